@@ -0,0 +1,478 @@
+"""Benchmarks for the storage, combat and rendering hot paths.
+
+Builds synthetic campaigns (see synthetic.py) in a temporary folder, drives
+the real tabs under the offscreen Qt platform and writes the timings as
+JSON. Pass --compare with an earlier results file to flag regressions.
+
+Usage:
+    python benchmarks/run.py [--sizes small,medium] [--repeat 5] [--output FILE]
+    python benchmarks/run.py --compare benchmarks/results/<old>.json
+    python benchmarks/run.py --diff OLD.json NEW.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from benchmarks import synthetic  # noqa: E402
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+DEFAULT_THRESHOLD = 1.25
+# Characters per campaign size; parties stay far smaller than bestiaries.
+CHARACTER_COUNTS = {"small": 5, "medium": 200, "large": 5000}
+COMBAT_SIZES = {"small": (8, 200), "medium": (40, 5000), "large": (200, 50000)}
+NOTES_SECTIONS = {"small": 10, "medium": 200, "large": 2000}
+DAMAGE_OPS = 20000
+GROUP_SIZE = 1000
+TUNER_HOSTILES = {"small": 4, "medium": 12, "large": 40}
+# Campaigns of 200 NPCs and 5 characters each in the library root.
+LIBRARY_CAMPAIGNS = {"small": 5, "medium": 50, "large": 300}
+# NPCs, characters and note sections in the full-text search index.
+SEARCH_SIZES = {"small": (500, 5, 10), "medium": (5000, 200, 200), "large": (50000, 200, 2000)}
+SEARCH_QUERIES = ["goblin", "gob", "fire bolt", "dragon cave", "the"]
+PALETTE_QUERIES = ["gob scim", "ember strike", "relic", "npc 00042", "frst"]
+EFFECT_COMBATANTS, EFFECTS_PER_COMBATANT, TURNS = 200, 25, 1000
+# Actions of the combatant in the combat action dialog (legendary creatures run long).
+ACTION_COUNTS = {"small": 10, "medium": 60, "large": 300}
+# List rows stepped through per tabs.*_browse sample, as with the arrow keys.
+BROWSE_ROWS = 50
+
+
+# --- Harness -----------------------------------------------------------
+def measure(func, repeat, setup=None, ops=1):
+    """Time func() `repeat` times (setup() runs untimed before each call)."""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    median = statistics.median(samples)
+    return {
+        "repeat": repeat,
+        "ops": ops,
+        "min_ms": min(samples) * 1000.0,
+        "median_ms": median * 1000.0,
+        "mean_ms": statistics.fmean(samples) * 1000.0,
+        "ops_per_s": ops / median if median > 0 else None,
+    }
+
+
+def _silence_dialogs():
+    """Answer modal message boxes immediately so save/delete paths run unattended."""
+    from PyQt5.QtWidgets import QMessageBox
+
+    QMessageBox.information = lambda *args, **kwargs: QMessageBox.Ok
+    QMessageBox.warning = lambda *args, **kwargs: QMessageBox.Ok
+    QMessageBox.question = lambda *args, **kwargs: QMessageBox.Yes
+
+
+def _make_window(folder):
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    from gui.main_window import MainWindow
+
+    window = MainWindow()
+    # Point at the folder without _apply_campaign, which would add the
+    # benchmark campaign to the user's recent list.
+    window.campaign_folder = folder
+    window.campaign_name = os.path.basename(folder)
+    return app, window
+
+
+def _write_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+# --- Benchmarks --------------------------------------------------------
+def bench_storage(size, folder, repeat, results):
+    from utils.file_io import load_entities, save_entity
+
+    npcs = synthetic.make_npcs(synthetic.SIZES[size])
+    synthetic.write_campaign(folder, npcs=npcs)
+    extra = synthetic.make_npcs(1, seed=99)[0]
+    results[f"storage.load_entities[{size}]"] = measure(lambda: load_entities("npcs", folder), repeat)
+    results[f"storage.save_entity[{size}]"] = measure(lambda: save_entity("npcs", extra, folder), repeat)
+
+
+def bench_tabs(size, folder, repeat, results, window):
+    npcs = synthetic.make_npcs(synthetic.SIZES[size])
+    characters = synthetic.make_characters(CHARACTER_COUNTS[size])
+    synthetic.write_campaign(folder, npcs=npcs, characters=characters)
+
+    for key, entities, save, delete in (
+        ("npc", npcs, "save_npc", "delete_npc"),
+        ("character", characters, "save_character", "delete_character"),
+    ):
+        tab = window.tab(key + "s")
+        tab.refresh_list()
+        target = len(entities) // 2
+        name = entities[target]["Name"]
+
+        def select_target():
+            # Reload the editor from the list, re-adding the entity if a delete removed it.
+            if tab.model.row_of(name) < 0:
+                _write_json(os.path.join(folder, f"{key}s.json"), entities)
+                tab.refresh_list()
+            tab.select_entity(name)
+
+        results[f"tabs.{key}_save[{size}]"] = measure(getattr(tab, save), repeat, setup=select_target)
+        results[f"tabs.{key}_delete[{size}]"] = measure(getattr(tab, delete), repeat, setup=select_target)
+        edit = tab.list_panel.filter_edit
+        results[f"tabs.{key}_filter[{size}]"] = measure(
+            lambda: edit.setText("ember"), repeat, setup=edit.clear
+        )
+        view = tab.list_view
+
+        def browse():
+            for row in range(min(BROWSE_ROWS, len(entities))):
+                view.setCurrentIndex(view.model().index(row, 0))
+
+        results[f"tabs.{key}_browse[{size}]"] = measure(
+            browse, repeat, setup=edit.clear, ops=min(BROWSE_ROWS, len(entities))
+        )
+
+
+def bench_actions(size, repeat, results, window):
+    from gui.combat_tab import ActionDialog
+
+    rng = random.Random(11)
+    count = ACTION_COUNTS[size]
+    combatant = dict(synthetic.make_npc(0, rng), Id=1, Actions=synthetic.make_actions(rng, count))
+    dialogs = []
+    results[f"combat.action_dialog[{size}]"] = measure(
+        lambda: dialogs.append(ActionDialog(combatant, [combatant], None, window)), repeat
+    )
+    for dialog in dialogs:
+        dialog.deleteLater()
+
+    # Alternate two lists so every load replaces the table.
+    editor = window.tab("npcs").editor
+    lists = [synthetic.make_actions(rng, count) for _ in range(2)]
+    loads = []
+
+    def load():
+        editor.set_actions(lists[len(loads) % 2])
+        loads.append(1)
+
+    results[f"tabs.npc_actions_load[{size}]"] = measure(load, repeat)
+
+
+def bench_damage(repeat, results):
+    from utils.combat_rules import apply_resist_vuln_immune, roll_damage
+
+    rng = random.Random(7)
+    targets = [synthetic.make_npc(i, rng) for i in range(50)]
+    work = [
+        (f"{rng.randint(1, 4)}d{rng.choice([4, 6, 8, 10, 12])}+{rng.randint(0, 5)}",
+         rng.choice(synthetic.DAMAGE_TYPES), rng.choice(targets), rng.random() < 0.05)
+        for _ in range(DAMAGE_OPS)
+    ]
+
+    def run():
+        for formula, damage_type, target, crit in work:
+            damage, _detail = roll_damage(formula, crit)
+            apply_resist_vuln_immune(damage, damage_type, target)
+
+    results["combat.roll_damage+apply_resist"] = measure(run, repeat, ops=DAMAGE_OPS)
+
+
+def bench_groups(repeat, results):
+    import numpy as np
+
+    from utils.monster_groups import MonsterGroup, resolve_group_action
+
+    rng = random.Random(11)
+    template = synthetic.make_combatant(synthetic.make_npc(0, rng), "NPC")
+    hero = synthetic.make_combatant(synthetic.make_character(0, rng), "Character")
+    action = dict(template["Actions"][0], damage="1d6+2")
+    fireball = {"name": "Fireball", "damage": "8d6", "damage_type": "fire"}
+    np_rng = np.random.default_rng(11)
+
+    def setup():
+        template["Group"] = MonsterGroup(GROUP_SIZE, 1000)
+        hero["HP"] = 10 ** 9
+
+    results["combat.group_attack[1000 members]"] = measure(
+        lambda: resolve_group_action(template, action, [hero], rng=np_rng), repeat, setup=setup, ops=GROUP_SIZE
+    )
+    results["combat.group_area_save[1000 members]"] = measure(
+        lambda: resolve_group_action(hero, fireball, [template], ("DEX", 15, True), rng=np_rng),
+        repeat, setup=setup, ops=GROUP_SIZE,
+    )
+
+
+def bench_effects(repeat, results):
+    from utils.effects import EffectsEngine
+    from utils.initiative import InitiativeTracker
+
+    rng = random.Random(13)
+    tracker = InitiativeTracker()
+    engine = EffectsEngine(tracker)
+    combatants = {f"c{i}": {"Name": f"c{i}", "HP": 10 ** 9, "CON": 12} for i in range(EFFECT_COMBATANTS)}
+    tracker.reset([(cid, rng.randint(1, 25), rng.randint(8, 18)) for cid in combatants])
+    tracker.start()
+    for i in range(EFFECT_COMBATANTS * EFFECTS_PER_COMBATANT):
+        cid = f"c{i % EFFECT_COMBATANTS}"
+        if i % 5 == 0:
+            engine.add(cid, "Burning", ongoing={"damage": "1d4", "type": "fire", "phase": "start"})
+        else:
+            engine.add(cid, "Long effect", condition="poisoned", rounds=10 ** 6)
+
+    def run():
+        for _ in range(TURNS):
+            tracker.next_turn()
+            engine.advance(combatants, rng)
+
+    results[f"combat.effects_advance[{EFFECT_COMBATANTS * EFFECTS_PER_COMBATANT} effects]"] = measure(
+        run, repeat, ops=TURNS
+    )
+
+
+def bench_encounters(size, repeat, results):
+    from utils.encounters import MonsterIndex, build_encounters
+
+    npcs = synthetic.make_npcs(synthetic.SIZES[size], 17)
+    index = MonsterIndex(npcs)
+    rng = random.Random(17)
+    results[f"encounters.index[{size}]"] = measure(lambda: MonsterIndex(npcs), repeat)
+    results[f"encounters.build[{size}]"] = measure(
+        lambda: build_encounters(index, [8] * 5, "hard", 12, limit=20, rng=rng), repeat
+    )
+
+
+def bench_tuner(size, repeat, results):
+    from utils.encounter_sim import tune
+
+    hero = {"hp": 40, "ac": 16, "init": 2, "attack": 6, "dice": (1, 10, 4), "count": 1}
+    goblin = {"hp": 7, "ac": 13, "init": 2, "attack": 4, "dice": (1, 6, 2), "count": TUNER_HOSTILES[size]}
+    spec = {
+        "party": [dict(hero, id=i, name=f"Hero {i}") for i in range(4)],
+        "hostiles": [dict(goblin, id="goblins", name="Goblin")],
+    }
+    # One worker, so the number does not depend on the machine's core count.
+    results[f"encounter_sim.tune[{size}]"] = measure(lambda: tune(spec, seed=17, workers=1), repeat)
+
+
+def bench_library(size, root, repeat, results):
+    from utils.library_index import LibraryIndex
+
+    for i in range(LIBRARY_CAMPAIGNS[size]):
+        synthetic.write_campaign(
+            os.path.join(root, f"campaign{i:03d}"),
+            npcs=synthetic.make_npcs(200, seed=i),
+            characters=synthetic.make_characters(5, seed=i),
+        )
+    results[f"library.full_index[{size}]"] = measure(lambda: LibraryIndex(root).update(save=False), repeat)
+    index = LibraryIndex(root)
+    index.update()
+    results[f"library.load[{size}]"] = measure(lambda: LibraryIndex(root).load(), repeat)
+    results[f"library.incremental_update[{size}]"] = measure(index.update, repeat)
+    results[f"library.search[{size}]"] = measure(lambda: index.search("goblin"), repeat)
+    entries = index.search("")[:100]
+    results[f"library.load_entity[{size}]"] = measure(
+        lambda: [index.load_entity(e) for e in entries], repeat, ops=len(entries)
+    )
+
+
+def bench_search(size, folder, repeat, results):
+    from utils.search_index import SearchIndex
+
+    npc_count, character_count, sections = SEARCH_SIZES[size]
+    npcs = synthetic.make_npcs(npc_count)
+    characters = synthetic.make_characters(character_count)
+    notes = synthetic.make_notes(sections, [n["Name"] for n in npcs[:50]])
+
+    def build():
+        index = SearchIndex()
+        index.sync_entities("NPC", npcs)
+        index.sync_entities("Character", characters)
+        index.set_notes(notes)
+        return index
+
+    results[f"search.build[{size}]"] = measure(build, repeat)
+    index = build()
+    index.save(folder)
+    results[f"search.load[{size}]"] = measure(lambda: SearchIndex.load(folder), repeat)
+    results[f"search.resync_unchanged[{size}]"] = measure(lambda: index.sync_entities("NPC", npcs), repeat)
+    index.search(SEARCH_QUERIES[0])
+    results[f"search.query[{size}]"] = measure(
+        lambda: [index.search(q) for q in SEARCH_QUERIES], repeat, ops=len(SEARCH_QUERIES)
+    )
+    results[f"search.add_entity[{size}]"] = measure(lambda: index.add_entity("NPC", npcs[0]), repeat)
+
+
+def bench_palette(size, repeat, results):
+    from gui.command_palette import FRAME_BUDGET, entity_candidates
+    from utils.fuzzy_index import FuzzyIndex
+
+    npcs = synthetic.make_npcs(SEARCH_SIZES[size][0])
+
+    def build():
+        index = FuzzyIndex()
+        for npc in npcs:
+            candidates = entity_candidates("NPC", npc)
+            index.set_group(("NPC", candidates[0][0][2]), candidates)
+        return index
+
+    results[f"palette.build[{size}]"] = measure(build, repeat)
+    index = build()
+    index.search("warm up")
+    results[f"palette.query[{size}]"] = measure(
+        lambda: [index.search(q) for q in PALETTE_QUERIES], repeat, ops=len(PALETTE_QUERIES)
+    )
+    # What the palette shows after its first slice: one frame budget of ranking.
+    results[f"palette.first_frame[{size}]"] = measure(
+        lambda: [index.ranking(q).step(FRAME_BUDGET) for q in PALETTE_QUERIES], repeat, ops=len(PALETTE_QUERIES)
+    )
+
+
+def bench_combat(size, folder, repeat, results, window):
+    combatants, log_lines = COMBAT_SIZES[size]
+    state = synthetic.make_combat_state(combatants, log_lines)
+    synthetic.write_campaign(folder, combat=state)
+    tab = window.tab("combat")
+    results[f"combat.load_saved_state[{size}]"] = measure(tab.load_saved_state, repeat)
+    results[f"combat.refresh_table[{size}]"] = measure(tab.refresh_table, repeat)
+
+
+def bench_notes(size, folder, repeat, results, window):
+    names = [n["Name"] for n in synthetic.make_npcs(50)]
+    notes = synthetic.make_notes(NOTES_SECTIONS[size], names)
+    tab = window.tab("notes")
+    tab._set_editor_text(notes)
+    window.entity_index.set_entities("NPC", synthetic.make_npcs(50))
+    result = measure(tab.render_markdown, repeat)
+    result["chars"] = len(notes)
+    results[f"notes.render_markdown[{size}]"] = result
+
+
+# --- Results -----------------------------------------------------------
+def _git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(baseline, current, threshold):
+    """Print median ratios against a baseline; returns the regressed benchmark names."""
+    regressed = []
+    print(f"{'benchmark':<44} {'base ms':>10} {'now ms':>10} {'ratio':>7}")
+    for name in sorted(current["results"]):
+        now = current["results"][name]["median_ms"]
+        base = baseline["results"].get(name, {}).get("median_ms")
+        if base is None:
+            print(f"{name:<44} {'-':>10} {now:10.2f} {'new':>7}")
+            continue
+        ratio = now / base if base > 0 else float("inf")
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(f"{name:<44} {base:10.2f} {now:10.2f} {ratio:7.2f}{flag}")
+        if flag:
+            regressed.append(name)
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="small,medium", help=f"comma list of {', '.join(synthetic.SIZES)}")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--diff", nargs=2, metavar=("OLD", "NEW"), help="compare two results files and exit")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="median ratio that fails")
+    args = parser.parse_args(argv)
+
+    if args.diff:
+        with open(args.diff[0], encoding="utf-8") as f:
+            old = json.load(f)
+        with open(args.diff[1], encoding="utf-8") as f:
+            new = json.load(f)
+        return 1 if compare(old, new, args.threshold) else 0
+
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in synthetic.SIZES]
+    if unknown:
+        parser.error(f"unknown size(s): {', '.join(unknown)}")
+
+    workdir = tempfile.mkdtemp(prefix="dnd-bench-")
+    # Keep the app's stall log out of the user's profile during the run.
+    os.environ.setdefault("DND_STALL_LOG", os.path.join(workdir, "stalls.jsonl"))
+    _silence_dialogs()
+    results = {}
+    try:
+        bench_damage(args.repeat, results)
+        bench_groups(args.repeat, results)
+        bench_effects(args.repeat, results)
+        for size in sizes:
+            folder = os.path.join(workdir, size)
+            os.makedirs(folder)
+            _app, window = _make_window(folder)
+            bench_storage(size, os.path.join(folder, "storage"), args.repeat, results)
+            bench_encounters(size, args.repeat, results)
+            bench_tuner(size, args.repeat, results)
+            bench_library(size, os.path.join(folder, "library"), args.repeat, results)
+            bench_search(size, os.path.join(folder, "search"), args.repeat, results)
+            bench_palette(size, args.repeat, results)
+            bench_tabs(size, folder, args.repeat, results, window)
+            bench_combat(size, folder, args.repeat, results, window)
+            bench_actions(size, args.repeat, results, window)
+            bench_notes(size, folder, args.repeat, results, window)
+            window.stall_monitor.stop()
+            window.deleteLater()
+            print(f"finished {size}", file=sys.stderr)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    from PyQt5.QtCore import QT_VERSION_STR
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "qt": QT_VERSION_STR,
+            "platform": platform.platform(),
+            "sizes": sizes,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{report['meta']['commit']}.json")
+    _write_json(output, report)
+
+    for name in sorted(results):
+        r = results[name]
+        rate = f"  {r['ops_per_s']:.0f} ops/s" if r["ops"] > 1 else ""
+        print(f"{name:<44} median {r['median_ms']:10.2f} ms{rate}")
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        return 1 if compare(baseline, report, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""Deterministic synthetic campaign data for the benchmarks.
+
+Entities follow the shape the editors save, so the same data exercises the
+storage code, the tabs and the combat helpers.
+"""
+import json
+import os
+import random
+
+# Named campaign sizes used by run.py (NPC count; characters scale down).
+SIZES = {"small": 10, "medium": 1000, "large": 50000}
+
+CREATURE_TYPES = ["Humanoid", "Beast", "Undead", "Fiend", "Dragon", "Monstrosity", "Construct", "Elemental"]
+DAMAGE_TYPES = ["slashing", "piercing", "bludgeoning", "fire", "cold", "poison", "necrotic", "radiant"]
+HABITATS = ["Forest", "Underdark", "Mountain", "Swamp", "Urban", "Coastal", "Desert", "Arctic"]
+CLASSES = ["Fighter", "Wizard", "Rogue", "Cleric", "Ranger", "Paladin", "Bard", "Warlock"]
+RACES = ["Human", "Elf", "Dwarf", "Halfling", "Gnome", "Tiefling", "Dragonborn", "Half-Orc"]
+WORDS = (
+    "ancient tower shadow river blade crown whisper ember frost vault oath relic "
+    "caravan marsh citadel lantern raven serpent temple harbor goblin council"
+).split()
+
+
+def _words(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def make_actions(rng, count=3):
+    actions = []
+    for i in range(count):
+        dice = rng.choice([4, 6, 8, 10, 12])
+        actions.append({
+            "name": f"{_words(rng, 1).title()} Strike {i + 1}",
+            "type": rng.choice(["Melee Weapon Attack", "Ranged Weapon Attack", "Spell Attack"]),
+            "attack_bonus": str(rng.randint(2, 9)),
+            "damage": f"{rng.randint(1, 3)}d{dice}+{rng.randint(0, 5)}",
+            "damage_type": rng.choice(DAMAGE_TYPES),
+            "description": _words(rng, 12),
+        })
+    return actions
+
+
+def make_npc(index, rng):
+    return {
+        "Name": f"NPC {index:05d} {_words(rng, 1).title()}",
+        "Type": rng.choice(CREATURE_TYPES),
+        "TokenImage": "",
+        "Role/Title": _words(rng, 2).title(),
+        "AC": str(rng.randint(10, 20)),
+        "HP": str(rng.randint(5, 250)),
+        "Initiative": str(rng.randint(-1, 5)),
+        "Speed": f"{rng.choice([20, 25, 30, 40])} ft.",
+        "STR": str(rng.randint(6, 22)),
+        "DEX": str(rng.randint(6, 20)),
+        "CON": str(rng.randint(6, 22)),
+        "INT": str(rng.randint(3, 18)),
+        "WIS": str(rng.randint(6, 18)),
+        "CHA": str(rng.randint(3, 18)),
+        "Skills": "Perception +4, Stealth +3",
+        "Gear": _words(rng, 3),
+        "Senses": "darkvision 60 ft., passive Perception 14",
+        "Languages": "Common",
+        "CR": rng.choice(["1/8", "1/4", "1/2", "1", "2", "3", "5", "8", "11", "15"]),
+        "Habitat": rng.choice(HABITATS),
+        "Description": _words(rng, 40),
+        "Resistances": rng.choice(["", "fire", "cold, poison", "bludgeoning, piercing, and slashing"]),
+        "Vulnerabilities": rng.choice(["", "", "radiant"]),
+        "Immunities": rng.choice(["", "", "poison", "necrotic"]),
+        "Actions": make_actions(rng, rng.randint(1, 4)),
+    }
+
+
+def make_character(index, rng):
+    return {
+        "Name": f"Hero {index:05d} {_words(rng, 1).title()}",
+        "TokenImage": "",
+        "Race": rng.choice(RACES),
+        "Class": rng.choice(CLASSES),
+        "Level": str(rng.randint(1, 20)),
+        "Alignment": "Neutral Good",
+        "HP": str(rng.randint(8, 180)),
+        "AC": str(rng.randint(11, 20)),
+        "STR": str(rng.randint(8, 20)),
+        "DEX": str(rng.randint(8, 20)),
+        "CON": str(rng.randint(8, 20)),
+        "INT": str(rng.randint(8, 20)),
+        "WIS": str(rng.randint(8, 20)),
+        "CHA": str(rng.randint(8, 20)),
+        "Resistances": "",
+        "Vulnerabilities": "",
+        "Immunities": "",
+        "Actions": make_actions(rng, 3),
+    }
+
+
+def make_npcs(count, seed=1):
+    rng = random.Random(seed)
+    return [make_npc(i, rng) for i in range(count)]
+
+
+def make_characters(count, seed=2):
+    rng = random.Random(seed)
+    return [make_character(i, rng) for i in range(count)]
+
+
+def make_combatant(entity, typ):
+    """A combat-table row built the way CombatTab.add_combatant builds it."""
+    return {
+        "Name": entity.get("Name", ""),
+        "Type": typ,
+        "NPCType": entity.get("Type", "") if typ == "NPC" else "",
+        "Class": entity.get("Class", ""),
+        "Race": entity.get("Race", ""),
+        "HP": int(entity.get("HP", 10)),
+        "AC": int(entity.get("AC", 10)),
+        "STR": int(entity.get("STR", 10)),
+        "DEX": int(entity.get("DEX", 10)),
+        "CON": int(entity.get("CON", 10)),
+        "INT": int(entity.get("INT", 10)),
+        "WIS": int(entity.get("WIS", 10)),
+        "CHA": int(entity.get("CHA", 10)),
+        "Initiative": 0,
+        "Actions": [dict(a) for a in entity.get("Actions", [])],
+        "Resistances": entity.get("Resistances", ""),
+        "Vulnerabilities": entity.get("Vulnerabilities", ""),
+        "Immunities": entity.get("Immunities", ""),
+        "TokenImage": entity.get("TokenImage", ""),
+    }
+
+
+def make_combat_log(count, names, seed=3):
+    rng = random.Random(seed)
+    lines = []
+    for i in range(count):
+        attacker, target = rng.choice(names), rng.choice(names)
+        kind = i % 4
+        if kind == 0:
+            lines.append(f"{attacker} attacks {target}: d20 roll {rng.randint(1, 20)} + 5")
+        elif kind == 1:
+            lines.append(f"{target} takes {rng.randint(1, 30)} {rng.choice(DAMAGE_TYPES)} damage and hits!")
+        elif kind == 2:
+            lines.append(f"{attacker} said: {_words(rng, 10)}")
+        else:
+            lines.append(f"Damage roll: 2d6+3: ({rng.randint(1, 6)} + {rng.randint(1, 6)}) +3")
+    return lines
+
+
+def make_combat_state(combatants=20, log_lines=5000, seed=4):
+    rng = random.Random(seed)
+    entities = [("NPC", make_npc(i, rng)) for i in range(combatants // 2)]
+    entities += [("Character", make_character(i, rng)) for i in range(combatants - len(entities))]
+    rows = [make_combatant(entity, typ) for typ, entity in entities]
+    return {
+        "combatants": rows,
+        "log_lines": make_combat_log(log_lines, [r["Name"] for r in rows] or ["Nobody"], seed),
+        "active_speaker": "__DM__",
+    }
+
+
+def make_notes(sections=200, names=(), seed=5):
+    """Markdown notes with headings, lists, code blocks and [[Name]] links."""
+    rng = random.Random(seed)
+    names = list(names) or ["Nobody"]
+    parts = ["# Campaign Notes\n"]
+    for i in range(sections):
+        parts.append(f"## Session {i + 1}: {_words(rng, 3).title()}\n")
+        for _ in range(3):
+            parts.append(
+                f"{_words(rng, 25).capitalize()} [[{rng.choice(names)}]] {_words(rng, 15)}. "
+                f"**{_words(rng, 2)}** and *{_words(rng, 2)}*.\n"
+            )
+        parts.append("".join(f"- {_words(rng, 6)}\n" for _ in range(4)))
+        if i % 10 == 0:
+            parts.append("```\n" + _words(rng, 20) + "\n```\n")
+        parts.append("\n")
+    return "\n".join(parts)
+
+
+def write_campaign(folder, npcs=(), characters=(), combat=None, notes=None):
+    """Write campaign files the way the app lays them out."""
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, "npcs.json"), "w", encoding="utf-8") as f:
+        json.dump(list(npcs), f, indent=2)
+    with open(os.path.join(folder, "characters.json"), "w", encoding="utf-8") as f:
+        json.dump(list(characters), f, indent=2)
+    if combat is not None:
+        with open(os.path.join(folder, "combat_state.json"), "w", encoding="utf-8") as f:
+            json.dump(combat, f, indent=2)
+    if notes is not None:
+        with open(os.path.join(folder, "notes.md"), "w", encoding="utf-8") as f:
+            f.write(notes)
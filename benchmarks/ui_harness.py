@@ -0,0 +1,302 @@
+"""Scripted UI scalability harness.
+
+Drives the real Character, NPC and Combat tabs under the offscreen Qt
+platform from a JSON (or YAML, if PyYAML is installed) scenario: generate a
+campaign, load it, click through entities, add combatants, roll initiative
+and execute attacks through the same dialogs a user sees. Each interaction
+is timed until the event queue is drained, and the report holds a latency
+histogram per interaction plus peak RSS.
+
+Usage:
+    python benchmarks/ui_harness.py benchmarks/scenarios/large_campaign.json [--output FILE]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from benchmarks import synthetic  # noqa: E402
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+# Upper bounds (ms) of the histogram buckets; the last bucket is open-ended.
+BUCKETS_MS = [1, 2, 4, 8, 16, 33, 50, 100, 200, 500, 1000, 2000]
+LOAD_TIMEOUT_S = 600
+
+
+# --- Scenario loading --------------------------------------------------
+def load_scenario(path):
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise SystemExit("YAML scenarios need PyYAML (pip install pyyaml); JSON works without it.")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+# --- Measurement -------------------------------------------------------
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+def histogram(samples_ms):
+    counts = [0] * (len(BUCKETS_MS) + 1)
+    for value in samples_ms:
+        for i, bound in enumerate(BUCKETS_MS):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+    labels = [f"<={b}" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}"]
+    return dict(zip(labels, counts))
+
+
+def summarize(samples_ms):
+    ordered = sorted(samples_ms)
+    return {
+        "count": len(ordered),
+        "p50_ms": statistics.median(ordered),
+        "p95_ms": ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))],
+        "max_ms": ordered[-1],
+        "histogram": histogram(ordered),
+    }
+
+
+class Harness:
+    def __init__(self, app, window, folder, seed):
+        self.app = app
+        self.window = window
+        self.folder = folder
+        self.rng = random.Random(seed)
+        self.samples = {}
+        self.rss = []
+
+    def timed(self, name, action):
+        """Run one interaction and wait for the event queue to drain."""
+        start = time.perf_counter()
+        action()
+        self.app.processEvents()
+        self.samples.setdefault(name, []).append((time.perf_counter() - start) * 1000.0)
+
+    def respond(self, handler):
+        """Run handler(dialog) once the next modal dialog opens (for exec_() calls)."""
+        from PyQt5.QtCore import QTimer
+        from PyQt5.QtWidgets import QApplication
+
+        def poll():
+            dialog = QApplication.activeModalWidget()
+            if dialog is None:
+                QTimer.singleShot(0, poll)
+                return
+            handler(dialog)
+
+        QTimer.singleShot(0, poll)
+
+    # --- Steps ---------------------------------------------------------
+    def step_load_campaign(self, step, name):
+        def load():
+            self.window._apply_campaign(os.path.basename(self.folder), self.folder)
+            deadline = time.monotonic() + LOAD_TIMEOUT_S
+            while self.window.loader.is_loading() and time.monotonic() < deadline:
+                self.app.processEvents()
+
+        self.timed(name, load)
+
+    def step_open_tab(self, step, name):
+        key = step["tab"]
+        self.timed(name, lambda: self.window.tabs.setCurrentIndex(self.window._tab_position(key)))
+
+    def step_click_entities(self, step, name):
+        view = self.window.tab(step["tab"]).list_view
+        total = view.model().rowCount()
+        if not total:
+            return
+        count = min(step.get("count", 50), total)
+        for i in range(count):
+            index = view.model().index(i * total // count, 0)
+
+            def click(index=index):
+                view.setCurrentIndex(index)
+
+            self.timed(name, click)
+
+    def step_add_combatants(self, step, name):
+        """Add random combatants; "group": N adds random NPCs as monster groups of N."""
+        from PyQt5.QtWidgets import QComboBox, QSpinBox
+
+        combat = self.window.tab("combat")
+        group = step.get("group", 1)
+
+        def pick(dialog):
+            combo = dialog.findChild(QComboBox)
+            if group > 1:
+                npcs = [i for i in range(combo.count()) if combo.itemText(i).startswith("NPC:")]
+                combo.setCurrentIndex(self.rng.choice(npcs))
+                dialog.findChild(QSpinBox).setValue(group)
+            else:
+                combo.setCurrentIndex(self.rng.randrange(combo.count()))
+            dialog.accept()
+
+        for _ in range(step.get("count", 10)):
+            self.respond(pick)
+            self.timed(name, combat.add_btn.click)
+
+    def step_roll_initiative(self, step, name):
+        combat = self.window.tab("combat")
+        for _ in range(step.get("repeat", 10)):
+            self.timed(name, combat.roll_initiative_btn.click)
+
+    def step_next_turn(self, step, name):
+        combat = self.window.tab("combat")
+        for _ in range(step.get("repeat", 20)):
+            self.timed(name, combat.next_turn_btn.click)
+
+    def step_select_combatants(self, step, name):
+        table = self.window.tab("combat").table
+        for _ in range(step.get("count", 50)):
+            if table.rowCount():
+                self.timed(name, lambda: table.selectRow(self.rng.randrange(table.rowCount())))
+
+    def step_attack(self, step, name):
+        """Open a combatant's actions, execute one against random targets, close the dialog.
+
+        "targets" (default 1) picks that many targets per action, so area
+        attacks can be measured with the same step.
+        """
+        from PyQt5.QtWidgets import QListWidget
+
+        combat = self.window.tab("combat")
+        per_action = step.get("targets", 1)
+
+        def pick_target(dialog):
+            targets = dialog.findChild(QListWidget)
+            targets.clearSelection()
+            for row in self.rng.sample(range(targets.count()), min(per_action, targets.count())):
+                targets.item(row).setSelected(True)
+            dialog.accept()
+
+        def run_action(dialog):
+            rows = dialog.model.rowCount()
+            if rows:
+                self.respond(pick_target)
+                # What clicking the row's Execute button emits.
+                dialog.table.executed.emit(self.rng.randrange(rows))
+            dialog.reject()
+
+        for _ in range(step.get("count", 20)):
+            rows = [r for r, c in enumerate(combat.combatants) if c.get("Actions")]
+            if len(combat.combatants) < 2 or not rows:
+                return
+            row = self.rng.choice(rows)
+            self.respond(run_action)
+            self.timed(name, combat.table.cellWidget(row, 7).click)
+
+    def run(self, steps):
+        for step in steps:
+            kind = step["do"]
+            handler = getattr(self, f"step_{kind}", None)
+            if handler is None:
+                raise SystemExit(f"Unknown scenario step '{kind}'")
+            handler(step, step.get("label", kind))
+            self.rss.append({"after": step.get("label", kind), "peak_rss_mb": peak_rss_mb()})
+            print(f"  {step.get('label', kind):<24} done (peak RSS {peak_rss_mb() or 0:.0f} MB)", file=sys.stderr)
+
+
+# --- Setup -------------------------------------------------------------
+def build_campaign(folder, spec):
+    seed = spec.get("seed", 1)
+    npcs = synthetic.make_npcs(spec.get("npcs", 1000), seed)
+    characters = synthetic.make_characters(spec.get("characters", 20), seed + 1)
+    combat = None
+    if spec.get("combatants") or spec.get("log_lines"):
+        combat = synthetic.make_combat_state(spec.get("combatants", 0), spec.get("log_lines", 0), seed + 2)
+    names = [n["Name"] for n in npcs[:200]] + [c["Name"] for c in characters[:50]]
+    notes = synthetic.make_notes(spec.get("notes_sections", 50), names, seed + 3)
+    synthetic.write_campaign(folder, npcs=npcs, characters=characters, combat=combat, notes=notes)
+
+
+def _print_report(report):
+    for name, stats in report["interactions"].items():
+        print(f"\n{name}: n={stats['count']} p50={stats['p50_ms']:.1f} ms "
+              f"p95={stats['p95_ms']:.1f} ms max={stats['max_ms']:.1f} ms")
+        top = max(stats["histogram"].values()) or 1
+        for label, count in stats["histogram"].items():
+            if count:
+                print(f"  {label:>7} ms | {'#' * max(1, round(40 * count / top))} {count}")
+    print(f"\nPeak RSS: {report['peak_rss_mb'] or 0:.0f} MB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scenario", help="scenario file (.json, or .yaml with PyYAML)")
+    parser.add_argument("--output", help="report file (default: benchmarks/results/ui-<scenario>-<time>.json)")
+    args = parser.parse_args(argv)
+
+    scenario = load_scenario(args.scenario)
+    name = scenario.get("name") or os.path.splitext(os.path.basename(args.scenario))[0]
+    workdir = tempfile.mkdtemp(prefix="dnd-ui-")
+    folder = os.path.join(workdir, name)
+    # Keep the run out of the user's recent-campaign list, stall log and AI quota:
+    # without a key the narration call fails fast, as it does for users without one.
+    os.environ["DND_STALL_LOG"] = os.path.join(workdir, "stalls.jsonl")
+    if not scenario.get("narration"):
+        os.environ.pop("OPENAI_API_KEY", None)
+
+    from PyQt5.QtCore import QSettings
+    from PyQt5.QtWidgets import QApplication
+
+    QSettings.setPath(QSettings.NativeFormat, QSettings.UserScope, workdir)
+    QSettings.setPath(QSettings.IniFormat, QSettings.UserScope, workdir)
+    app = QApplication.instance() or QApplication(sys.argv)
+    from gui.main_window import MainWindow
+
+    try:
+        print(f"Generating campaign '{name}'...", file=sys.stderr)
+        build_campaign(folder, scenario.get("campaign", {}))
+        random.seed(scenario.get("seed", 1))
+        window = MainWindow()
+        app.processEvents()
+        harness = Harness(app, window, folder, scenario.get("seed", 1))
+        harness.run(scenario.get("steps", []))
+        window.stall_monitor.stop()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "scenario": name,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "campaign": scenario.get("campaign", {}),
+        "interactions": {key: summarize(values) for key, values in harness.samples.items()},
+        "rss": harness.rss,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"ui-{name}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    _print_report(report)
+    print(f"Report written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+import json
+
+from PyQt5.QtWidgets import QAbstractItemView, QHeaderView, QStyle, QStyleOptionButton, QStyledItemDelegate, QTableView
+from PyQt5.QtCore import QAbstractTableModel, QEvent, QModelIndex, Qt, pyqtSignal
+
+ACTION_KEYS = ["name", "type", "attack_bonus", "damage", "damage_type", "description"]
+HEADERS = ["Name", "Type", "Attack Bonus", "Damage", "Damage Type", "Description"]
+ACTION_ROLE = Qt.UserRole
+
+
+def normalize_action(action):
+    """An action dict with a string for each of ACTION_KEYS (None becomes "")."""
+    if not isinstance(action, dict):
+        action = {"name": action}
+    return {key: "" if action.get(key) is None else str(action.get(key)) for key in ACTION_KEYS}
+
+
+def parse_actions(text):
+    """Actions from a JSON list of action objects, or a single object.
+
+    Raises ValueError (json.JSONDecodeError included) for anything else.
+    """
+    data = json.loads(text)
+    if isinstance(data, dict):
+        data = [data]
+    if not isinstance(data, list):
+        raise ValueError("Expected a list of actions.")
+    for i, action in enumerate(data, 1):
+        if not isinstance(action, dict):
+            raise ValueError(f"Action {i} is not an object.")
+        if not str(action.get("name") or "").strip():
+            raise ValueError(f"Action {i} has no name.")
+    return [normalize_action(action) for action in data]
+
+
+class ActionsTableModel(QAbstractTableModel):
+    """The actions of a character, NPC or combatant, one row per action.
+
+    set_actions() loads a whole list in one batch of updates. With editable
+    the six text columns can be edited in place; with execute_column a
+    seventh column holds an Execute button drawn by ExecuteDelegate.
+    """
+
+    def __init__(self, editable=False, execute_column=False, parent=None):
+        super().__init__(parent)
+        self.editable = editable
+        self.execute_column = execute_column
+        self.rows = []
+
+    # --- Qt model interface --------------------------------------------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(ACTION_KEYS) + self.execute_column
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Vertical:
+            return section + 1
+        return HEADERS[section] if section < len(HEADERS) else "Execute"
+
+    def data(self, index, role=Qt.DisplayRole):
+        # Views ask for every role of every cell; most are left to the style.
+        if role not in (Qt.DisplayRole, Qt.EditRole, Qt.ToolTipRole, ACTION_ROLE) or not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+        if role == ACTION_ROLE:
+            return self.rows[row]
+        if col == len(ACTION_KEYS):
+            return "Execute" if role == Qt.DisplayRole else None
+        if role == Qt.ToolTipRole:
+            return self.rows[row]["description"] or None if ACTION_KEYS[col] == "description" else None
+        return self.rows[row][ACTION_KEYS[col]]
+
+    def flags(self, index):
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if self.editable and index.column() < len(ACTION_KEYS):
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or not self.editable or index.column() >= len(ACTION_KEYS):
+            return False
+        self.rows[index.row()][ACTION_KEYS[index.column()]] = str(value)
+        self.dataChanged.emit(index, index)
+        return True
+
+    # --- Actions -------------------------------------------------------
+    def set_actions(self, actions):
+        """Show actions in one batch of model updates.
+
+        Rows that differ are rewritten in place and the surplus inserted or
+        removed at the end, so the view keeps its layout and selection
+        instead of being reset.
+        """
+        rows = [normalize_action(action) for action in actions or []]
+        if rows == self.rows:
+            return
+        old, new = len(self.rows), len(rows)
+        if new < old:
+            self.beginRemoveRows(QModelIndex(), new, old - 1)
+            del self.rows[new:]
+            self.endRemoveRows()
+        elif new > old:
+            self.beginInsertRows(QModelIndex(), old, new - 1)
+            self.rows.extend(rows[old:])
+            self.endInsertRows()
+        changed = [row for row in range(min(old, new)) if self.rows[row] != rows[row]]
+        if changed:
+            self.rows[:changed[-1] + 1] = rows[:changed[-1] + 1]
+            self.dataChanged.emit(self.index(changed[0], 0), self.index(changed[-1], self.columnCount() - 1))
+
+    def actions(self):
+        return [dict(row) for row in self.rows]
+
+    def action(self, row):
+        return dict(self.rows[row])
+
+    def append(self, action):
+        row = len(self.rows)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.rows.append(normalize_action(action))
+        self.endInsertRows()
+        return row
+
+    def replace(self, row, action):
+        self.rows[row] = normalize_action(action)
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(ACTION_KEYS) - 1))
+
+    def remove(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.rows[row]
+        self.endRemoveRows()
+
+    def to_json(self):
+        return json.dumps(self.rows, indent=2)
+
+    def load_json(self, text):
+        """Replace the actions with those in text; raises ValueError if it is not valid."""
+        self.set_actions(parse_actions(text))
+
+
+class ExecuteDelegate(QStyledItemDelegate):
+    """Draws a push button in each cell and emits clicked(row) when one is clicked."""
+
+    clicked = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pressed = None
+
+    def paint(self, painter, option, index):
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+        button = QStyleOptionButton()
+        button.rect = option.rect.adjusted(2, 2, -2, -2)
+        button.text = str(index.data() or "")
+        button.state = QStyle.State_Enabled
+        button.state |= QStyle.State_Sunken if self._pressed == index.row() else QStyle.State_Raised
+        if option.state & QStyle.State_HasFocus:
+            button.state |= QStyle.State_HasFocus
+        widget = option.widget
+        style = widget.style() if widget is not None else None
+        if style is not None:
+            style.drawControl(QStyle.CE_PushButton, button, painter, widget)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonPress and event.button() == Qt.LeftButton:
+            self._pressed = index.row()
+        elif event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            pressed, self._pressed = self._pressed, None
+            if pressed == index.row() and option.rect.contains(event.pos()):
+                self.clicked.emit(index.row())
+                return True
+        return False
+
+
+class ActionsTable(QTableView):
+    """Table view for an ActionsTableModel.
+
+    With an Execute column, clicking a row's button, or Space/Enter on
+    the current row, emits executed(row).
+    """
+
+    executed = pyqtSignal(int)
+
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.setModel(model)
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        if model.execute_column:
+            delegate = ExecuteDelegate(self)
+            delegate.clicked.connect(self.executed)
+            self.setItemDelegateForColumn(len(ACTION_KEYS), delegate)
+
+    def current_row(self):
+        index = self.currentIndex()
+        return index.row() if index.isValid() else -1
+
+    def select_action(self, row):
+        """Make row current on its Execute button (or first column) and focus the table."""
+        column = len(ACTION_KEYS) if self.model().execute_column else 0
+        index = self.model().index(row, column)
+        self.setCurrentIndex(index)
+        self.selectRow(row)
+        self.scrollTo(index)
+        self.setFocus()
+
+    def keyPressEvent(self, event):
+        row = self.current_row()
+        if (self.model().execute_column and row >= 0
+                and event.key() in (Qt.Key_Space, Qt.Key_Return, Qt.Key_Enter)):
+            self.executed.emit(row)
+            return
+        super().keyPressEvent(event)
@@ -0,0 +1,170 @@
+import marshal
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from utils.campaign_snapshot import SOURCE_FILES, gc_paused, read_snapshot, source_signature, write_snapshot
+from utils.file_io import CAMPAIGN_PARTS
+from utils.notes_index import note_sections
+
+# Parts computed from another part inside the same worker: part -> (source part, function).
+DERIVED_PARTS = {"notes_index": ("notes", note_sections)}
+
+
+class _TaskSignals(QObject):
+    snapshot_checked = pyqtSignal(int, object, object)
+    loaded = pyqtSignal(int, str, object, object)
+    failed = pyqtSignal(int, str, str)
+
+
+class _SnapshotTask(QRunnable):
+    def __init__(self, loader, generation, folder):
+        super().__init__()
+        self.loader = loader
+        self.generation = generation
+        self.folder = folder
+        self.signals = loader._signals
+
+    def run(self):
+        if self.loader.generation != self.generation:
+            return
+        signature = source_signature(self.folder)
+        parts = read_snapshot(self.folder, signature)
+        self.signals.snapshot_checked.emit(self.generation, signature, parts)
+
+
+class _LoadPartTask(QRunnable):
+    def __init__(self, loader, generation, part, folder):
+        super().__init__()
+        self.loader = loader
+        self.generation = generation
+        self.part = part
+        self.folder = folder
+        self.signals = loader._signals
+
+    def run(self):
+        if self.loader.generation != self.generation:
+            return
+        try:
+            with gc_paused():
+                data = CAMPAIGN_PARTS[self.part](self.folder)
+            results = [(self.part, data)]
+            for derived, (source, func) in DERIVED_PARTS.items():
+                if source == self.part:
+                    results.append((derived, func(data)))
+        except Exception as exc:
+            self.signals.failed.emit(self.generation, self.part, str(exc))
+            return
+        # Marshal here, off the GUI thread, before the tabs start mutating the data.
+        for part, value in results:
+            self.signals.loaded.emit(self.generation, part, value, marshal.dumps(value))
+
+
+class _WriteSnapshotTask(QRunnable):
+    def __init__(self, folder, signature, blobs):
+        super().__init__()
+        self.folder = folder
+        self.signature = signature
+        self.blobs = blobs
+
+    def run(self):
+        try:
+            write_snapshot(self.folder, self.signature, self.blobs)
+        except OSError:
+            # The snapshot is only a cache; the next load parses the JSON again.
+            pass
+
+
+class CampaignLoader(QObject):
+    """Reads the parts of a campaign concurrently on the global thread pool.
+
+    A valid warm-start snapshot is tried first and, when fresh, delivers
+    every part from a single read. Otherwise each part is parsed in its own
+    task and delivered on the GUI thread through part_loaded as soon as it
+    is ready, and a new snapshot is written once all parts are in.
+    Starting a new load (or calling cancel) bumps the generation, so
+    results still in flight for an older campaign are dropped.
+    """
+
+    part_loaded = pyqtSignal(str, object)
+    part_failed = pyqtSignal(str, str)
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.generation = 0
+        self.folder = None
+        self.from_snapshot = False
+        self._pending = set()
+        self._total = 0
+        self._signature = None
+        self._blobs = {}
+        self._failed = False
+        self._signals = _TaskSignals()
+        self._signals.snapshot_checked.connect(self._on_snapshot_checked)
+        self._signals.loaded.connect(self._on_loaded)
+        self._signals.failed.connect(self._on_failed)
+
+    def is_loading(self):
+        return bool(self._pending)
+
+    def start(self, folder):
+        self.cancel()
+        self.folder = folder
+        self.from_snapshot = False
+        self._pending = set(SOURCE_FILES)
+        self._total = len(self._pending)
+        self._blobs = {}
+        self._failed = False
+        self.progress.emit(0, self._total)
+        QThreadPool.globalInstance().start(_SnapshotTask(self, self.generation, folder))
+
+    def cancel(self):
+        self.generation += 1
+        self._pending = set()
+
+    def _on_snapshot_checked(self, generation, signature, parts):
+        if generation != self.generation:
+            return
+        if parts is not None:
+            self.from_snapshot = True
+            for part, data in parts.items():
+                self._deliver(part, data)
+            return
+        self._signature = signature
+        pool = QThreadPool.globalInstance()
+        for part in CAMPAIGN_PARTS:
+            pool.start(_LoadPartTask(self, generation, part, self.folder))
+
+    def _deliver(self, part, data):
+        if part not in self._pending:
+            return
+        self._pending.discard(part)
+        self.part_loaded.emit(part, data)
+        self.progress.emit(self._total - len(self._pending), self._total)
+        if not self._pending:
+            self._complete()
+
+    def _complete(self):
+        if not self.from_snapshot and not self._failed and set(self._blobs) == set(SOURCE_FILES):
+            QThreadPool.globalInstance().start(_WriteSnapshotTask(self.folder, self._signature, self._blobs))
+        self.finished.emit()
+
+    def _on_loaded(self, generation, part, data, blob):
+        if generation != self.generation:
+            return
+        self._blobs[part] = blob
+        self._deliver(part, data)
+
+    def _on_failed(self, generation, part, message):
+        if generation != self.generation:
+            return
+        self._failed = True
+        failed_parts = [part] + [d for d, (source, _f) in DERIVED_PARTS.items() if source == part]
+        for failed in failed_parts:
+            if failed in self._pending:
+                self._pending.discard(failed)
+                self.part_failed.emit(failed, message)
+        self.progress.emit(self._total - len(self._pending), self._total)
+        if not self._pending:
+            self._complete()
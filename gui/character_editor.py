@@ -1,4 +1,3 @@
-import random
 from PyQt5.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -8,9 +7,6 @@ from PyQt5.QtWidgets import (
     QFormLayout,
     QMessageBox,
     QHBoxLayout,
-    QTableWidget,
-    QTableWidgetItem,
-    QHeaderView,
     QDialog,
     QDialogButtonBox,
     QGridLayout,
@@ -20,6 +16,9 @@ from PyQt5.QtWidgets import (
     QSizePolicy,
 )
 from PyQt5.QtCore import Qt
+from gui.actions_model import ActionsTable, ActionsTableModel
+from gui.form_binding import FormBinder
+from utils.rng import default_service
 
 class ActionDialog(QDialog):
     def __init__(self, action=None, parent=None):
@@ -133,6 +132,29 @@ class CharacterEditor(QWidget):
 
         form_container_layout.addLayout(self.form)
 
+        # Character fields in saved order; required ones must be filled in to save.
+        self.binder = FormBinder()
+        for key, widget, required in [
+            ("Name", self.name_edit, True),
+            ("TokenImage", self.token_edit, False),
+            ("Race", self.race_edit, True),
+            ("Class", self.class_edit, True),
+            ("Level", self.level_edit, True),
+            ("Alignment", self.alignment_edit, True),
+            ("HP", self.hp_edit, True),
+            ("AC", self.ac_edit, True),
+            ("STR", self.str_edit, True),
+            ("DEX", self.dex_edit, True),
+            ("CON", self.con_edit, True),
+            ("INT", self.int_edit, True),
+            ("WIS", self.wis_edit, True),
+            ("CHA", self.cha_edit, True),
+            ("Resistances", self.resist_edit, False),
+            ("Vulnerabilities", self.vuln_edit, False),
+            ("Immunities", self.immune_edit, False),
+        ]:
+            self.binder.bind(key, widget, required=required)
+
         roll_layout = QHBoxLayout()
         roll_layout.setContentsMargins(0, 0, 0, 0)
         self.roll_btn = QPushButton("Roll Stats (4d6 drop lowest)")
@@ -145,9 +167,8 @@ class CharacterEditor(QWidget):
         self.splitter.addWidget(form_scroll)
 
         # --- Actions section ---
-        self.actions_table = QTableWidget(0, 6)
-        self.actions_table.setHorizontalHeaderLabels(["Name", "Type", "Attack Bonus", "Damage", "Damage Type", "Description"])
-        self.actions_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.actions_model = ActionsTableModel(editable=True, parent=self)
+        self.actions_table = ActionsTable(self.actions_model)
 
         self.add_action_btn = QPushButton("Add Action")
         self.edit_action_btn = QPushButton("Edit Action")
@@ -193,31 +214,46 @@ class CharacterEditor(QWidget):
     def add_footer_layout(self, layout):
         self.footer_layout.addLayout(layout)
 
+    def load_entity(self, character):
+        """Show a character dict in the form and actions table."""
+        self.binder.apply(character)
+        self.set_actions(character.get("Actions", []) or [])
+
+    def clear_form(self):
+        self.binder.clear()
+        self.actions_model.set_actions([])
+
+    def entity_data(self):
+        """The character dict being edited, with its actions."""
+        data = self.binder.values()
+        data["Actions"] = self.get_actions()
+        return data
+
+    def set_actions(self, actions):
+        """Set the actions table from a list of action dicts."""
+        self.actions_model.set_actions(actions)
+
+    def get_actions(self):
+        return self.actions_model.actions()
+
     def add_action(self):
         dialog = ActionDialog(parent=self)
         if dialog.exec_():
-            action = dialog.get_action()
-            row = self.actions_table.rowCount()
-            self.actions_table.insertRow(row)
-            for col, key in enumerate(["name", "type", "attack_bonus", "damage", "damage_type", "description"]):
-                self.actions_table.setItem(row, col, QTableWidgetItem(action[key]))
+            self.actions_model.append(dialog.get_action())
 
     def edit_action(self):
-        row = self.actions_table.currentRow()
+        row = self.actions_table.current_row()
         if row < 0:
             QMessageBox.warning(self, "No Selection", "Select an action to edit.")
             return
-        action = {key: self.actions_table.item(row, col).text() if self.actions_table.item(row, col) else "" for col, key in enumerate(["name", "type", "attack_bonus", "damage", "damage_type", "description"])}
-        dialog = ActionDialog(action, parent=self)
+        dialog = ActionDialog(self.actions_model.action(row), parent=self)
         if dialog.exec_():
-            action = dialog.get_action()
-            for col, key in enumerate(["name", "type", "attack_bonus", "damage", "damage_type", "description"]):
-                self.actions_table.setItem(row, col, QTableWidgetItem(action[key]))
+            self.actions_model.replace(row, dialog.get_action())
 
     def remove_action(self):
-        row = self.actions_table.currentRow()
+        row = self.actions_table.current_row()
         if row >= 0:
-            self.actions_table.removeRow(row)
+            self.actions_model.remove(row)
 
     def roll_stats(self):
         stats = [self.roll_4d6_drop_lowest() for _ in range(6)]
@@ -229,47 +265,15 @@ class CharacterEditor(QWidget):
         self.cha_edit.setText(str(stats[5]))
 
     def roll_4d6_drop_lowest(self):
-        rolls = sorted([random.randint(1, 6) for _ in range(4)])
+        stream = default_service().stream("chargen")
+        rolls = sorted([stream.randint(1, 6) for _ in range(4)])
         return sum(rolls[1:])
 
     def save_character(self):
         # Validate mandatory fields
-        mandatory = [
-            (self.name_edit, "Name"),
-            (self.race_edit, "Race"),
-            (self.class_edit, "Class"),
-            (self.level_edit, "Level"),
-            (self.alignment_edit, "Alignment"),
-            (self.hp_edit, "HP"),
-            (self.ac_edit, "AC"),
-            (self.str_edit, "STR"),
-            (self.dex_edit, "DEX"),
-            (self.con_edit, "CON"),
-            (self.int_edit, "INT"),
-            (self.wis_edit, "WIS"),
-            (self.cha_edit, "CHA"),
-        ]
-        missing = [label for edit, label in mandatory if not edit.text().strip()]
+        missing = self.binder.missing()
         if missing:
             QMessageBox.warning(self, "Missing Fields", f"Please fill in all mandatory fields: {', '.join(missing)}")
             return
-        # Collect actions from table
-        actions = []
-        for row in range(self.actions_table.rowCount()):
-            action = {
-                "name": self.actions_table.item(row, 0).text() if self.actions_table.item(row, 0) else "",
-                "type": self.actions_table.item(row, 1).text() if self.actions_table.item(row, 1) else "",
-                "attack_bonus": self.actions_table.item(row, 2).text() if self.actions_table.item(row, 2) else "",
-                "damage": self.actions_table.item(row, 3).text() if self.actions_table.item(row, 3) else "",
-                "damage_type": self.actions_table.item(row, 4).text() if self.actions_table.item(row, 4) else "",
-                "description": self.actions_table.item(row, 5).text() if self.actions_table.item(row, 5) else "",
-            }
-            actions.append(action)
-        # Collect resistances, vulnerabilities, immunities
-        token_image = self.token_edit.text().strip()
-        resistances = self.resist_edit.text().strip()
-        vulnerabilities = self.vuln_edit.text().strip()
-        immunities = self.immune_edit.text().strip()
-        # Placeholder: Save logic would go here, now includes new fields
-        # Example: character_data = {..., "TokenImage": token_image, "Resistances": resistances, ...}
+        # Placeholder: Save logic would go here
         QMessageBox.information(self, "Saved", "Character saved (placeholder).")
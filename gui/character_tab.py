@@ -2,23 +2,23 @@ from PyQt5.QtWidgets import (
     QWidget,
     QHBoxLayout,
     QVBoxLayout,
-    QListWidget,
     QPushButton,
     QMessageBox,
     QLabel,
-    QListWidgetItem,
-    QTableWidgetItem,
     QLineEdit,
     QApplication,
     QSplitter,
 )
 from PyQt5.QtCore import Qt
 from gui.character_editor import CharacterEditor
+from gui.entity_list_model import EntityListModel, EntityListPanel, character_rank
+from utils.action_profiler import profiled_action
+from utils.ai import chat_completion
+from utils.entity_index import name_key
 from utils.file_io import load_entities
 from gui.global_log import GlobalLogWidget
 import os
 import json
-import openai
 
 class CharacterTab(QWidget):
     def __init__(self, main_window):
@@ -37,7 +37,10 @@ class CharacterTab(QWidget):
         left_layout = QVBoxLayout(sidebar)
         left_layout.setContentsMargins(0, 0, 0, 0)
         left_layout.setSpacing(6)
-        self.list_widget = QListWidget()
+        # Filled by MainWindow once the campaign's characters are loaded.
+        self.model = EntityListModel(character_rank, self)
+        self.list_panel = EntityListPanel(self.model, "Level", with_types=False)
+        self.list_view = self.list_panel.view
         self.add_btn = QPushButton("+")
         self.add_btn.setToolTip("Add New Character")
         self.add_btn.clicked.connect(self.new_character)
@@ -46,9 +49,9 @@ class CharacterTab(QWidget):
         # Add Delete button
         self.delete_btn = QPushButton("Delete")
         self.delete_btn.setToolTip("Delete Selected Character")
-        self.delete_btn.clicked.connect(self.delete_character)
+        self.delete_btn.clicked.connect(lambda: self.delete_character())
         left_layout.addWidget(self.delete_btn)
-        left_layout.addWidget(self.list_widget)
+        left_layout.addWidget(self.list_panel, stretch=1)
         splitter.addWidget(sidebar)
 
         # --- AI Generation UI ---
@@ -58,7 +61,7 @@ class CharacterTab(QWidget):
         self.ai_desc_edit = QLineEdit()
         self.ai_desc_edit.setPlaceholderText("Describe the character to generate (e.g. 'elven wizard, level 5')")
         self.ai_generate_btn = QPushButton("Generate with AI")
-        self.ai_generate_btn.clicked.connect(self.generate_with_ai)
+        self.ai_generate_btn.clicked.connect(lambda: self.generate_with_ai())
         ai_layout.addWidget(self.ai_desc_edit)
         ai_layout.addWidget(self.ai_generate_btn)
 
@@ -70,24 +73,17 @@ class CharacterTab(QWidget):
 
         self.editor = CharacterEditor()
         self.editor.save_btn.clicked.disconnect()
-        self.editor.save_btn.clicked.connect(self.save_character)
+        self.editor.save_btn.clicked.connect(lambda: self.save_character())
         right_layout.addWidget(self.editor, stretch=1)
 
         # Add "Copy Action as String" button below the actions table
         self.copy_action_btn = QPushButton("Copy Action as String")
         def copy_selected_action():
-            row = self.editor.actions_table.currentRow()
+            row = self.editor.actions_table.current_row()
             if row < 0:
                 QMessageBox.warning(self, "No Action Selected", "Please select an action row to copy.")
                 return
-            action = {
-                "name": self.editor.actions_table.item(row, 0).text() if self.editor.actions_table.item(row, 0) else "",
-                "type": self.editor.actions_table.item(row, 1).text() if self.editor.actions_table.item(row, 1) else "",
-                "attack_bonus": self.editor.actions_table.item(row, 2).text() if self.editor.actions_table.item(row, 2) else "",
-                "damage": self.editor.actions_table.item(row, 3).text() if self.editor.actions_table.item(row, 3) else "",
-                "damage_type": self.editor.actions_table.item(row, 4).text() if self.editor.actions_table.item(row, 4) else "",
-                "description": self.editor.actions_table.item(row, 5).text() if self.editor.actions_table.item(row, 5) else "",
-            }
+            action = self.editor.actions_model.action(row)
             clipboard = QApplication.clipboard()
             clipboard.setText(json.dumps(action, indent=2))
             QMessageBox.information(self, "Copied", "Selected action copied to clipboard as JSON.")
@@ -114,7 +110,7 @@ class CharacterTab(QWidget):
                 "Output only the JSON object."
             )
             try:
-                response = openai.chat.completions.create(
+                response = chat_completion(
                     model="gpt-4.1-mini",
                     messages=[{"role": "user", "content": prompt}],
                     max_tokens=300,
@@ -123,10 +119,7 @@ class CharacterTab(QWidget):
                 )
                 content = response.choices[0].message.content
                 action = json.loads(content)
-                row = self.editor.actions_table.rowCount()
-                self.editor.actions_table.insertRow(row)
-                for col, key in enumerate(["name", "type", "attack_bonus", "damage", "damage_type", "description"]):
-                    self.editor.actions_table.setItem(row, col, QTableWidgetItem(str(action.get(key, ""))))
+                self.editor.actions_model.append(action)
                 QMessageBox.information(self, "AI Generated", "Action generated and added to table.")
             except Exception as e:
                 QMessageBox.critical(self, "AI Error", f"Failed to generate action with AI:\n{e}")
@@ -140,129 +133,60 @@ class CharacterTab(QWidget):
         splitter.setStretchFactor(0, 1)
         splitter.setStretchFactor(1, 3)
 
-        self.list_widget.itemClicked.connect(self.load_character)
+        self.list_view.selectionModel().currentChanged.connect(self._on_current_changed)
+        # A click also reloads the current entity, e.g. after starting a new one.
+        self.list_view.clicked.connect(lambda index: self._on_current_changed(index, None))
+        self.selected_index = None
+
+    @property
+    def characters(self):
+        return self.model.entities
+
+    def _on_current_changed(self, current, _previous):
+        row = self.list_panel.source_row(current)
+        if row >= 0 and row != self.selected_index:
+            self.load_character(row)
 
-        self.characters = []
+    def refresh_list(self, characters=None):
+        """Repopulate the list, reading characters.json unless already-loaded characters are given."""
+        if characters is None:
+            folder = self.main_window.campaign_folder
+            characters = load_entities("characters", folder) if folder else []
+            self.main_window.entity_index.set_entities("Character", characters)
         self.selected_index = None
-        self.refresh_list()
+        self.model.set_entities(characters)
 
-    def refresh_list(self):
-        folder = self.main_window.campaign_folder
-        self.characters = load_entities("characters", folder) if folder else []
-        self.list_widget.clear()
-        for char in self.characters:
-            item = QListWidgetItem(char.get("Name", "Unnamed"))
-            self.list_widget.addItem(item)
+    def select_entity(self, name):
+        """Select and load the character with the given name (case-insensitive)."""
+        row = self.model.row_of(name)
+        if row < 0:
+            return False
+        self.list_panel.select_row(row)
+        if self.selected_index != row:
+            self.load_character(row)
+        return True
 
     def new_character(self):
         self.selected_index = None
-        self.editor.name_edit.clear()
-        self.editor.token_edit.clear()
-        self.editor.race_edit.clear()
-        self.editor.class_edit.clear()
-        self.editor.level_edit.clear()
-        self.editor.alignment_edit.clear()
-        self.editor.hp_edit.clear()
-        self.editor.ac_edit.clear()
-        self.editor.str_edit.clear()
-        self.editor.dex_edit.clear()
-        self.editor.con_edit.clear()
-        self.editor.int_edit.clear()
-        self.editor.wis_edit.clear()
-        self.editor.cha_edit.clear()
-        self.editor.resist_edit.clear()
-        self.editor.vuln_edit.clear()
-        self.editor.immune_edit.clear()
-        # Clear actions table
-        self.editor.actions_table.setRowCount(0)
+        self.editor.clear_form()
 
-    def load_character(self, item):
-        idx = self.list_widget.row(item)
-        char = self.characters[idx]
+    def load_character(self, idx):
         self.selected_index = idx
-        self.editor.name_edit.setText(char.get("Name", ""))
-        self.editor.token_edit.setText(char.get("TokenImage", ""))
-        self.editor.race_edit.setText(char.get("Race", ""))
-        self.editor.class_edit.setText(char.get("Class", ""))
-        self.editor.level_edit.setText(str(char.get("Level", "")))
-        self.editor.alignment_edit.setText(char.get("Alignment", ""))
-        self.editor.hp_edit.setText(str(char.get("HP", "")))
-        self.editor.ac_edit.setText(str(char.get("AC", "")))
-        self.editor.str_edit.setText(str(char.get("STR", "")))
-        self.editor.dex_edit.setText(str(char.get("DEX", "")))
-        self.editor.con_edit.setText(str(char.get("CON", "")))
-        self.editor.int_edit.setText(str(char.get("INT", "")))
-        self.editor.wis_edit.setText(str(char.get("WIS", "")))
-        self.editor.cha_edit.setText(str(char.get("CHA", "")))
-        self.editor.resist_edit.setText(char.get("Resistances", ""))
-        self.editor.vuln_edit.setText(char.get("Vulnerabilities", ""))
-        self.editor.immune_edit.setText(char.get("Immunities", ""))
-        actions = char.get("Actions", [])
-        self.editor.actions_table.setRowCount(0)
-        for action in actions:
-            row = self.editor.actions_table.rowCount()
-            self.editor.actions_table.insertRow(row)
-            for col, key in enumerate(["name", "type", "attack_bonus", "damage", "damage_type", "description"]):
-                self.editor.actions_table.setItem(row, col, QTableWidgetItem(str(action.get(key, ""))))
+        self.editor.load_entity(self.characters[idx])
 
+    @profiled_action("Save Character")
     def save_character(self):
-        mandatory = [
-            (self.editor.name_edit, "Name"),
-            (self.editor.race_edit, "Race"),
-            (self.editor.class_edit, "Class"),
-            (self.editor.level_edit, "Level"),
-            (self.editor.alignment_edit, "Alignment"),
-            (self.editor.hp_edit, "HP"),
-            (self.editor.ac_edit, "AC"),
-            (self.editor.str_edit, "STR"),
-            (self.editor.dex_edit, "DEX"),
-            (self.editor.con_edit, "CON"),
-            (self.editor.int_edit, "INT"),
-            (self.editor.wis_edit, "WIS"),
-            (self.editor.cha_edit, "CHA"),
-        ]
-        missing = [label for edit, label in mandatory if not edit.text().strip()]
+        missing = self.editor.binder.missing()
         if missing:
             msg = f"Please fill in all mandatory fields: {', '.join(missing)}"
-            GlobalLogWidget.instance().log(msg, error=True)
+            GlobalLogWidget.instance().log(msg, error=True, source="Characters")
             QMessageBox.warning(self, "Missing Fields", msg)
             return
-        # Collect actions from table
-        actions = []
-        for row in range(self.editor.actions_table.rowCount()):
-            action = {
-                "name": self.editor.actions_table.item(row, 0).text() if self.editor.actions_table.item(row, 0) else "",
-                "type": self.editor.actions_table.item(row, 1).text() if self.editor.actions_table.item(row, 1) else "",
-                "attack_bonus": self.editor.actions_table.item(row, 2).text() if self.editor.actions_table.item(row, 2) else "",
-                "damage": self.editor.actions_table.item(row, 3).text() if self.editor.actions_table.item(row, 3) else "",
-                "damage_type": self.editor.actions_table.item(row, 4).text() if self.editor.actions_table.item(row, 4) else "",
-                "description": self.editor.actions_table.item(row, 5).text() if self.editor.actions_table.item(row, 5) else "",
-            }
-            actions.append(action)
-        char_data = {
-            "Name": self.editor.name_edit.text().strip(),
-            "TokenImage": self.editor.token_edit.text().strip(),
-            "Race": self.editor.race_edit.text().strip(),
-            "Class": self.editor.class_edit.text().strip(),
-            "Level": self.editor.level_edit.text().strip(),
-            "Alignment": self.editor.alignment_edit.text().strip(),
-            "HP": self.editor.hp_edit.text().strip(),
-            "AC": self.editor.ac_edit.text().strip(),
-            "STR": self.editor.str_edit.text().strip(),
-            "DEX": self.editor.dex_edit.text().strip(),
-            "CON": self.editor.con_edit.text().strip(),
-            "INT": self.editor.int_edit.text().strip(),
-            "WIS": self.editor.wis_edit.text().strip(),
-            "CHA": self.editor.cha_edit.text().strip(),
-            "Resistances": self.editor.resist_edit.text().strip(),
-            "Vulnerabilities": self.editor.vuln_edit.text().strip(),
-            "Immunities": self.editor.immune_edit.text().strip(),
-            "Actions": actions,
-        }
+        char_data = self.editor.entity_data()
         folder = self.main_window.campaign_folder
         if not folder:
             msg = "Please create or load a campaign first."
-            GlobalLogWidget.instance().log(msg, error=True)
+            GlobalLogWidget.instance().log(msg, error=True, source="Characters")
             QMessageBox.warning(self, "No Campaign", msg)
             return
         # Override character with same name if exists
@@ -271,14 +195,18 @@ class CharacterTab(QWidget):
         if os.path.exists(json_path):
             with open(json_path, "r") as f:
                 chars = json.load(f)
-            # Remove any character with the same name
-            chars = [c for c in chars if c.get("Name", "") != char_data["Name"]]
+            # Remove any character with the same name, matched the way the list matches it
+            key = name_key(char_data["Name"])
+            chars = [c for c in chars if name_key(c.get("Name", "")) != key]
         chars.append(char_data)
         with open(json_path, "w") as f:
             json.dump(chars, f, indent=2)
+        self.selected_index = self.model.upsert(char_data)
+        self.list_panel.select_row(self.selected_index)
+        self.main_window.entity_index.add("Character", char_data)
         QMessageBox.information(self, "Saved", "Character saved.")
-        self.refresh_list()
 
+    @profiled_action("Generate Character with AI")
     def generate_with_ai(self):
         desc = self.ai_desc_edit.text().strip()
         prompt = (
@@ -289,7 +217,7 @@ class CharacterTab(QWidget):
             "Output only the JSON object."
         )
         try:
-            response = openai.chat.completions.create(
+            response = chat_completion(
                 model="gpt-4.1-mini",
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=800,
@@ -298,33 +226,15 @@ class CharacterTab(QWidget):
             )
             content = response.choices[0].message.content
             char = json.loads(content)
-            # Fill editor fields
-            self.editor.name_edit.setText(char.get("Name", ""))
-            self.editor.race_edit.setText(char.get("Race", ""))
-            self.editor.class_edit.setText(char.get("Class", ""))
-            self.editor.level_edit.setText(str(char.get("Level", "")))
-            self.editor.alignment_edit.setText(char.get("Alignment", ""))
-            self.editor.hp_edit.setText(str(char.get("HP", "")))
-            self.editor.ac_edit.setText(str(char.get("AC", "")))
-            self.editor.str_edit.setText(str(char.get("STR", "")))
-            self.editor.dex_edit.setText(str(char.get("DEX", "")))
-            self.editor.con_edit.setText(str(char.get("CON", "")))
-            self.editor.int_edit.setText(str(char.get("INT", "")))
-            self.editor.wis_edit.setText(str(char.get("WIS", "")))
-            self.editor.cha_edit.setText(str(char.get("CHA", "")))
-            actions = char.get("Actions", [])
-            self.editor.actions_table.setRowCount(0)
-            for action in actions:
-                row = self.editor.actions_table.rowCount()
-                self.editor.actions_table.insertRow(row)
-                for col, key in enumerate(["name", "type", "attack_bonus", "damage", "damage_type", "description"]):
-                    self.editor.actions_table.setItem(row, col, QTableWidgetItem(str(action.get(key, ""))))
+            # Fill editor fields; ones the reply leaves out keep their text
+            self.editor.load_entity(dict(self.editor.binder.values(), **char))
             QMessageBox.information(self, "AI Generated", "Character generated and fields populated.")
         except Exception as e:
             QMessageBox.critical(self, "AI Error", f"Failed to generate character with AI:\n{e}")
 
+    @profiled_action("Delete Character")
     def delete_character(self):
-        selected = self.list_widget.currentRow()
+        selected = self.list_panel.source_row()
         if selected < 0:
             QMessageBox.warning(self, "Delete Character", "No character selected.")
             return
@@ -343,30 +253,13 @@ class CharacterTab(QWidget):
                 if os.path.exists(json_path):
                     with open(json_path, "r") as f:
                         chars = json.load(f)
-                    # Remove first entry with matching name
-                    for i, c in enumerate(chars):
-                        if c.get("Name", "") == name:
-                            del chars[i]
-                            break
+                    # Remove every entry the list row stands for
+                    chars = [c for c in chars if name_key(c.get("Name", "")) != name_key(name)]
                     with open(json_path, "w") as f:
                         json.dump(chars, f, indent=2)
             # Remove from UI
-            self.refresh_list()
-            self.editor.name_edit.clear()
-            self.editor.token_edit.clear()
-            self.editor.race_edit.clear()
-            self.editor.class_edit.clear()
-            self.editor.level_edit.clear()
-            self.editor.alignment_edit.clear()
-            self.editor.hp_edit.clear()
-            self.editor.ac_edit.clear()
-            self.editor.str_edit.clear()
-            self.editor.dex_edit.clear()
-            self.editor.con_edit.clear()
-            self.editor.int_edit.clear()
-            self.editor.wis_edit.clear()
-            self.editor.cha_edit.clear()
-            self.editor.resist_edit.clear()
-            self.editor.vuln_edit.clear()
-            self.editor.immune_edit.clear()
-            self.editor.actions_table.setRowCount(0)
+            self.list_panel.clear_current()
+            self.model.remove(selected)
+            self.selected_index = None
+            self.main_window.entity_index.remove("Character", name)
+            self.editor.clear_form()
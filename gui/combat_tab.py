@@ -15,90 +15,56 @@ from PyQt5.QtWidgets import (
     QTextEdit,
     QComboBox,
     QPlainTextEdit,
+    QListWidget,
+    QListWidgetItem,
+    QCheckBox,
+    QSpinBox,
+    QShortcut,
 )
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QIcon, QPixmap, QTextCharFormat, QColor
-import random
-import re
+from PyQt5.QtGui import QIcon, QPixmap, QTextCharFormat, QColor, QBrush, QFont, QKeySequence
 import os
 import json
-from utils.file_io import load_entities
-import openai
-
-# ---------- Helper functions ----------
-def roll_dice(formula):
-    """Basic dice roller for non-damage rolls like 1d20+5"""
-    match = re.match(r"(\d+)d(\d+)([+-]\d+)?", formula.replace(" ", ""))
-    if not match:
-        return 0, "Invalid dice formula"
-    num, die, mod = int(match.group(1)), int(match.group(2)), match.group(3)
-    rolls = [random.randint(1, die) for _ in range(num)]
-    total = sum(rolls)
-    mod_val = int(mod) if mod else 0
-    result = total + mod_val
-    roll_str = f"({' + '.join(str(r) for r in rolls)})"
-    if mod:
-        roll_str += f" {mod}"
-    return result, f"{formula}: {roll_str} = {result}"
-
-
-def parse_tags(val):
-    """Normalize resistance/immunity/vulnerability strings."""
-    if not val:
-        return set()
-    if isinstance(val, (list, tuple, set)):
-        items = val
-    else:
-        items = re.split(r"(?:,|/|;|\band\b|\bor\b)", str(val), flags=re.I)
-    return {s.strip().lower() for s in items if s and s.strip()}
-
-
-def roll_damage(formula, crit=False):
-    """Roll damage with crit (doubles dice only)."""
-    m = re.match(r"\s*(\d+)d(\d+)\s*([+-]\s*\d+)?\s*$", str(formula))
-    if not m:
-        return 0, f"Invalid damage formula '{formula}'"
-    num, die = int(m.group(1)), int(m.group(2))
-    mod = int(m.group(3).replace(" ", "")) if m.group(3) else 0
-    num_eff = num * 2 if crit else num
-    rolls = [random.randint(1, die) for _ in range(num_eff)]
-    total = sum(rolls) + mod
-    parts = " + ".join(str(r) for r in rolls)
-    if mod:
-        parts += f" {'+' if mod >= 0 else ''}{mod}"
-    return max(
-        0, total
-    ), f"{num_eff}d{die}{('+' + str(mod)) if mod else ''}: ({parts}) = {total}"
-
-
-def apply_resist_vuln_immune(base_damage, damage_type, target):
-    """Adjust damage for resistances, vulnerabilities, immunities."""
-    dmg_types = parse_tags(damage_type)
-    res = parse_tags(target.get("Resistances", ""))
-    vul = parse_tags(target.get("Vulnerabilities", ""))
-    imm = parse_tags(target.get("Immunities", ""))
-    
-    # if immune to all damage types
-    if dmg_types and len(dmg_types & imm) == len(dmg_types):
-        return 0, "immune"
-
-    adjusted = base_damage
-    notes = []
-    if dmg_types and dmg_types & res:
-        adjusted = base_damage // 2
-        notes.append("resistance")
-    if dmg_types and dmg_types & vul:
-        adjusted = adjusted * 2
-        notes.append("vulnerability")
-
-    note = "+".join(notes) if notes else None
-    return adjusted, note
+from contextlib import nullcontext
+from gui.actions_model import ActionsTable, ActionsTableModel
+from utils.action_profiler import profiled_action
+from utils.ai import chat_completion
+# The dice and damage helpers used to live here; they are re-exported for existing imports.
+from utils.combat_rules import (
+    apply_resist_vuln_immune,
+    parse_save,
+    parse_tags,
+    roll_damage,
+    roll_dice,
+)
+from utils.combat_history import CombatHistory
+from utils.combat_replay import change_hp, jsonable, perform_action, roll_initiative_for, start_state
+from utils.effects import EffectsEngine
+from utils.file_io import load_combat_state, load_entities
+from utils.initiative import InitiativeTracker, initiative_bonus, new_combatant_id
+from utils.rng import RNGService
+from utils.tracing import span, traced
+
+
+def _display_name(combatant):
+    """Name as shown in the table; monster groups add their headcount."""
+    group = combatant.get("Group")
+    if group is None:
+        return str(combatant.get("Name", ""))
+    return f"{combatant.get('Name', '')} ×{group.alive_count()}/{group.size}"
+
+
+def _state_default(obj):
+    """json.dump hook: monster groups save as their compact state."""
+    if hasattr(obj, "to_state"):
+        return obj.to_state()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
 
 
 # ---------- ActionDialog ----------
 class ActionDialog(QDialog):
     def __init__(
-        self, combatant, all_combatants, log_callback, main_window, parent=None
+        self, combatant, all_combatants, log_callback, main_window, parent=None, selected=None
     ):
         super().__init__(parent)
         self.setWindowTitle(f"Actions for {combatant['Name']}")
@@ -108,41 +74,31 @@ class ActionDialog(QDialog):
         self.main_window = main_window
 
         self.layout = QVBoxLayout()
-        self.table = QTableWidget(0, 7)
-        self.table.setHorizontalHeaderLabels(
-            [
-                "Name",
-                "Type",
-                "Attack Bonus",
-                "Damage",
-                "Damage Type",
-                "Description",
-                "Execute",
-            ]
-        )
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.model = ActionsTableModel(execute_column=True, parent=self)
+        self.table = ActionsTable(self.model)
+        self.table.executed.connect(self.execute_action)
         self.layout.addWidget(self.table)
         self.refresh_table()
 
         refresh_btn = QPushButton("Refresh Actions")
+        # Enter belongs to the selected action's Execute button.
+        refresh_btn.setAutoDefault(False)
         refresh_btn.clicked.connect(self.refresh_actions_from_campaign)
         self.layout.addWidget(refresh_btn)
 
         self.setLayout(self.layout)
         self.resize(700, 300)
+        if selected is not None:
+            self.select_action(selected)
 
+    def select_action(self, row):
+        """Highlight an action and focus its Execute button, so Space runs it."""
+        if 0 <= row < self.model.rowCount():
+            self.table.select_action(row)
+
+    @traced("combat.action_dialog.refresh_table")
     def refresh_table(self):
-        self.table.setRowCount(len(self.combatant.get("Actions", [])))
-        for row, action in enumerate(self.combatant.get("Actions", [])):
-            for col, key in enumerate(
-                ["name", "type", "attack_bonus", "damage", "damage_type", "description"]
-            ):
-                item = QTableWidgetItem(str(action.get(key, "")))
-                item.setFlags(item.flags() & ~Qt.ItemIsEditable)
-                self.table.setItem(row, col, item)
-            exec_btn = QPushButton("Execute")
-            exec_btn.clicked.connect(lambda _, r=row: self.execute_action(r))
-            self.table.setCellWidget(row, 6, exec_btn)
+        self.model.set_actions(self.combatant.get("Actions", []))
 
     def refresh_actions_from_campaign(self):
         folder = self.main_window.campaign_folder
@@ -167,112 +123,152 @@ class ActionDialog(QDialog):
                 self, "Not Found", f"{typ} '{name}' not found in campaign data."
             )
 
-    def select_target_dialog(self):
+    def select_targets_dialog(self, action):
+        """Pick one or more targets, plus the save DC for saving-throw actions.
+
+        Returns (targets, save) where save is (ability, dc, half_on_success)
+        or None for an attack roll, or (None, None) if cancelled.
+        """
         targets = [c for c in self.all_combatants if c is not self.combatant]
         if not targets:
             QMessageBox.warning(self, "No Target", "No other combatants to target.")
-            return None, False
+            return None, None
         dlg = QDialog(self)
-        dlg.setWindowTitle("Select Target")
+        dlg.setWindowTitle("Select Targets")
         layout = QVBoxLayout()
-        combo = QComboBox()
+        layout.addWidget(QLabel("Select one or more targets (Ctrl/Shift-click, or Select All):"))
+        target_list = QListWidget()
+        target_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
         for t in targets:
-            combo.addItem(t["Name"])
-        layout.addWidget(QLabel("Select target:"))
-        layout.addWidget(combo)
+            target_list.addItem(f"{_display_name(t)} (HP {t.get('HP', '')}, AC {t.get('AC', '')})")
+        target_list.setCurrentRow(0)
+        layout.addWidget(target_list)
+        select_row = QHBoxLayout()
+        all_btn = QPushButton("Select All")
+        all_btn.clicked.connect(target_list.selectAll)
+        type_btn = QPushButton(f"All {self.combatant.get('Type', '')} Opponents")
+        type_btn.setToolTip("Select every combatant whose type differs from the attacker's.")
+        type_btn.clicked.connect(
+            lambda: [
+                target_list.item(i).setSelected(t.get("Type") != self.combatant.get("Type"))
+                for i, t in enumerate(targets)
+            ]
+        )
+        select_row.addWidget(all_btn)
+        select_row.addWidget(type_btn)
+        select_row.addStretch(1)
+        layout.addLayout(select_row)
+
+        parsed = parse_save(action)
+        save_check = QCheckBox("Saving throw instead of attack roll")
+        save_check.setChecked(parsed is not None)
+        ability_combo = QComboBox()
+        ability_combo.addItems(["STR", "DEX", "CON", "INT", "WIS", "CHA"])
+        dc_spin = QSpinBox()
+        dc_spin.setRange(1, 30)
+        half_check = QCheckBox("Half damage on a successful save")
+        ability, dc, half = parsed or ("DEX", 13, True)
+        ability_combo.setCurrentText(ability)
+        dc_spin.setValue(dc)
+        half_check.setChecked(half)
+        save_row = QHBoxLayout()
+        save_row.addWidget(save_check)
+        save_row.addWidget(QLabel("DC"))
+        save_row.addWidget(dc_spin)
+        save_row.addWidget(ability_combo)
+        save_row.addWidget(half_check)
+        layout.addLayout(save_row)
+        for widget in (ability_combo, dc_spin, half_check):
+            widget.setEnabled(save_check.isChecked())
+            save_check.toggled.connect(widget.setEnabled)
+
         btns = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
         layout.addWidget(btns)
         dlg.setLayout(layout)
         btns.accepted.connect(dlg.accept)
         btns.rejected.connect(dlg.reject)
-        if dlg.exec_() == QDialog.Accepted:
-            idx = combo.currentIndex()
-            return targets[idx], True
-        return None, False
-
+        if dlg.exec_() != QDialog.Accepted:
+            return None, None
+        chosen = [targets[i] for i in sorted(index.row() for index in target_list.selectedIndexes())]
+        if not chosen:
+            return None, None
+        save = None
+        if save_check.isChecked():
+            save = (ability_combo.currentText(), dc_spin.value(), half_check.isChecked())
+        return chosen, save
+
+    @profiled_action("Execute Action")
     def execute_action(self, row):
-        action = self.combatant.get("Actions", [])[row]
-        if self.log_callback:
-            self.log_callback(
-                f"{self.combatant['Name']} prepares to use {action.get('name', 'Unknown Action')}."
-            )
+        """Resolve an action against all chosen targets as one batch.
 
-        target, ok = self.select_target_dialog()
-        if not ok:
+        All rolls are resolved first. The log, the affected table rows and
+        the saved combat state are then each updated once, and a single
+        narration request covers the whole action.
+        """
+        action = self.combatant.get("Actions", [])[row]
+        targets, save = self.select_targets_dialog(action)
+        if not targets:
             return
 
-        # Roll attack
-        try:
-            attack_bonus = int(action.get("attack_bonus", 0))
-        except Exception:
-            attack_bonus = 0
-
-        d20 = random.randint(1, 20)
-        ac = int(target.get("AC", 10))
-        total = d20 + attack_bonus
-        crit = d20 == 20
-        hit = d20 != 1 and (crit or total >= ac)
-
-        self.log_callback(
-            f"Attack Roll: d20({d20}) + Attack Bonus({attack_bonus}) = {total} vs AC {ac}"
-        )
-
-        if not hit:
-            self.log_callback(
-                f"{self.combatant['Name']}'s attack misses {target['Name']}."
+        parent_tab = self.parent()
+        history = getattr(parent_tab, "history", None)
+        label = f"{self.combatant.get('Name', '')}: {action.get('name', 'Unknown Action')}"
+        with history.record(label) if history else nullcontext():
+            outcomes, lines = perform_action(
+                self.combatant, action, targets, save,
+                getattr(parent_tab, "rng", None), getattr(parent_tab, "effects", None),
+            )
+        if parent_tab and hasattr(parent_tab, "log_command"):
+            parent_tab.log_command(
+                "action", attacker=self.combatant.get("Id"), action=jsonable(action),
+                targets=[t.get("Id") for t in targets], save=list(save) if save else None,
             )
-            return
 
-        # Roll and apply damage
-        dmg_formula = action.get("damage", "")
-        dmg_type = action.get("damage_type", "")
-        dmg, dmg_str = roll_damage(dmg_formula, crit=crit)
-        adj_dmg, note = apply_resist_vuln_immune(dmg, dmg_type, target)
-        hp_before = int(target.get("HP", 0))
-        hp_after = max(0, hp_before - adj_dmg)
-        target["HP"] = hp_after
-
-        msg = f"{self.combatant['Name']} hits {target['Name']} with {action['name']}! {dmg_str}"
-        if note:
-            msg += f" ({note})"
-        msg += f" Damage: {adj_dmg} ({dmg_type}). HP: {hp_before} → {hp_after}."
-        if crit:
-            msg += " (Critical Hit!)"
-        self.log_callback(msg)
-
-        if hp_before > 0 and hp_after == 0:
-            self.log_callback(f"{target['Name']} has fallen!")
-
-        # 🎭 Enhanced AI narration with damage, effects, and death context
+        if parent_tab and hasattr(parent_tab, "append_log_lines"):
+            parent_tab.append_log_lines(lines)
+        elif self.log_callback:
+            for line in lines:
+                self.log_callback(line)
+        if parent_tab and hasattr(parent_tab, "update_combatants"):
+            parent_tab.update_combatants([o["target"] for o in outcomes])
+
+        # 🎭 One AI narration for the whole action, with damage, effects and deaths
         try:
-            dmg_text = f"{adj_dmg} {dmg_type} damage" if adj_dmg > 0 else "no damage"
             effect_text = action.get("description", "").strip()
-            fallen = hp_after == 0
-
+            results = []
+            for o in outcomes:
+                t = o["target"]
+                if save is not None:
+                    verdict = "saved" if o["saved"] else "failed the save"
+                else:
+                    verdict = ("critical hit" if o["crit"] else "hit") if o["hit"] else "missed"
+                results.append(
+                    f"- {t['Name']} (Immunities: {t.get('Immunities', '')}, Resistances: {t.get('Resistances', '')}, "
+                    f"Vulnerabilities: {t.get('Vulnerabilities', '')}): {verdict}, "
+                    f"{o['damage']} {action.get('damage_type', '')} damage"
+                    f"{' (' + o['note'] + ')' if o['note'] else ''}, HP {o['hp_before']} -> {o['hp_after']}"
+                    f"{', FALLEN' if o['hp_before'] > 0 and o['hp_after'] == 0 else ''}"
+                )
             prompt = (
                 "You are a dramatic and concise Dungeon Master narrator in D&D 5e combat. "
                 "Write a vivid cinematic describing the outcome of the action, "
                 "from a third-person perspective."
-                "Take into account the calculation results provided,the action description as well as target's vulnerabilities, resistances and immunities to more accurately describe the oucome"
+                "Take into account the calculation results provided,the action description as well as targets' vulnerabilities, resistances and immunities to more accurately describe the oucome"
                 "Include tone, motion, and consequence, not numbers. "
-                "If the target is slain or falls to 0 HP, make it climactic and final. "
+                "If a target is slain or falls to 0 HP, make it climactic and final. "
+                "With many targets, describe the sweep of the action rather than each one. "
                 "Keep it short but engaging enough.\n\n"
                 f"Attacker: {self.combatant['Name']} (class: {self.combatant['Class']}, race: {self.combatant['Race']})\n"
                 f"Action: {action.get('name', 'Unknown Action')}\n"
                 f"Description: {effect_text}\n"
-                f"Calculation by combat engine: {msg}\n"
-                f"Target: {target['Name']} (class: {self.combatant['Class']}, race: {self.combatant['Race']}, Immunities: {target['Immunities']}, Resistances: {target['Resistances']},Vulnerabilities {target['Vulnerabilities']})\n"
-                f"Hit: {hit}\n"
-                f"Critical: {crit}\n"
-                f"Damage: {dmg_text}\n"
-                f"Target HP before: {hp_before}, after: {hp_after}\n"
-                f"Target Fallen: {fallen}\n"
+                f"Resolution: {'DC %d %s saving throw' % (save[1], save[0]) if save else 'attack roll'}\n"
+                f"Results per target:\n" + "\n".join(results[:40]) + "\n"
             )
 
-            resp = openai.chat.completions.create(
+            resp = chat_completion(
                 model="gpt-4.1-mini",
                 messages=[{"role": "user", "content": prompt}],
-                max_tokens=120,
+                max_tokens=160,
                 temperature=1.0,
             )
             narration = resp.choices[0].message.content.strip()
@@ -281,14 +277,91 @@ class ActionDialog(QDialog):
         except Exception as e:
             self.log_callback(f"[Narration skipped: {e}]")
 
-        # ✅ ensure table refreshes to show updated HP
-        parent_tab = self.parent()
-        if parent_tab and hasattr(parent_tab, "refresh_table"):
-            parent_tab.refresh_table()
         if parent_tab and hasattr(parent_tab, "save_state"):
             parent_tab.save_state(silent=True)
 
 
+# ---------- GroupMembersWidget ----------
+class GroupMembersWidget(QWidget):
+    """Per-member HP and conditions of a monster group, edited in bulk."""
+
+    def __init__(self, combatant, parent=None, on_command=None):
+        super().__init__(parent)
+        from utils.combat_rules import CONDITIONS
+
+        self.combatant = combatant
+        self.group = combatant["Group"]
+        self.on_command = on_command
+        self.changed = False
+
+        layout = QVBoxLayout()
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+        self.table = QTableWidget(0, 3)
+        self.table.setHorizontalHeaderLabels(["Member", "HP", "Conditions"])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        layout.addWidget(self.table)
+
+        edit_row = QHBoxLayout()
+        self.hp_spin = QSpinBox()
+        self.hp_spin.setRange(0, self.group.max_hp)
+        self.hp_spin.setValue(self.group.max_hp)
+        set_hp_btn = QPushButton("Set HP")
+        set_hp_btn.clicked.connect(self.set_hp)
+        self.condition_combo = QComboBox()
+        self.condition_combo.addItems(CONDITIONS)
+        add_btn = QPushButton("Add Condition")
+        add_btn.clicked.connect(lambda: self.set_condition(True))
+        clear_btn = QPushButton("Clear Condition")
+        clear_btn.clicked.connect(lambda: self.set_condition(False))
+        for widget in (self.hp_spin, set_hp_btn, self.condition_combo, add_btn, clear_btn):
+            edit_row.addWidget(widget)
+        layout.addLayout(edit_row)
+        self.setLayout(layout)
+        self.refresh()
+
+    def refresh(self):
+        self.summary_label.setText(self.group.summary())
+        self.table.setUpdatesEnabled(False)
+        self.table.setRowCount(self.group.size)
+        for member in range(self.group.size):
+            values = [f"#{member + 1}", str(int(self.group.hp[member])), ", ".join(self.group.conditions_of(member))]
+            for col, value in enumerate(values):
+                item = self.table.item(member, col)
+                if item is None:
+                    item = QTableWidgetItem()
+                    self.table.setItem(member, col, item)
+                item.setText(value)
+        self.table.setUpdatesEnabled(True)
+
+    def _selected_members(self):
+        return sorted({index.row() for index in self.table.selectedIndexes()})
+
+    def set_hp(self):
+        members = self._selected_members()
+        if members:
+            self.group.set_hp(members, self.hp_spin.value())
+            self.group.sync(self.combatant)
+            self._command("group_hp", members=members, value=self.hp_spin.value())
+            self.changed = True
+            self.refresh()
+
+    def set_condition(self, flag):
+        members = self._selected_members()
+        if members:
+            self.group.set_condition(members, self.condition_combo.currentText(), flag)
+            self._command("group_condition", members=members, condition=self.condition_combo.currentText(), flag=flag)
+            self.changed = True
+            self.refresh()
+
+    def _command(self, op, **fields):
+        if self.on_command:
+            self.on_command(dict(op=op, id=self.combatant.get("Id"), **fields))
+
+
 class CombatTab(QWidget):
     def __init__(self, main_window):
         super().__init__()
@@ -303,6 +376,20 @@ class CombatTab(QWidget):
         }
         self.active_speaker = None
         self.dm_speaker = {"Name": "Dungeon Master", "Type": "Narrator"}
+        # Turn order; self.combatants mirrors it row for row via _on_tracker_event.
+        self.tracker = InitiativeTracker()
+        self.tracker.add_listener(self._on_tracker_event)
+        self.effects = EffectsEngine(self.tracker)
+        self.history = CombatHistory(lambda: self._by_id, self.tracker, self.effects)
+        self.history.add_listener(self._on_history_event)
+        self._by_id = {}
+        # Dice come from seeded streams, and each step is logged so the
+        # session can be replayed (utils/combat_replay.py).
+        self.rng = RNGService()
+        self.commands = []
+        self._replay_start = None
+        self._current_turn_brush = QBrush(QColor("#fff3c4"))
+        self._plain_brush = QBrush()
 
         main_layout = QHBoxLayout()
 
@@ -322,7 +409,7 @@ class CombatTab(QWidget):
 
         chat_btn_row = QHBoxLayout()
         self.chat_send_btn = QPushButton("Send")
-        self.chat_send_btn.clicked.connect(self.send_chat)
+        self.chat_send_btn.clicked.connect(lambda: self.send_chat())
         chat_btn_row.addWidget(self.chat_send_btn, alignment=Qt.AlignLeft)
         self.chat_dm_btn = QPushButton("Chat as DM")
         self.chat_dm_btn.clicked.connect(self.chat_as_dm)
@@ -336,21 +423,60 @@ class CombatTab(QWidget):
         add_layout = QHBoxLayout()
 
         self.add_btn = QPushButton("Add Combatant")
-        self.add_btn.clicked.connect(self.add_combatant)
+        self.add_btn.clicked.connect(lambda: self.add_combatant())
         add_layout.addWidget(self.add_btn)
 
+        self.encounter_btn = QPushButton("Build Encounter…")
+        self.encounter_btn.setToolTip("Find monster combinations for the party at a chosen difficulty.")
+        self.encounter_btn.clicked.connect(lambda: self.open_encounter_builder())
+        add_layout.addWidget(self.encounter_btn)
+
+        self.tune_btn = QPushButton("Tune Difficulty…")
+        self.tune_btn.setToolTip("Simulate the fight and scale the NPCs to a target win rate for the party.")
+        self.tune_btn.clicked.connect(lambda: self.open_tuner())
+        add_layout.addWidget(self.tune_btn)
+
         self.roll_initiative_btn = QPushButton("Roll Initiative")
-        self.roll_initiative_btn.clicked.connect(self.roll_initiative)
+        self.roll_initiative_btn.clicked.connect(lambda: self.roll_initiative())
         add_layout.addWidget(self.roll_initiative_btn)
 
         self.save_state_btn = QPushButton("Save Combat State")
-        self.save_state_btn.clicked.connect(self.save_state)
+        self.save_state_btn.clicked.connect(lambda: self.save_state())
         add_layout.addWidget(self.save_state_btn)
 
         add_layout.addStretch(1)
         right_layout.addLayout(add_layout)
 
-        self.table = QTableWidget(0, 9)
+        turn_layout = QHBoxLayout()
+        self.turn_label = QLabel("Initiative not rolled.")
+        turn_layout.addWidget(self.turn_label)
+        turn_layout.addStretch(1)
+        self.next_turn_btn = QPushButton("Next Turn")
+        self.next_turn_btn.clicked.connect(self.next_turn)
+        turn_layout.addWidget(self.next_turn_btn)
+        self.delay_btn = QPushButton("Delay")
+        self.delay_btn.setToolTip("The current combatant delays; use Act Now to bring them back.")
+        self.delay_btn.clicked.connect(self.delay_turn)
+        turn_layout.addWidget(self.delay_btn)
+        self.act_now_btn = QPushButton("Act Now")
+        self.act_now_btn.setToolTip("The selected delayed combatant takes its turn now.")
+        self.act_now_btn.clicked.connect(self.resume_delayed)
+        turn_layout.addWidget(self.act_now_btn)
+        self.ready_btn = QPushButton("Ready")
+        self.ready_btn.setToolTip("Toggle a readied action for the selected combatant.")
+        self.ready_btn.clicked.connect(self.toggle_ready)
+        turn_layout.addWidget(self.ready_btn)
+        self.effects_btn = QPushButton("Effects…")
+        self.effects_btn.setToolTip("Conditions and timed effects on the selected combatant.")
+        self.effects_btn.clicked.connect(lambda: self.open_effects_dialog())
+        turn_layout.addWidget(self.effects_btn)
+        self.hp_btn = QPushButton("HP ±…")
+        self.hp_btn.setToolTip("Damage or heal the selected combatant.")
+        self.hp_btn.clicked.connect(lambda: self.adjust_hp())
+        turn_layout.addWidget(self.hp_btn)
+        right_layout.addLayout(turn_layout)
+
+        self.table = QTableWidget(0, 10)
         self.table.setHorizontalHeaderLabels(
             [
                 "Name",
@@ -358,6 +484,7 @@ class CombatTab(QWidget):
                 "HP",
                 "AC",
                 "Initiative",
+                "Effects",
                 "Chat As",
                 "Actions",
                 "Show Stats",
@@ -370,37 +497,86 @@ class CombatTab(QWidget):
         self.table.currentCellChanged.connect(
             lambda row, _col, _old_row, _old_col: self.update_token_preview(row)
         )
+        # Double-clicking a monster group expands it into its members.
+        self.table.cellDoubleClicked.connect(
+            lambda row, _col: self.combatants[row].get("Group") is not None
+            and self.show_stats_dialog(self.combatants[row].get("Id"))
+        )
 
         self.token_preview = QLabel("Select a combatant to preview token.")
         self.token_preview.setAlignment(Qt.AlignCenter)
         self.token_preview.setFixedHeight(160)
         self.token_preview.setStyleSheet("border: 1px solid #ccc; background-color: #f8f8f8;")
-        right_layout.addWidget(self.token_preview)
+        bottom_layout = QHBoxLayout()
+        bottom_layout.addWidget(self.token_preview, stretch=1)
+
+        history_layout = QVBoxLayout()
+        history_layout.addWidget(QLabel("History (click a step to go back to it):"))
+        self.history_list = QListWidget()
+        self.history_list.setFixedHeight(130)
+        self.history_list.itemClicked.connect(self._jump_to_history_item)
+        history_layout.addWidget(self.history_list)
+        history_btn_row = QHBoxLayout()
+        self.undo_btn = QPushButton("Undo")
+        self.undo_btn.setToolTip("Undo the last combat step (Ctrl+Z)")
+        self.undo_btn.clicked.connect(lambda: self.undo())
+        self.redo_btn = QPushButton("Redo")
+        self.redo_btn.setToolTip("Redo (Ctrl+Shift+Z)")
+        self.redo_btn.clicked.connect(lambda: self.redo())
+        history_btn_row.addWidget(self.undo_btn)
+        history_btn_row.addWidget(self.redo_btn)
+        history_btn_row.addStretch(1)
+        history_layout.addLayout(history_btn_row)
+        bottom_layout.addLayout(history_layout, stretch=1)
+        right_layout.addLayout(bottom_layout)
+        # Text fields keep their own undo while they have focus. Duplicate key
+        # sequences would make both shortcuts ambiguous, so each is bound once.
+        for slot, standard, extra in (
+            (self.undo, QKeySequence.Undo, "Ctrl+Z"),
+            (self.redo, QKeySequence.Redo, "Ctrl+Shift+Z"),
+        ):
+            sequences = {seq.toString(): seq for seq in QKeySequence.keyBindings(standard)}
+            sequences.setdefault(QKeySequence(extra).toString(), QKeySequence(extra))
+            for sequence in sequences.values():
+                QShortcut(sequence, self, activated=slot, context=Qt.WidgetWithChildrenShortcut)
 
         main_layout.addLayout(right_layout, stretch=2)
         self.setLayout(main_layout)
         self._update_speaker_label()
+        self._on_history_event("clear", None)
 
     def _make_format(self, color):
         fmt = QTextCharFormat()
         fmt.setForeground(color)
         return fmt
 
-    def log_message(self, msg):
+    def _format_for(self, msg):
         if msg.startswith("Attack Roll") or msg.startswith("Damage") or "=" in msg:
-            fmt = self._format_cache["roll"]
+            return self._format_cache["roll"]
         elif "has fallen" in msg:
-            fmt = self._format_cache["fallen"]
+            return self._format_cache["fallen"]
         elif "hits" in msg or "Attack Roll" in msg:
-            fmt = self._format_cache["hit"]
-        else:
-            fmt = self._format_cache["default"]
+            return self._format_cache["hit"]
+        return self._format_cache["default"]
 
+    def log_message(self, msg):
         cursor = self.log_widget.textCursor()
         cursor.movePosition(cursor.End)
-        cursor.insertText(msg + "\n", fmt)
+        cursor.insertText(msg + "\n", self._format_for(msg))
         self.log_widget.setTextCursor(cursor)
 
+    def append_log_lines(self, lines):
+        """Append many log lines inside one edit block, so the log lays out once."""
+        cursor = self.log_widget.textCursor()
+        cursor.movePosition(cursor.End)
+        cursor.beginEditBlock()
+        for line in lines:
+            if isinstance(line, str):
+                cursor.insertText(line + "\n", self._format_for(line))
+        cursor.endEditBlock()
+        self.log_widget.setTextCursor(cursor)
+
+    @profiled_action("Add Combatant")
     def add_combatant(self):
         folder = self.main_window.campaign_folder
         if not folder:
@@ -421,6 +597,16 @@ class CombatTab(QWidget):
             combo.addItem(f"{typ}: {ent.get('Name', 'Unnamed')}")
         layout.addWidget(QLabel("Select a character or NPC:"))
         layout.addWidget(combo)
+        count_row = QHBoxLayout()
+        count_row.addWidget(QLabel("Count:"))
+        count_spin = QSpinBox()
+        count_spin.setRange(1, 10000)
+        count_spin.setToolTip("More than one NPC joins as a single monster group row.")
+        count_row.addWidget(count_spin)
+        count_row.addStretch(1)
+        layout.addLayout(count_row)
+        combo.currentIndexChanged.connect(lambda i: count_spin.setEnabled(options[i][0] == "NPC"))
+        count_spin.setEnabled(options[0][0] == "NPC")
         btns = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
         layout.addWidget(btns)
         dlg.setLayout(layout)
@@ -429,61 +615,341 @@ class CombatTab(QWidget):
         if dlg.exec_() == QDialog.Accepted:
             idx = combo.currentIndex()
             typ, ent = options[idx]
-            combatant = {
-                "Name": ent.get("Name", ""),
-                "Type": typ,
-                "Class": ent.get("Class", ""),
-                "Race": ent.get("Race", ""),
-                "HP": int(ent.get("HP", 10)),
-                "AC": int(ent.get("AC", 10)),
-                "STR": int(ent.get("STR", 10)),
-                "DEX": int(ent.get("DEX", 10)),
-                "CON": int(ent.get("CON", 10)),
-                "INT": int(ent.get("INT", 10)),
-                "WIS": int(ent.get("WIS", 10)),
-                "CHA": int(ent.get("CHA", 10)),
-                "Initiative": 0,
-                "Actions": [dict(a) for a in ent.get("Actions", [])],
-                "Resistances": ent.get("Resistances", ""),
-                "Vulnerabilities": ent.get("Vulnerabilities", ""),
-                "Immunities": ent.get("Immunities", ""),
-                "TokenImage": ent.get("TokenImage", ""),
-            }
-            self.combatants.append(combatant)
-            self.refresh_table()
+            combatant = self._new_combatant(typ, ent, count_spin.value() if typ == "NPC" else 1)
+            self.log_command("add", combatant=jsonable(combatant))
+            with self.history.record(f"Add {_display_name(combatant)}"):
+                self._join(combatant)
             self.save_state(silent=True)
 
-    def refresh_table(self):
-        self.table.setRowCount(len(self.combatants))
-        for row, c in enumerate(self.combatants):
-            name_item = QTableWidgetItem(str(c.get("Name", "")))
-            pixmap = self._get_token_pixmap(c.get("TokenImage", ""))
-            if pixmap:
-                name_item.setIcon(QIcon(pixmap.scaled(32, 32, Qt.KeepAspectRatio, Qt.SmoothTransformation)))
-            name_item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
-            self.table.setItem(row, 0, name_item)
-
-            for offset, key in enumerate(["Type", "HP", "AC", "Initiative"], start=1):
-                item = QTableWidgetItem(str(c.get(key, "")))
-                item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
-                self.table.setItem(row, offset, item)
+    def _new_combatant(self, typ, ent, count=1):
+        """Combatant dict for a character or NPC entity; count > 1 makes a monster group."""
+        combatant = {
+            "Name": ent.get("Name", ""),
+            "Type": typ,
+            # Hostile, Friendly or Neutral; the NPC's own Type field.
+            "NPCType": ent.get("Type", "") if typ == "NPC" else "",
+            "Class": ent.get("Class", ""),
+            "Race": ent.get("Race", ""),
+            "HP": int(ent.get("HP", 10)),
+            "AC": int(ent.get("AC", 10)),
+            "STR": int(ent.get("STR", 10)),
+            "DEX": int(ent.get("DEX", 10)),
+            "CON": int(ent.get("CON", 10)),
+            "INT": int(ent.get("INT", 10)),
+            "WIS": int(ent.get("WIS", 10)),
+            "CHA": int(ent.get("CHA", 10)),
+            "Id": new_combatant_id(),
+            "Initiative": None,
+            "InitiativeBonus": initiative_bonus(ent, typ),
+            "Actions": [dict(a) for a in ent.get("Actions", [])],
+            "Resistances": ent.get("Resistances", ""),
+            "Vulnerabilities": ent.get("Vulnerabilities", ""),
+            "Immunities": ent.get("Immunities", ""),
+            "TokenImage": ent.get("TokenImage", ""),
+        }
+        if count > 1:
+            from utils.monster_groups import MonsterGroup
+
+            combatant["Group"] = MonsterGroup(count, combatant["HP"])
+            combatant["Group"].sync(combatant)
+        return combatant
+
+    def _join(self, combatant):
+        self._by_id[combatant["Id"]] = combatant
+        if self.tracker.started():
+            # A late joiner rolls now and is inserted in place.
+            roll_initiative_for(combatant, self.rng)
+            self.log_message(f"{combatant['Name']} joins the fight with initiative {combatant['Initiative']}.")
+        self.tracker.add(combatant["Id"], combatant["Initiative"], combatant["DEX"])
+
+    def add_encounter(self, monsters):
+        """Add [(npc, count), ...] as one undoable step; repeated NPCs join as monster groups."""
+        combatants = [self._new_combatant("NPC", npc, count) for npc, count in monsters]
+        if not combatants:
+            return
+        self.log_command("batch", ops=[{"op": "add", "combatant": jsonable(c)} for c in combatants])
+        with self.history.record(f"Add encounter ({len(combatants)} combatants)"):
+            for combatant in combatants:
+                self._join(combatant)
+        self.log_message("Encounter added: " + ", ".join(_display_name(c) for c in combatants) + ".")
+        self.save_state(silent=True)
 
-            chat_btn = QPushButton("Chat As")
-            chat_btn.clicked.connect(lambda _, r=row: self.chat_as(r))
-            self.table.setCellWidget(row, 5, chat_btn)
+    @profiled_action("Build Encounter")
+    def open_encounter_builder(self):
+        from gui.encounter_dialog import EncounterDialog
 
-            actions_btn = QPushButton("Actions")
-            actions_btn.clicked.connect(lambda _, r=row: self.open_actions_dialog(r))
-            self.table.setCellWidget(row, 6, actions_btn)
+        folder = self.main_window.campaign_folder
+        if not folder:
+            QMessageBox.warning(self, "No Campaign", "Please load a campaign first.")
+            return
+        dlg = EncounterDialog(load_entities("characters", folder), load_entities("npcs", folder), self)
+        if dlg.exec_() == QDialog.Accepted and dlg.chosen:
+            self.add_encounter(dlg.chosen["monsters"])
+
+    @profiled_action("Tune Difficulty")
+    def open_tuner(self):
+        from gui.tuner_dialog import TunerDialog
+        from utils.encounter_sim import build_spec
+
+        dlg = TunerDialog(build_spec(self.combatants), self.rng.seed, self)
+        if dlg.exec_() == QDialog.Accepted and dlg.chosen not in (None, (0, 1.0)):
+            k, hp_scale = dlg.chosen
+            self.apply_tuning(k, dlg.knobs, hp_scale)
+
+    def apply_tuning(self, k, knobs, hp_scale=1.0):
+        """Move every standing hostile NPC to strength step k (HP times hp_scale), as one undoable step.
+
+        Monster groups are resized rather than rebuilt, so wounded members
+        keep their share of HP and their conditions.
+        """
+        from utils.encounter_sim import side_of, tuned_combatant
+        from utils.monster_groups import MonsterGroup
+
+        hostiles = [c for c in self.combatants if side_of(c) == "hostiles" and int(c.get("HP", 0) or 0) > 0]
+        ops = []
+        step = f"step {k:+d}" + (f", HP ×{hp_scale:g}" if hp_scale != 1 else "")
+        with self.history.record(f"Tune hostiles ({step})"):
+            for combatant in hostiles:
+                fields, group = tuned_combatant(combatant, k, knobs, hp_scale)
+                combatant.update(fields)
+                op = {"op": "edit", "id": combatant["Id"], "fields": jsonable(fields)}
+                if group is not None:
+                    if combatant.get("Group") is None:
+                        combatant["Group"] = MonsterGroup(*group)
+                    else:
+                        combatant["Group"] = combatant["Group"].resized(*group)
+                    combatant["Group"].sync(combatant)
+                    op["group"] = combatant["Group"].to_state()
+                ops.append(op)
+        self.log_command("batch", ops=ops)
+        self.update_combatants(hostiles)
+        self.log_message(f"Hostiles tuned to {step}: " + ", ".join(_display_name(c) for c in hostiles) + ".")
+        self.save_state(silent=True)
 
-            stats_btn = QPushButton("Show Stats")
-            stats_btn.clicked.connect(lambda _, r=row: self.show_stats_dialog(r))
-            self.table.setCellWidget(row, 7, stats_btn)
+    def log_command(self, op, **fields):
+        """Append a step to the replay log (see utils.combat_replay.CombatReplay)."""
+        self.commands.append(dict(op=op, **fields))
+
+    # --- Turn order -------------------------------------------------
+    def _prepare_combatant(self, combatant):
+        """Give combatants from older saves an id and initiative bonus."""
+        if not combatant.get("Id"):
+            combatant["Id"] = new_combatant_id()
+        if "InitiativeBonus" not in combatant:
+            combatant["InitiativeBonus"] = initiative_bonus(combatant)
+        if isinstance(combatant.get("Group"), dict):
+            from utils.monster_groups import MonsterGroup
+
+            combatant["Group"] = MonsterGroup.from_state(combatant["Group"])
+            combatant["Group"].sync(combatant)
+        return combatant
+
+    def _on_tracker_event(self, event, *args):
+        if event == "inserted":
+            index, cid = args
+            self.combatants.insert(index, self._by_id[cid])
+            self.table.insertRow(index)
+            self._fill_row(index)
+        elif event == "removed":
+            index, cid = args
+            del self.combatants[index]
+            self._by_id.pop(cid, None)
+            self.table.removeRow(index)
+            for effect in self.effects.remove_for(cid):
+                row = self.tracker.index_of(effect["target"])
+                if row >= 0:
+                    self._fill_row(row)
+        elif event == "moved":
+            old, new, cid = args
+            self.combatants.insert(new, self.combatants.pop(old))
+            self.table.removeRow(old)
+            self.table.insertRow(new)
+            self._fill_row(new)
+            self.effects.rebuild()
+        elif event == "changed":
+            self._fill_row(args[0])
+        elif event == "turn":
+            changed, lines = self.effects.advance(self._by_id, self.rng.stream("effects"))
+            self.append_log_lines(lines)
+            for cid in set(args) | changed:
+                row = self.tracker.index_of(cid)
+                if row >= 0:
+                    self._fill_row(row)
+            current = self.tracker.index_of(args[1])
+            if current >= 0:
+                self.table.scrollToItem(self.table.item(current, 0))
+            self._update_turn_label()
+        elif event == "round":
+            self._update_turn_label()
+            # Remaining-round counters in the Effects column tick down.
+            for cid in {e["target"] for e in self.effects.effects.values() if e.get("expires_round") is not None}:
+                row = self.tracker.index_of(cid)
+                if row >= 0:
+                    self._fill_row(row)
+        elif event == "reset":
+            self.combatants[:] = [self._by_id[cid] for cid in self.tracker.order()]
+            self.effects.rebuild()
+            self.refresh_table()
 
-            rm_btn = QPushButton("Remove")
-            rm_btn.setEnabled(int(c.get("HP", 0)) == 0)
-            rm_btn.clicked.connect(lambda _, r=row: self.remove_combatant(r))
-            self.table.setCellWidget(row, 8, rm_btn)
+    def _update_turn_label(self):
+        current = self._by_id.get(self.tracker.current)
+        if not self.tracker.started():
+            self.turn_label.setText("Initiative not rolled.")
+        elif current is None:
+            self.turn_label.setText(f"Round {self.tracker.round}")
+        else:
+            self.turn_label.setText(f"Round {self.tracker.round}: {current.get('Name', '')}'s turn")
+
+    def _selected_id(self):
+        row = self.table.currentRow()
+        if 0 <= row < len(self.combatants):
+            return self.combatants[row].get("Id")
+        return None
+
+    def next_turn(self):
+        if not self.combatants:
+            return
+        with self.history.record("Next Turn"):
+            cid = self.tracker.next_turn()
+        self.log_command("next_turn")
+        current = self._by_id.get(cid)
+        if current is not None:
+            self.log_message(f"Round {self.tracker.round}: {current.get('Name', '')}'s turn.")
+        self.save_state(silent=True)
+
+    def delay_turn(self):
+        current = self._by_id.get(self.tracker.current)
+        if current is None:
+            return
+        with self.history.record(f"{current.get('Name', '')} delays"):
+            self.tracker.delay()
+        self.log_command("delay")
+        self.log_message(f"{current.get('Name', '')} delays their turn.")
+        self.save_state(silent=True)
+
+    def resume_delayed(self):
+        cid = self._selected_id()
+        if cid not in self.tracker.delayed:
+            QMessageBox.information(self, "Act Now", "Select a delayed combatant first.")
+            return
+        combatant = self._by_id[cid]
+        with self.history.record(f"{combatant.get('Name', '')} acts now"):
+            self.tracker.resume(cid)
+            combatant["Initiative"] = self.tracker.initiative_of(cid)
+        self.log_command("resume", id=cid)
+        self.update_combatant(combatant)
+        self.log_message(f"{combatant.get('Name', '')} stops delaying and acts now.")
+        self.save_state(silent=True)
+
+    def toggle_ready(self):
+        cid = self._selected_id() or self.tracker.current
+        if cid is None:
+            return
+        readied = cid not in self.tracker.ready
+        name = self._by_id[cid].get("Name", "")
+        with self.history.record(f"{name} {'readies' if readied else 'stops readying'}"):
+            self.tracker.set_ready(cid, readied)
+        self.log_command("ready", id=cid, flag=readied)
+        self.log_message(f"{name} readies an action." if readied else f"{name} no longer has an action readied.")
+        self.save_state(silent=True)
+
+    def update_combatants(self, combatants):
+        """Redraw the rows of several combatants with a single repaint."""
+        self.table.setUpdatesEnabled(False)
+        try:
+            for combatant in combatants:
+                self.update_combatant(combatant)
+        finally:
+            self.table.setUpdatesEnabled(True)
+
+    def update_combatant(self, combatant):
+        """Redraw the one row showing this combatant."""
+        row = self.tracker.index_of(combatant.get("Id"))
+        if row >= 0:
+            self._fill_row(row)
+
+    def adjust_hp(self, cid=None):
+        cid = cid or self._selected_id() or self.tracker.current
+        combatant = self._by_id.get(cid)
+        if combatant is None:
+            QMessageBox.information(self, "Adjust HP", "Select a combatant first.")
+            return
+        if combatant.get("Group") is not None:
+            # Group members are adjusted individually in the members table.
+            self.show_stats_dialog(cid)
+            return
+        delta, ok = QInputDialog.getInt(
+            self, "Adjust HP", f"HP change for {combatant.get('Name', '')} (negative for damage):",
+            0, -10000, 10000,
+        )
+        if not ok or not delta:
+            return
+        name = combatant.get("Name", "")
+        with self.history.record(f"{'Heal' if delta > 0 else 'Damage'} {name} ({delta:+d})"):
+            lines = change_hp(combatant, delta, self.effects, self.rng)
+        self.log_command("hp", id=cid, delta=delta)
+        self.append_log_lines(lines)
+        self.update_combatant(combatant)
+        self.save_state(silent=True)
+
+    # --- Undo / redo --------------------------------------------------
+    def undo(self):
+        command = self.history.undo()
+        if command is not None:
+            self.log_command("undo")
+            self.log_message(f"Undo: {command.label}")
+            self.save_state(silent=True)
+
+    def redo(self):
+        command = self.history.redo()
+        if command is not None:
+            self.log_command("redo")
+            self.log_message(f"Redo: {command.label}")
+            self.save_state(silent=True)
+
+    def _on_history_event(self, event, command):
+        self.undo_btn.setEnabled(self.history.can_undo())
+        self.redo_btn.setEnabled(self.history.can_redo())
+        self.history_list.clear()
+        for i, step in enumerate(self.history.done):
+            item = QListWidgetItem(step.label)
+            item.setData(Qt.UserRole, len(self.history.done) - 1 - i)
+            self.history_list.addItem(item)
+        # Undone steps follow in grey italics until a new step replaces them.
+        for i, step in enumerate(reversed(self.history.undone)):
+            item = QListWidgetItem(step.label)
+            item.setData(Qt.UserRole, -(i + 1))
+            item.setForeground(QBrush(QColor("#999999")))
+            font = QFont(item.font())
+            font.setItalic(True)
+            item.setFont(font)
+            self.history_list.addItem(item)
+        if self.history.done:
+            self.history_list.setCurrentRow(len(self.history.done) - 1)
+            self.history_list.scrollToItem(self.history_list.currentItem())
+
+    def _jump_to_history_item(self, item):
+        """Undo back to a done step's result, or redo forward through an undone one."""
+        offset = item.data(Qt.UserRole)
+        for _ in range(offset):
+            self.history.undo()
+            self.log_command("undo")
+        for _ in range(-offset):
+            self.history.redo()
+            self.log_command("redo")
+        if offset:
+            self.log_message(f"History: back to {self.history.done[-1].label if self.history.done else 'the start'}")
+            self.save_state(silent=True)
+
+    @traced("combat.refresh_table")
+    def refresh_table(self):
+        # Rows are refilled in place: _fill_row reuses items, and buttons
+        # survive when the row still shows the same combatant (e.g. on undo).
+        self.table.setUpdatesEnabled(False)
+        self.table.setRowCount(len(self.combatants))
+        for row in range(len(self.combatants)):
+            self._fill_row(row)
+        self.table.setUpdatesEnabled(True)
 
         current_row = self.table.currentRow()
         if current_row >= 0:
@@ -493,12 +959,66 @@ class CombatTab(QWidget):
         else:
             self.update_token_preview(-1)
         self._update_speaker_label()
+        self._update_turn_label()
+
+    def _fill_row(self, row):
+        c = self.combatants[row]
+        cid = c.get("Id")
+        is_current = cid is not None and cid == self.tracker.current
+        initiative = c.get("Initiative")
+        initiative_text = "" if initiative is None else str(initiative)
+        if cid in self.tracker.delayed:
+            initiative_text += " (delayed)"
+        if cid in self.tracker.ready:
+            initiative_text += " (ready)"
+        values = [_display_name(c), str(c.get("Type", "")), str(c.get("HP", "")), str(c.get("AC", "")),
+                  initiative_text.strip(), self.effects.describe(cid)]
+        for col, value in enumerate(values):
+            item = self.table.item(row, col)
+            if item is None:
+                item = QTableWidgetItem()
+                item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
+                self.table.setItem(row, col, item)
+            item.setText(value)
+            if col == 0:
+                item.setToolTip(c["Group"].summary() if c.get("Group") is not None else "")
+            item.setBackground(self._current_turn_brush if is_current else self._plain_brush)
+            if col == 0:
+                font = item.font()
+                font.setBold(is_current)
+                item.setFont(font)
+                pixmap = self._get_token_pixmap(c.get("TokenImage", ""))
+                item.setIcon(
+                    QIcon(pixmap.scaled(32, 32, Qt.KeepAspectRatio, Qt.SmoothTransformation)) if pixmap else QIcon()
+                )
+
+        # Buttons capture the combatant id, so they stay valid as rows move.
+        rm_btn = self.table.cellWidget(row, 9)
+        if rm_btn is None or rm_btn.property("combatant_id") != cid:
+            chat_btn = QPushButton("Chat As")
+            chat_btn.clicked.connect(lambda _, i=cid: self.chat_as(i))
+            self.table.setCellWidget(row, 6, chat_btn)
+
+            actions_btn = QPushButton("Actions")
+            actions_btn.clicked.connect(lambda _, i=cid: self.open_actions_dialog(i))
+            self.table.setCellWidget(row, 7, actions_btn)
+
+            stats_btn = QPushButton("Show Stats")
+            stats_btn.clicked.connect(lambda _, i=cid: self.show_stats_dialog(i))
+            self.table.setCellWidget(row, 8, stats_btn)
 
-    def chat_as(self, row):
-        if row < 0 or row >= len(self.combatants):
+            rm_btn = QPushButton("Remove")
+            rm_btn.setProperty("combatant_id", cid)
+            rm_btn.clicked.connect(lambda _, i=cid: self.remove_combatant(i))
+            self.table.setCellWidget(row, 9, rm_btn)
+        rm_btn.setEnabled(int(c.get("HP", 0)) == 0)
+
+    def chat_as(self, cid):
+        combatant = self._by_id.get(cid)
+        if combatant is None:
             return
-        self.active_speaker = self.combatants[row]
-        self.table.selectRow(row)
+        self.active_speaker = combatant
+        self.table.selectRow(self.tracker.index_of(cid))
         self._update_speaker_label()
 
     def _update_speaker_label(self):
@@ -519,6 +1039,7 @@ class CombatTab(QWidget):
         self.active_speaker = self.dm_speaker
         self._update_speaker_label()
 
+    @profiled_action("Send Chat")
     def send_chat(self):
         message = self.chat_input.toPlainText().strip()
         if not message:
@@ -541,6 +1062,7 @@ class CombatTab(QWidget):
             return None
         return os.path.join(folder, "combat_state.json")
 
+    @traced("combat.save_state")
     def save_state(self, silent=False):
         path = self._state_file_path()
         if not path:
@@ -551,38 +1073,56 @@ class CombatTab(QWidget):
             "combatants": self.combatants,
             "log_lines": self.log_widget.toPlainText().splitlines(),
             "active_speaker": (
-                "__DM__" if self.active_speaker is self.dm_speaker else self.active_speaker.get("Name")
-            )
+                "__DM__" if self.active_speaker is self.dm_speaker
+                else self.active_speaker.get("Name") if self.active_speaker else None
+            ),
+            "initiative": self.tracker.to_state(),
+            "effects": self.effects.to_state(),
+            "rng": self.rng.to_state(),
+            "replay": {"start": self._replay_start, "commands": self.commands},
         }
         try:
             with open(path, "w", encoding="utf-8") as f:
-                json.dump(state, f, indent=2)
+                json.dump(state, f, indent=2, default=_state_default)
             if not silent:
                 QMessageBox.information(self, "Combat Saved", f"Combat state saved to {path}")
         except Exception as exc:
             QMessageBox.critical(self, "Save Error", f"Failed to save combat state:\n{exc}")
 
-    def load_saved_state(self):
+    @traced("combat.load_saved_state")
+    def load_saved_state(self, data=None):
+        """Restore combat from combat_state.json, or from already-loaded state data."""
         path = self._state_file_path()
         self.log_widget.clear()
         self.chat_input.clear()
         self._token_cache.clear()
-        if not path or not os.path.exists(path):
-            self.combatants = []
+        self.history.clear()
+        if data is None:
+            try:
+                data = load_combat_state(self.main_window.campaign_folder) if path else {}
+            except Exception as exc:
+                QMessageBox.warning(self, "Load Warning", f"Could not load combat state:\n{exc}")
+                data = {}
+        if not data:
+            self._by_id = {}
             self.active_speaker = None
-            self.refresh_table()
-            return
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        except Exception as exc:
-            QMessageBox.warning(self, "Load Warning", f"Could not load combat state:\n{exc}")
-            self.combatants = []
-            self.active_speaker = None
-            self.refresh_table()
+            self.effects.load_state(None)
+            self.tracker.reset([])
+            self._start_replay_log()
             return
 
-        self.combatants = data.get("combatants", [])
+        combatants = [self._prepare_combatant(c) for c in data.get("combatants", [])]
+        self._by_id = {c["Id"]: c for c in combatants}
+        state = data.get("initiative")
+        # Effects load first so the rows are drawn with them; the tracker's "reset" schedules them.
+        self.effects.load_state(data.get("effects"), known=self._by_id)
+        if state and {entry[0] for entry in state.get("entries", [])} == set(self._by_id):
+            self.tracker.load_state(state)
+        else:
+            # Older saves: 0 meant "not rolled yet"; rolled lists were already sorted.
+            self.tracker.reset(
+                [(c["Id"], c.get("Initiative") or None, c.get("DEX", 10)) for c in combatants]
+            )
         speaker_name = data.get("active_speaker")
         if speaker_name == "__DM__":
             self.active_speaker = self.dm_speaker
@@ -590,10 +1130,22 @@ class CombatTab(QWidget):
             self.active_speaker = next(
                 (c for c in self.combatants if c.get("Name") == speaker_name), None
             )
-        for line in data.get("log_lines", []):
-            if isinstance(line, str):
-                self.log_message(line)
-        self.refresh_table()
+        self.append_log_lines(data.get("log_lines", []))
+        self._update_speaker_label()
+        replay = data.get("replay")
+        if replay and data.get("rng"):
+            # Carry on the same session: its streams continue where they stopped.
+            self.rng = RNGService.from_state(data["rng"])
+            self._replay_start = replay.get("start")
+            self.commands = list(replay.get("commands", [])) + [{"op": "reload"}]
+        else:
+            self._start_replay_log()
+
+    def _start_replay_log(self):
+        """Begin a new seeded session whose replay starts from the current combat."""
+        self.rng = RNGService()
+        self.commands = []
+        self._replay_start = start_state(self.combatants, self.tracker, self.effects) if self.combatants else None
 
     def _get_token_pixmap(self, source):
         if not source:
@@ -606,8 +1158,9 @@ class CombatTab(QWidget):
             if source.lower().startswith(("http://", "https://")):
                 from urllib.request import urlopen
 
-                with urlopen(source) as resp:
-                    data = resp.read()
+                with span("combat.token_fetch", url=source):
+                    with urlopen(source) as resp:
+                        data = resp.read()
                 pixmap.loadFromData(data)
             else:
                 if os.path.exists(source):
@@ -638,10 +1191,10 @@ class CombatTab(QWidget):
             self.token_preview.setPixmap(QPixmap())
             self.token_preview.setText("No token available.")
 
-    def show_stats_dialog(self, row):
-        if row < 0 or row >= len(self.combatants):
+    def show_stats_dialog(self, cid):
+        combatant = self._by_id.get(cid)
+        if combatant is None:
             return
-        combatant = self.combatants[row]
         dlg = QDialog(self)
         dlg.setWindowTitle(f"{combatant.get('Name', 'Combatant')} Stats")
         layout = QVBoxLayout()
@@ -657,41 +1210,91 @@ class CombatTab(QWidget):
             ("Immunities", "Immunities"),
         ]:
             layout.addWidget(QLabel(f"{label}: {combatant.get(key, '')}"))
+        members = None
+        ops = []
+        if combatant.get("Group") is not None:
+            members = GroupMembersWidget(combatant, dlg, ops.append)
+            layout.addWidget(members)
+            dlg.resize(520, 560)
         btns = QDialogButtonBox(QDialogButtonBox.Ok)
         btns.accepted.connect(dlg.accept)
         layout.addWidget(btns)
         dlg.setLayout(layout)
-        dlg.exec_()
+        with self.history.record(f"Edit {_display_name(combatant)}"):
+            dlg.exec_()
+        if ops:
+            self.log_command("batch", ops=ops)
+        if members is not None and members.changed:
+            self.update_combatant(combatant)
+            self.save_state(silent=True)
 
-    def open_actions_dialog(self, row):
+    def open_effects_dialog(self, cid=None):
+        from gui.effects_dialog import EffectsDialog
+
+        cid = cid or self._selected_id() or self.tracker.current
+        combatant = self._by_id.get(cid)
+        if combatant is None:
+            QMessageBox.information(self, "Effects", "Select a combatant first.")
+            return
+        ops = []
+        dlg = EffectsDialog(combatant, self.combatants, self.effects, self.log_message, self, ops.append)
+        with self.history.record(f"Effects on {combatant.get('Name', '')}"):
+            dlg.exec_()
+        if ops:
+            self.log_command("batch", ops=ops)
+        if dlg.changed:
+            # Adding a concentration effect can end one on another combatant.
+            self.table.setUpdatesEnabled(False)
+            for row in range(len(self.combatants)):
+                self._fill_row(row)
+            self.table.setUpdatesEnabled(True)
+            self.save_state(silent=True)
+
+    def open_actions_dialog(self, cid, action_index=None):
+        combatant = self._by_id.get(cid)
+        if combatant is None:
+            return
         dlg = ActionDialog(
-            self.combatants[row],
+            combatant,
             self.combatants,
             self.log_message,
             self.main_window,
             self,
+            selected=action_index,
         )
         if dlg.exec_():
-            self.refresh_table()
+            self.update_combatant(combatant)
 
-    def remove_combatant(self, row):
-        if row < 0 or row >= len(self.combatants):
+    def remove_combatant(self, cid):
+        combatant = self._by_id.get(cid)
+        if combatant is None:
             return
-        combatant = self.combatants[row]
         if int(combatant.get("HP", 0)) != 0:
             QMessageBox.warning(self, "Cannot Remove", "Can only remove if HP is 0.")
             return
         name = combatant.get("Name", "Unknown")
-        del self.combatants[row]
+        with self.history.record(f"Remove {name}"):
+            self.tracker.remove(cid)
+        self.log_command("remove", id=cid)
         if self.active_speaker is combatant:
             self.active_speaker = None
         self.log_message(f"{name} has been removed from combat.")
-        self.refresh_table()
+        self._update_speaker_label()
         self.save_state(silent=True)
 
+    @profiled_action("Roll Initiative")
+    @traced("combat.roll_initiative")
     def roll_initiative(self):
-        for c in self.combatants:
-            c["Initiative"] = random.randint(1, 20)
-        self.combatants.sort(key=lambda x: int(x.get("Initiative", 0)), reverse=True)
-        self.refresh_table()
+        """Roll d20 + initiative bonus for everyone and start round 1 (ties go to higher DEX)."""
+        if not self.combatants:
+            return
+        with self.history.record("Roll Initiative"):
+            for c in self.combatants:
+                roll_initiative_for(c, self.rng)
+            self.tracker.reset([(c["Id"], c["Initiative"], c.get("DEX", 10)) for c in self.combatants])
+            self.tracker.start()
+        self.log_command("roll_initiative")
+        first = self._by_id.get(self.tracker.current)
+        if first is not None:
+            self.log_message(f"Initiative rolled. Round 1: {first.get('Name', '')} acts first.")
         self.save_state(silent=True)
@@ -0,0 +1,235 @@
+import time
+
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLineEdit, QListWidget, QListWidgetItem, QLabel
+from PyQt5.QtCore import QEvent, QObject, QTimer, Qt, pyqtSignal
+
+from utils.fuzzy_index import FuzzyIndex
+
+# Work done per event-loop slice, so typing and repaints never wait a frame.
+FRAME_BUDGET = 0.008
+MAX_RESULTS = 30
+# Score boosts: commands and executable combat actions first, entity actions last.
+BOOSTS = {"command": 0.1, "combat_action": 0.05, "entity": 0.0, "action": -0.02}
+HINTS = {"command": "Command", "combat_action": "Execute"}
+
+
+def entity_candidates(kind, entity):
+    """Palette candidates for a character or NPC and each of its actions."""
+    name = str(entity.get("Name", "")).strip()
+    key = " ".join(name.lower().split())
+    candidates = [(("entity", kind, key), name, {"type": "entity", "kind": kind, "name": name}, BOOSTS["entity"])]
+    for i, action in enumerate(entity.get("Actions", []) or []):
+        if isinstance(action, dict) and action.get("name"):
+            payload = {"type": "action", "kind": kind, "name": name, "index": i}
+            candidates.append((("action", kind, key, i), f"{name}: {action['name']}", payload, BOOSTS["action"]))
+    return candidates
+
+
+def hint(payload):
+    kind = payload["type"]
+    if kind == "entity":
+        return payload["kind"]
+    if kind == "action":
+        return f"{payload['kind']} action"
+    return HINTS[kind]
+
+
+class PaletteIndexer(QObject):
+    """Keeps a FuzzyIndex of the campaign's characters, NPCs and their actions.
+
+    Saves and deletes update one entity right away. A campaign load
+    replaces every entity of a kind, so that is re-synced in the
+    background, FRAME_BUDGET at a time; unchanged entities cost a dict
+    lookup each.
+    """
+
+    progress = pyqtSignal()
+
+    def __init__(self, entity_index, parent=None):
+        super().__init__(parent)
+        self.entity_index = entity_index
+        self.index = FuzzyIndex()
+        # Built on first use, so the entities loaded so far are synced first.
+        self._stale = ["Character", "NPC"]
+        self._sync = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._step)
+        self._timer.start()
+        entity_index.add_change_listener(self._on_entity_changed)
+
+    def is_busy(self):
+        return bool(self._stale)
+
+    def _on_entity_changed(self, op, kind, value):
+        if op == "set" or kind in self._stale:
+            # A pending sync reads the entity index, so it just starts over.
+            if kind not in self._stale:
+                self._stale.append(kind)
+            self._sync = None
+            self._timer.start()
+        elif op == "add":
+            name = " ".join(str(value.get("Name", "")).lower().split())
+            self.index.set_group((kind, name), entity_candidates(kind, value))
+        elif op == "remove":
+            self.index.remove_group((kind, " ".join(str(value).lower().split())))
+
+    def _sync_kind(self, kind):
+        seen = set()
+        for n, entity in enumerate(self.entity_index.entities(kind)):
+            candidates = entity_candidates(kind, entity)
+            group = (kind, candidates[0][0][2])
+            seen.add(group)
+            self.index.set_group(group, candidates)
+            if n % 64 == 63:
+                yield
+        for group in self.index.groups():
+            if group[0] == kind and group not in seen:
+                self.index.remove_group(group)
+
+    def _step(self):
+        deadline = time.perf_counter() + FRAME_BUDGET
+        while self._stale and time.perf_counter() < deadline:
+            if self._sync is None:
+                self._sync = self._sync_kind(self._stale[0])
+            if next(self._sync, StopIteration) is StopIteration:
+                self._stale.pop(0)
+                self._sync = None
+        if self._stale:
+            self._timer.start()
+        self.progress.emit()
+
+    def set_commands(self, commands):
+        """commands: (label, callback) pairs."""
+        self.index.set_group(("commands",), [
+            (("command", label), label, {"type": "command", "run": run}, BOOSTS["command"])
+            for label, run in commands
+        ])
+
+    def set_combatants(self, combatants):
+        """Executable actions of the combatants now in the combat tracker."""
+        candidates = []
+        for combatant in combatants:
+            cid = combatant.get("Id")
+            for i, action in enumerate(combatant.get("Actions", []) or []):
+                if isinstance(action, dict) and action.get("name"):
+                    candidates.append((
+                        ("combat", cid, i),
+                        f"{combatant.get('Name', '')}: {action['name']}",
+                        {"type": "combat_action", "cid": cid, "index": i},
+                        BOOSTS["combat_action"],
+                    ))
+        self.index.set_group(("combat",), candidates)
+
+
+class CommandPalette(QDialog):
+    """Ctrl+K palette: type a few letters of anything, Enter to go there.
+
+    Ranking runs FRAME_BUDGET at a time on the event loop; results shown
+    after the first slice are refined as the rest is scored.
+    """
+
+    activated = pyqtSignal(object)
+
+    def __init__(self, indexer, parent=None):
+        super().__init__(parent, Qt.Popup | Qt.FramelessWindowHint)
+        self.indexer = indexer
+        self.ranking = None
+        self.results = []
+        layout = QVBoxLayout()
+        layout.setContentsMargins(6, 6, 6, 6)
+        self.edit = QLineEdit()
+        self.edit.setPlaceholderText("Go to a character or NPC, execute an action, run a command…")
+        self.edit.textChanged.connect(self._start_ranking)
+        self.edit.returnPressed.connect(self._activate_current)
+        self.edit.installEventFilter(self)
+        layout.addWidget(self.edit)
+        self.list = QListWidget()
+        self.list.setFocusPolicy(Qt.NoFocus)
+        self.list.itemClicked.connect(lambda _item: self._activate_current())
+        layout.addWidget(self.list)
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+        self.setLayout(layout)
+        self.resize(560, 420)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._continue_ranking)
+        self.indexer.progress.connect(self._on_index_progress)
+
+    def popup(self):
+        parent = self.parentWidget()
+        if parent is not None:
+            top_left = parent.mapToGlobal(parent.rect().topLeft())
+            self.move(top_left.x() + (parent.width() - self.width()) // 2, top_left.y() + 60)
+        self.edit.clear()
+        self._start_ranking("")
+        self.show()
+        self.edit.setFocus()
+
+    def _start_ranking(self, text):
+        self.ranking = self.indexer.index.ranking(text, MAX_RESULTS) if text.strip() else None
+        self._continue_ranking()
+
+    def _continue_ranking(self):
+        if self.ranking is None:
+            self.results = []
+            self._show_results(True)
+            return
+        done = self.ranking.step(FRAME_BUDGET)
+        self.results = self.ranking.results()
+        self._show_results(done)
+        if not done:
+            self._timer.start()
+
+    def _on_index_progress(self):
+        # Results change while a campaign is still being indexed.
+        if not self.isVisible():
+            return
+        if self.ranking is not None and self.ranking.done and self.ranking.stale:
+            self._continue_ranking()
+        else:
+            self._show_results(self.ranking is None or self.ranking.done)
+
+    def _show_results(self, done):
+        current = self.list.currentRow()
+        self.list.clear()
+        for result in self.results:
+            item = QListWidgetItem(f"{result['label']}    ·  {hint(result['payload'])}")
+            self.list.addItem(item)
+        self.list.setCurrentRow(min(max(current, 0), len(self.results) - 1))
+        if self.ranking is None:
+            status = ""
+        elif not self.results and done:
+            status = "No matches"
+        else:
+            status = f"{self.ranking.scored:,} candidates scored" + ("" if done else "…")
+        if self.indexer.is_busy():
+            status = (status + " · " if status else "") + "indexing campaign…"
+        self.status_label.setText(status)
+
+    def _activate_current(self):
+        row = self.list.currentRow()
+        if 0 <= row < len(self.results):
+            payload = self.results[row]["payload"]
+            self.hide()
+            self.activated.emit(payload)
+
+    def eventFilter(self, obj, event):
+        if obj is self.edit and event.type() == QEvent.KeyPress:
+            key = event.key()
+            if key in (Qt.Key_Down, Qt.Key_Up):
+                step = 1 if key == Qt.Key_Down else -1
+                row = self.list.currentRow() + step
+                if 0 <= row < len(self.results):
+                    self.list.setCurrentRow(row)
+                return True
+        return super().eventFilter(obj, event)
+
+    def hideEvent(self, event):
+        self._timer.stop()
+        self.ranking = None
+        super().hideEvent(event)
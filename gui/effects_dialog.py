@@ -0,0 +1,187 @@
+from PyQt5.QtWidgets import (
+    QDialog,
+    QVBoxLayout,
+    QHBoxLayout,
+    QFormLayout,
+    QLabel,
+    QLineEdit,
+    QPushButton,
+    QComboBox,
+    QSpinBox,
+    QCheckBox,
+    QListWidget,
+    QListWidgetItem,
+    QDialogButtonBox,
+)
+from PyQt5.QtCore import Qt
+
+from utils.combat_rules import CONDITIONS
+
+
+class EffectsDialog(QDialog):
+    """List, add and remove the effects on one combatant."""
+
+    def __init__(self, combatant, combatants, engine, log_callback=None, parent=None, on_command=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"Effects on {combatant.get('Name', 'Combatant')}")
+        self.combatant = combatant
+        self.combatants = combatants
+        self.engine = engine
+        self.log_callback = log_callback
+        self.on_command = on_command
+        self.changed = False
+
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel("Active effects:"))
+        self.effect_list = QListWidget()
+        layout.addWidget(self.effect_list)
+        remove_btn = QPushButton("Remove Selected")
+        remove_btn.clicked.connect(self.remove_selected)
+        layout.addWidget(remove_btn, alignment=Qt.AlignLeft)
+
+        form = QFormLayout()
+        self.name_edit = QLineEdit()
+        self.name_edit.setPlaceholderText("e.g. Hold Person, Burning (defaults to the condition)")
+        form.addRow("Name:", self.name_edit)
+        self.condition_combo = QComboBox()
+        self.condition_combo.addItems(["(none)"] + list(CONDITIONS) + ["dodging"])
+        form.addRow("Condition:", self.condition_combo)
+
+        # Everyone but the target can be the source; any combatant can anchor the duration.
+        names = [c.get("Name", "") for c in combatants]
+        self.source_combo = QComboBox()
+        self.source_combo.addItems(["(none)"] + names)
+        form.addRow("Source:", self.source_combo)
+        self.concentration_check = QCheckBox("Source is concentrating on it")
+        form.addRow("", self.concentration_check)
+
+        duration_row = QHBoxLayout()
+        self.rounds_spin = QSpinBox()
+        self.rounds_spin.setRange(0, 1000)
+        self.rounds_spin.setSpecialValueText("until removed")
+        duration_row.addWidget(self.rounds_spin)
+        duration_row.addWidget(QLabel("round(s), ending at the"))
+        self.phase_combo = QComboBox()
+        self.phase_combo.addItems(["end", "start"])
+        duration_row.addWidget(self.phase_combo)
+        duration_row.addWidget(QLabel("of"))
+        self.anchor_combo = QComboBox()
+        self.anchor_combo.addItems(names)
+        self.anchor_combo.setCurrentIndex(max(0, combatants.index(combatant) if combatant in combatants else 0))
+        duration_row.addWidget(self.anchor_combo)
+        duration_row.addWidget(QLabel("'s turn"))
+        form.addRow("Duration:", duration_row)
+
+        ongoing_row = QHBoxLayout()
+        self.ongoing_edit = QLineEdit()
+        self.ongoing_edit.setPlaceholderText("e.g. 2d6")
+        self.ongoing_type_edit = QLineEdit()
+        self.ongoing_type_edit.setPlaceholderText("damage type")
+        self.ongoing_phase_combo = QComboBox()
+        self.ongoing_phase_combo.addItems(["start", "end"])
+        ongoing_row.addWidget(self.ongoing_edit)
+        ongoing_row.addWidget(self.ongoing_type_edit)
+        ongoing_row.addWidget(QLabel("at the"))
+        ongoing_row.addWidget(self.ongoing_phase_combo)
+        ongoing_row.addWidget(QLabel("of its turns"))
+        form.addRow("Ongoing damage:", ongoing_row)
+
+        save_row = QHBoxLayout()
+        self.save_ability_combo = QComboBox()
+        self.save_ability_combo.addItems(["(none)", "STR", "DEX", "CON", "INT", "WIS", "CHA"])
+        self.save_dc_spin = QSpinBox()
+        self.save_dc_spin.setRange(1, 30)
+        self.save_dc_spin.setValue(13)
+        save_row.addWidget(self.save_ability_combo)
+        save_row.addWidget(QLabel("DC"))
+        save_row.addWidget(self.save_dc_spin)
+        save_row.addWidget(QLabel("at the end of each of its turns"))
+        form.addRow("Save ends:", save_row)
+        layout.addLayout(form)
+
+        add_btn = QPushButton("Add Effect")
+        add_btn.clicked.connect(self.add_effect)
+        layout.addWidget(add_btn, alignment=Qt.AlignLeft)
+
+        btns = QDialogButtonBox(QDialogButtonBox.Close)
+        btns.rejected.connect(self.accept)
+        layout.addWidget(btns)
+        self.setLayout(layout)
+        self.resize(620, 520)
+        self.refresh()
+
+    def refresh(self):
+        self.effect_list.clear()
+        names = {c.get("Id"): c.get("Name", "") for c in self.combatants}
+        for effect in self.engine.effects_on(self.combatant.get("Id")):
+            parts = [effect["name"]]
+            if effect.get("expires_round") is not None:
+                parts.append(
+                    f"ends round {effect['expires_round']} at the {effect['phase']} of "
+                    f"{names.get(effect['anchor'], '?')}'s turn"
+                )
+            if effect.get("ongoing"):
+                parts.append(f"{effect['ongoing']['damage']} {effect['ongoing'].get('type', '')} per turn")
+            if effect.get("save_ends"):
+                parts.append(f"DC {effect['save_ends']['dc']} {effect['save_ends']['ability']} save ends")
+            if effect.get("concentration"):
+                parts.append(f"concentration: {names.get(effect['source'], '?')}")
+            item = QListWidgetItem(" — ".join(parts))
+            item.setData(Qt.UserRole, effect["id"])
+            self.effect_list.addItem(item)
+
+    def _command(self, command):
+        if self.on_command:
+            self.on_command(command)
+
+    def _log(self, msg):
+        if self.log_callback:
+            self.log_callback(msg)
+
+    def add_effect(self):
+        condition = self.condition_combo.currentText()
+        condition = None if condition == "(none)" else condition
+        source_index = self.source_combo.currentIndex() - 1
+        source = self.combatants[source_index].get("Id") if source_index >= 0 else None
+        ongoing = None
+        if self.ongoing_edit.text().strip():
+            ongoing = {
+                "damage": self.ongoing_edit.text().strip(),
+                "type": self.ongoing_type_edit.text().strip(),
+                "phase": self.ongoing_phase_combo.currentText(),
+            }
+        save_ends = None
+        if self.save_ability_combo.currentIndex() > 0:
+            save_ends = {"ability": self.save_ability_combo.currentText(), "dc": self.save_dc_spin.value()}
+        name = self.name_edit.text().strip() or condition
+        if not (name or ongoing):
+            return
+        args = {
+            "target": self.combatant.get("Id"),
+            "name": name,
+            "condition": condition,
+            "rounds": self.rounds_spin.value() or None,
+            "anchor": self.combatants[self.anchor_combo.currentIndex()].get("Id") if self.combatants else None,
+            "phase": self.phase_combo.currentText(),
+            "source": source,
+            "ongoing": ongoing,
+            "save_ends": save_ends,
+            "concentration": self.concentration_check.isChecked() and source is not None,
+        }
+        effect = self.engine.add(**args)
+        self._command({"op": "effect_add", "args": args})
+        self._log(f"{self.combatant.get('Name', '')} is affected by {effect['name']}.")
+        self.changed = True
+        self.name_edit.clear()
+        self.refresh()
+
+    def remove_selected(self):
+        item = self.effect_list.currentItem()
+        if item is None:
+            return
+        effect = self.engine.remove(item.data(Qt.UserRole))
+        if effect is not None:
+            self._command({"op": "effect_remove", "effect": effect["id"]})
+            self._log(f"{effect['name']} on {self.combatant.get('Name', '')} ends.")
+            self.changed = True
+        self.refresh()
@@ -0,0 +1,154 @@
+import random
+
+from PyQt5.QtWidgets import (
+    QDialog,
+    QVBoxLayout,
+    QFormLayout,
+    QLabel,
+    QPushButton,
+    QComboBox,
+    QSpinBox,
+    QListWidget,
+    QListWidgetItem,
+    QDialogButtonBox,
+)
+from PyQt5.QtCore import Qt
+
+from utils.encounters import (
+    DIFFICULTIES,
+    XP_BY_CR,
+    MonsterIndex,
+    build_encounters,
+    character_level,
+    format_cr,
+    parse_cr,
+    party_thresholds,
+)
+
+
+class EncounterDialog(QDialog):
+    """Pick a party and a difficulty, then choose one of the suggested encounters.
+
+    After exec_() returns Accepted, chosen holds the encounter dict from
+    utils.encounters.build_encounters.
+    """
+
+    def __init__(self, characters, npcs, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Build Encounter")
+        self.characters = characters
+        self.index = MonsterIndex(npcs)
+        self.encounters = []
+        self.chosen = None
+
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel("Party:"))
+        self.party_list = QListWidget()
+        for character in characters:
+            item = QListWidgetItem(f"{character.get('Name', '')} (level {character_level(character)})")
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked)
+            self.party_list.addItem(item)
+        self.party_list.itemChanged.connect(lambda _item: self._update_thresholds())
+        layout.addWidget(self.party_list)
+        self.thresholds_label = QLabel()
+        layout.addWidget(self.thresholds_label)
+
+        form = QFormLayout()
+        self.difficulty_combo = QComboBox()
+        self.difficulty_combo.addItems([d.title() for d in DIFFICULTIES])
+        self.difficulty_combo.setCurrentIndex(1)
+        form.addRow("Difficulty:", self.difficulty_combo)
+        self.max_monsters_spin = QSpinBox()
+        self.max_monsters_spin.setRange(1, 30)
+        self.max_monsters_spin.setValue(8)
+        form.addRow("Most monsters:", self.max_monsters_spin)
+        self.type_combo = QComboBox()
+        self.type_combo.addItems(["Any"] + [t.title() for t in self.index.types()])
+        form.addRow("Type:", self.type_combo)
+        self.habitat_combo = QComboBox()
+        self.habitat_combo.addItems(["Any"] + [h.title() for h in self.index.habitats()])
+        form.addRow("Habitat:", self.habitat_combo)
+        self.max_cr_combo = QComboBox()
+        self.max_cr_combo.addItem("Any")
+        for cr in sorted(XP_BY_CR):
+            self.max_cr_combo.addItem(format_cr(cr))
+        form.addRow("Highest CR:", self.max_cr_combo)
+        layout.addLayout(form)
+
+        find_btn = QPushButton("Find Encounters")
+        find_btn.clicked.connect(self.find_encounters)
+        layout.addWidget(find_btn, alignment=Qt.AlignLeft)
+        self.results_list = QListWidget()
+        self.results_list.itemDoubleClicked.connect(lambda _item: self.accept_selected())
+        layout.addWidget(self.results_list, stretch=1)
+        self.status_label = QLabel(f"{len(self.index)} NPCs with a CR in the library.")
+        layout.addWidget(self.status_label)
+
+        btns = QDialogButtonBox(QDialogButtonBox.Cancel)
+        add_btn = btns.addButton("Add to Combat", QDialogButtonBox.AcceptRole)
+        add_btn.clicked.connect(self.accept_selected)
+        btns.rejected.connect(self.reject)
+        layout.addWidget(btns)
+        self.setLayout(layout)
+        self.resize(640, 640)
+        self._update_thresholds()
+
+    def _levels(self):
+        return [
+            character_level(character)
+            for row, character in enumerate(self.characters)
+            if self.party_list.item(row).checkState() == Qt.Checked
+        ]
+
+    def _update_thresholds(self):
+        levels = self._levels()
+        if not levels:
+            self.thresholds_label.setText("Select at least one party member.")
+            return
+        thresholds = party_thresholds(levels)
+        self.thresholds_label.setText(
+            "XP thresholds: " + ", ".join(f"{d} {xp:,}" for d, xp in zip(DIFFICULTIES, thresholds))
+        )
+
+    def find_encounters(self):
+        levels = self._levels()
+        self.results_list.clear()
+        self.encounters = []
+        if not levels:
+            self.status_label.setText("Select at least one party member.")
+            return
+        max_cr = parse_cr(self.max_cr_combo.currentText()) if self.max_cr_combo.currentIndex() else None
+        candidates = self.index.select(
+            types=[self.type_combo.currentText()] if self.type_combo.currentIndex() else None,
+            habitats=[self.habitat_combo.currentText()] if self.habitat_combo.currentIndex() else None,
+            max_cr=max_cr,
+        )
+        self.encounters = build_encounters(
+            self.index,
+            levels,
+            DIFFICULTIES[self.difficulty_combo.currentIndex()],
+            self.max_monsters_spin.value(),
+            candidates,
+            limit=20,
+            rng=random.Random(),
+        )
+        for encounter in self.encounters:
+            monsters = ", ".join(
+                f"{count} × {npc.get('Name', '')} (CR {npc.get('CR', '')})" for npc, count in encounter["monsters"]
+            )
+            self.results_list.addItem(
+                f"{encounter['difficulty'].title()} · {encounter['adjusted_xp']:,} adjusted XP "
+                f"({encounter['xp']:,} XP): {monsters}"
+            )
+        if self.encounters:
+            self.results_list.setCurrentRow(0)
+            self.status_label.setText(f"{len(self.encounters)} encounters from {len(candidates)} matching NPCs.")
+        else:
+            self.status_label.setText(f"No combination of the {len(candidates)} matching NPCs fits; relax a filter.")
+
+    def accept_selected(self):
+        row = self.results_list.currentRow()
+        if 0 <= row < len(self.encounters):
+            self.chosen = self.encounters[row]
+            self.accept()
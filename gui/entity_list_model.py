@@ -0,0 +1,257 @@
+from PyQt5.QtWidgets import QWidget, QHBoxLayout, QVBoxLayout, QLineEdit, QComboBox, QLabel, QListView
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, QSortFilterProxyModel, Qt
+
+from utils.encounters import format_cr, parse_cr
+from utils.entity_index import name_key
+
+ENTITY_ROLE = Qt.UserRole
+# Entities without a readable CR or level sort after every ranked one.
+UNRANKED = float("inf")
+NPC_TYPES = ["Hostile", "Friendly", "Neutral"]
+CR_CHOICES = [0, 0.125, 0.25, 0.5] + list(range(1, 31))
+LEVEL_CHOICES = list(range(1, 21))
+
+
+def npc_rank(npc):
+    cr = parse_cr(npc.get("CR"))
+    return UNRANKED if cr is None else cr
+
+
+def character_rank(character):
+    level = parse_cr(character.get("Level"))
+    return UNRANKED if level is None else level
+
+
+class EntityListModel(QAbstractListModel):
+    """The characters or NPCs of a tab, one row per entity.
+
+    entities is the tab's own list; upsert() and remove() change it in
+    place and send row insert/remove/change notifications, so a save
+    updates one row and the view keeps its selection and scroll position.
+    The name, type and rank (CR or level) of each row are folded once into
+    the parallel lists the proxy filters and sorts on.
+    """
+
+    def __init__(self, rank=npc_rank, parent=None):
+        super().__init__(parent)
+        self.rank = rank
+        self.entities = []
+        self.names = []
+        self.types = []
+        self.ranks = []
+
+    def _keys(self, entity):
+        return name_key(entity.get("Name", "")), str(entity.get("Type", "") or ""), self.rank(entity)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entities)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        entity = self.entities[index.row()]
+        if role == Qt.DisplayRole:
+            return entity.get("Name", "Unnamed")
+        if role == ENTITY_ROLE:
+            return entity
+        return None
+
+    # --- Updates -------------------------------------------------------
+    def set_entities(self, entities):
+        self.beginResetModel()
+        self.entities = entities
+        keys = [self._keys(e) for e in entities]
+        self.names = [k[0] for k in keys]
+        self.types = [k[1] for k in keys]
+        self.ranks = [k[2] for k in keys]
+        self.endResetModel()
+
+    def row_of(self, name):
+        wanted = name_key(name)
+        try:
+            return self.names.index(wanted)
+        except ValueError:
+            return -1
+
+    def upsert(self, entity):
+        """Replace the entity of the same name, or append it; returns its row."""
+        name, typ, rank = self._keys(entity)
+        row = self.row_of(entity.get("Name", ""))
+        if row >= 0:
+            self.entities[row] = entity
+            self.names[row], self.types[row], self.ranks[row] = name, typ, rank
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+            return row
+        row = len(self.entities)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.entities.append(entity)
+        self.names.append(name)
+        self.types.append(typ)
+        self.ranks.append(rank)
+        self.endInsertRows()
+        return row
+
+    def remove(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.entities[row], self.names[row], self.types[row], self.ranks[row]
+        self.endRemoveRows()
+
+    def distinct_types(self):
+        return sorted(set(self.types) - {""})
+
+
+class EntityFilterProxy(QSortFilterProxyModel):
+    """Filters an EntityListModel by name text, type and rank range, and sorts it.
+
+    Filtering and sorting read the model's precomputed key lists instead
+    of calling data() for every comparison.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.text = ""
+        self.type = None
+        self.min_rank = None
+        self.max_rank = None
+        self.sort_mode = "name"
+        self.setDynamicSortFilter(True)
+
+    def set_filters(self, text="", type=None, min_rank=None, max_rank=None):
+        self.text = name_key(text)
+        self.type = type
+        self.min_rank = min_rank
+        self.max_rank = max_rank
+        self.invalidateFilter()
+
+    def set_sort_mode(self, mode):
+        self.sort_mode = mode
+        self.invalidate()
+        self.sort(0)
+
+    def filterAcceptsRow(self, row, parent):
+        model = self.sourceModel()
+        if self.text and self.text not in model.names[row]:
+            return False
+        if self.type is not None and model.types[row] != self.type:
+            return False
+        rank = model.ranks[row]
+        if self.min_rank is not None and rank < self.min_rank:
+            return False
+        if self.max_rank is not None and rank > self.max_rank:
+            return False
+        return True
+
+    def lessThan(self, left, right):
+        model = self.sourceModel()
+        a, b = left.row(), right.row()
+        if self.sort_mode == "rank":
+            return (model.ranks[a], model.names[a]) < (model.ranks[b], model.names[b])
+        if self.sort_mode == "type":
+            return (model.types[a], model.names[a]) < (model.types[b], model.names[b])
+        return model.names[a] < model.names[b]
+
+
+class EntityListPanel(QWidget):
+    """Filter controls above a virtualized list of a tab's entities.
+
+    rank_label is "CR" or "Level"; with_types adds the Type filter. The
+    view shows the proxy; source_row() and select_row() translate to the
+    tab's entity list.
+    """
+
+    def __init__(self, model, rank_label="CR", with_types=True, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self.with_types = with_types
+        self.proxy = EntityFilterProxy(self)
+        self.proxy.setSourceModel(model)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(4)
+
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filter by name…")
+        self.filter_edit.setClearButtonEnabled(True)
+        layout.addWidget(self.filter_edit)
+
+        row = QHBoxLayout()
+        row.setContentsMargins(0, 0, 0, 0)
+        self.type_combo = QComboBox()
+        self.type_combo.addItem("All types", None)
+        for typ in NPC_TYPES:
+            self.type_combo.addItem(typ, typ)
+        self.type_combo.setVisible(with_types)
+        row.addWidget(self.type_combo)
+        choices = CR_CHOICES if rank_label == "CR" else LEVEL_CHOICES
+        self.min_combo = QComboBox()
+        self.max_combo = QComboBox()
+        for combo, any_label in ((self.min_combo, "Any"), (self.max_combo, "Any")):
+            combo.addItem(any_label, None)
+            for value in choices:
+                combo.addItem(format_cr(value), value)
+        row.addWidget(QLabel(f"{rank_label}:"))
+        row.addWidget(self.min_combo)
+        row.addWidget(QLabel("–"))
+        row.addWidget(self.max_combo)
+        self.sort_combo = QComboBox()
+        self.sort_combo.addItem("Sort: Name", "name")
+        self.sort_combo.addItem(f"Sort: {rank_label}", "rank")
+        if with_types:
+            self.sort_combo.addItem("Sort: Type", "type")
+        row.addWidget(self.sort_combo)
+        layout.addLayout(row)
+
+        self.view = QListView()
+        self.view.setUniformItemSizes(True)
+        self.view.setModel(self.proxy)
+        layout.addWidget(self.view, stretch=1)
+
+        self.filter_edit.textChanged.connect(self._apply_filters)
+        for combo in (self.type_combo, self.min_combo, self.max_combo):
+            combo.currentIndexChanged.connect(self._apply_filters)
+        self.sort_combo.currentIndexChanged.connect(
+            lambda _i: self.proxy.set_sort_mode(self.sort_combo.currentData())
+        )
+        model.modelReset.connect(self._refresh_types)
+        self.proxy.sort(0)
+
+    def _refresh_types(self):
+        # Types other than the editor's three (e.g. imported stat blocks) are offered too.
+        current = self.type_combo.currentData()
+        known = {self.type_combo.itemData(i) for i in range(self.type_combo.count())}
+        for typ in self.model.distinct_types():
+            if typ not in known:
+                self.type_combo.addItem(typ, typ)
+        self.type_combo.setCurrentIndex(max(0, self.type_combo.findData(current)))
+
+    def _apply_filters(self, *_args):
+        self.proxy.set_filters(
+            self.filter_edit.text(),
+            self.type_combo.currentData() if self.with_types else None,
+            self.min_combo.currentData(),
+            self.max_combo.currentData(),
+        )
+
+    def source_row(self, proxy_index=None):
+        """Row in the tab's entity list of proxy_index (default: the current row), or -1."""
+        if proxy_index is None:
+            proxy_index = self.view.currentIndex()
+        if not proxy_index.isValid():
+            return -1
+        return self.proxy.mapToSource(proxy_index).row()
+
+    def select_row(self, row):
+        """Make the entity at source row current, clearing filters that hide it."""
+        index = self.proxy.mapFromSource(self.model.index(row))
+        if not index.isValid():
+            self.filter_edit.clear()
+            for combo in (self.type_combo, self.min_combo, self.max_combo):
+                combo.setCurrentIndex(0)
+            index = self.proxy.mapFromSource(self.model.index(row))
+        self.view.setCurrentIndex(index)
+        self.view.scrollTo(index)
+
+    def clear_current(self):
+        self.view.setCurrentIndex(QModelIndex())
+        self.view.clearSelection()
@@ -0,0 +1,77 @@
+from PyQt5.QtWidgets import QComboBox, QPlainTextEdit, QTextEdit
+
+
+def _accessors(widget):
+    """(get, set, changed signal) of a widget's text."""
+    if isinstance(widget, QComboBox):
+        return (
+            widget.currentText,
+            lambda text: widget.setCurrentIndex(widget.findText(text)),
+            widget.currentTextChanged,
+        )
+    if isinstance(widget, (QTextEdit, QPlainTextEdit)):
+        return widget.toPlainText, widget.setPlainText, widget.textChanged
+    return widget.text, widget.setText, widget.textChanged
+
+
+class FormBinder:
+    """Maps the fields of a character or NPC dict to the widgets of an editor form.
+
+    Each editor binds its fields once, in the order they are saved in;
+    loading, clearing, validation and saving all go through the binding.
+    apply() writes only the widgets whose text differs from the entity's,
+    with their signals blocked, so stepping through a list touches a few
+    widgets per row instead of every field.
+    """
+
+    def __init__(self):
+        self.fields = []    # (key, widget, get, set, label, required, default)
+        self._shown = {}    # key -> text last written to or read from the widget
+        self._edited = set()
+
+    def bind(self, key, widget, label=None, required=False, default=""):
+        """Bind entity[key] to widget; combo boxes show default for values they lack."""
+        get, set_, changed = _accessors(widget)
+        self.fields.append((key, widget, get, set_, label or key, required, default))
+        self._shown[key] = get()
+        # Only user edits get here: apply() blocks the widget's signals.
+        changed.connect(lambda *_args, key=key: self._edited.add(key))
+
+    def apply(self, entity):
+        """Show entity in the form; returns the number of widgets changed."""
+        changed = 0
+        for key, widget, get, set_, _label, _required, default in self.fields:
+            value = entity.get(key, default)
+            text = "" if value is None else str(value)
+            if isinstance(widget, QComboBox) and widget.findText(text) < 0:
+                text = default if widget.findText(default) >= 0 else widget.itemText(0)
+            current = get() if key in self._edited else self._shown[key]
+            if current != text:
+                blocked = widget.blockSignals(True)
+                set_(text)
+                widget.blockSignals(blocked)
+                changed += 1
+            self._shown[key] = text
+        self._edited.clear()
+        return changed
+
+    def clear(self):
+        """Empty every field; combo boxes go back to their first entry."""
+        return self.apply({
+            field[0]: field[1].itemText(0) if isinstance(field[1], QComboBox) else ""
+            for field in self.fields
+        })
+
+    def values(self):
+        """{key: text} of the form, stripped, in binding order."""
+        return {
+            key: get() if isinstance(widget, QComboBox) else get().strip()
+            for key, widget, get, _set, _label, _required, _default in self.fields
+        }
+
+    def missing(self):
+        """Labels of the required fields left empty."""
+        return [
+            label for _key, _widget, get, _set, label, required, _default in self.fields
+            if required and not get().strip()
+        ]
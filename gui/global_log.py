@@ -1,5 +1,99 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTextEdit
-from PyQt5.QtCore import Qt
+import os
+import time
+
+from PyQt5.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QListView,
+    QComboBox,
+    QLineEdit,
+    QCheckBox,
+    QPushButton,
+    QAbstractItemView,
+)
+from PyQt5.QtCore import Qt, QTimer, QAbstractListModel, QModelIndex, QSortFilterProxyModel
+from PyQt5.QtGui import QColor
+
+from utils.log_sink import LEVELS, SINK
+
+FLUSH_INTERVAL_MS = 100
+LOG_FILE_PATH = os.path.expanduser("~/.dnd_campaign_creator/campaign_creator.log")
+
+_LEVEL_COLORS = {
+    "DEBUG": QColor("#757575"),
+    "WARNING": QColor("#ef6c00"),
+    "ERROR": QColor("#c62828"),
+}
+
+
+class LogModel(QAbstractListModel):
+    """Capped list of log entries; appends and front trims are batched per flush."""
+
+    def __init__(self, capacity, parent=None):
+        super().__init__(parent)
+        self.capacity = capacity
+        self._entries = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._entries)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self._entries[index.row()]
+        if role == Qt.DisplayRole:
+            stamp = time.strftime("%H:%M:%S", time.localtime(entry.timestamp))
+            source = f" [{entry.source}]" if entry.source else ""
+            return f"{stamp} {entry.level:<7}{source} {entry.message}"
+        if role == Qt.ForegroundRole:
+            return _LEVEL_COLORS.get(entry.level)
+        if role == Qt.UserRole:
+            return entry
+        return None
+
+    def append_entries(self, batch):
+        if not batch:
+            return
+        batch = batch[-self.capacity:]
+        overflow = len(self._entries) + len(batch) - self.capacity
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            del self._entries[:overflow]
+            self.endRemoveRows()
+        first = len(self._entries)
+        self.beginInsertRows(QModelIndex(), first, first + len(batch) - 1)
+        self._entries.extend(batch)
+        self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self._entries = []
+        self.endResetModel()
+
+
+class LogFilterProxy(QSortFilterProxyModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.min_level = 0
+        self.text = ""
+
+    def set_min_level(self, level_index):
+        self.min_level = level_index
+        self.invalidateFilter()
+
+    def set_text(self, text):
+        self.text = text.lower()
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        entry = self.sourceModel().index(source_row, 0, source_parent).data(Qt.UserRole)
+        if LEVELS.index(entry.level) < self.min_level:
+            return False
+        if self.text and self.text not in entry.message.lower() and self.text not in entry.source.lower():
+            return False
+        return True
+
 
 class GlobalLogWidget(QWidget):
     _instance = None
@@ -7,11 +101,49 @@ class GlobalLogWidget(QWidget):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Global Chat/Error Log")
+        self.resize(800, 400)
         layout = QVBoxLayout()
-        self.text_edit = QTextEdit()
-        self.text_edit.setReadOnly(True)
-        layout.addWidget(self.text_edit)
+
+        filter_row = QHBoxLayout()
+        self.level_combo = QComboBox()
+        self.level_combo.addItems(LEVELS)
+        self.level_combo.setCurrentIndex(LEVELS.index("INFO"))
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filter by text or source…")
+        self.file_check = QCheckBox("Log to file")
+        self.file_check.setToolTip(LOG_FILE_PATH)
+        self.file_check.toggled.connect(self._toggle_file_sink)
+        clear_btn = QPushButton("Clear")
+        filter_row.addWidget(self.level_combo)
+        filter_row.addWidget(self.filter_edit, stretch=1)
+        filter_row.addWidget(self.file_check)
+        filter_row.addWidget(clear_btn)
+        layout.addLayout(filter_row)
+
+        # A list view over a model only lays out the visible rows.
+        self.model = LogModel(SINK.capacity, self)
+        self.proxy = LogFilterProxy(self)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.set_min_level(self.level_combo.currentIndex())
+        self.view = QListView()
+        self.view.setModel(self.proxy)
+        self.view.setUniformItemSizes(True)
+        self.view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.view.setWordWrap(False)
+        layout.addWidget(self.view)
         self.setLayout(layout)
+
+        self.level_combo.currentIndexChanged.connect(self.proxy.set_min_level)
+        self.filter_edit.textChanged.connect(self.proxy.set_text)
+        clear_btn.clicked.connect(self.model.clear)
+
+        self.model.append_entries(list(SINK.entries))
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setInterval(FLUSH_INTERVAL_MS)
+        self.flush_timer.timeout.connect(self.flush)
+        self.flush_timer.start()
+        if os.environ.get("DND_LOG_FILE"):
+            self.file_check.setChecked(True)
         GlobalLogWidget._instance = self
 
     @staticmethod
@@ -20,9 +152,22 @@ class GlobalLogWidget(QWidget):
             GlobalLogWidget._instance = GlobalLogWidget()
         return GlobalLogWidget._instance
 
-    def log(self, message, error=False):
-        if error:
-            self.text_edit.append(f'<span style="color:red;">{message}</span>')
+    def log(self, message, error=False, level=None, source=""):
+        """Queue a message; it appears on the next flush. Safe from any thread."""
+        SINK.emit(message, level or ("ERROR" if error else "INFO"), source)
+
+    def flush(self):
+        batch = SINK.drain()
+        if not batch:
+            return
+        scrollbar = self.view.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - 2
+        self.model.append_entries(batch)
+        if at_bottom:
+            self.view.scrollToBottom()
+
+    def _toggle_file_sink(self, enabled):
+        if enabled:
+            SINK.enable_file_sink(os.environ.get("DND_LOG_FILE") or LOG_FILE_PATH)
         else:
-            self.text_edit.append(message)
-        self.text_edit.moveCursor(self.text_edit.textCursor().End)
\ No newline at end of file
+            SINK.disable_file_sink()
@@ -0,0 +1,229 @@
+import html
+import os
+
+from PyQt5.QtWidgets import (
+    QDialog,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QLineEdit,
+    QComboBox,
+    QListWidget,
+    QListWidgetItem,
+    QTextEdit,
+    QPushButton,
+    QSplitter,
+    QMessageBox,
+    QAbstractItemView,
+)
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, Qt, QTimer, pyqtSignal
+
+from utils.library_index import LIBRARY_ROOT, LibraryIndex
+
+KINDS = [("All", None), ("NPCs", "NPC"), ("Characters", "Character")]
+PREVIEW_FIELDS = ("Type", "Role/Title", "Race", "Class", "Level", "CR", "AC", "HP", "Habitat", "Description")
+
+
+class _IndexSignals(QObject):
+    finished = pyqtSignal(int)
+    failed = pyqtSignal(str)
+
+
+class _UpdateTask(QRunnable):
+    def __init__(self, index, signals):
+        super().__init__()
+        self.index = index
+        self.signals = signals
+
+    def run(self):
+        try:
+            read = self.index.update()
+        except Exception as exc:
+            self.signals.failed.emit(str(exc))
+            return
+        self.signals.finished.emit(read)
+
+
+class LibraryIndexer(QObject):
+    """Owns the library index and refreshes it on the global thread pool."""
+
+    updated = pyqtSignal(int)
+    failed = pyqtSignal(str)
+
+    def __init__(self, root=LIBRARY_ROOT, parent=None):
+        super().__init__(parent)
+        self.index = LibraryIndex(root)
+        self.index.load()
+        self._busy = False
+        self._signals = _IndexSignals()
+        self._signals.finished.connect(self._on_finished)
+        self._signals.failed.connect(self._on_failed)
+
+    def is_busy(self):
+        return self._busy
+
+    def refresh(self):
+        """Start an incremental update unless one is already running."""
+        if self._busy:
+            return
+        self._busy = True
+        QThreadPool.globalInstance().start(_UpdateTask(self.index, self._signals))
+
+    def _on_finished(self, read):
+        self._busy = False
+        self.updated.emit(read)
+
+    def _on_failed(self, message):
+        self._busy = False
+        self.failed.emit(message)
+
+
+class LibraryDialog(QDialog):
+    """Search the characters and NPCs of every campaign and import them into the current one."""
+
+    def __init__(self, main_window, indexer):
+        super().__init__(main_window)
+        self.setWindowTitle("Campaign Library")
+        self.main_window = main_window
+        self.indexer = indexer
+        self.results = []
+
+        layout = QVBoxLayout()
+        search_row = QHBoxLayout()
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Search by name, type or campaign…")
+        self.search_edit.setClearButtonEnabled(True)
+        self.kind_combo = QComboBox()
+        self.kind_combo.addItems([label for label, _kind in KINDS])
+        search_row.addWidget(self.search_edit, stretch=1)
+        search_row.addWidget(self.kind_combo)
+        layout.addLayout(search_row)
+
+        splitter = QSplitter(Qt.Horizontal)
+        self.results_list = QListWidget()
+        self.results_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.results_list.currentRowChanged.connect(self._show_preview)
+        self.results_list.itemDoubleClicked.connect(lambda _item: self.import_selected())
+        splitter.addWidget(self.results_list)
+        self.preview = QTextEdit()
+        self.preview.setReadOnly(True)
+        splitter.addWidget(self.preview)
+        splitter.setSizes([420, 300])
+        layout.addWidget(splitter, stretch=1)
+
+        bottom_row = QHBoxLayout()
+        self.status_label = QLabel()
+        bottom_row.addWidget(self.status_label, stretch=1)
+        self.import_btn = QPushButton("Import into Campaign")
+        self.import_btn.clicked.connect(self.import_selected)
+        bottom_row.addWidget(self.import_btn)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.reject)
+        bottom_row.addWidget(close_btn)
+        layout.addLayout(bottom_row)
+        self.setLayout(layout)
+        self.resize(760, 560)
+
+        # Searching runs on each keystroke after a short pause.
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(120)
+        self._search_timer.timeout.connect(self.search)
+        self.search_edit.textChanged.connect(lambda _text: self._search_timer.start())
+        self.kind_combo.currentIndexChanged.connect(lambda _i: self.search())
+        self.indexer.updated.connect(self._on_index_updated)
+        self.indexer.failed.connect(self._on_index_failed)
+
+        # The saved index answers right away; the refresh catches up in the background.
+        self.search()
+        self.indexer.refresh()
+        self._update_status()
+
+    def _update_status(self, read=None):
+        index = self.indexer.index
+        text = f"{len(index):,} entities in {len(index.campaigns())} campaigns under {index.root}"
+        if self.indexer.is_busy():
+            text += " (updating…)"
+        elif read:
+            text += f" ({read} files re-indexed)"
+        self.status_label.setText(text)
+
+    def _on_index_updated(self, read):
+        if read:
+            self.search()
+        self._update_status(read)
+
+    def _on_index_failed(self, message):
+        self.status_label.setText(f"Could not update the library: {message}")
+
+    def search(self):
+        kind = KINDS[self.kind_combo.currentIndex()][1]
+        self.results = self.indexer.index.search(self.search_edit.text(), kind)
+        current = os.path.normpath(self.main_window.campaign_folder or "")
+        self.results_list.clear()
+        for entry in self.results:
+            rank = f", {'CR' if entry['kind'] == 'NPC' else 'level'} {entry['rank']}" if entry["rank"] else ""
+            detail = f", {entry['detail']}" if entry["detail"] else ""
+            text = f"{entry['name']}  —  {entry['kind']}{detail}{rank} · {entry['campaign']}"
+            if os.path.normpath(entry["campaign_folder"]) == current:
+                text += " (this campaign)"
+            self.results_list.addItem(QListWidgetItem(text))
+        if self.results:
+            self.results_list.setCurrentRow(0)
+        else:
+            self.preview.clear()
+
+    def _show_preview(self, row):
+        if not 0 <= row < len(self.results):
+            self.preview.clear()
+            return
+        entry = self.results[row]
+        try:
+            entity = self.indexer.index.load_entity(entry)
+        except (OSError, ValueError) as exc:
+            self.preview.setPlainText(f"Could not read {entry['path']}:\n{exc}")
+            return
+        if entity is None:
+            self.preview.setPlainText(f"{entry['name']} is no longer in {entry['campaign']}.")
+            return
+        def esc(value):
+            return html.escape(str(value))
+
+        lines = [f"<h3>{esc(entity.get('Name', ''))}</h3>"]
+        for field in PREVIEW_FIELDS:
+            if entity.get(field):
+                lines.append(f"<b>{field}:</b> {esc(entity[field])}<br>")
+        actions = ", ".join(esc(a.get("name", "")) for a in entity.get("Actions", []) if a.get("name"))
+        if actions:
+            lines.append(f"<b>Actions:</b> {actions}<br>")
+        lines.append(f"<br><i>From {esc(entry['campaign_folder'])}</i>")
+        self.preview.setHtml("".join(lines))
+
+    def import_selected(self):
+        if not self.main_window.campaign_folder:
+            QMessageBox.warning(self, "No Campaign", "Load the campaign to import into first.")
+            return
+        rows = sorted(self.results_list.row(item) for item in self.results_list.selectedItems())
+        entries = [self.results[row] for row in rows if 0 <= row < len(self.results)]
+        current = os.path.normpath(self.main_window.campaign_folder)
+        entries = [e for e in entries if os.path.normpath(e["campaign_folder"]) != current]
+        if not entries:
+            self.status_label.setText("Select entities from another campaign to import.")
+            return
+        clashes = [e["name"] for e in entries if self.main_window.entity_index.has(e["kind"], e["name"])]
+        if clashes:
+            reply = QMessageBox.question(
+                self, "Replace Existing?",
+                "This campaign already has:\n" + "\n".join(clashes[:10]) + "\n\nReplace them with the library copies?",
+                QMessageBox.Yes | QMessageBox.No,
+            )
+            if reply != QMessageBox.Yes:
+                return
+        imported = []
+        for entry in entries:
+            entity = self.indexer.index.load_entity(entry)
+            if entity is not None:
+                self.main_window.import_entity(entry["kind"], entity)
+                imported.append(entry["name"])
+        self.search()
+        self.status_label.setText(f"Imported {', '.join(imported)}." if imported else "Nothing was imported.")
@@ -1,7 +1,34 @@
 from PyQt5.QtWidgets import (
-    QMainWindow, QWidget, QTabWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QSizePolicy, QFileDialog
+    QMainWindow, QWidget, QTabWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QSizePolicy, QFileDialog,
+    QProgressBar, QMessageBox, QListWidget, QListWidgetItem, QShortcut, QInputDialog
 )
+from PyQt5.QtCore import QSettings, Qt, QThreadPool
+from PyQt5.QtGui import QKeySequence
 import os
+from gui.campaign_loader import CampaignLoader
+from gui.global_log import GlobalLogWidget
+from gui.search_bar import GlobalSearchBar, SearchIndexTask
+from gui.stall_monitor import StallMonitor
+from utils.action_profiler import PROFILER
+from utils.entity_index import EntityIndex
+from utils.search_index import SearchIndex
+
+# Tabs after "Campaign", built on first activation: (key, title, factory method).
+LAZY_TABS = [
+    ("characters", "Characters", "_make_characters_tab"),
+    ("npcs", "NPCs", "_make_npcs_tab"),
+    ("notes", "Notes", "_make_notes_tab"),
+    ("combat", "Combat", "_make_combat_tab"),
+]
+# Which tab consumes each loaded campaign part, in delivery order.
+PART_TABS = {
+    "characters": "characters",
+    "npcs": "npcs",
+    "notes": "notes",
+    "notes_index": "notes",
+    "combat": "combat",
+}
+MAX_RECENT_CAMPAIGNS = 10
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -9,14 +36,65 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("DnD 5e Solo Campaign Creator")
         self.campaign_name = None
         self.campaign_folder = None
+        self.settings = QSettings("dnd-campaign-creator", "DnD Campaign Creator")
+        # Shared name index for [[Name]] links in notes; the entity tabs keep it current.
+        self.entity_index = EntityIndex()
+        # Full-text index for the search bar. It is loaded and brought up to
+        # date in a worker after each campaign load; changes made meanwhile
+        # wait in _search_queue.
+        self.search_index = SearchIndex()
+        self._search_sources = {}
+        self._search_queue = None
+        self._search_generation = 0
+        self._search_dirty = False
+        self._search_folder = None
+        self.entity_index.add_change_listener(self._on_entity_changed)
 
-
+        # Only the Campaign tab is built up front; the rest get an empty
+        # placeholder that is swapped for the real widget on first activation.
         self.tabs = QTabWidget()
         self.tabs.addTab(self._make_campaign_tab(), "Campaign")
-        self.tabs.addTab(self._make_characters_tab(), "Characters")
-        self.tabs.addTab(self._make_npcs_tab(), "NPCs")
-        self.tabs.addTab(self._make_notes_tab(), "Notes")
-        self.tabs.addTab(self._make_combat_tab(), "Combat")
+        self._built_tabs = {}
+        for key, title, _factory in LAZY_TABS:
+            self.tabs.addTab(QWidget(), title)
+        self.tabs.currentChanged.connect(self._on_tab_changed)
+        self.search_bar = GlobalSearchBar(self.search_index_query)
+        self.search_bar.activated.connect(self.open_search_result)
+        self.tabs.setCornerWidget(self.search_bar, Qt.TopRightCorner)
+        QShortcut(QKeySequence("Ctrl+Shift+F"), self, activated=self.search_bar.focus)
+
+        # Campaign parts are read in worker threads; parts that arrive before
+        # their tab exists wait here until the tab is first opened.
+        self._loaded_parts = {}
+        self.loader = CampaignLoader(self)
+        self.loader.part_loaded.connect(self._on_part_loaded)
+        self.loader.part_failed.connect(self._on_part_failed)
+        self.loader.progress.connect(self._on_load_progress)
+        self.loader.finished.connect(self._on_load_finished)
+        self.load_label = QLabel("")
+        self.load_progress = QProgressBar()
+        self.load_progress.setMaximumWidth(200)
+        self.statusBar().addPermanentWidget(self.load_label)
+        self.statusBar().addPermanentWidget(self.load_progress)
+        self.load_label.hide()
+        self.load_progress.hide()
+        # Created up front (hidden) so its timer keeps draining the log sink.
+        self.log_window = GlobalLogWidget.instance()
+        # The cross-campaign library index is loaded on first use.
+        self.library_indexer = None
+        # The Ctrl+K command palette and its index are built on first use.
+        self.palette_indexer = None
+        self.command_palette = None
+        QShortcut(QKeySequence("Ctrl+K"), self, activated=self.open_command_palette)
+        # The profiler HUD is built on first toggle (F12).
+        self.profiler_hud = None
+        QShortcut(QKeySequence("F12"), self, activated=self.toggle_profiler_hud)
+        # Watchdog that records event-loop stalls with the GUI thread's stack.
+        self.stall_monitor = StallMonitor(self)
+        self.stall_monitor.start()
+        self._load_profile = None
+        PROFILER.add_listener(self._on_action_profiled)
+        self._make_developer_menu()
 
         main_widget = QWidget()
         main_layout = QHBoxLayout()
@@ -31,7 +109,6 @@ class MainWindow(QMainWindow):
         self.showFullScreen()
 
     def _make_campaign_tab(self):
-        from PyQt5.QtCore import Qt
         widget = QWidget()
         layout = QVBoxLayout()
         self.campaign_label = QLabel("No campaign loaded.")
@@ -52,18 +129,158 @@ class MainWindow(QMainWindow):
         load_btn.clicked.connect(self.load_campaign_direct)
         button_col.addWidget(load_btn, alignment=Qt.AlignHCenter)
 
+        library_btn = QPushButton("Campaign Library")
+        library_btn.setMinimumWidth(220)
+        library_btn.setToolTip("Search the characters and NPCs of all your campaigns and import them.")
+        library_btn.clicked.connect(self.open_library)
+        button_col.addWidget(library_btn, alignment=Qt.AlignHCenter)
+
+        log_btn = QPushButton("Show Log")
+        log_btn.setMinimumWidth(220)
+        log_btn.clicked.connect(self.show_log)
+        button_col.addWidget(log_btn, alignment=Qt.AlignHCenter)
+
         exit_btn = QPushButton("Exit")
         exit_btn.setMinimumWidth(220)
         exit_btn.clicked.connect(self.close)
         button_col.addWidget(exit_btn, alignment=Qt.AlignHCenter)
 
         layout.addLayout(button_col)
+
+        # Recent campaigns reopen through the warm-start snapshot when it is fresh.
+        layout.addSpacing(24)
+        layout.addWidget(QLabel("Recent Campaigns"), alignment=Qt.AlignHCenter)
+        self.recent_list = QListWidget()
+        self.recent_list.setMinimumWidth(420)
+        self.recent_list.setMaximumHeight(200)
+        self.recent_list.itemActivated.connect(self._open_recent_campaign)
+        layout.addWidget(self.recent_list, alignment=Qt.AlignHCenter)
+        self._refresh_recent_list()
         layout.addStretch(2)
 
         widget.setLayout(layout)
         widget.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         return widget
 
+    def show_log(self):
+        self.log_window.show()
+        self.log_window.raise_()
+
+    def toggle_profiler_hud(self):
+        if self.profiler_hud is None:
+            from gui.profiler_hud import ProfilerHUD
+
+            self.profiler_hud = ProfilerHUD(self)
+        self.profiler_hud.toggle()
+
+    def _make_developer_menu(self):
+        menu = self.menuBar().addMenu("&Developer")
+        menu.addAction("Profile Next Actions…", self.arm_action_profiler)
+        self.cancel_profiling_action = menu.addAction("Cancel Profiling", self.disarm_action_profiler)
+        self.cancel_profiling_action.setEnabled(False)
+        menu.addSeparator()
+        menu.addAction("Profiler HUD\tF12", self.toggle_profiler_hud)
+        menu.addAction("Stall Report…", self.show_stall_report)
+        menu.addAction("Show Log", self.show_log)
+
+    def arm_action_profiler(self):
+        count, ok = QInputDialog.getInt(
+            self, "Profile Next Actions",
+            "Profile the next N actions (Roll Initiative, Save NPC, Load Campaign, ...)\n"
+            "with cProfile and tracemalloc. Reports go to the campaign's profiles folder.",
+            3, 1, 100,
+        )
+        if not ok:
+            return
+        PROFILER.arm(count)
+        self.cancel_profiling_action.setEnabled(True)
+        self.statusBar().showMessage(f"Profiling the next {count} action(s).", 5000)
+
+    def disarm_action_profiler(self):
+        PROFILER.disarm()
+        self.cancel_profiling_action.setEnabled(False)
+
+    def _on_action_profiled(self, name, paths):
+        self.log_window.log(f"Profiled '{name}': {paths['pstats']}", source="Profiler")
+        self.statusBar().showMessage(
+            f"Profiled '{name}' ({PROFILER.remaining} left). Reports in {os.path.dirname(paths['pstats'])}", 8000
+        )
+        if PROFILER.remaining <= 0:
+            self.cancel_profiling_action.setEnabled(False)
+
+    def show_stall_report(self):
+        from gui.stall_monitor import StallReportDialog
+
+        StallReportDialog(self.stall_monitor.log_path, self).exec_()
+
+    def recent_campaigns(self):
+        recent = self.settings.value("recent_campaigns", [])
+        if isinstance(recent, str):
+            recent = [recent]
+        return [folder for folder in (recent or []) if folder]
+
+    def _remember_campaign(self, folder):
+        recent = [f for f in self.recent_campaigns() if os.path.normpath(f) != os.path.normpath(folder)]
+        recent.insert(0, folder)
+        self.settings.setValue("recent_campaigns", recent[:MAX_RECENT_CAMPAIGNS])
+        self._refresh_recent_list()
+
+    def _refresh_recent_list(self):
+        self.recent_list.clear()
+        for folder in self.recent_campaigns():
+            item = QListWidgetItem(f"{os.path.basename(folder)}  —  {folder}")
+            item.setData(Qt.UserRole, folder)
+            self.recent_list.addItem(item)
+
+    def _open_recent_campaign(self, item):
+        folder = item.data(Qt.UserRole)
+        if not os.path.isdir(folder):
+            QMessageBox.warning(self, "Campaign Missing", f"Campaign folder no longer exists:\n{folder}")
+            recent = [f for f in self.recent_campaigns() if f != folder]
+            self.settings.setValue("recent_campaigns", recent)
+            self._refresh_recent_list()
+            return
+        self._apply_campaign(os.path.basename(folder), folder)
+
+    def _tab_position(self, key):
+        for offset, (tab_key, _title, _factory) in enumerate(LAZY_TABS, start=1):
+            if tab_key == key:
+                return offset
+        raise KeyError(key)
+
+    def tab(self, key, create=True):
+        """Return the tab widget for key, building it first if needed.
+
+        With create=False an unbuilt tab returns None instead.
+        """
+        if key in self._built_tabs:
+            return self._built_tabs[key]
+        if not create:
+            return None
+        index = self._tab_position(key)
+        _key, title, factory = LAZY_TABS[index - 1]
+        widget = getattr(self, factory)()
+        self._built_tabs[key] = widget
+        current = self.tabs.currentIndex()
+        self.tabs.blockSignals(True)
+        placeholder = self.tabs.widget(index)
+        self.tabs.removeTab(index)
+        self.tabs.insertTab(index, widget, title)
+        self.tabs.setCurrentIndex(current)
+        self.tabs.blockSignals(False)
+        placeholder.deleteLater()
+        parts = [part for part, tab_key in PART_TABS.items() if tab_key == key]
+        if self.loader.is_loading() and not any(part in self._loaded_parts for part in parts):
+            widget.setEnabled(False)
+        for part in parts:
+            if part in self._loaded_parts:
+                self._populate_tab(part, widget, self._loaded_parts.pop(part))
+        return widget
+
+    def _on_tab_changed(self, index):
+        if 1 <= index <= len(LAZY_TABS):
+            self.tab(LAZY_TABS[index - 1][0])
+
     def _make_characters_tab(self):
         from gui.character_tab import CharacterTab
         return CharacterTab(self)
@@ -95,28 +312,263 @@ class MainWindow(QMainWindow):
             name = os.path.basename(folder)
             self._apply_campaign(name, folder)
 
+    def open_library(self):
+        from gui.library_dialog import LibraryDialog, LibraryIndexer
+
+        if self.library_indexer is None:
+            self.library_indexer = LibraryIndexer(parent=self)
+        dialog = LibraryDialog(self, self.library_indexer)
+        dialog.setAttribute(Qt.WA_DeleteOnClose)
+        dialog.exec_()
+
+    def import_entity(self, kind, entity):
+        """Add a character or NPC to the current campaign, replacing one of the same name."""
+        from utils.file_io import upsert_entity
+
+        entity_type, key = ("characters", "characters") if kind == "Character" else ("npcs", "npcs")
+        entities = upsert_entity(entity_type, entity, self.campaign_folder)
+        self.entity_index.add(kind, entity)
+        tab = self.tab(key, create=False)
+        if tab is not None:
+            tab.model.upsert(entity)
+        elif key in self._loaded_parts:
+            self._loaded_parts[key] = entities
+        if self.library_indexer is not None:
+            self.library_indexer.index.refresh_file(os.path.join(self.campaign_folder, f"{entity_type}.json"))
+        self.log_window.log(f"Imported {kind} '{entity.get('Name', '')}' from the library.", source="Library")
+
     def _apply_campaign(self, name, folder):
         self.campaign_name = name
         self.campaign_folder = folder
         self.campaign_label.setText(
             f"Current Campaign: {self.campaign_name}\nFolder: {self.campaign_folder}"
         )
-        # Refresh entity tabs after loading campaign
-        for idx in [1, 2, 3, 4]:
-            tab = self.tabs.widget(idx)
-            if hasattr(tab, "refresh_list"):
-                tab.refresh_list()
-        # Load notes in Notes tab (assumed to be tab index 3)
-        notes_tab_index = 3
-        if self.tabs.count() > notes_tab_index:
-            notes_tab = self.tabs.widget(notes_tab_index)
-            if hasattr(notes_tab, "load_notes"):
-                notes_tab.load_notes()
-        combat_tab_index = 4
-        if self.tabs.count() > combat_tab_index:
-            combat_tab = self.tabs.widget(combat_tab_index)
-            if hasattr(combat_tab, "load_saved_state"):
-                combat_tab.load_saved_state()
+        # Parts are loaded off the GUI thread; each built tab is disabled
+        # until its own part arrives.
+        self._loaded_parts = {}
+        for tab in self._built_tabs.values():
+            tab.setEnabled(False)
+        self._remember_campaign(folder)
+        PROFILER.output_folder = folder
+        # Loading finishes asynchronously, so it is profiled until the loader
+        # reports completion; parsing in worker threads is not in the profile.
+        PROFILER.end(self._load_profile)
+        self._load_profile = PROFILER.begin("Load Campaign")
+        self._reset_search_index(folder)
+        self.loader.start(folder)
+
+    def _populate_tab(self, part, tab, data):
+        if part in ("characters", "npcs"):
+            tab.refresh_list(data)
+        elif part == "notes":
+            tab.load_notes(data)
+        elif part == "notes_index":
+            tab.set_sections(data)
+        elif part == "combat":
+            tab.load_saved_state(data)
+        tab.setEnabled(True)
+
+    def _on_part_loaded(self, part, data):
+        if part in ("characters", "npcs", "notes"):
+            self._search_sources[part] = data
+        if part in ("characters", "npcs"):
+            self.entity_index.set_entities("Character" if part == "characters" else "NPC", data)
+        tab = self.tab(PART_TABS[part], create=False)
+        if tab is not None:
+            self._populate_tab(part, tab, data)
+        else:
+            self._loaded_parts[part] = data
+
+    def _on_part_failed(self, part, message):
+        self.log_window.log(f"Could not load {part} from {self.campaign_folder}: {message}", level="ERROR", source="Loader")
+        if part != "notes_index":
+            QMessageBox.warning(self, "Load Warning", f"Could not load campaign {part}:\n{message}")
+        empty = "" if part == "notes" else ({} if part == "combat" else [])
+        self._on_part_loaded(part, empty)
+
+    def _on_load_progress(self, done, total):
+        self.load_label.setText(f"Loading {self.campaign_name}…")
+        self.load_progress.setMaximum(total)
+        self.load_progress.setValue(done)
+        self.load_label.show()
+        self.load_progress.show()
+
+    def _on_load_finished(self):
+        self.load_label.hide()
+        self.load_progress.hide()
+        PROFILER.end(self._load_profile)
+        self._load_profile = None
+        self._start_search_indexing()
+
+    # --- Search -------------------------------------------------------
+    def _reset_search_index(self, folder):
+        """Save the previous campaign's index and hold changes until the new one is ready."""
+        self._save_search_index()
+        self._search_generation += 1
+        self.search_index = SearchIndex()
+        self._search_folder = folder
+        self._search_sources = {}
+        self._search_queue = []
+        self.search_bar.set_busy(True)
+
+    def _start_search_indexing(self):
+        task = SearchIndexTask(self._search_generation, self._search_folder, self._search_sources)
+        self._search_sources = {}
+        task.signals.ready.connect(self._on_search_index_ready)
+        task.signals.failed.connect(self._on_search_index_failed)
+        self._search_task = task
+        QThreadPool.globalInstance().start(task)
+
+    def _on_search_index_ready(self, generation, index, changed):
+        if generation != self._search_generation:
+            return
+        self.search_index = index
+        queue, self._search_queue = self._search_queue or [], None
+        for change in queue:
+            self._apply_search_change(*change)
+        self._search_dirty = bool(queue)
+        self._search_task = None
+        self.search_bar.set_busy(False)
+        self.log_window.log(f"Search index ready: {len(index)} documents, {changed} re-indexed.", source="Search")
+
+    def _on_search_index_failed(self, generation, message):
+        if generation != self._search_generation:
+            return
+        # Later changes still reach the in-memory index, but it only holds those, so never
+        # save it over the campaign's last good index.
+        self._search_queue = None
+        self._search_folder = None
+        self._search_dirty = False
+        self._search_task = None
+        self.search_bar.set_busy(False)
+        self.log_window.log(f"Could not build the search index: {message}", level="ERROR", source="Search")
+
+    def _on_entity_changed(self, op, kind, value):
+        # Campaign loads are indexed by SearchIndexTask from the loaded parts.
+        if op == "set" and self.loader.is_loading():
+            return
+        self._queue_search_change(op, kind, value)
+
+    def index_notes(self, text):
+        """Re-index the note sections after the notes were saved."""
+        self._queue_search_change("notes", "Note", text)
+
+    def _queue_search_change(self, op, kind, value):
+        if self._search_queue is not None:
+            self._search_queue.append((op, kind, value))
+        else:
+            self._apply_search_change(op, kind, value)
+
+    def _apply_search_change(self, op, kind, value):
+        if op == "add":
+            self.search_index.add_entity(kind, value)
+        elif op == "remove":
+            self.search_index.remove_entity(kind, value)
+        elif op == "set":
+            self.search_index.sync_entities(kind, value)
+        elif op == "notes":
+            self.search_index.set_notes(value)
+        self._search_dirty = True
+
+    def _save_search_index(self):
+        if self._search_dirty and self._search_folder and self._search_queue is None:
+            try:
+                self.search_index.save(self._search_folder)
+            except OSError as exc:
+                self.log_window.log(f"Could not save the search index: {exc}", level="ERROR", source="Search")
+        self._search_dirty = False
+
+    def search_index_query(self, query, limit):
+        return self.search_index.search(query, limit)
+
+    def open_search_result(self, result):
+        if result["kind"] == "Note":
+            notes = self.tab("notes")
+            self.tabs.setCurrentIndex(self._tab_position("notes"))
+            notes.goto_line(result["line"])
+        else:
+            self.show_entity(result["title"])
+
+    # --- Command palette ------------------------------------------------
+    def open_command_palette(self):
+        from gui.command_palette import CommandPalette, PaletteIndexer
+
+        if self.command_palette is None:
+            self.palette_indexer = PaletteIndexer(self.entity_index, self)
+            self.command_palette = CommandPalette(self.palette_indexer, self)
+            self.command_palette.activated.connect(self.run_palette_item)
+        self.palette_indexer.set_commands(self._palette_commands())
+        combat = self.tab("combat", create=False)
+        self.palette_indexer.set_combatants(combat.combatants if combat is not None else [])
+        self.command_palette.popup()
+
+    def _palette_commands(self):
+        def goto(key):
+            return lambda: self.tabs.setCurrentIndex(self._tab_position(key))
+
+        def combat(method):
+            def run():
+                tab = self.tab("combat")
+                self.tabs.setCurrentIndex(self._tab_position("combat"))
+                getattr(tab, method)()
+            return run
+
+        commands = [
+            ("Go to Campaign", lambda: self.tabs.setCurrentIndex(0)),
+            *[(f"Go to {title}", goto(key)) for key, title, _factory in LAZY_TABS],
+            ("Create Campaign…", lambda: self.open_campaign_dialog(mode="create")),
+            ("Load Campaign…", self.load_campaign_direct),
+            ("Campaign Library…", self.open_library),
+            ("Search Campaign", self.search_bar.focus),
+            ("Add Combatant…", combat("add_combatant")),
+            ("Build Encounter…", combat("open_encounter_builder")),
+            ("Tune Difficulty…", combat("open_tuner")),
+            ("Roll Initiative", combat("roll_initiative")),
+            ("Next Turn", combat("next_turn")),
+            ("Effects…", combat("open_effects_dialog")),
+            ("HP ±…", combat("adjust_hp")),
+            ("Undo Combat Step", combat("undo")),
+            ("Redo Combat Step", combat("redo")),
+            ("Save Combat State", combat("save_state")),
+            ("Show Log", self.show_log),
+            ("Profiler HUD", self.toggle_profiler_hud),
+            ("Stall Report…", self.show_stall_report),
+            ("Profile Next Actions…", self.arm_action_profiler),
+        ]
+        return commands
+
+    def run_palette_item(self, payload):
+        kind = payload["type"]
+        if kind == "command":
+            payload["run"]()
+        elif kind == "combat_action":
+            self.tabs.setCurrentIndex(self._tab_position("combat"))
+            self.tab("combat").open_actions_dialog(payload["cid"], payload["index"])
+        elif self.show_entity(payload["name"]) and kind == "action":
+            tab = self.tab("characters" if payload["kind"] == "Character" else "npcs")
+            tab.editor.actions_table.select_action(payload["index"])
+
+    def show_entity(self, name):
+        """Switch to the tab holding the named character or NPC and select it."""
+        found = self.entity_index.resolve(name)
+        if not found:
+            return False
+        kind, _entity = found
+        key = "characters" if kind == "Character" else "npcs"
+        tab = self.tab(key)
+        if tab.select_entity(name):
+            self.tabs.setCurrentIndex(self._tab_position(key))
+            return True
+        return False
+
+    def closeEvent(self, event):
+        # Flush the notes recovery journal so the last few seconds of typing survive.
+        notes_tab = self.tab("notes", create=False)
+        if notes_tab is not None:
+            notes_tab.autosave()
+        self._save_search_index()
+        self.stall_monitor.stop()
+        super().closeEvent(event)
 
     def _make_tab(self, name):
         widget = QWidget()
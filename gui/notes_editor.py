@@ -1,6 +1,8 @@
 import os
+import time
 
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt, QTimer, QUrl
+from PyQt5.QtGui import QColor, QCursor, QDesktopServices, QSyntaxHighlighter, QTextCharFormat, QTextCursor
 from PyQt5.QtWidgets import (
     QFrame,
     QHBoxLayout,
@@ -13,12 +15,63 @@ from PyQt5.QtWidgets import (
     QWidget,
     QPlainTextEdit,
     QTextBrowser,
+    QLabel,
+    QToolTip,
+    QComboBox,
 )
 
-try:
-    import markdown
-except ImportError:
-    markdown = None
+from utils.action_profiler import profiled_action
+from utils.entity_index import LINK_RE, name_from_url
+from utils.notes_index import note_sections
+from utils.notes_journal import NotesJournal
+from utils.tracing import span, traced
+
+AUTOSAVE_INTERVAL_MS = 5000
+# Fold the journal back into notes.md once it grows past this size or age.
+COMPACT_JOURNAL_BYTES = 256 * 1024
+COMPACT_INTERVAL_S = 300
+
+_markdown = None
+
+
+def _load_markdown():
+    """Import the optional markdown package on first render, or return None."""
+    global _markdown
+    if _markdown is None:
+        try:
+            import markdown
+        except ImportError:
+            markdown = False
+        _markdown = markdown
+    return _markdown or None
+
+
+class EntityLinkHighlighter(QSyntaxHighlighter):
+    """Marks [[Name]] links and bare entity mentions block by block as the user types."""
+
+    def __init__(self, document, entity_index):
+        super().__init__(document)
+        self.entity_index = entity_index
+        self.link_format = QTextCharFormat()
+        self.link_format.setForeground(QColor("#1e88e5"))
+        self.link_format.setFontUnderline(True)
+        self.broken_format = QTextCharFormat()
+        self.broken_format.setForeground(QColor("#c62828"))
+        self.broken_format.setUnderlineStyle(QTextCharFormat.WaveUnderline)
+        self.broken_format.setUnderlineColor(QColor("#c62828"))
+        self.mention_format = QTextCharFormat()
+        self.mention_format.setUnderlineStyle(QTextCharFormat.DotLine)
+        self.mention_format.setUnderlineColor(QColor("#1e88e5"))
+
+    def highlightBlock(self, text):
+        linked = []
+        for match in LINK_RE.finditer(text):
+            fmt = self.link_format if self.entity_index.resolve(match.group(1)) else self.broken_format
+            self.setFormat(match.start(), match.end() - match.start(), fmt)
+            linked.append((match.start(), match.end()))
+        for start, end, _key in self.entity_index.find_mentions(text):
+            if not any(a <= start < b for a, b in linked):
+                self.setFormat(start, end - start, self.mention_format)
 
 
 class NotesEditor(QWidget):
@@ -38,12 +91,16 @@ class NotesEditor(QWidget):
         self.editor.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.editor.setMinimumHeight(360)
         self.editor.textChanged.connect(self._on_editor_changed)
+        self.editor.document().contentsChange.connect(self._on_contents_change)
         self.splitter.addWidget(self.editor)
 
         # Live preview pane.
         self.preview = QTextBrowser()
         self.preview.setPlaceholderText("Markdown preview appears here.")
-        self.preview.setOpenExternalLinks(True)
+        # Links are dispatched manually so entity: links can jump to their tab.
+        self.preview.setOpenLinks(False)
+        self.preview.anchorClicked.connect(self._on_link_clicked)
+        self.preview.highlighted[QUrl].connect(self._on_link_hovered)
         self.preview.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.splitter.addWidget(self.preview)
         self.splitter.setStretchFactor(0, 1)
@@ -60,9 +117,15 @@ class NotesEditor(QWidget):
 
         self.save_btn = QPushButton("💾 Save Notes")
         self.save_btn.setMinimumWidth(120)
-        self.save_btn.clicked.connect(self.save_notes)
+        self.save_btn.clicked.connect(lambda: self.save_notes())
         footer_layout.addWidget(self.save_btn)
+        self.section_combo = QComboBox()
+        self.section_combo.setMinimumWidth(220)
+        self.section_combo.activated.connect(self._jump_to_section)
+        footer_layout.addWidget(self.section_combo)
         footer_layout.addStretch(1)
+        self.autosave_label = QLabel("")
+        footer_layout.addWidget(self.autosave_label)
 
         main_layout.addWidget(footer, stretch=0)
 
@@ -73,54 +136,239 @@ class NotesEditor(QWidget):
         self.render_timer = QTimer(self)
         self.render_timer.setSingleShot(True)
         self.render_timer.setInterval(2000)
-        self.render_timer.timeout.connect(self.render_markdown)
+        self.render_timer.timeout.connect(self._on_render_timer)
 
-        if self.main_window and getattr(self.main_window, "campaign_folder", None):
-            self.load_notes()
-        else:
-            self.render_markdown()
+        # Autosave appends only the edits made since the last tick to a
+        # recovery journal; notes.md itself is rewritten on compaction.
+        self.journal = None
+        self._pending_ops = []
+        self._journal_suspended = False
+        self._doc_length = 0
+        self._last_compact = time.monotonic()
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.setInterval(AUTOSAVE_INTERVAL_MS)
+        self.autosave_timer.timeout.connect(self.autosave)
+        self.autosave_timer.start()
+
+        self.entity_index = getattr(self.main_window, "entity_index", None)
+        self.highlighter = None
+        if self.entity_index is not None:
+            self.highlighter = EntityLinkHighlighter(self.editor.document(), self.entity_index)
+            self._names_changed = False
+            self.relink_timer = QTimer(self)
+            self.relink_timer.setSingleShot(True)
+            self.relink_timer.setInterval(500)
+            self.relink_timer.timeout.connect(self._relink)
+            self.entity_index.add_listener(self._on_entity_index_changed)
+
+        # MainWindow calls load_notes once the campaign's notes are read.
+        self.render_markdown()
 
     # --- Editor / preview helpers -----------------------------------
     def _on_editor_changed(self):
         # Restart the timer so rendering only happens after user pauses typing.
         self.render_timer.start()
 
+    def _on_contents_change(self, position, removed, added):
+        if self._journal_suspended:
+            return
+        # Qt occasionally reports ranges past the end of the document.
+        removed = max(0, min(removed, self._doc_length - position))
+        end = min(position + added, self.editor.document().characterCount() - 1)
+        inserted = ""
+        if end > position:
+            cursor = QTextCursor(self.editor.document())
+            cursor.setPosition(position)
+            cursor.setPosition(end, QTextCursor.KeepAnchor)
+            inserted = cursor.selectedText().replace("\u2029", "\n")
+        self._doc_length += (end - position) - removed
+        if not removed and not inserted:
+            return
+        # Coalesce plain typing into a single insert op.
+        if self._pending_ops and not removed:
+            last = self._pending_ops[-1]
+            if last[0] + len(last[2].encode("utf-16-le")) // 2 == position:
+                last[2] += inserted
+                return
+        self._pending_ops.append([position, removed, inserted])
+
+    def _set_editor_text(self, text):
+        self._journal_suspended = True
+        self.editor.blockSignals(True)
+        self.editor.setPlainText(text)
+        self.editor.blockSignals(False)
+        self._journal_suspended = False
+        self._pending_ops = []
+        self._doc_length = self.editor.document().characterCount() - 1
+
+    def _on_entity_index_changed(self, names_changed):
+        self._names_changed = self._names_changed or names_changed
+        self.relink_timer.start()
+
+    def _relink(self):
+        if self._names_changed:
+            self.highlighter.rehighlight()
+            self._names_changed = False
+        self.render_markdown()
+
+    def _on_link_clicked(self, url):
+        name = name_from_url(url.toString())
+        if name is None:
+            QDesktopServices.openUrl(url)
+        elif self.main_window and hasattr(self.main_window, "show_entity"):
+            self.main_window.show_entity(name)
+
+    def _on_link_hovered(self, url):
+        name = name_from_url(url.toString()) if url.isValid() else None
+        summary = self.entity_index.summary_html(name) if name and self.entity_index else None
+        if summary:
+            QToolTip.showText(QCursor.pos(), summary, self.preview)
+        else:
+            QToolTip.hideText()
+
+    def _on_render_timer(self):
+        self.set_sections(note_sections(self.editor.toPlainText()))
+        self.render_markdown()
+
+    def set_sections(self, sections):
+        """Fill the section jump list from [level, title, line_number] entries."""
+        self.section_combo.clear()
+        self.section_combo.addItem("Jump to section…", -1)
+        for level, title, line_no in sections:
+            self.section_combo.addItem("    " * (level - 1) + title, line_no)
+
+    def _jump_to_section(self, index):
+        line_no = self.section_combo.itemData(index)
+        self.section_combo.setCurrentIndex(0)
+        if line_no is not None:
+            self.goto_line(line_no)
+
+    def goto_line(self, line_no):
+        if line_no < 0:
+            return
+        block = self.editor.document().findBlockByNumber(line_no)
+        if block.isValid():
+            cursor = QTextCursor(block)
+            self.editor.setTextCursor(cursor)
+            self.editor.centerCursor()
+            self.editor.setFocus()
+
     def render_markdown(self):
         text = self.editor.toPlainText()
+        if not text:
+            self.preview.clear()
+            return
+        markdown = _load_markdown()
+        if self.entity_index is not None:
+            with span("notes.link_markdown"):
+                text = self.entity_index.link_markdown(text)
         if markdown:
             try:
-                html_content = markdown.markdown(text)
-                self.preview.setHtml(html_content)
+                with span("notes.render_markdown", chars=len(text)):
+                    html_content = markdown.markdown(text)
+                with span("notes.preview_set_html"):
+                    self.preview.setHtml(html_content)
             except Exception as exc:
                 self.preview.setPlainText(f"Failed to render markdown:\n{exc}")
         else:
             self.preview.setPlainText("Markdown module not installed.\n\n" + text)
 
     # --- Notes IO ---------------------------------------------------
-    def load_notes(self):
+    def load_notes(self, text=None):
+        """Show the campaign notes, reading notes.md unless text is already loaded."""
+        # Flush anything typed against the previous campaign first.
+        self.autosave()
         campaign_folder = getattr(self.main_window, "campaign_folder", None) if self.main_window else None
         if not campaign_folder:
-            self.editor.setPlainText("")
+            self.journal = None
+            self._set_editor_text("")
             self.render_markdown()
             return
 
-        notes_path = os.path.join(campaign_folder, "notes.md")
-        if os.path.exists(notes_path):
-            try:
-                with open(notes_path, "r", encoding="utf-8") as f:
-                    self.editor.blockSignals(True)
-                    self.editor.setPlainText(f.read())
-                    self.editor.blockSignals(False)
-            except Exception:
-                self.editor.blockSignals(True)
-                self.editor.setPlainText("")
-                self.editor.blockSignals(False)
-        else:
-            self.editor.blockSignals(True)
-            self.editor.setPlainText("")
-            self.editor.blockSignals(False)
+        if text is None:
+            notes_path = os.path.join(campaign_folder, "notes.md")
+            text = ""
+            if os.path.exists(notes_path):
+                try:
+                    with open(notes_path, "r", encoding="utf-8") as f:
+                        text = f.read()
+                except Exception:
+                    text = ""
+        self._set_editor_text(text)
+
+        self.journal = NotesJournal(campaign_folder)
+        restored = None
+        try:
+            restored = self.journal.recover(text)
+        except Exception as exc:
+            self._show_autosave_status(f"Recovery journal unreadable: {exc}")
+        if restored is not None and restored != text:
+            reply = QMessageBox.question(
+                self,
+                "Restore Notes",
+                "Unsaved changes to the campaign notes were found from a previous session.\n"
+                "Restore them?",
+                QMessageBox.Yes | QMessageBox.No,
+            )
+            if reply == QMessageBox.Yes:
+                self._set_editor_text(restored)
+                self.set_sections(note_sections(restored))
+                self._show_autosave_status("Unsaved notes restored.")
+                self.render_markdown()
+                return
+        try:
+            self.journal.reset(text)
+        except Exception as exc:
+            self._show_autosave_status(f"Autosave unavailable: {exc}")
+            self.journal = None
+        self._last_compact = time.monotonic()
         self.render_markdown()
 
+    @traced("notes.autosave")
+    def autosave(self):
+        """Append edits since the last tick to the recovery journal."""
+        if self.journal is None:
+            self._pending_ops = []
+            return
+        if not self._pending_ops:
+            return
+        ops, self._pending_ops = self._pending_ops, []
+        try:
+            self.journal.append(ops)
+        except Exception as exc:
+            self._pending_ops = ops + self._pending_ops
+            self._show_autosave_status(f"Autosave failed: {exc}")
+            return
+        if (
+            self.journal.size() > COMPACT_JOURNAL_BYTES
+            or time.monotonic() - self._last_compact > COMPACT_INTERVAL_S
+        ):
+            self.compact()
+        else:
+            self._show_autosave_status(f"Autosaved {time.strftime('%H:%M:%S')}")
+
+    def compact(self):
+        """Write the full notes to notes.md atomically and restart the journal."""
+        if self.journal is None:
+            return
+        self._pending_ops = []
+        try:
+            self.journal.compact(self.editor.toPlainText())
+        except Exception as exc:
+            self._show_autosave_status(f"Autosave failed: {exc}")
+            return
+        self._last_compact = time.monotonic()
+        self._notes_written(self.editor.toPlainText())
+        self._show_autosave_status(f"Saved {time.strftime('%H:%M:%S')}")
+
+    def _notes_written(self, text):
+        if hasattr(self.main_window, "index_notes"):
+            self.main_window.index_notes(text)
+
+    def _show_autosave_status(self, text):
+        self.autosave_label.setText(text)
+
+    @profiled_action("Save Notes")
     def save_notes(self):
         campaign_folder = getattr(self.main_window, "campaign_folder", None) if self.main_window else None
         if not campaign_folder:
@@ -130,8 +378,12 @@ class NotesEditor(QWidget):
         notes_path = os.path.join(campaign_folder, "notes.md")
         notes_text = self.editor.toPlainText()
         try:
-            with open(notes_path, "w", encoding="utf-8") as f:
-                f.write(notes_text)
+            if self.journal is None or self.journal.campaign_folder != campaign_folder:
+                self.journal = NotesJournal(campaign_folder)
+            self.journal.compact(notes_text)
+            self._pending_ops = []
+            self._last_compact = time.monotonic()
+            self._notes_written(notes_text)
             QMessageBox.information(self, "Notes Saved", f"Notes saved to {notes_path}")
         except Exception as exc:
             QMessageBox.critical(self, "Save Error", f"Failed to save notes:\n{exc}")
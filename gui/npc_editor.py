@@ -9,9 +9,6 @@ from PyQt5.QtWidgets import (
     QMessageBox,
     QComboBox,
     QHBoxLayout,
-    QTableWidget,
-    QTableWidgetItem,
-    QHeaderView,
     QDialog,
     QDialogButtonBox,
     QGridLayout,
@@ -20,8 +17,10 @@ from PyQt5.QtWidgets import (
     QSizePolicy,
 )
 from PyQt5.QtCore import Qt
+from gui.actions_model import ActionsTable, ActionsTableModel
+from gui.form_binding import FormBinder
+from utils.ai import chat_completion
 import os
-import openai
 import json
 
 class ActionDialog(QDialog):
@@ -163,13 +162,42 @@ class NPCEditor(QWidget):
         form_container_layout.addLayout(self.form)
         form_container_layout.addStretch()
 
+        # NPC fields in saved order; required ones must be filled in to save.
+        self.binder = FormBinder()
+        for key, widget, required in [
+            ("Name", self.name_edit, True),
+            ("Type", self.type_combo, False),
+            ("TokenImage", self.token_edit, False),
+            ("Role/Title", self.role_edit, True),
+            ("AC", self.ac_edit, True),
+            ("HP", self.hp_edit, True),
+            ("Initiative", self.initiative_edit, True),
+            ("Speed", self.speed_edit, True),
+            ("STR", self.str_edit, True),
+            ("DEX", self.dex_edit, True),
+            ("CON", self.con_edit, True),
+            ("INT", self.int_edit, True),
+            ("WIS", self.wis_edit, True),
+            ("CHA", self.cha_edit, True),
+            ("Skills", self.skills_edit, True),
+            ("Gear", self.gear_edit, True),
+            ("Senses", self.senses_edit, True),
+            ("Languages", self.languages_edit, True),
+            ("CR", self.cr_edit, True),
+            ("Habitat", self.habitat_edit, True),
+            ("Description", self.desc_edit, False),
+            ("Resistances", self.resist_edit, False),
+            ("Vulnerabilities", self.vuln_edit, False),
+            ("Immunities", self.immune_edit, False),
+        ]:
+            self.binder.bind(key, widget, required=required, default="Neutral" if key == "Type" else "")
+
         form_scroll.setWidget(form_container)
         self.splitter.addWidget(form_scroll)
 
         # --- Actions area (table + buttons) ---
-        self.actions_table = QTableWidget(0, 6)
-        self.actions_table.setHorizontalHeaderLabels(["Name", "Type", "Attack Bonus", "Damage", "Damage Type", "Description"])
-        self.actions_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.actions_model = ActionsTableModel(editable=True, parent=self)
+        self.actions_table = ActionsTable(self.actions_model)
         
         self.add_action_btn = QPushButton("Add Action")
         self.edit_action_btn = QPushButton("Edit Action")
@@ -205,43 +233,49 @@ class NPCEditor(QWidget):
         self.edit_action_btn.clicked.connect(self.edit_action)
         self.remove_action_btn.clicked.connect(self.remove_action)
 
+    def load_entity(self, npc):
+        """Show an NPC dict in the form and actions table."""
+        self.binder.apply(npc)
+        self.set_actions(npc.get("Actions", []) or [])
+
+    def clear_form(self):
+        self.binder.clear()
+        self.clear_actions()
+
+    def entity_data(self):
+        """The NPC dict being edited, with its actions."""
+        data = self.binder.values()
+        data["Actions"] = self.get_actions()
+        return data
+
     def set_actions(self, actions):
         """Set the actions table from a list of action dicts."""
-        self.actions_table.setRowCount(0)
-        for action in actions:
-            row = self.actions_table.rowCount()
-            self.actions_table.insertRow(row)
-            for col, key in enumerate(["name", "type", "attack_bonus", "damage", "damage_type", "description"]):
-                self.actions_table.setItem(row, col, QTableWidgetItem(str(action.get(key, ""))))
+        self.actions_model.set_actions(actions)
+
+    def get_actions(self):
+        return self.actions_model.actions()
 
     def clear_actions(self):
-        self.actions_table.setRowCount(0)
+        self.actions_model.set_actions([])
 
     def add_action(self):
         dialog = ActionDialog(parent=self)
         if dialog.exec_():
-            action = dialog.get_action()
-            row = self.actions_table.rowCount()
-            self.actions_table.insertRow(row)
-            for col, key in enumerate(["name", "type", "attack_bonus", "damage", "damage_type", "description"]):
-                self.actions_table.setItem(row, col, QTableWidgetItem(action[key]))
+            self.actions_model.append(dialog.get_action())
 
     def edit_action(self):
-        row = self.actions_table.currentRow()
+        row = self.actions_table.current_row()
         if row < 0:
             QMessageBox.warning(self, "No Selection", "Select an action to edit.")
             return
-        action = {key: self.actions_table.item(row, col).text() if self.actions_table.item(row, col) else "" for col, key in enumerate(["name", "type", "attack_bonus", "damage", "damage_type", "description"])}
-        dialog = ActionDialog(action, parent=self)
+        dialog = ActionDialog(self.actions_model.action(row), parent=self)
         if dialog.exec_():
-            action = dialog.get_action()
-            for col, key in enumerate(["name", "type", "attack_bonus", "damage", "damage_type", "description"]):
-                self.actions_table.setItem(row, col, QTableWidgetItem(action[key]))
+            self.actions_model.replace(row, dialog.get_action())
 
     def remove_action(self):
-        row = self.actions_table.currentRow()
+        row = self.actions_table.current_row()
         if row >= 0:
-            self.actions_table.removeRow(row)
+            self.actions_model.remove(row)
 
     def parse_stat_block(self):
         text = self.stat_block_edit.toPlainText()
@@ -343,8 +377,8 @@ class NPCEditor(QWidget):
         }
 
         try:
-            openai.api_key = api_key
-            response = openai.chat.completions.create(
+            response = chat_completion(
+                api_key=api_key,
                 model="gpt-4.1-mini",
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=1200,
@@ -357,89 +391,15 @@ class NPCEditor(QWidget):
             QMessageBox.critical(self, "OpenAI Error", f"Failed to parse stat block with OpenAI:\n{e}")
             return
 
-        # Fill fields from AI response
-        self.name_edit.setText(str(npc_data.get("Name", "")))
-        self.token_edit.setText(str(npc_data.get("TokenImage", "")))
-        self.role_edit.setText(str(npc_data.get("Role/Title", "")))
-        self.ac_edit.setText(str(npc_data.get("AC", "")))
-        self.hp_edit.setText(str(npc_data.get("HP", "")))
-        self.initiative_edit.setText(str(npc_data.get("Initiative", "")))
-        self.speed_edit.setText(str(npc_data.get("Speed", "")))
-        self.str_edit.setText(str(npc_data.get("STR", "")))
-        self.dex_edit.setText(str(npc_data.get("DEX", "")))
-        self.con_edit.setText(str(npc_data.get("CON", "")))
-        self.int_edit.setText(str(npc_data.get("INT", "")))
-        self.wis_edit.setText(str(npc_data.get("WIS", "")))
-        self.cha_edit.setText(str(npc_data.get("CHA", "")))
-        self.skills_edit.setText(str(npc_data.get("Skills", "")))
-        self.gear_edit.setText(str(npc_data.get("Gear", "")))
-        self.senses_edit.setText(str(npc_data.get("Senses", "")))
-        self.languages_edit.setText(str(npc_data.get("Languages", "")))
-        self.cr_edit.setText(str(npc_data.get("CR", "")))
-        self.habitat_edit.setText(str(npc_data.get("Habitat", "")))
-        self.desc_edit.setPlainText(str(npc_data.get("Description", "")))
-        self.resist_edit.setText(str(npc_data.get("Resistances", "")))
-        self.vuln_edit.setText(str(npc_data.get("Vulnerabilities", "")))
-        self.immune_edit.setText(str(npc_data.get("Immunities", "")))
-        # Set type
-        t = str(npc_data.get("Type", "Neutral"))
-        if t in ["Hostile", "Friendly", "Neutral"]:
-            self.type_combo.setCurrentText(t)
-        else:
-            self.type_combo.setCurrentText("Neutral")
-        # Actions
-        self.actions_table.setRowCount(0)
-        actions = npc_data.get("Actions", [])
-        for action in actions:
-            row = self.actions_table.rowCount()
-            self.actions_table.insertRow(row)
-            for col, key in enumerate(["name", "type", "attack_bonus", "damage", "damage_type", "description"]):
-                self.actions_table.setItem(row, col, QTableWidgetItem(str(action.get(key, ""))))
+        # Fill fields from AI response; unknown types become Neutral
+        self.load_entity(npc_data)
         QMessageBox.information(self, "Parsed", "Stat block parsed using OpenAI. Please review and complete all fields.")
 
     def save_npc(self):
         # Validate all fields
-        mandatory = [
-            (self.name_edit, "Name"),
-            (self.role_edit, "Role/Title"),
-            (self.ac_edit, "AC"),
-            (self.hp_edit, "HP"),
-            (self.initiative_edit, "Initiative"),
-            (self.speed_edit, "Speed"),
-            (self.str_edit, "STR"),
-            (self.dex_edit, "DEX"),
-            (self.con_edit, "CON"),
-            (self.int_edit, "INT"),
-            (self.wis_edit, "WIS"),
-            (self.cha_edit, "CHA"),
-            (self.skills_edit, "Skills"),
-            (self.gear_edit, "Gear"),
-            (self.senses_edit, "Senses"),
-            (self.languages_edit, "Languages"),
-            (self.cr_edit, "CR"),
-            (self.habitat_edit, "Habitat"),
-        ]
-        missing = [label for edit, label in mandatory if not edit.text().strip()]
+        missing = self.binder.missing()
         if missing:
             QMessageBox.warning(self, "Missing Fields", f"Please fill in all mandatory fields: {', '.join(missing)}")
             return
-        # Collect actions from table
-        actions = []
-        for row in range(self.actions_table.rowCount()):
-            action = {
-                "name": self.actions_table.item(row, 0).text() if self.actions_table.item(row, 0) else "",
-                "type": self.actions_table.item(row, 1).text() if self.actions_table.item(row, 1) else "",
-                "attack_bonus": self.actions_table.item(row, 2).text() if self.actions_table.item(row, 2) else "",
-                "damage": self.actions_table.item(row, 3).text() if self.actions_table.item(row, 3) else "",
-                "damage_type": self.actions_table.item(row, 4).text() if self.actions_table.item(row, 4) else "",
-                "description": self.actions_table.item(row, 5).text() if self.actions_table.item(row, 5) else "",
-            }
-            actions.append(action)
-        # Collect resistances, vulnerabilities, immunities
-        token_image = self.token_edit.text().strip()
-        resistances = self.resist_edit.text().strip()
-        vulnerabilities = self.vuln_edit.text().strip()
-        immunities = self.immune_edit.text().strip()
-        # Placeholder: Save logic would go here, now includes new fields
-        # Example: npc_data = {..., "TokenImage": token_image, "Resistances": resistances, ...}
+        # Placeholder: Save logic would go here
         QMessageBox.information(self, "Saved", "NPC saved (placeholder).")
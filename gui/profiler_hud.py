@@ -0,0 +1,131 @@
+import os
+import time
+
+from PyQt5.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QTableWidget,
+    QTableWidgetItem,
+    QCheckBox,
+    QPushButton,
+    QFileDialog,
+    QAbstractItemView,
+    QHeaderView,
+)
+from PyQt5.QtCore import Qt, QTimer
+
+from gui.global_log import GlobalLogWidget
+from utils import tracing
+
+REFRESH_INTERVAL_MS = 500
+SLOWEST_LIMIT = 15
+
+
+class ProfilerHUD(QWidget):
+    """Floating window with per-span latency stats and the slowest recent spans."""
+
+    def __init__(self, main_window=None):
+        super().__init__(main_window, Qt.Tool)
+        self.main_window = main_window
+        self.setWindowTitle("Profiler")
+        self.resize(560, 520)
+        layout = QVBoxLayout()
+
+        controls = QHBoxLayout()
+        self.enabled_check = QCheckBox("Tracing enabled")
+        self.enabled_check.setChecked(tracing.is_enabled())
+        self.enabled_check.toggled.connect(tracing.enable)
+        export_btn = QPushButton("Export Chrome Trace…")
+        export_btn.clicked.connect(self.export_trace)
+        clear_btn = QPushButton("Clear")
+        clear_btn.clicked.connect(self.clear)
+        controls.addWidget(self.enabled_check)
+        controls.addStretch(1)
+        if hasattr(main_window, "show_stall_report"):
+            stalls_btn = QPushButton("Stall Report…")
+            stalls_btn.clicked.connect(main_window.show_stall_report)
+            controls.addWidget(stalls_btn)
+        controls.addWidget(export_btn)
+        controls.addWidget(clear_btn)
+        layout.addLayout(controls)
+
+        layout.addWidget(QLabel("Latency by operation"))
+        self.stats_table = self._make_table(["Operation", "Count", "p50 ms", "p95 ms", "Max ms"])
+        layout.addWidget(self.stats_table, stretch=2)
+        layout.addWidget(QLabel("Slowest recent operations"))
+        self.slowest_table = self._make_table(["Operation", "ms", "Details"])
+        layout.addWidget(self.slowest_table, stretch=1)
+        self.setLayout(layout)
+
+        # Only refresh while visible, so a hidden HUD costs nothing.
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(REFRESH_INTERVAL_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def _make_table(self, headers):
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        table.verticalHeader().setVisible(False)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        return table
+
+    def toggle(self):
+        if self.isVisible():
+            self.hide()
+        else:
+            self.show()
+            self.raise_()
+
+    def showEvent(self, event):
+        self.enabled_check.setChecked(tracing.is_enabled())
+        self.refresh()
+        self.refresh_timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        rows = tracing.stats()
+        self._fill(self.stats_table, [
+            (r["name"], r["count"], f"{r['p50_ms']:.2f}", f"{r['p95_ms']:.2f}", f"{r['max_ms']:.2f}")
+            for r in rows
+        ])
+        self._fill(self.slowest_table, [
+            (name, f"{ms:.2f}", ", ".join(f"{k}={v}" for k, v in (args or {}).items()))
+            for name, ms, args in tracing.slowest(SLOWEST_LIMIT)
+        ])
+
+    def _fill(self, table, rows):
+        table.setUpdatesEnabled(False)
+        table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for col, value in enumerate(values):
+                item = table.item(row, col)
+                if item is None:
+                    item = QTableWidgetItem()
+                    if col > 0 and (table is self.stats_table or col == 1):
+                        item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                    table.setItem(row, col, item)
+                item.setText(str(value))
+        table.setUpdatesEnabled(True)
+
+    def clear(self):
+        tracing.clear()
+        self.refresh()
+
+    def export_trace(self):
+        folder = getattr(self.main_window, "campaign_folder", None) or os.getcwd()
+        default = os.path.join(folder, time.strftime("trace-%Y%m%d-%H%M%S.json"))
+        path, _ = QFileDialog.getSaveFileName(self, "Export Chrome Trace", default, "Trace JSON (*.json)")
+        if not path:
+            return
+        count = tracing.write_chrome_trace(path)
+        GlobalLogWidget.instance().log(
+            f"Wrote {count} spans to {path} (open in chrome://tracing or Perfetto).", source="Profiler"
+        )
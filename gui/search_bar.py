@@ -0,0 +1,137 @@
+import time
+
+from PyQt5.QtWidgets import QWidget, QHBoxLayout, QLineEdit, QListWidget, QListWidgetItem
+from PyQt5.QtCore import QEvent, QObject, QPoint, QRunnable, Qt, pyqtSignal
+
+from utils.search_index import SearchIndex
+
+MAX_RESULTS = 30
+KIND_LABELS = {"Character": "Character", "NPC": "NPC", "Note": "Notes"}
+
+
+class _IndexSignals(QObject):
+    ready = pyqtSignal(int, object, int)
+    failed = pyqtSignal(int, str)
+
+
+class SearchIndexTask(QRunnable):
+    """Load a campaign's saved search index and bring it up to date with the loaded parts."""
+
+    def __init__(self, generation, folder, parts):
+        super().__init__()
+        self.generation = generation
+        self.folder = folder
+        self.parts = parts
+        self.signals = _IndexSignals()
+
+    def run(self):
+        try:
+            index = SearchIndex.load(self.folder)
+            changed = index.sync_entities("Character", self.parts.get("characters") or [])
+            changed += index.sync_entities("NPC", self.parts.get("npcs") or [])
+            changed += index.set_notes(self.parts.get("notes") or "")
+            if changed:
+                index.save(self.folder)
+        except Exception as exc:
+            self.signals.failed.emit(self.generation, str(exc))
+            return
+        self.signals.ready.emit(self.generation, index, changed)
+
+
+def describe(result):
+    label = KIND_LABELS.get(result["kind"], result["kind"])
+    if result["kind"] == "Note" and result["line"] >= 0:
+        return f"{result['title']}  —  {label}, line {result['line'] + 1}"
+    return f"{result['title']}  —  {label}"
+
+
+class GlobalSearchBar(QWidget):
+    """Search box whose results drop down over the window as you type.
+
+    search is a callable(query, limit) returning SearchIndex.search()
+    results; picking one emits activated(result).
+    """
+
+    activated = pyqtSignal(object)
+
+    def __init__(self, search, parent=None):
+        super().__init__(parent)
+        self.search = search
+        self.results = []
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(4, 2, 4, 2)
+        self.edit = QLineEdit()
+        self.edit.setPlaceholderText("Search characters, NPCs, actions, notes…")
+        self.edit.setClearButtonEnabled(True)
+        self.edit.setMinimumWidth(320)
+        self.edit.textChanged.connect(self._on_text_changed)
+        self.edit.returnPressed.connect(self._activate_current)
+        self.edit.installEventFilter(self)
+        layout.addWidget(self.edit)
+        # A child of the window rather than a popup, so typing keeps the focus.
+        self.popup = QListWidget(self.window())
+        self.popup.setFocusPolicy(Qt.NoFocus)
+        self.popup.itemClicked.connect(lambda _item: self._activate_current())
+        self.popup.hide()
+
+    def focus(self):
+        self.edit.setFocus()
+        self.edit.selectAll()
+
+    def set_busy(self, busy):
+        self.edit.setPlaceholderText(
+            "Indexing campaign…" if busy else "Search characters, NPCs, actions, notes…"
+        )
+
+    def _on_text_changed(self, text):
+        if not text.strip():
+            self.results = []
+            self.popup.hide()
+            return
+        start = time.perf_counter()
+        self.results = self.search(text, MAX_RESULTS)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.popup.clear()
+        for result in self.results:
+            self.popup.addItem(QListWidgetItem(describe(result)))
+        if not self.results:
+            item = QListWidgetItem("No matches")
+            item.setFlags(Qt.NoItemFlags)
+            self.popup.addItem(item)
+        self.popup.setToolTip(f"{len(self.results)} results in {elapsed_ms:.1f} ms")
+        self.popup.setCurrentRow(0 if self.results else -1)
+        self._place_popup()
+
+    def _place_popup(self):
+        if self.popup.parent() is not self.window():
+            self.popup.setParent(self.window())
+        rows = max(1, self.popup.count())
+        height = min(rows, 12) * (self.popup.sizeHintForRow(0) or 20) + 6
+        width = max(self.edit.width(), 420)
+        corner = self.edit.mapTo(self.window(), QPoint(self.edit.width(), self.edit.height()))
+        self.popup.setGeometry(max(0, corner.x() - width), corner.y() + 2, width, height)
+        self.popup.show()
+        self.popup.raise_()
+
+    def _activate_current(self):
+        row = self.popup.currentRow()
+        if self.popup.isVisible() and 0 <= row < len(self.results):
+            result = self.results[row]
+            self.popup.hide()
+            self.activated.emit(result)
+
+    def eventFilter(self, obj, event):
+        if obj is self.edit and event.type() == QEvent.KeyPress and self.popup.isVisible():
+            key = event.key()
+            if key in (Qt.Key_Down, Qt.Key_Up):
+                step = 1 if key == Qt.Key_Down else -1
+                row = self.popup.currentRow() + step
+                if 0 <= row < len(self.results):
+                    self.popup.setCurrentRow(row)
+                return True
+            if key == Qt.Key_Escape:
+                self.popup.hide()
+                return True
+        elif obj is self.edit and event.type() == QEvent.FocusOut:
+            self.popup.hide()
+        return super().eventFilter(obj, event)
@@ -0,0 +1,138 @@
+import os
+
+from PyQt5.QtWidgets import (
+    QDialog,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QTableWidget,
+    QTableWidgetItem,
+    QPlainTextEdit,
+    QPushButton,
+    QAbstractItemView,
+    QHeaderView,
+    QSplitter,
+)
+from PyQt5.QtCore import QObject, QTimer, Qt
+
+from utils.log_sink import log
+from utils.stall_watchdog import STALL_LOG_PATH, STALL_THRESHOLD_MS, StallWatchdog, aggregate_stalls, read_stalls
+
+HEARTBEAT_INTERVAL_MS = 20
+
+
+class StallMonitor(QObject):
+    """Keeps the watchdog's heartbeat from a GUI-thread timer."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        threshold = float(os.environ.get("DND_STALL_MS") or STALL_THRESHOLD_MS)
+        self.log_path = os.environ.get("DND_STALL_LOG") or STALL_LOG_PATH
+        self.watchdog = StallWatchdog(HEARTBEAT_INTERVAL_MS, threshold, self.log_path, self._on_stall)
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.setInterval(HEARTBEAT_INTERVAL_MS)
+        self.timer.timeout.connect(self.watchdog.beat)
+
+    def start(self):
+        self.timer.start()
+        self.watchdog.start()
+
+    def stop(self):
+        self.timer.stop()
+        self.watchdog.stop()
+
+    def _on_stall(self, record):
+        # Runs on the watchdog thread; the log sink is safe to call from there.
+        log(
+            f"UI stalled {record['duration_ms']:.0f} ms at {record['call_site']} ({record['blocked_in']})",
+            level="WARNING",
+            source="Stall",
+        )
+
+
+class StallReportDialog(QDialog):
+    """Stalls from the stall log grouped by call site, with the longest stack per site."""
+
+    def __init__(self, log_path=STALL_LOG_PATH, parent=None):
+        super().__init__(parent)
+        self.log_path = log_path
+        self.groups = []
+        self.setWindowTitle("UI Stall Report")
+        self.resize(900, 600)
+        layout = QVBoxLayout()
+
+        self.summary_label = QLabel("")
+        layout.addWidget(self.summary_label)
+
+        splitter = QSplitter(Qt.Vertical)
+        self.table = QTableWidget(0, 5)
+        self.table.setHorizontalHeaderLabels(["Call site", "Blocked in", "Count", "Total ms", "Max ms"])
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.table.currentCellChanged.connect(lambda row, _c, _pr, _pc: self._show_stack(row))
+        splitter.addWidget(self.table)
+        self.stack_view = QPlainTextEdit()
+        self.stack_view.setReadOnly(True)
+        self.stack_view.setLineWrapMode(QPlainTextEdit.NoWrap)
+        splitter.addWidget(self.stack_view)
+        layout.addWidget(splitter, stretch=1)
+
+        btn_row = QHBoxLayout()
+        refresh_btn = QPushButton("Refresh")
+        refresh_btn.clicked.connect(self.refresh)
+        clear_btn = QPushButton("Clear Log")
+        clear_btn.clicked.connect(self.clear_log)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.close)
+        btn_row.addWidget(refresh_btn)
+        btn_row.addWidget(clear_btn)
+        btn_row.addStretch(1)
+        btn_row.addWidget(close_btn)
+        layout.addLayout(btn_row)
+        self.setLayout(layout)
+        self.refresh()
+
+    def refresh(self):
+        records = read_stalls(self.log_path)
+        self.groups = aggregate_stalls(records)
+        total_ms = sum(g["total_ms"] for g in self.groups)
+        self.summary_label.setText(
+            f"{len(records)} stalls, {total_ms / 1000.0:.1f} s blocked in total. Log: {self.log_path}"
+        )
+        self.table.setRowCount(len(self.groups))
+        for row, group in enumerate(self.groups):
+            values = [
+                group["call_site"], group["blocked_in"], str(group["count"]),
+                f"{group['total_ms']:.0f}", f"{group['max_ms']:.0f}",
+            ]
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if col >= 2:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(row, col, item)
+        if self.groups:
+            self.table.selectRow(0)
+        else:
+            self.stack_view.clear()
+
+    def _show_stack(self, row):
+        if not 0 <= row < len(self.groups):
+            self.stack_view.clear()
+            return
+        lines = []
+        for filename, lineno, name, line in self.groups[row]["stack"]:
+            lines.append(f'File "{filename}", line {lineno}, in {name}')
+            if line:
+                lines.append(f"    {line}")
+        self.stack_view.setPlainText("\n".join(lines))
+
+    def clear_log(self):
+        for path in (self.log_path, self.log_path + ".1"):
+            if os.path.exists(path):
+                os.remove(path)
+        self.refresh()
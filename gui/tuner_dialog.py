@@ -0,0 +1,179 @@
+from PyQt5.QtWidgets import (
+    QDialog,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QSpinBox,
+    QCheckBox,
+    QListWidget,
+    QListWidgetItem,
+    QDialogButtonBox,
+)
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, Qt, pyqtSignal
+
+from utils.encounter_sim import KNOBS, STEPS, tune
+
+KNOB_LABELS = {"hp": "HP", "ac": "AC", "attack": "Attack bonus", "count": "Monster count"}
+
+
+class _TuneSignals(QObject):
+    progress = pyqtSignal(object)
+    finished = pyqtSignal(object, object)
+    failed = pyqtSignal(str)
+
+
+class _TuneTask(QRunnable):
+    def __init__(self, spec, band, knobs, seed):
+        super().__init__()
+        self.spec = spec
+        self.band = band
+        self.knobs = knobs
+        self.seed = seed
+        self.signals = _TuneSignals()
+
+    def run(self):
+        try:
+            best, results = tune(self.spec, self.band, self.knobs, self.seed, progress=self.signals.progress.emit)
+        except Exception as exc:
+            self.signals.failed.emit(str(exc))
+            return
+        self.signals.finished.emit(best, results)
+
+
+def _step(result):
+    text = f"Step {result['k']:+d}"
+    return text + (f", HP ×{result['hp']:g}" if result["hp"] != 1 else "")
+
+
+def _describe(result, best=False):
+    low, high = result["ci"]
+    text = (
+        f"{_step(result)}: party wins {result['p']:.0%} "
+        f"({low:.0%}-{high:.0%}, {result['trials']} fights) — {result['verdict']}"
+    )
+    if not result["confident"]:
+        text += " (uncertain)"
+    return text + ("  ← suggested" if best else "")
+
+
+class TunerDialog(QDialog):
+    """Simulate the current fight and pick how much to strengthen or weaken the hostiles.
+
+    After exec_() returns Accepted, chosen holds the (strength step, HP
+    scale) picked and knobs the stats it may change (see utils.encounter_sim).
+    """
+
+    def __init__(self, spec, seed, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Tune Difficulty")
+        self.spec = spec
+        self.seed = seed
+        self.results = []
+        self.chosen = None
+        self.knobs = KNOBS
+        self._task = None
+
+        layout = QVBoxLayout()
+        party = ", ".join(u["name"] for u in spec["party"]) or "none"
+        hostiles = ", ".join(f"{u['count']} × {u['name']}" if u["count"] > 1 else u["name"] for u in spec["hostiles"])
+        layout.addWidget(QLabel(f"Party: {party}"))
+        layout.addWidget(QLabel(f"Hostiles: {hostiles or 'none'}"))
+
+        band_row = QHBoxLayout()
+        band_row.addWidget(QLabel("Party should win"))
+        self.low_spin = QSpinBox()
+        self.high_spin = QSpinBox()
+        for spin, value in ((self.low_spin, 70), (self.high_spin, 85)):
+            spin.setRange(1, 99)
+            spin.setSuffix("%")
+            spin.setValue(value)
+        band_row.addWidget(self.low_spin)
+        band_row.addWidget(QLabel("to"))
+        band_row.addWidget(self.high_spin)
+        band_row.addWidget(QLabel("of fights"))
+        band_row.addStretch(1)
+        layout.addLayout(band_row)
+
+        knob_row = QHBoxLayout()
+        knob_row.addWidget(QLabel("Adjust:"))
+        self.knob_boxes = {}
+        for knob in KNOBS:
+            box = QCheckBox(KNOB_LABELS[knob])
+            box.setChecked(True)
+            knob_row.addWidget(box)
+            self.knob_boxes[knob] = box
+        knob_row.addStretch(1)
+        layout.addLayout(knob_row)
+
+        self.tune_btn = QPushButton("Tune")
+        self.tune_btn.setToolTip(f"Simulate the fight with the hostiles from step -{STEPS} (weakest) to +{STEPS}.")
+        self.tune_btn.clicked.connect(self.start_tuning)
+        layout.addWidget(self.tune_btn, alignment=Qt.AlignLeft)
+        self.results_list = QListWidget()
+        self.results_list.itemDoubleClicked.connect(lambda _item: self.accept_selected())
+        layout.addWidget(self.results_list, stretch=1)
+        self.status_label = QLabel("Step 0 is the fight as it stands.")
+        layout.addWidget(self.status_label)
+
+        btns = QDialogButtonBox(QDialogButtonBox.Cancel)
+        self.apply_btn = btns.addButton("Apply", QDialogButtonBox.AcceptRole)
+        self.apply_btn.setEnabled(False)
+        self.apply_btn.clicked.connect(self.accept_selected)
+        btns.rejected.connect(self.reject)
+        layout.addWidget(btns)
+        self.setLayout(layout)
+        self.resize(560, 480)
+        if not spec["party"] or not spec["hostiles"]:
+            self.tune_btn.setEnabled(False)
+            self.status_label.setText("The fight needs at least one character and one NPC standing.")
+
+    def start_tuning(self):
+        knobs = tuple(k for k, box in self.knob_boxes.items() if box.isChecked())
+        low, high = self.low_spin.value() / 100, self.high_spin.value() / 100
+        if not knobs or low >= high:
+            self.status_label.setText("Pick at least one stat and a band whose low end is below its high end.")
+            return
+        self.knobs = knobs
+        self.tune_btn.setEnabled(False)
+        self.apply_btn.setEnabled(False)
+        self.results_list.clear()
+        self.status_label.setText("Simulating…")
+        self._task = _TuneTask(self.spec, (low, high), knobs, self.seed)
+        self._task.signals.progress.connect(self._show_results)
+        self._task.signals.finished.connect(self._on_finished)
+        self._task.signals.failed.connect(self._on_failed)
+        QThreadPool.globalInstance().start(self._task)
+
+    def _show_results(self, results, best=None):
+        self.results = results
+        self.results_list.clear()
+        for result in results:
+            item = QListWidgetItem(_describe(result, result is best))
+            item.setData(Qt.UserRole, (result["k"], result["hp"]))
+            self.results_list.addItem(item)
+            if result is best:
+                self.results_list.setCurrentItem(item)
+        fights = sum(r["trials"] for r in results)
+        self.status_label.setText(f"{len(results)} steps simulated, {fights:,} fights so far…")
+
+    def _on_finished(self, best, results):
+        self._task = None
+        self._show_results(results, best)
+        self.tune_btn.setEnabled(True)
+        self.apply_btn.setEnabled(True)
+        if best["verdict"] == "in":
+            self.status_label.setText(f"{_step(best)} puts the party's win rate in the band.")
+        else:
+            self.status_label.setText(f"No step reaches the band; {_step(best).lower()} comes closest.")
+
+    def _on_failed(self, message):
+        self._task = None
+        self.tune_btn.setEnabled(True)
+        self.status_label.setText(f"Simulation failed: {message}")
+
+    def accept_selected(self):
+        item = self.results_list.currentItem()
+        if item is not None and self._task is None:
+            self.chosen = tuple(item.data(Qt.UserRole))
+            self.accept()
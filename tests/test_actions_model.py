@@ -0,0 +1,106 @@
+import json
+
+import pytest
+
+
+def _action(name, damage="1d6"):
+    return {"name": name, "type": "Melee", "attack_bonus": 4, "damage": damage, "damage_type": "slashing", "description": None}
+
+
+@pytest.fixture
+def model(qapp):
+    from gui.actions_model import ActionsTableModel
+
+    model = ActionsTableModel(editable=True, execute_column=True)
+    model.events = []
+    model.rowsInserted.connect(lambda _parent, first, last: model.events.append(("insert", first, last)))
+    model.rowsRemoved.connect(lambda _parent, first, last: model.events.append(("remove", first, last)))
+    model.dataChanged.connect(lambda top, bottom, *_roles: model.events.append(("change", top.row(), bottom.row())))
+    model.modelReset.connect(lambda: model.events.append(("reset",)))
+    return model
+
+
+def _shown(model):
+    return [[model.index(row, col).data() for col in range(model.columnCount())] for row in range(model.rowCount())]
+
+
+def _expected(actions):
+    return [[a["name"], "Melee", "4", a["damage"], "slashing", "", "Execute"] for a in actions]
+
+
+def _set(model, actions):
+    model.events.clear()
+    model.set_actions(actions)
+    assert model.actions() == [dict(a, attack_bonus="4", description="") for a in actions]
+    assert _shown(model) == _expected(actions)
+    return model.events
+
+
+# --- set_actions --------------------------------------------------------
+def test_set_actions_grows_shrinks_and_rewrites_rows_in_place(model):
+    actions = [_action(name) for name in ("Bite", "Claw", "Tail", "Wing")]
+    assert _set(model, actions[:2]) == [("insert", 0, 1)]
+    assert _set(model, actions) == [("insert", 2, 3)]
+    assert _set(model, actions) == []
+    assert _set(model, [actions[0], _action("Claw", "2d6"), actions[2], _action("Breath")]) == [("change", 1, 3)]
+    assert _set(model, [_action("Gore")] + actions[1:2]) == [("remove", 2, 3), ("change", 0, 1)]
+    assert _set(model, [_action("Gore"), _action("Kick"), actions[2]]) == [("insert", 2, 2), ("change", 1, 1)]
+    assert _set(model, []) == [("remove", 0, 2)]
+
+
+def test_set_actions_normalizes_rows():
+    from gui.actions_model import normalize_action
+
+    assert normalize_action("Bite") == {
+        "name": "Bite", "type": "", "attack_bonus": "", "damage": "", "damage_type": "", "description": "",
+    }
+    assert normalize_action({"name": "Bite", "attack_bonus": 5, "damage": None})["attack_bonus"] == "5"
+
+
+def test_edits_append_and_remove(model):
+    from PyQt5.QtCore import Qt
+
+    model.set_actions([_action("Bite"), _action("Claw")])
+    assert model.setData(model.index(0, 3), "2d4")
+    assert not model.setData(model.index(0, 6), "x")
+    assert model.action(0)["damage"] == "2d4"
+    assert model.append({"name": "Tail"}) == 2
+    model.remove(1)
+    assert [a["name"] for a in model.actions()] == ["Bite", "Tail"]
+    assert model.flags(model.index(0, 0)) & Qt.ItemIsEditable
+    assert not model.flags(model.index(0, 6)) & Qt.ItemIsEditable
+    assert json.loads(model.to_json()) == model.actions()
+
+
+# --- parse_actions ------------------------------------------------------
+def test_parse_actions_accepts_a_list_or_one_object():
+    from gui.actions_model import parse_actions
+
+    assert [a["name"] for a in parse_actions(json.dumps([_action("Bite"), _action("Claw")]))] == ["Bite", "Claw"]
+    assert parse_actions('{"name": "Bite", "damage": "1d4"}')[0]["damage"] == "1d4"
+    assert parse_actions("[]") == []
+
+
+@pytest.mark.parametrize("text, message", [
+    ("not json", None),
+    ("[{\"name\": \"Bite\"},", None),
+    ("\"Bite\"", "Expected a list"),
+    ("42", "Expected a list"),
+    ("[\"Bite\"]", "Action 1 is not an object"),
+    ("[{\"name\": \"Bite\"}, {\"damage\": \"1d4\"}]", "Action 2 has no name"),
+    ("[{\"name\": \"  \"}]", "Action 1 has no name"),
+])
+def test_parse_actions_rejects_bad_input(text, message):
+    from gui.actions_model import parse_actions
+
+    with pytest.raises(ValueError, match=message):
+        parse_actions(text)
+
+
+def test_load_json_keeps_the_rows_on_bad_input(model):
+    model.set_actions([_action("Bite")])
+    with pytest.raises(ValueError):
+        model.load_json("[{\"damage\": \"1d4\"}]")
+    assert [a["name"] for a in model.actions()] == ["Bite"]
+    model.load_json(json.dumps([_action("Claw"), _action("Tail")]))
+    assert [a["name"] for a in model.actions()] == ["Claw", "Tail"]
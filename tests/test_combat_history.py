@@ -0,0 +1,114 @@
+import pytest
+
+from utils.combat_history import CombatHistory
+from utils.effects import EffectsEngine
+from utils.initiative import InitiativeTracker
+from utils.monster_groups import MonsterGroup
+
+
+@pytest.fixture
+def fight():
+    by_id = {
+        "a": {"Id": "a", "Name": "Fighter", "HP": 30},
+        "b": {"Id": "b", "Name": "Ogre", "HP": 59},
+        "g": {"Id": "g", "Name": "Goblin", "HP": 0},
+    }
+    group = MonsterGroup(4, 7)
+    by_id["g"]["Group"] = group
+    group.sync(by_id["g"])
+    tracker = InitiativeTracker()
+    tracker.reset([("a", 15, 12), ("b", 8, 8), ("g", 12, 14)])
+    tracker.start()
+    effects = EffectsEngine(tracker)
+    history = CombatHistory(lambda: by_id, tracker, effects, max_steps=3)
+    return by_id, tracker, effects, history
+
+
+def test_field_changes_undo_and_redo(fight):
+    by_id, _tracker, _effects, history = fight
+    with history.record("Hit the ogre"):
+        by_id["b"]["HP"] = 40
+        by_id["b"]["Note"] = "bloodied"
+    command = history.done[-1]
+    # Only what changed is kept.
+    assert set(command.fields) == {"b"} and set(command.fields["b"]) == {"HP", "Note"}
+    assert command.fields["b"]["HP"] == (59, 40)
+    history.undo()
+    assert by_id["b"]["HP"] == 59 and "Note" not in by_id["b"]
+    history.redo()
+    assert by_id["b"]["HP"] == 40 and by_id["b"]["Note"] == "bloodied"
+
+
+def test_group_members_are_stored_as_a_diff(fight):
+    by_id, _tracker, _effects, history = fight
+    group = by_id["g"]["Group"]
+    with history.record("Fireball"):
+        group.damage([1, 3], [7, 2])
+        group.set_condition([0], "prone")
+        group.sync(by_id["g"])
+    indices = history.done[-1].groups["g"][0]
+    assert indices.tolist() == [0, 1, 3]
+    history.undo()
+    assert group.hp.tolist() == [7, 7, 7, 7] and group.conditions.tolist() == [0, 0, 0, 0]
+    assert by_id["g"]["HP"] == 28
+    history.redo()
+    assert group.hp.tolist() == [7, 0, 7, 5] and group.conditions_of(0) == ["prone"]
+    assert by_id["g"]["HP"] == 19
+
+
+def test_replaced_group_comes_back_as_it_was(fight):
+    by_id, _tracker, _effects, history = fight
+    old = by_id["g"]["Group"]
+    with history.record("Tune"):
+        old.damage([0], [3])
+        by_id["g"]["Group"] = old.resized(6, 10)
+        by_id["g"]["Group"].sync(by_id["g"])
+    history.undo()
+    assert by_id["g"]["Group"] is old
+    assert old.hp.tolist() == [7, 7, 7, 7]
+    history.redo()
+    assert by_id["g"]["Group"].size == 6 and by_id["g"]["Group"].max_hp == 10
+
+
+def test_membership_turn_order_and_effects(fight):
+    by_id, tracker, effects, history = fight
+    with history.record("Reinforcements"):
+        by_id["c"] = {"Id": "c", "Name": "Wolf", "HP": 11}
+        tracker.add("c", 20, 15)
+        effects.add("b", "Hold", condition="paralyzed", rounds=2)
+        tracker.next_turn()
+    after = tracker.to_state()
+    history.undo()
+    assert "c" not in by_id and "c" not in tracker
+    assert effects.effects == {}
+    assert tracker.current == "a"
+    history.redo()
+    assert by_id["c"]["Name"] == "Wolf"
+    assert tracker.to_state() == after
+    assert effects.conditions_of("b") == {"paralyzed"}
+
+
+def test_steps_merge_skip_empties_and_are_bounded(fight):
+    by_id, _tracker, _effects, history = fight
+    with history.record("Outer"):
+        by_id["a"]["HP"] = 25
+        with history.record("Inner"):
+            by_id["b"]["HP"] = 50
+    assert [c.label for c in history.done] == ["Outer"]
+    with history.record("Nothing"):
+        pass
+    assert len(history.done) == 1
+
+    history.undo()
+    assert history.can_redo()
+    with history.record("New branch"):
+        by_id["a"]["HP"] = 1
+    assert not history.can_redo()
+
+    for hp in (2, 3, 4):
+        with history.record(f"HP {hp}"):
+            by_id["a"]["HP"] = hp
+    assert [c.label for c in history.done] == ["HP 2", "HP 3", "HP 4"]
+    while history.undo():
+        pass
+    assert by_id["a"]["HP"] == 1
@@ -0,0 +1,108 @@
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from utils.combat_replay import verify
+
+GOBLIN = {
+    "Name": "Goblin", "Type": "Hostile", "HP": 7, "AC": 13, "DEX": 14,
+    "Actions": [{"name": "Scimitar", "attack_bonus": 4, "damage": "1d6+2", "damage_type": "slashing"}],
+}
+OGRE = {
+    "Name": "Ogre", "Type": "Hostile", "HP": 59, "AC": 11, "DEX": 8,
+    "Actions": [{"name": "Greatclub", "attack_bonus": 6, "damage": "2d8+4", "damage_type": "bludgeoning"}],
+}
+GUARD = {
+    "Name": "Guard", "Type": "Friendly", "HP": 11, "AC": 16, "DEX": 12,
+    "Actions": [{"name": "Spear", "attack_bonus": 3, "damage": "1d6+1", "damage_type": "piercing"}],
+}
+
+
+@pytest.fixture
+def combat(tmp_path, qapp, no_dialogs, monkeypatch):
+    """A combat tab on an empty campaign, with the narration call failing fast instead of going online."""
+    import gui.combat_tab as combat_tab
+
+    def no_network(*args, **kwargs):
+        raise RuntimeError("offline")
+
+    monkeypatch.setattr(combat_tab, "chat_completion", no_network)
+    tab = combat_tab.CombatTab(SimpleNamespace(campaign_folder=str(tmp_path)))
+    tab.add_encounter([(GOBLIN, 3), (OGRE, 1), (GUARD, 1)])
+    return tab
+
+
+def _by_name(tab, name):
+    return next(c for c in tab.combatants if c["Name"] == name)
+
+
+def _attack(tab, attacker, targets, monkeypatch):
+    from gui.combat_tab import ActionDialog
+
+    dialog = ActionDialog(attacker, tab.combatants, tab.log_message, tab.main_window, tab)
+    monkeypatch.setattr(dialog, "select_targets_dialog", lambda action: (targets, None))
+    dialog.execute_action(0)
+
+
+def _add_effect(tab, target, monkeypatch):
+    from gui.effects_dialog import EffectsDialog
+
+    def fill(dialog):
+        dialog.condition_combo.setCurrentText("poisoned")
+        dialog.rounds_spin.setValue(2)
+        dialog.ongoing_edit.setText("1d4")
+        dialog.add_effect()
+        return 0
+
+    monkeypatch.setattr(EffectsDialog, "exec_", fill)
+    tab.open_effects_dialog(target["Id"])
+
+
+def _select(tab, combatant):
+    tab.table.setCurrentCell(tab.tracker.index_of(combatant["Id"]), 0)
+
+
+def _saved(tab):
+    tab.save_state(silent=True)
+    with open(os.path.join(tab.main_window.campaign_folder, "combat_state.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_recorded_combat_replays_to_the_saved_state(combat, monkeypatch):
+    tab = combat
+    goblins, ogre, guard = _by_name(tab, "Goblin"), _by_name(tab, "Ogre"), _by_name(tab, "Guard")
+    tab.roll_initiative()
+    _attack(tab, guard, [ogre, goblins], monkeypatch)
+    _attack(tab, ogre, [guard], monkeypatch)
+    _add_effect(tab, ogre, monkeypatch)
+    tab.delay_turn()
+    tab.next_turn()
+    _select(tab, guard)
+    tab.toggle_ready()
+    tab.undo()
+    tab.redo()
+    _attack(tab, goblins, [guard], monkeypatch)
+    tab.undo()
+    _attack(tab, goblins, [guard, ogre], monkeypatch)
+    delayed = next(iter(tab.tracker.delayed))
+    _select(tab, tab._by_id[delayed])
+    tab.resume_delayed()
+    for _ in range(4):
+        tab.next_turn()
+
+    data = _saved(tab)
+    assert len(data["replay"]["commands"]) > 10
+    assert verify(data) == []
+
+
+def test_verify_reports_a_state_the_log_does_not_explain(combat, monkeypatch):
+    tab = combat
+    tab.roll_initiative()
+    _attack(tab, _by_name(tab, "Guard"), [_by_name(tab, "Ogre")], monkeypatch)
+    data = _saved(tab)
+    ogre = next(c for c in data["combatants"] if c["Name"] == "Ogre")
+    ogre["HP"] += 100
+    problems = verify(data)
+    assert problems and problems[0].startswith("Ogre:")
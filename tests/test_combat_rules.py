@@ -0,0 +1,28 @@
+import random
+
+from utils.combat_rules import resolve_action
+
+
+def _targets():
+    return [{"Name": f"Goblin {i}", "HP": 30, "AC": 1, "DEX": 10} for i in range(4)]
+
+
+def test_resolve_action_rolls_only_with_its_rng():
+    """Attack and damage dice both come from rng, so a seed replays the whole action."""
+    attacker = {"Name": "Fighter"}
+    action = {"name": "Longsword", "attack_bonus": 5, "damage": "2d6+3", "damage_type": "slashing"}
+    state = random.getstate()
+    first = resolve_action(attacker, action, _targets(), rng=random.Random(7))[1]
+    second = resolve_action(attacker, action, _targets(), rng=random.Random(7))[1]
+    assert first == second
+    assert random.getstate() == state
+
+
+def test_resolve_save_action_rolls_only_with_its_rng():
+    attacker = {"Name": "Wizard"}
+    action = {"name": "Fireball", "damage": "8d6", "damage_type": "fire"}
+    state = random.getstate()
+    first = resolve_action(attacker, action, _targets(), save=("DEX", 15, True), rng=random.Random(7))[1]
+    second = resolve_action(attacker, action, _targets(), save=("DEX", 15, True), rng=random.Random(7))[1]
+    assert first == second
+    assert random.getstate() == state
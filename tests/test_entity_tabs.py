@@ -0,0 +1,52 @@
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from utils.entity_index import EntityIndex
+
+
+def _tab(kind, folder):
+    main_window = SimpleNamespace(campaign_folder=folder, entity_index=EntityIndex())
+    if kind == "npcs":
+        from gui.npc_tab import NPCTab
+
+        tab = NPCTab(main_window)
+        return tab, tab.save_npc, tab.delete_npc
+    from gui.character_tab import CharacterTab
+
+    tab = CharacterTab(main_window)
+    return tab, tab.save_character, tab.delete_character
+
+
+def _fill(tab, name):
+    for key, _widget, get, set_, _label, required, _default in tab.editor.binder.fields:
+        if key == "Name":
+            set_(name)
+        elif required and not get().strip():
+            set_("1")
+
+
+def _names(folder, kind):
+    with open(os.path.join(folder, f"{kind}.json"), encoding="utf-8") as f:
+        return [e["Name"] for e in json.load(f)]
+
+
+@pytest.mark.parametrize("kind", ["npcs", "characters"])
+def test_file_and_list_agree_on_names_that_differ_in_case(kind, tmp_path, qapp, no_dialogs):
+    folder = str(tmp_path)
+    tab, save, delete = _tab(kind, folder)
+    _fill(tab, "Goblin")
+    save()
+    _fill(tab, "goblin")
+    save()
+    assert _names(folder, kind) == ["goblin"]
+    assert [e["Name"] for e in tab.model.entities] == ["goblin"]
+
+    tab.list_panel.select_row(0)
+    delete()
+    assert _names(folder, kind) == []
+    assert tab.model.entities == []
+    tab.refresh_list()
+    assert tab.model.entities == []
@@ -0,0 +1,16 @@
+from utils.entity_index import EntityIndex
+from utils.file_io import load_entities, upsert_entity
+
+
+def test_upsert_entity_replaces_names_that_differ_in_case_and_spacing(tmp_path):
+    """The library import asks before replacing a clash found by EntityIndex; the file must agree."""
+    folder = str(tmp_path)
+    upsert_entity("npcs", {"Name": "Goblin  Boss", "HP": 7}, folder)
+    upsert_entity("npcs", {"Name": "Orc", "HP": 15}, folder)
+    index = EntityIndex()
+    index.set_entities("NPC", load_entities("npcs", folder))
+    assert index.has("NPC", "goblin boss")
+
+    entities = upsert_entity("npcs", {"Name": "goblin boss", "HP": 21}, folder)
+    assert entities == load_entities("npcs", folder)
+    assert [(e["Name"], e["HP"]) for e in entities] == [("Orc", 15), ("goblin boss", 21)]
@@ -0,0 +1,99 @@
+import pytest
+
+
+@pytest.fixture
+def form(qapp):
+    from PyQt5.QtWidgets import QComboBox, QLineEdit, QPlainTextEdit
+
+    from gui.form_binding import FormBinder
+
+    class CountingLineEdit(QLineEdit):
+        def setText(self, text):
+            self.writes += 1
+            super().setText(text)
+
+    binder = FormBinder()
+    widgets = {key: CountingLineEdit() for key in ("Name", "HP", "AC")}
+    for widget in widgets.values():
+        widget.writes = 0
+    widgets["Type"] = QComboBox()
+    widgets["Type"].addItems(["Neutral", "Enemy", "Ally"])
+    widgets["Description"] = QPlainTextEdit()
+    for key, widget in widgets.items():
+        binder.bind(key, widget, required=key == "Name", default="Neutral" if key == "Type" else "")
+    return binder, widgets
+
+
+GOBLIN = {"Name": "Goblin", "HP": "7", "AC": "15", "Type": "Enemy", "Description": "Small and mean."}
+ORC = {"Name": "Orc", "HP": "15", "AC": "13", "Type": "Enemy", "Description": "Small and mean."}
+
+
+def _writes(widgets):
+    return {key: widgets[key].writes for key in ("Name", "HP", "AC")}
+
+
+def test_apply_only_touches_widgets_that_change(form):
+    binder, widgets = form
+    assert binder.apply(GOBLIN) == 5
+    assert binder.values() == GOBLIN
+    assert _writes(widgets) == {"Name": 1, "HP": 1, "AC": 1}
+
+    assert binder.apply(ORC) == 3
+    assert binder.values() == ORC
+    assert _writes(widgets) == {"Name": 2, "HP": 2, "AC": 2}
+
+    assert binder.apply(dict(ORC, AC="14")) == 1
+    assert _writes(widgets) == {"Name": 2, "HP": 2, "AC": 3}
+    assert binder.apply(dict(ORC, AC="14")) == 0
+
+
+def test_apply_does_not_count_as_a_user_edit(form):
+    binder, widgets = form
+    binder.apply(GOBLIN)
+    seen = []
+    widgets["Name"].textChanged.connect(seen.append)
+    binder.apply(ORC)
+    assert seen == []
+
+
+def test_browsing_replaces_user_edits_the_cache_cannot_see(form):
+    binder, widgets = form
+    binder.apply(GOBLIN)
+    # Orc has the Type and Description Goblin had, so only the user's edits make those differ.
+    widgets["AC"].setText("99")
+    widgets["Type"].setCurrentText("Ally")
+    widgets["Description"].setPlainText("Edited.")
+    assert binder.apply(ORC) == 5
+    assert binder.values() == ORC
+
+
+def test_filling_in_part_of_an_entity_keeps_unsaved_edits(form):
+    binder, widgets = form
+    binder.apply(GOBLIN)
+    widgets["HP"].setText("12")
+    widgets["Description"].setPlainText("Has a limp.")
+    # As the AI fill does: fields the reply leaves out keep the text in the form.
+    binder.apply(dict(binder.values(), Name="Goblin Boss", AC="17"))
+    assert binder.values() == dict(GOBLIN, Name="Goblin Boss", HP="12", AC="17", Description="Has a limp.")
+    binder.apply(GOBLIN)
+    assert binder.values() == GOBLIN
+
+
+def test_combo_boxes_fall_back_to_their_default(form):
+    binder, widgets = form
+    binder.apply(dict(GOBLIN, Type="Dragon"))
+    assert widgets["Type"].currentText() == "Neutral"
+    binder.apply({"Name": "Rat"})
+    assert binder.values()["Type"] == "Neutral"
+
+
+def test_clear_and_missing(form):
+    binder, widgets = form
+    binder.apply(GOBLIN)
+    binder.clear()
+    assert binder.values() == {"Name": "", "HP": "", "AC": "", "Type": "Neutral", "Description": ""}
+    assert binder.missing() == ["Name"]
+    widgets["Name"].setText("  ")
+    assert binder.missing() == ["Name"]
+    widgets["Name"].setText("Rat")
+    assert binder.missing() == []
@@ -0,0 +1,33 @@
+from utils.initiative import InitiativeTracker
+
+
+def _assert_consistent(tracker):
+    keys = [tracker.key_of(cid) for cid in tracker.order()]
+    assert len(set(keys)) == len(keys)
+    assert keys == sorted(keys)
+    for index, cid in enumerate(tracker.order()):
+        assert tracker.index_of(cid) == index
+
+
+def test_add_after_resume_after_last():
+    """A late joiner never shares a key with a combatant resumed after the last slot."""
+    tracker = InitiativeTracker()
+    tracker.add("a", 20)
+    tracker.add("b", 10)
+    tracker.add("c", 10)
+    tracker.start()
+    tracker.delay()             # a waits; b is up
+    tracker.next_turn()         # c, the last slot
+    tracker.resume("a")         # a acts right after c
+    assert tracker.order() == ["b", "c", "a"]
+    tracker.add("d", 10)
+    assert tracker.order() == ["b", "c", "a", "d"]
+    _assert_consistent(tracker)
+
+
+def test_add_after_load_state_with_fractional_order():
+    tracker = InitiativeTracker()
+    tracker.load_state({"entries": [["a", 10, 0, 1.0], ["b", 10, 0, 2.5]], "current": "a", "round": 1})
+    tracker.add("c", 10)
+    assert tracker.order() == ["a", "b", "c"]
+    _assert_consistent(tracker)
@@ -0,0 +1,37 @@
+import numpy as np
+
+from utils.combat_rules import CONDITIONS
+from utils.monster_groups import MonsterGroup, _rle_decode, _rle_encode
+
+
+def test_rle_round_trip():
+    for values in ([], [5], [7] * 50, [7, 7, 3, 0, 0, 7, 1, 1, 1]):
+        array = np.array(values, dtype=np.int32)
+        runs = _rle_encode(array)
+        assert np.array_equal(_rle_decode(runs, np.int32), array)
+    assert _rle_encode(np.full(50, 7, dtype=np.int32)) == [[7, 50]]
+
+
+def test_group_state_round_trip():
+    group = MonsterGroup(6, 11)
+    group.damage([0, 1, 1, 4], [3, 5, 20, 11])
+    group.set_condition([2, 3], CONDITIONS[0])
+    group.set_condition([3], CONDITIONS[-1])
+    restored = MonsterGroup.from_state(group.to_state())
+    assert restored.max_hp == 11
+    assert restored.hp.tolist() == [8, 0, 11, 11, 0, 11]
+    assert np.array_equal(restored.conditions, group.conditions)
+    assert restored.conditions_of(3) == [CONDITIONS[0], CONDITIONS[-1]]
+
+
+def test_untouched_group_saves_in_one_run():
+    state = MonsterGroup(50, 7).to_state()
+    assert state["hp"] == [[7, 50]] and state["conditions"] == [[0, 50]]
+
+
+def test_state_of_the_wrong_size_resets_the_members():
+    state = MonsterGroup(4, 9).to_state()
+    state["size"] = 5
+    restored = MonsterGroup.from_state(state)
+    assert restored.hp.tolist() == [9] * 5
+    assert restored.conditions.tolist() == [0] * 5
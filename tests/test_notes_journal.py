@@ -0,0 +1,118 @@
+import os
+from types import SimpleNamespace
+
+from utils.file_io import atomic_write_text
+from utils.notes_journal import JOURNAL_NAME, NotesJournal, apply_ops
+
+BASE = "# Session 1\nThe party meets 😀 at the inn.\n"
+
+
+def _journal(tmp_path, text=BASE):
+    atomic_write_text(os.path.join(str(tmp_path), "notes.md"), text)
+    journal = NotesJournal(str(tmp_path))
+    journal.reset(text)
+    return journal
+
+
+# --- apply_ops --------------------------------------------------------------
+def test_apply_ops_counts_utf16_code_units():
+    """The emoji is a surrogate pair: two positions, as Qt reports them."""
+    text = "a😀b"
+    assert apply_ops(text, [[3, 0, "X"]]) == "a😀Xb"
+    assert apply_ops(text, [[1, 2, ""]]) == "ab"
+    assert apply_ops(text, [[0, 1, "🐉"], [2, 2, "é"]]) == "🐉éb"
+
+
+def test_apply_ops_replays_in_order():
+    ops = [[0, 0, "Hello"], [5, 0, " world"], [0, 5, "Goodbye"], [13, 0, "!"]]
+    assert apply_ops("", ops) == "Goodbye world!"
+
+
+# --- Recovery ---------------------------------------------------------------
+def test_recover_replays_every_batch(tmp_path):
+    journal = _journal(tmp_path)
+    journal.append([[0, 0, "Draft: "]])
+    journal.append([[len("Draft: # Session 1\nThe party meets ".encode("utf-16-le")) // 2 + 2, 0, " and 🐉"]])
+    assert NotesJournal(str(tmp_path)).recover(BASE) == "Draft: # Session 1\nThe party meets 😀 and 🐉 at the inn.\n"
+
+
+def test_recover_without_edits_or_journal_is_none(tmp_path):
+    assert NotesJournal(str(tmp_path)).recover(BASE) is None
+    journal = _journal(tmp_path)
+    journal.append([])
+    assert journal.recover(BASE) is None
+
+
+def test_recover_ignores_a_truncated_last_record(tmp_path):
+    journal = _journal(tmp_path)
+    journal.append([[0, 0, "kept "]])
+    journal.append([[5, 0, "lost"]])
+    with open(journal.path, "rb") as f:
+        data = f.read()
+    with open(journal.path, "wb") as f:
+        f.write(data[:-6])
+    assert journal.recover(BASE) == "kept " + BASE
+
+
+def test_recover_refuses_a_journal_for_other_notes(tmp_path):
+    journal = _journal(tmp_path)
+    journal.append([[0, 0, "x"]])
+    assert journal.recover(BASE + "edited elsewhere\n") is None
+    assert journal.recover(BASE.replace("inn", "pub")) is None
+
+
+def test_recover_refuses_an_unknown_version(tmp_path):
+    journal = _journal(tmp_path)
+    journal.append([[0, 0, "x"]])
+    with open(journal.path, encoding="utf-8") as f:
+        lines = f.readlines()
+    lines[0] = lines[0].replace('"version": 1', '"version": 99')
+    with open(journal.path, "w", encoding="utf-8") as f:
+        f.writelines(lines)
+    assert journal.recover(BASE) is None
+
+
+# --- Compaction -------------------------------------------------------------
+def test_compact_writes_notes_and_restarts_the_journal(tmp_path):
+    journal = _journal(tmp_path)
+    journal.append([[0, 0, "x"]])
+    edited = journal.recover(BASE)
+    journal.compact(edited)
+    with open(journal.notes_path, encoding="utf-8") as f:
+        assert f.read() == edited
+    assert journal.read()[1] == []
+    assert journal.recover(edited) is None
+    assert [name for name in os.listdir(str(tmp_path)) if name.startswith(".tmp-")] == []
+
+
+def test_stale_journal_after_compaction_is_not_replayed(tmp_path):
+    """A crash between writing notes.md and restarting the journal leaves old ops behind."""
+    journal = _journal(tmp_path)
+    journal.append([[0, 0, "x"]])
+    edited = journal.recover(BASE)
+    atomic_write_text(journal.notes_path, edited)
+    assert NotesJournal(str(tmp_path)).recover(edited) is None
+
+
+# --- Editor -----------------------------------------------------------------
+def test_editor_edits_recover_to_the_editor_text(tmp_path, qapp, no_dialogs):
+    from PyQt5.QtGui import QTextCursor
+
+    from gui.notes_editor import NotesEditor
+    from utils.entity_index import EntityIndex
+
+    folder = str(tmp_path)
+    atomic_write_text(os.path.join(folder, "notes.md"), BASE)
+    main_window = SimpleNamespace(campaign_folder=folder, entity_index=EntityIndex(), index_notes=lambda text: None)
+    editor = NotesEditor(main_window=main_window)
+    editor.load_notes()
+    cursor = editor.editor.textCursor()
+    cursor.movePosition(QTextCursor.End)
+    cursor.insertText("🐉 roars.\nNew line")
+    editor.autosave()
+    cursor.setPosition(len("# Session 1\nThe party meets ".encode("utf-16-le")) // 2)
+    cursor.setPosition(cursor.position() + 2, QTextCursor.KeepAnchor)
+    cursor.insertText("the mayor")
+    editor.autosave()
+    assert os.path.exists(os.path.join(folder, JOURNAL_NAME))
+    assert NotesJournal(folder).recover(BASE) == editor.editor.toPlainText()
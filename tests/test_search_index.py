@@ -0,0 +1,136 @@
+import os
+import random
+
+import pytest
+
+from utils import search_index
+from utils.file_io import write_cache
+from utils.search_index import INDEX_NAME, INDEX_VERSION, SearchIndex
+
+WORDS = "goblin orc dragon fire ice sword bow cave forest tavern king queen shadow poison healer".split()
+QUERIES = ["goblin", "fire sword", "dra", "cave ", "queen shadow", "poison heal", "zzz"]
+
+
+def _npcs(count, seed):
+    rng = random.Random(seed)
+    return [
+        {
+            "Name": f"NPC {i}",
+            "Description": " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 30))),
+            "Actions": [{"name": rng.choice(WORDS), "description": rng.choice(WORDS)}],
+        }
+        for i in range(count)
+    ]
+
+
+NOTES = "Intro goblin\n# Tavern\nThe king drinks by the fire.\n# Cave\nA dragon sleeps on ice.\n"
+NOTES_EDITED = "# Cave\nA dragon sleeps on poison.\n# Tavern\nThe king drinks by the fire.\n# Forest\nShadow bow\n"
+
+
+def _results(index):
+    return {query: sorted((r["kind"], r["title"], r["line"]) for r in index.search(query, limit=1000)) for query in QUERIES}
+
+
+def _scores(index, query):
+    return {(r["kind"], r["title"]): r["score"] for r in index.search(query, limit=1000)}
+
+
+def _fresh(npcs, characters, notes):
+    index = SearchIndex()
+    index.sync_entities("NPC", npcs)
+    index.sync_entities("Character", characters)
+    index.set_notes(notes)
+    return index
+
+
+# --- Incremental updates ------------------------------------------------
+def test_incremental_updates_match_a_fresh_build(tmp_path):
+    npcs = _npcs(80, seed=1)
+    characters = _npcs(5, seed=2)
+    index = _fresh(npcs[:60], characters, NOTES)
+
+    # Edit some, drop some, add some, one at a time and in a sync.
+    npcs[3]["Description"] = "a poison healer"
+    assert index.sync_entities("NPC", npcs[:50] + npcs[60:70]) == 10 + 1 + 10
+    index.add_entity("NPC", npcs[75])
+    index.remove_entity("Character", characters[0]["Name"])
+    index.set_notes(NOTES_EDITED)
+    assert _results(index) == _results(_fresh(npcs[:50] + npcs[60:70] + [npcs[75]], characters[1:], NOTES_EDITED))
+
+    # Saved, loaded and updated again.
+    index.save(str(tmp_path))
+    loaded = SearchIndex.load(str(tmp_path))
+    assert len(loaded) == len(index)
+    assert _results(loaded) == _results(index)
+    npcs[61]["Description"] = "the goblin king"
+    assert loaded.sync_entities("NPC", npcs[40:70]) == 10 + 1 + 40 + 1
+    loaded.add_entity("Character", characters[0])
+    loaded.set_notes(NOTES)
+    assert _results(loaded) == _results(_fresh(npcs[40:70], characters, NOTES))
+
+
+def test_unchanged_entities_and_moved_sections_are_not_reindexed():
+    npcs = _npcs(20, seed=3)
+    index = _fresh(npcs, [], NOTES)
+    assert index.sync_entities("NPC", [dict(npc) for npc in npcs]) == 0
+    assert not index.add_entity("NPC", dict(npcs[0]))
+    # A new first section re-indexes only itself; the rest just move down.
+    assert index.set_notes("# Road\nShadow\n" + NOTES.replace("Intro goblin\n", "")) == 1 + 1
+    assert [(r["title"], r["line"]) for r in index.search("dragon", kinds={"Note"})] == [("Cave", 4)]
+
+
+def test_reweight_gives_the_weights_of_a_fresh_build():
+    npcs = _npcs(40, seed=4)
+    index = _fresh(npcs[:20], [], "")
+    # Short documents pull the average down, but not by enough to reweight on their own.
+    for npc in npcs[20:]:
+        npc["Description"] = "goblin"
+        index.add_entity("NPC", npc)
+    fresh = _fresh(npcs, [], "")
+    fresh.reweight()
+    assert index.avgdl != fresh.avgdl
+    index.reweight()
+    assert index.avgdl == pytest.approx(fresh.avgdl)
+    for query in QUERIES:
+        mine, theirs = _scores(index, query), _scores(fresh, query)
+        assert mine.keys() == theirs.keys()
+        for key, score in mine.items():
+            assert score == pytest.approx(theirs[key], rel=1e-5)
+
+
+# --- Persistence --------------------------------------------------------
+def _saved(tmp_path):
+    index = _fresh(_npcs(30, seed=5), [], NOTES)
+    index.save(str(tmp_path))
+    return os.path.join(str(tmp_path), INDEX_NAME)
+
+
+def test_load_without_a_saved_index_is_empty(tmp_path):
+    assert len(SearchIndex.load(str(tmp_path))) == 0
+
+
+def test_load_rejects_a_damaged_file(tmp_path):
+    path = _saved(tmp_path)
+    assert len(SearchIndex.load(str(tmp_path))) == 33
+    with open(path, "rb") as f:
+        raw = f.read()
+    with open(path, "wb") as f:
+        f.write(raw[:-10])
+    assert len(SearchIndex.load(str(tmp_path))) == 0
+    with open(path, "wb") as f:
+        f.write(raw[:-10] + b"0123456789")
+    assert len(SearchIndex.load(str(tmp_path))) == 0
+
+
+def test_load_rejects_another_version_or_shape(tmp_path):
+    path = _saved(tmp_path)
+    write_cache(path, {"version": INDEX_VERSION + 1}, {})
+    assert len(SearchIndex.load(str(tmp_path))) == 0
+    write_cache(path, {"version": INDEX_VERSION}, {"ids": {}, "docs": {}})
+    assert len(SearchIndex.load(str(tmp_path))) == 0
+
+
+def test_load_rejects_an_oversized_file(tmp_path, monkeypatch):
+    path = _saved(tmp_path)
+    monkeypatch.setattr(search_index, "MAX_INDEX_SIZE", os.path.getsize(path) - 1)
+    assert len(SearchIndex.load(str(tmp_path))) == 0
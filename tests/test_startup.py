@@ -0,0 +1,91 @@
+"""Startup-time regression check.
+
+Launches the app the way main.py does under ``-X importtime`` with the
+offscreen Qt platform, and fails if heavy optional modules were imported
+before the first window appeared or if total import time exceeds the
+budget (DND_STARTUP_BUDGET_MS, default 300).
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_MS = float(os.environ.get("DND_STARTUP_BUDGET_MS", 300))
+# Modules that must only load on first use, never at startup.
+DEFERRED_MODULES = ["openai", "httpx", "pydantic", "markdown", "numpy"]
+
+STARTUP_SCRIPT = """
+import sys
+from PyQt5.QtWidgets import QApplication
+from gui.main_window import MainWindow
+app = QApplication(sys.argv)
+window = MainWindow()
+app.processEvents()
+"""
+
+
+def parse_importtime(stderr):
+    """Return [(module, self_us, cumulative_us, depth)] from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0])
+            cumulative_us = int(parts[1])
+        except ValueError:
+            # Header row.
+            continue
+        raw_name = parts[2].rstrip()
+        name = raw_name.strip()
+        depth = (len(raw_name) - len(raw_name.lstrip())) // 2
+        rows.append((name, self_us, cumulative_us, depth))
+    return rows
+
+
+def _startup_imports():
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_SCRIPT],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    assert proc.returncode == 0, proc.stderr
+    return parse_importtime(proc.stderr)
+
+
+def _slowest(rows, top=15):
+    top_level = sorted((r for r in rows if r[3] == 1), key=lambda r: r[2], reverse=True)
+    return "\n".join(f"  {cumulative_us / 1000.0:8.1f} ms  {name}" for name, _self, cumulative_us, _depth in top_level[:top])
+
+
+def test_startup_defers_heavy_modules_and_stays_in_budget():
+    rows = _startup_imports()
+    imported = {name for name, _self, _cum, _depth in rows}
+    leaked = [
+        mod for mod in DEFERRED_MODULES
+        if mod in imported or any(name.startswith(mod + ".") for name in imported)
+    ]
+    assert not leaked, f"deferred modules imported at startup: {', '.join(leaked)}"
+    total_ms = sum(self_us for _name, self_us, _cum, _depth in rows) / 1000.0
+    assert total_ms <= BUDGET_MS, (
+        f"startup import time {total_ms:.1f} ms is over the {BUDGET_MS:.0f} ms budget; slowest imports:\n"
+        + _slowest(rows)
+    )
+
+
+def test_parse_importtime():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   _io\n"
+        "import time:      1500 |       2000 | gui.main_window\n"
+        "unrelated line\n"
+    )
+    assert parse_importtime(stderr) == [("_io", 120, 120, 1), ("gui.main_window", 1500, 2000, 0)]
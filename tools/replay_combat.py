@@ -0,0 +1,46 @@
+"""Replay a saved combat session and check it reaches the saved state.
+
+Re-executes the command log stored in combat_state.json from the seed and
+starting state it was recorded with, then compares HP, initiative order,
+effects and RNG stream positions with what was saved.
+
+Usage: python tools/replay_combat.py CAMPAIGN_FOLDER_OR_COMBAT_STATE_JSON
+"""
+import argparse
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.combat_replay import verify  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="campaign folder or combat_state.json")
+    args = parser.parse_args(argv)
+
+    path = args.path
+    if os.path.isdir(path):
+        path = os.path.join(path, "combat_state.json")
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    commands = len((data.get("replay") or {}).get("commands", []))
+    try:
+        problems = verify(data)
+    except ValueError as exc:
+        print(f"Cannot replay {path}: {exc}")
+        return 2
+    if problems:
+        print(f"MISMATCH after replaying {commands} command(s) (seed {data['rng']['seed']}):")
+        for problem in problems:
+            print(f"  {problem}")
+        return 1
+    print(f"OK: {commands} command(s) replayed to the saved state (seed {data['rng']['seed']}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+import functools
+import os
+import re
+import time
+
+DEFAULT_OUTPUT_FOLDER = os.path.expanduser("~/.dnd_campaign_creator")
+PROFILE_DIR_NAME = "profiles"
+TRACEMALLOC_FRAMES = 10
+TOP_ALLOCATIONS = 30
+MAX_FLAME_DEPTH = 64
+
+
+class ActionProfiler:
+    """Profiles the next N user actions with cProfile and tracemalloc.
+
+    Actions are marked with @profiled_action (or begin()/end() for actions
+    that finish asynchronously, like loading a campaign). While armed, each
+    outermost action is profiled on the GUI thread and leaves three files in
+    <output folder>/profiles: a .pstats dump, collapsed stacks for
+    flamegraph.pl/speedscope, and the top tracemalloc allocation deltas.
+    Disarmed, an action costs one attribute check.
+    """
+
+    def __init__(self):
+        self.remaining = 0
+        self.output_folder = None
+        self.listeners = []
+        self._active = None
+
+    def arm(self, count):
+        self.remaining = max(0, int(count))
+
+    def disarm(self):
+        self.remaining = 0
+
+    def add_listener(self, callback):
+        """callback(name, paths) runs after each captured action."""
+        self.listeners.append(callback)
+
+    def begin(self, name):
+        """Start profiling an action; returns a token for end(), or None when idle."""
+        if self.remaining <= 0 or self._active is not None:
+            return None
+        import cProfile
+        import tracemalloc
+
+        started_tracemalloc = not tracemalloc.is_tracing()
+        if started_tracemalloc:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        profile = cProfile.Profile()
+        self._active = {
+            "name": name,
+            "profile": profile,
+            "before": before,
+            "started_tracemalloc": started_tracemalloc,
+            "start": time.perf_counter(),
+        }
+        profile.enable()
+        return self._active
+
+    def end(self, token):
+        """Finish the action begun with token and write its reports; returns the paths."""
+        if token is None or token is not self._active:
+            return None
+        import tracemalloc
+
+        token["profile"].disable()
+        elapsed = time.perf_counter() - token["start"]
+        after = tracemalloc.take_snapshot()
+        _current, peak = tracemalloc.get_traced_memory()
+        if token["started_tracemalloc"]:
+            tracemalloc.stop()
+        self._active = None
+        self.remaining -= 1
+        paths = self._write_reports(token, after, peak, elapsed)
+        for callback in list(self.listeners):
+            callback(token["name"], paths)
+        return paths
+
+    def _write_reports(self, token, after, peak, elapsed):
+        import pstats
+
+        folder = os.path.join(self.output_folder or DEFAULT_OUTPUT_FOLDER, PROFILE_DIR_NAME)
+        os.makedirs(folder, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", token["name"]).strip("-").lower() or "action"
+        base = os.path.join(folder, f"{time.strftime('%Y%m%d-%H%M%S')}-{slug}")
+
+        stats = pstats.Stats(token["profile"])
+        paths = {"pstats": base + ".pstats", "collapsed": base + ".collapsed.txt", "memory": base + ".tracemalloc.txt"}
+        stats.dump_stats(paths["pstats"])
+        with open(paths["collapsed"], "w", encoding="utf-8") as f:
+            for stack, micros in collapsed_stacks(stats.stats):
+                f.write(f"{stack} {micros}\n")
+
+        diff = after.compare_to(token["before"], "lineno")
+        with open(paths["memory"], "w", encoding="utf-8") as f:
+            f.write(f"Action: {token['name']}\n")
+            f.write(f"Wall time: {elapsed * 1000.0:.1f} ms\n")
+            f.write(f"Peak traced memory: {peak / 1024.0:.1f} KiB\n")
+            f.write(f"Net allocated: {sum(s.size_diff for s in diff) / 1024.0:.1f} KiB\n\n")
+            f.write(f"Top {TOP_ALLOCATIONS} allocation sites by size delta:\n")
+            for stat in diff[:TOP_ALLOCATIONS]:
+                f.write(f"{stat}\n")
+        return paths
+
+
+def _frame_label(func):
+    filename, lineno, name = func
+    if filename == "~":
+        # Built-ins are recorded as ('~', 0, '<built-in method ...>').
+        return name
+    return f"{name} ({os.path.basename(filename)}:{lineno})"
+
+
+def collapsed_stacks(raw_stats):
+    """Approximate collapsed stacks ("a;b;c <µs>") from a pstats call graph.
+
+    cProfile keeps caller->callee edges, not full stacks, so each function's
+    self time is split across the paths reaching it in proportion to the
+    cumulative time of each incoming edge. Recursion is cut at the first
+    repeat of a function on the path.
+    """
+    callees = {}
+    for func, (_cc, _nc, _tt, _ct, callers) in raw_stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+    # Calls made from frames entered before profiling started have no caller
+    # edge; that share of a function's calls makes it a root.
+    roots = []
+    for func, (_cc, nc, _tt, _ct, callers) in raw_stats.items():
+        untracked = nc - sum(edge[1] for edge in callers.values())
+        if untracked > 0:
+            roots.append((func, untracked / nc))
+
+    totals = {}
+
+    def walk(func, path, fraction):
+        if len(path) >= MAX_FLAME_DEPTH:
+            return
+        path = path + [func]
+        self_time = raw_stats[func][2] * fraction
+        if self_time > 0:
+            key = ";".join(_frame_label(f) for f in path)
+            totals[key] = totals.get(key, 0.0) + self_time
+        for callee, edge_ct in callees.get(func, ()):
+            if callee in path:
+                continue
+            callee_ct = raw_stats[callee][3]
+            if callee_ct > 0 and edge_ct > 0:
+                walk(callee, path, fraction * min(1.0, edge_ct / callee_ct))
+
+    for root, fraction in roots:
+        walk(root, [], fraction)
+    rows = [(stack, int(round(seconds * 1e6))) for stack, seconds in totals.items()]
+    return sorted(row for row in rows if row[1] > 0)
+
+
+PROFILER = ActionProfiler()
+
+
+def profiled_action(name):
+    """Profile calls to the decorated function while PROFILER is armed.
+
+    Like @traced, the wrapper takes *args, so connect decorated slots to
+    Qt signals through a lambda.
+    """
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if PROFILER.remaining <= 0:
+                return func(*args, **kwargs)
+            token = PROFILER.begin(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                PROFILER.end(token)
+
+        return wrapper
+
+    return decorate
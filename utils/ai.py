@@ -0,0 +1,16 @@
+from utils.tracing import span
+
+
+def chat_completion(api_key=None, **kwargs):
+    """Create an OpenAI chat completion.
+
+    openai (and the httpx/pydantic stack behind it) is imported here on
+    first use rather than at module import, keeping it off the startup path.
+    """
+    with span("openai.import"):
+        import openai
+
+    if api_key:
+        openai.api_key = api_key
+    with span("openai.chat", model=kwargs.get("model"), max_tokens=kwargs.get("max_tokens")):
+        return openai.chat.completions.create(**kwargs)
@@ -0,0 +1,88 @@
+import gc
+import marshal
+import os
+from contextlib import contextmanager
+
+from utils.file_io import read_cache, write_cache
+
+SNAPSHOT_NAME = ".campaign_snapshot.bin"
+SNAPSHOT_VERSION = 2
+# A snapshot larger than this many times its source files (plus slack) is not read.
+MAX_SIZE_RATIO = 8
+MAX_SIZE_SLACK = 1 << 20
+# Source file each snapshotted part is derived from.
+SOURCE_FILES = {
+    "characters": "characters.json",
+    "npcs": "npcs.json",
+    "notes": "notes.md",
+    "notes_index": "notes.md",
+    "combat": "combat_state.json",
+}
+
+
+@contextmanager
+def gc_paused():
+    """Suspend the cyclic GC while decoding many small containers.
+
+    Decoding a large campaign allocates hundreds of thousands of dicts and
+    lists, and the collections they trigger cost as much as the decode.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def source_signature(campaign_folder):
+    """(mtime_ns, size) of every source file, None for files that don't exist."""
+    signature = {}
+    for file_name in sorted(set(SOURCE_FILES.values())):
+        try:
+            st = os.stat(os.path.join(campaign_folder, file_name))
+        except FileNotFoundError:
+            signature[file_name] = None
+        else:
+            signature[file_name] = (st.st_mtime_ns, st.st_size)
+    return signature
+
+
+def read_snapshot(campaign_folder, signature):
+    """Return {part: data} from the snapshot, or None if missing or stale.
+
+    The snapshot is only trusted if it was written by the same Python
+    version against files with identical mtimes and sizes. It is a
+    marshal cache (see utils.file_io.read_cache): the version, signature,
+    size and digest are checked before anything is unmarshalled, and a
+    file far larger than the campaign's sources is not read at all.
+    """
+    sources = sum(sig[1] for sig in signature.values() if sig)
+    blobs = read_cache(
+        os.path.join(campaign_folder, SNAPSHOT_NAME),
+        {"version": SNAPSHOT_VERSION, "signature": _encode_signature(signature)},
+        MAX_SIZE_RATIO * sources + MAX_SIZE_SLACK,
+    )
+    if not isinstance(blobs, dict) or set(blobs) != set(SOURCE_FILES):
+        return None
+    if not all(isinstance(blob, bytes) for blob in blobs.values()):
+        return None
+    try:
+        with gc_paused():
+            return {part: marshal.loads(blob) for part, blob in blobs.items()}
+    except (EOFError, ValueError, TypeError):
+        return None
+
+
+def write_snapshot(campaign_folder, signature, blobs):
+    """Write pre-marshalled part blobs with the signature they were read under."""
+    write_cache(
+        os.path.join(campaign_folder, SNAPSHOT_NAME),
+        {"version": SNAPSHOT_VERSION, "signature": _encode_signature(signature)},
+        blobs,
+    )
+
+
+def _encode_signature(signature):
+    return {name: list(sig) if sig else None for name, sig in signature.items()}
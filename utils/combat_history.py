@@ -0,0 +1,215 @@
+from contextlib import contextmanager
+
+MAX_STEPS = 500
+# Tracker fields that change on every turn; the entry list is only kept when it changed.
+_TURN_FIELDS = ("current", "round", "delayed", "ready")
+_MISSING = object()
+
+
+class _Snapshot:
+    """Transient view of the mutable combat state, taken when a command begins.
+
+    Field values and effect dicts are copied shallowly and group arrays are
+    copied; the snapshot is dropped as soon as the command's diff is made.
+    """
+
+    def __init__(self, by_id, tracker, effects):
+        self.fields = {
+            cid: {k: v for k, v in c.items() if k != "Group"} for cid, c in by_id.items()
+        }
+        self.members = {cid: c for cid, c in by_id.items()}
+        self.group_refs = {cid: c.get("Group") for cid, c in by_id.items()}
+        self.groups = {
+            cid: (c["Group"].hp.copy(), c["Group"].conditions.copy())
+            for cid, c in by_id.items() if c.get("Group") is not None
+        }
+        self.tracker = tracker.to_state()
+        self.effects = {eid: dict(e, next=dict(e.get("next", {}))) for eid, e in effects.effects.items()}
+
+
+class Command:
+    """One undoable step, stored as the before/after values of what it changed."""
+
+    def __init__(self, label):
+        self.label = label
+        self.fields = {}      # cid -> {key: (before, after)}
+        self.members = {}     # cid -> (combatant or None before, combatant or None after)
+        self.groups = {}      # cid -> (indices, hp before, hp after, conditions before, conditions after)
+        self.tracker = None   # (before, after): turn fields only, or whole states if the order changed
+        self.effects = {}     # effect id -> (effect or None before, effect or None after)
+
+    def is_empty(self):
+        return not (self.fields or self.members or self.groups or self.tracker or self.effects)
+
+
+def _diff(label, snap, by_id, tracker, effects):
+    command = Command(label)
+    for cid in set(snap.members) | set(by_id):
+        before, after = snap.members.get(cid), by_id.get(cid)
+        if before is not after:
+            command.members[cid] = (before, after)
+    for cid, old in snap.fields.items():
+        combatant = by_id.get(cid)
+        if combatant is None or cid in command.members:
+            continue
+        changes = {}
+        for key in set(old) | set(combatant):
+            if key == "Group":
+                continue
+            a, b = old.get(key, _MISSING), combatant.get(key, _MISSING)
+            if a is not b and a != b:
+                changes[key] = (a, b)
+        old_group = snap.group_refs[cid]
+        if combatant.get("Group") is not old_group:
+            # A replaced (e.g. resized) group is kept whole. The old one is no
+            # longer live, so it is put back as it was when the step began.
+            if old_group is not None:
+                old_group.hp[:], old_group.conditions[:] = snap.groups[cid]
+            changes["Group"] = (
+                _MISSING if old_group is None else old_group, combatant.get("Group", _MISSING)
+            )
+        if changes:
+            command.fields[cid] = changes
+    if snap.groups:
+        import numpy as np
+    for cid, (hp, conditions) in snap.groups.items():
+        combatant = by_id.get(cid)
+        if combatant is None or cid in command.members or combatant.get("Group") is not snap.group_refs[cid]:
+            continue
+        group = combatant["Group"]
+        changed = np.flatnonzero((group.hp != hp) | (group.conditions != conditions))
+        if len(changed):
+            command.groups[cid] = (
+                changed, hp[changed], group.hp[changed].copy(),
+                conditions[changed], group.conditions[changed].copy(),
+            )
+    state = tracker.to_state()
+    if state != snap.tracker:
+        if state["entries"] == snap.tracker["entries"]:
+            command.tracker = (
+                {k: snap.tracker[k] for k in _TURN_FIELDS}, {k: state[k] for k in _TURN_FIELDS}
+            )
+        else:
+            command.tracker = (snap.tracker, state)
+    for eid in set(snap.effects) | set(effects.effects):
+        before, after = snap.effects.get(eid), effects.effects.get(eid)
+        if before != after:
+            command.effects[eid] = (before, None if after is None else dict(after, next=dict(after["next"])))
+    return command
+
+
+class CombatHistory:
+    """Undo/redo for the combat tracker.
+
+    Wrap each user action in record(label). The state it can touch
+    (combatant fields, group members, turn order, effects) is compared
+    before and after, and only the differences are kept, as a Command
+    holding both sides. Undo applies the "before" side, redo the "after"
+    side. A step that hits three goblins stores three HP pairs, not a copy
+    of the fight.
+
+    by_id is a callable returning the live {combatant id: combatant} dict;
+    the owner redraws after undo()/redo() (listeners get (event, command)).
+    """
+
+    def __init__(self, by_id, tracker, effects, max_steps=MAX_STEPS):
+        self.by_id = by_id
+        self.tracker = tracker
+        self.effects = effects
+        self.max_steps = max_steps
+        self.done = []
+        self.undone = []
+        self.listeners = []
+        self._depth = 0
+        self._snapshot = None
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def _emit(self, event, command=None):
+        for callback in list(self.listeners):
+            callback(event, command)
+
+    def clear(self):
+        self.done = []
+        self.undone = []
+        self._emit("clear")
+
+    def can_undo(self):
+        return bool(self.done)
+
+    def can_redo(self):
+        return bool(self.undone)
+
+    @contextmanager
+    def record(self, label):
+        """Record everything changed inside the block as one step (nested blocks merge)."""
+        self._depth += 1
+        if self._depth == 1:
+            self._snapshot = _Snapshot(self.by_id(), self.tracker, self.effects)
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                snap, self._snapshot = self._snapshot, None
+                command = _diff(label, snap, self.by_id(), self.tracker, self.effects)
+                if not command.is_empty():
+                    self.done.append(command)
+                    del self.done[: -self.max_steps]
+                    self.undone = []
+                    self._emit("record", command)
+
+    # --- Undo / redo ---------------------------------------------------
+    def undo(self):
+        if not self.done:
+            return None
+        command = self.done.pop()
+        self._apply(command, 0)
+        self.undone.append(command)
+        self._emit("undo", command)
+        return command
+
+    def redo(self):
+        if not self.undone:
+            return None
+        command = self.undone.pop()
+        self._apply(command, 1)
+        self.done.append(command)
+        self._emit("redo", command)
+        return command
+
+    def _apply(self, command, side):
+        by_id = self.by_id()
+        for cid, pair in command.members.items():
+            combatant = pair[side]
+            if combatant is None:
+                by_id.pop(cid, None)
+            else:
+                by_id[cid] = combatant
+        for cid, changes in command.fields.items():
+            combatant = by_id.get(cid)
+            if combatant is None:
+                continue
+            for key, pair in changes.items():
+                if pair[side] is _MISSING:
+                    combatant.pop(key, None)
+                else:
+                    combatant[key] = pair[side]
+        for cid, (indices, hp_before, hp_after, cond_before, cond_after) in command.groups.items():
+            combatant = by_id.get(cid)
+            if combatant is None:
+                continue
+            group = combatant["Group"]
+            group.hp[indices] = (hp_before, hp_after)[side]
+            group.conditions[indices] = (cond_before, cond_after)[side]
+            group.sync(combatant)
+        for eid, pair in command.effects.items():
+            self.effects.remove(eid)
+            if pair[side] is not None:
+                self.effects.restore(dict(pair[side], next=dict(pair[side]["next"])))
+        state = self.tracker.to_state()
+        if command.tracker is not None:
+            state.update(command.tracker[side])
+        # A single load_state keeps the table and the effect schedule in step with the restored order.
+        self.tracker.load_state(state)
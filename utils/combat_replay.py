@@ -0,0 +1,280 @@
+"""Command log and headless replay of a combat session.
+
+The combat tab logs every state-changing step as a small JSON command
+(see CombatReplay for the list) and saves the log with the combat state,
+next to the RNG seed the session started from and the state it started
+in. Replaying the log with a fresh RNGService on that seed re-rolls every
+die in the same order, so verify() can check that the saved final state
+is exactly what the commands produce:
+
+    python tools/replay_combat.py path/to/campaign
+
+The steps that roll dice live here (perform_action, change_hp,
+roll_initiative_for) and the combat tab calls the same functions, so
+the live session and its replay cannot drift apart.
+"""
+import json
+
+from utils.combat_history import CombatHistory
+from utils.combat_rules import resolve_action
+from utils.effects import EffectsEngine
+from utils.initiative import InitiativeTracker
+from utils.rng import RNGService
+from utils.tracing import span
+
+
+def _state_default(obj):
+    if hasattr(obj, "to_state"):
+        return obj.to_state()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+def jsonable(obj):
+    """Deep copy of obj as plain JSON data (monster groups become their saved state)."""
+    return json.loads(json.dumps(obj, default=_state_default))
+
+
+def start_state(combatants, tracker, effects):
+    """What a command log starts from: the combat as it is right now."""
+    return jsonable({"combatants": combatants, "initiative": tracker.to_state(), "effects": effects.to_state()})
+
+
+# ---------- Shared steps ----------
+def roll_initiative_for(combatant, rng):
+    combatant["Initiative"] = rng.stream("initiative").randint(1, 20) + int(combatant.get("InitiativeBonus", 0))
+    return combatant["Initiative"]
+
+
+def perform_action(attacker, action, targets, save=None, rng=None, effects=None):
+    """Resolve an action and the concentration saves it causes; returns (outcomes, lines)."""
+    rng = rng or RNGService()
+    conditions_of = (lambda c: effects.conditions_of(c.get("Id"))) if effects else None
+    if any(c.get("Group") is not None for c in [attacker] + targets):
+        from utils.monster_groups import resolve_group_action
+
+        with span("combat.resolve_group_action", targets=len(targets)):
+            outcomes, lines = resolve_group_action(
+                attacker, action, targets, save, rng=rng.stream("attacks"), conditions_of=conditions_of
+            )
+    else:
+        with span("combat.resolve_action", targets=len(targets)):
+            outcomes, lines = resolve_action(
+                attacker, action, targets, save, rng=rng.stream("attacks"), conditions_of=conditions_of
+            )
+        if save is None:
+            lines.insert(0, f"{attacker['Name']} uses {action.get('name', 'Unknown Action')}.")
+    if effects:
+        for o in outcomes:
+            lines += effects.concentration_check(o["target"].get("Id"), o["damage"], o["target"], rng.stream("effects"))
+    return outcomes, lines
+
+
+def change_hp(combatant, delta, effects, rng):
+    """Heal (delta > 0) or damage a combatant by hand; returns the log lines."""
+    name = combatant.get("Name", "")
+    hp_before = int(combatant.get("HP", 0) or 0)
+    combatant["HP"] = max(0, hp_before + delta)
+    lines = [f"{name} {'regains' if delta > 0 else 'takes'} {abs(delta)} HP. HP: {hp_before} → {combatant['HP']}."]
+    if hp_before > 0 and combatant["HP"] == 0:
+        lines.append(f"{name} has fallen!")
+    if delta < 0:
+        lines += effects.concentration_check(combatant.get("Id"), -delta, combatant, rng.stream("effects"))
+    return lines
+
+
+def restore_combatant(combatant):
+    """Turn a saved monster group back into a MonsterGroup."""
+    if isinstance(combatant.get("Group"), dict):
+        from utils.monster_groups import MonsterGroup
+
+        combatant["Group"] = MonsterGroup.from_state(combatant["Group"])
+        combatant["Group"].sync(combatant)
+    return combatant
+
+
+# ---------- Replay ----------
+class CombatReplay:
+    """Re-executes a command log without any UI.
+
+    Commands are dicts with an "op" key:
+      add (combatant), remove (id), roll_initiative, next_turn, delay,
+      resume (id), ready (id, flag), action (attacker, action, targets,
+      save), hp (id, delta), effect_add (args), effect_remove (effect),
+      group_hp (id, members, value), group_condition (id, members,
+      condition, flag), edit (id, fields, group: a saved group that
+      replaces the old one), batch (ops: one undo step), undo, redo and
+      reload (the state was saved and loaded again).
+    """
+
+    def __init__(self, seed, start=None):
+        self.rng = RNGService(seed)
+        self.by_id = {}
+        self.tracker = InitiativeTracker()
+        self.tracker.add_listener(self._on_tracker_event)
+        self.effects = EffectsEngine(self.tracker)
+        self.history = CombatHistory(lambda: self.by_id, self.tracker, self.effects)
+        self.lines = []
+        self.load(start)
+
+    def _on_tracker_event(self, event, *args):
+        # Mirrors the combat tab's listener, minus the redrawing.
+        if event == "removed":
+            cid = args[1]
+            self.by_id.pop(cid, None)
+            self.effects.remove_for(cid)
+        elif event in ("moved", "reset"):
+            self.effects.rebuild()
+        elif event == "turn":
+            self.lines += self.effects.advance(self.by_id, self.rng.stream("effects"))[1]
+
+    def load(self, data):
+        """Load a saved combat the way the combat tab does."""
+        data = jsonable(data or {})
+        combatants = [restore_combatant(c) for c in data.get("combatants", [])]
+        self.by_id = {c["Id"]: c for c in combatants}
+        self.history.clear()
+        self.effects.load_state(data.get("effects"), known=self.by_id)
+        state = data.get("initiative")
+        if state and {entry[0] for entry in state.get("entries", [])} == set(self.by_id):
+            self.tracker.load_state(state)
+        else:
+            self.tracker.reset([(c["Id"], c.get("Initiative") or None, c.get("DEX", 10)) for c in combatants])
+
+    def combatants(self):
+        return [self.by_id[cid] for cid in self.tracker.order()]
+
+    def run(self, commands):
+        for command in commands:
+            self.apply(command)
+        return self
+
+    def apply(self, command):
+        op = command["op"]
+        handler = getattr(self, f"_op_{op}", None)
+        if handler is None:
+            raise ValueError(f"Unknown combat command {op!r}")
+        if op in ("undo", "redo", "reload"):
+            handler(command)
+        else:
+            with self.history.record(op):
+                handler(command)
+
+    # --- Commands ------------------------------------------------------
+    def _op_add(self, command):
+        combatant = restore_combatant(jsonable(command["combatant"]))
+        self.by_id[combatant["Id"]] = combatant
+        if self.tracker.started():
+            roll_initiative_for(combatant, self.rng)
+        self.tracker.add(combatant["Id"], combatant["Initiative"], combatant["DEX"])
+
+    def _op_remove(self, command):
+        self.tracker.remove(command["id"])
+
+    def _op_roll_initiative(self, command):
+        combatants = self.combatants()
+        for c in combatants:
+            roll_initiative_for(c, self.rng)
+        self.tracker.reset([(c["Id"], c["Initiative"], c.get("DEX", 10)) for c in combatants])
+        self.tracker.start()
+
+    def _op_next_turn(self, command):
+        self.tracker.next_turn()
+
+    def _op_delay(self, command):
+        self.tracker.delay()
+
+    def _op_resume(self, command):
+        self.tracker.resume(command["id"])
+        self.by_id[command["id"]]["Initiative"] = self.tracker.initiative_of(command["id"])
+
+    def _op_ready(self, command):
+        self.tracker.set_ready(command["id"], command["flag"])
+
+    def _op_action(self, command):
+        targets = [self.by_id[cid] for cid in command["targets"]]
+        save = tuple(command["save"]) if command.get("save") else None
+        self.lines += perform_action(
+            self.by_id[command["attacker"]], command["action"], targets, save, self.rng, self.effects
+        )[1]
+
+    def _op_hp(self, command):
+        self.lines += change_hp(self.by_id[command["id"]], command["delta"], self.effects, self.rng)
+
+    def _op_effect_add(self, command):
+        self.effects.add(**command["args"])
+
+    def _op_effect_remove(self, command):
+        self.effects.remove(command["effect"])
+
+    def _op_group_hp(self, command):
+        combatant = self.by_id[command["id"]]
+        combatant["Group"].set_hp(command["members"], command["value"])
+        combatant["Group"].sync(combatant)
+
+    def _op_group_condition(self, command):
+        self.by_id[command["id"]]["Group"].set_condition(command["members"], command["condition"], command["flag"])
+
+    def _op_edit(self, command):
+        combatant = self.by_id[command["id"]]
+        combatant.update(jsonable(command["fields"]))
+        if command.get("group") is not None:
+            combatant["Group"] = command["group"]
+            restore_combatant(combatant)
+
+    def _op_batch(self, command):
+        for sub in command["ops"]:
+            self.apply(sub)
+
+    def _op_undo(self, command):
+        self.history.undo()
+
+    def _op_redo(self, command):
+        self.history.redo()
+
+    def _op_reload(self, command):
+        self.load(
+            {"combatants": self.combatants(), "initiative": self.tracker.to_state(), "effects": self.effects.to_state()}
+        )
+
+
+# ---------- Verification ----------
+def _outcome(combatants, initiative, effects, rng):
+    """The parts of a combat state a replay must reproduce exactly."""
+    combatants = jsonable(combatants)
+    return {
+        "combatants": {
+            c["Id"]: {"HP": c.get("HP"), "Initiative": c.get("Initiative"), "Group": c.get("Group")}
+            for c in combatants
+        },
+        "initiative": jsonable(initiative),
+        "effects": sorted(jsonable((effects or {}).get("effects", [])), key=lambda e: e["id"]),
+        "rng": jsonable(rng),
+    }
+
+
+def replay(data):
+    """Replay a saved combat state's command log; returns the CombatReplay."""
+    log = data.get("replay") or {}
+    seed = (data.get("rng") or {}).get("seed")
+    if seed is None:
+        raise ValueError("This combat state has no RNG seed to replay from")
+    return CombatReplay(seed, log.get("start")).run(log.get("commands", []))
+
+
+def verify(data):
+    """Replay data's command log and list how the result differs from data (empty if identical)."""
+    session = replay(data)
+    expected = _outcome(data.get("combatants", []), data.get("initiative"), data.get("effects"), data.get("rng"))
+    actual = _outcome(
+        session.combatants(), session.tracker.to_state(), session.effects.to_state(), session.rng.to_state()
+    )
+    problems = []
+    names = {c.get("Id"): c.get("Name", "") for c in data.get("combatants", [])}
+    for cid in sorted(set(expected["combatants"]) | set(actual["combatants"])):
+        want, got = expected["combatants"].get(cid), actual["combatants"].get(cid)
+        if want != got:
+            problems.append(f"{names.get(cid, cid)}: expected {want}, replay gave {got}")
+    for key in ("initiative", "effects", "rng"):
+        if expected[key] != actual[key]:
+            problems.append(f"{key} differs after replay")
+    return problems
@@ -0,0 +1,258 @@
+import random
+import re
+
+from utils.initiative import ability_modifier
+
+
+# ---------- Dice and damage ----------
+def roll_dice(formula, rng=random):
+    """Basic dice roller for non-damage rolls like 1d20+5"""
+    match = re.match(r"(\d+)d(\d+)([+-]\d+)?", formula.replace(" ", ""))
+    if not match:
+        return 0, "Invalid dice formula"
+    num, die, mod = int(match.group(1)), int(match.group(2)), match.group(3)
+    rolls = [rng.randint(1, die) for _ in range(num)]
+    total = sum(rolls)
+    mod_val = int(mod) if mod else 0
+    result = total + mod_val
+    roll_str = f"({' + '.join(str(r) for r in rolls)})"
+    if mod:
+        roll_str += f" {mod}"
+    return result, f"{formula}: {roll_str} = {result}"
+
+
+def parse_tags(val):
+    """Normalize resistance/immunity/vulnerability strings."""
+    if not val:
+        return set()
+    if isinstance(val, (list, tuple, set)):
+        items = val
+    else:
+        items = re.split(r"(?:,|/|;|\band\b|\bor\b)", str(val), flags=re.I)
+    return {s.strip().lower() for s in items if s and s.strip()}
+
+
+def roll_damage(formula, crit=False, rng=random):
+    """Roll damage with crit (doubles dice only)."""
+    m = re.match(r"\s*(\d+)d(\d+)\s*([+-]\s*\d+)?\s*$", str(formula))
+    if not m:
+        return 0, f"Invalid damage formula '{formula}'"
+    num, die = int(m.group(1)), int(m.group(2))
+    mod = int(m.group(3).replace(" ", "")) if m.group(3) else 0
+    num_eff = num * 2 if crit else num
+    rolls = [rng.randint(1, die) for _ in range(num_eff)]
+    total = sum(rolls) + mod
+    parts = " + ".join(str(r) for r in rolls)
+    if mod:
+        parts += f" {'+' if mod >= 0 else ''}{mod}"
+    return max(
+        0, total
+    ), f"{num_eff}d{die}{('+' + str(mod)) if mod else ''}: ({parts}) = {total}"
+
+
+def damage_modifiers(damage_type, target):
+    """(immune, resistant, vulnerable) flags of target against a damage type."""
+    dmg_types = parse_tags(damage_type)
+    if not dmg_types:
+        return False, False, False
+    res = parse_tags(target.get("Resistances", ""))
+    vul = parse_tags(target.get("Vulnerabilities", ""))
+    imm = parse_tags(target.get("Immunities", ""))
+    # immune only if immune to all damage types
+    return len(dmg_types & imm) == len(dmg_types), bool(dmg_types & res), bool(dmg_types & vul)
+
+
+def apply_resist_vuln_immune(base_damage, damage_type, target):
+    """Adjust damage for resistances, vulnerabilities, immunities."""
+    immune, resistant, vulnerable = damage_modifiers(damage_type, target)
+    if immune:
+        return 0, "immune"
+
+    adjusted = base_damage
+    notes = []
+    if resistant:
+        adjusted = base_damage // 2
+        notes.append("resistance")
+    if vulnerable:
+        adjusted = adjusted * 2
+        notes.append("vulnerability")
+
+    note = "+".join(notes) if notes else None
+    return adjusted, note
+
+
+# ---------- Conditions ----------
+CONDITIONS = (
+    "blinded", "charmed", "deafened", "exhaustion", "frightened", "grappled", "incapacitated",
+    "invisible", "paralyzed", "petrified", "poisoned", "prone", "restrained", "stunned", "unconscious",
+)
+_ATTACKER_DISADVANTAGE = {"blinded", "frightened", "poisoned", "prone", "restrained"}
+_ATTACKER_ADVANTAGE = {"invisible"}
+_TARGET_ADVANTAGE = {"blinded", "paralyzed", "petrified", "restrained", "stunned", "unconscious"}
+_TARGET_DISADVANTAGE = {"invisible", "dodging"}
+_AUTO_CRIT = {"paralyzed", "unconscious"}
+_FAIL_STR_DEX = {"paralyzed", "petrified", "stunned", "unconscious"}
+
+
+def is_melee(action):
+    return "melee" in str(action.get("type", "")).lower()
+
+
+def attack_modifiers(attacker_conditions, target_conditions, action):
+    """(advantage, disadvantage, auto_crit) for an attack, from both sides' conditions.
+
+    Prone targets are easier to hit in melee and harder at range;
+    paralyzed or unconscious targets take a critical hit from any melee hit.
+    """
+    advantage = bool(attacker_conditions & _ATTACKER_ADVANTAGE or target_conditions & _TARGET_ADVANTAGE)
+    disadvantage = bool(attacker_conditions & _ATTACKER_DISADVANTAGE or target_conditions & _TARGET_DISADVANTAGE)
+    melee = is_melee(action)
+    if "prone" in target_conditions:
+        if melee:
+            advantage = True
+        else:
+            disadvantage = True
+    return advantage, disadvantage, melee and bool(target_conditions & _AUTO_CRIT)
+
+
+def save_modifier(conditions, ability):
+    """"fail" for automatic failure, "disadvantage", or None."""
+    if ability in ("STR", "DEX") and conditions & _FAIL_STR_DEX:
+        return "fail"
+    if ability == "DEX" and "restrained" in conditions:
+        return "disadvantage"
+    return None
+
+
+def roll_d20(advantage=False, disadvantage=False, rng=random):
+    """(kept roll, text); advantage and disadvantage cancel out."""
+    if advantage == disadvantage:
+        d20 = rng.randint(1, 20)
+        return d20, f"d20({d20})"
+    rolls = (rng.randint(1, 20), rng.randint(1, 20))
+    d20 = max(rolls) if advantage else min(rolls)
+    return d20, f"d20({rolls[0]}, {rolls[1]} {'adv' if advantage else 'dis'})"
+
+
+# ---------- Multi-target resolution ----------
+SAVE_ABILITIES = {
+    "str": "STR", "strength": "STR",
+    "dex": "DEX", "dexterity": "DEX",
+    "con": "CON", "constitution": "CON",
+    "int": "INT", "intelligence": "INT",
+    "wis": "WIS", "wisdom": "WIS",
+    "cha": "CHA", "charisma": "CHA",
+}
+_SAVE_RE = re.compile(
+    r"DC\s*(\d+)\s*(strength|dexterity|constitution|intelligence|wisdom|charisma|str|dex|con|int|wis|cha)\b",
+    re.I,
+)
+
+
+def parse_save(action):
+    """Saving-throw details of an action as (ability, dc, half_on_success), or None.
+
+    Reads "DC 15 Dexterity saving throw" style text from the attack bonus,
+    type or description; "half as much damage" marks half damage on a save.
+    """
+    for field in ("attack_bonus", "type", "description"):
+        match = _SAVE_RE.search(str(action.get(field, "") or ""))
+        if match:
+            text = str(action.get("description", "") or "").lower()
+            half = "half" in text or "half" in str(action.get("attack_bonus", "")).lower()
+            return SAVE_ABILITIES[match.group(2).lower()], int(match.group(1)), half
+    return None
+
+
+def _int(value, default=0):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def resolve_action(attacker, action, targets, save=None, rng=random, conditions_of=None):
+    """Resolve one action against any number of targets and apply the damage.
+
+    Attack actions roll to hit and roll damage separately for each target.
+    Saving-throw actions (save=(ability, dc, half_on_success), e.g. from
+    parse_save) roll damage once and each target saves on its own. The
+    target's resistances, vulnerabilities and immunities are applied per
+    target after any halving. Target HP is updated in place.
+
+    conditions_of(combatant) -> set of condition names, if given, adds
+    advantage, disadvantage, automatic crits and failed saves.
+
+    Returns (outcomes, lines): one dict per target and the combat log lines.
+    """
+    name = action.get("name", "Unknown Action")
+    dmg_formula = action.get("damage", "")
+    dmg_type = action.get("damage_type", "")
+    attacker_name = attacker.get("Name", "Unknown")
+    conditions_of = conditions_of or (lambda _combatant: set())
+    lines = []
+    outcomes = []
+
+    shared_damage = None
+    if save is not None:
+        ability, dc, half = save
+        shared_damage = roll_damage(dmg_formula, rng=rng) if dmg_formula else (0, "")
+        lines.append(
+            f"{attacker_name} uses {name} (DC {dc} {ability} save) on {len(targets)} target(s)."
+            + (f" Damage roll: {shared_damage[1]}" if dmg_formula else "")
+        )
+    else:
+        attack_bonus = _int(action.get("attack_bonus", 0))
+        attacker_conditions = conditions_of(attacker)
+
+    for target in targets:
+        outcome = {"target": target, "crit": False, "damage": 0, "note": None}
+        if save is not None:
+            modifier = save_modifier(conditions_of(target), ability)
+            d20, d20_text = roll_d20(disadvantage=modifier == "disadvantage", rng=rng)
+            total = d20 + ability_modifier(target.get(ability, 10))
+            saved = total >= dc and modifier != "fail"
+            base = shared_damage[0]
+            if saved:
+                base = base // 2 if half else 0
+            outcome.update(hit=not saved, saved=saved, d20=d20, total=total)
+            if modifier == "fail":
+                roll_text = f"{target.get('Name', '')} automatically fails the {ability} save"
+            else:
+                roll_text = f"{target.get('Name', '')} {ability} save: {d20_text} = {total} vs DC {dc}: " + (
+                    "success" if saved else "failure"
+                )
+        else:
+            advantage, disadvantage, auto_crit = attack_modifiers(attacker_conditions, conditions_of(target), action)
+            d20, d20_text = roll_d20(advantage, disadvantage, rng)
+            total = d20 + attack_bonus
+            ac = _int(target.get("AC", 10), 10)
+            hit = d20 != 1 and (d20 == 20 or total >= ac)
+            crit = hit and (d20 == 20 or auto_crit)
+            outcome.update(hit=hit, saved=False, d20=d20, total=total, crit=crit)
+            roll_text = f"Attack Roll vs {target.get('Name', '')}: {d20_text} + Attack Bonus({attack_bonus}) = {total} vs AC {ac}"
+            base = 0
+            if hit:
+                base, dmg_str = roll_damage(dmg_formula, crit=crit, rng=rng)
+                roll_text += f" — hit! {dmg_str}" + (" (Critical Hit!)" if crit else "")
+            else:
+                roll_text += " — miss."
+        lines.append(roll_text)
+
+        hp_before = _int(target.get("HP", 0))
+        if base > 0 or outcome["hit"]:
+            adjusted, note = apply_resist_vuln_immune(base, dmg_type, target)
+        else:
+            adjusted, note = 0, None
+        hp_after = max(0, hp_before - adjusted)
+        target["HP"] = hp_after
+        outcome.update(damage=adjusted, note=note, hp_before=hp_before, hp_after=hp_after)
+        outcomes.append(outcome)
+        if adjusted or note:
+            msg = f"{target.get('Name', '')} takes {adjusted} {dmg_type} damage"
+            if note:
+                msg += f" ({note})"
+            lines.append(msg + f". HP: {hp_before} → {hp_after}.")
+        if hp_before > 0 and hp_after == 0:
+            lines.append(f"{target.get('Name', '')} has fallen!")
+    return outcomes, lines
@@ -0,0 +1,254 @@
+import heapq
+import random
+
+from utils.combat_rules import CONDITIONS, roll_damage
+from utils.initiative import ability_modifier
+
+START, END = 0, 1
+PHASES = {"start": START, "end": END}
+
+
+class EffectsEngine:
+    """Conditions and timed effects on combatants.
+
+    An effect is a dict attached to a target combatant id. It may carry a
+    condition (see combat_rules.CONDITIONS), a duration in rounds that runs
+    out at the start or end of an anchor combatant's turn, ongoing damage
+    at the start or end of the target's turns, a save that ends it at the
+    end of the target's turns, and concentration on its source.
+
+    Everything that can happen at a turn boundary is a heap entry keyed by
+    (round, initiative key, phase), which sorts exactly like the turn order.
+    Advancing a turn pops the k entries due, O(k log n), instead of
+    scanning every effect. Entries of removed effects are skipped when
+    popped. The heap is rebuilt when the turn order is re-rolled. Effects
+    are also indexed by target and by concentrating source, so per-row
+    lookups do not scan every effect either.
+    """
+
+    def __init__(self, tracker):
+        self.tracker = tracker
+        self.effects = {}
+        self._by_target = {}
+        self._by_source = {}
+        self._heap = []
+        self._seq = 0       # effect ids
+        self._pushes = 0    # heap tie-breaker, so rebuilding never changes ids
+        self._position = None
+
+    # --- Queries -------------------------------------------------------
+    def effects_on(self, cid):
+        return [self.effects[eid] for eid in self._by_target.get(cid, ())]
+
+    def conditions_of(self, cid):
+        return {e["condition"] for e in self.effects_on(cid) if e.get("condition")}
+
+    def concentrating(self, cid):
+        return bool(self._by_source.get(cid))
+
+    def describe(self, cid):
+        """Short text for the combat table, e.g. "poisoned (2r), burning"."""
+        parts = []
+        for e in self.effects_on(cid):
+            text = e["name"]
+            if e.get("expires_round") is not None:
+                text += f" ({max(0, e['expires_round'] - self.tracker.round)}r)"
+            parts.append(text)
+        return ", ".join(parts)
+
+    # --- Scheduling ----------------------------------------------------
+    def _push(self, round_, cid, phase, kind, eid):
+        key = self.tracker.key_of(cid)
+        if key is None:
+            return
+        self._pushes += 1
+        heapq.heappush(self._heap, (round_, key, phase, self._pushes, kind, eid))
+
+    def _schedule(self, effect):
+        if effect.get("expires_round") is not None:
+            self._push(effect["expires_round"], effect["anchor"], PHASES[effect["phase"]], "expire", effect["id"])
+        for kind, round_ in effect["next"].items():
+            self._push(round_, effect["target"], self._tick_phase(effect, kind), kind, effect["id"])
+
+    @staticmethod
+    def _tick_phase(effect, kind):
+        return PHASES[effect["ongoing"].get("phase", "start")] if kind == "ongoing" else END
+
+    def rebuild(self):
+        """Recompute every heap entry, after initiative keys changed."""
+        self._heap = []
+        for effect in self.effects.values():
+            self._schedule(effect)
+        cid = self.tracker.current
+        self._position = (self.tracker.round, self.tracker.key_of(cid)) if cid in self.tracker else None
+
+    # --- Changes -------------------------------------------------------
+    def add(self, target, name, condition=None, rounds=None, anchor=None, phase="end", source=None,
+            ongoing=None, save_ends=None, concentration=False):
+        """Attach an effect to target and return it.
+
+        rounds: None lasts until removed; otherwise it ends at the given
+        phase ("start" or "end") of anchor's turn (default: the target's)
+        that many rounds from now. ongoing: {"damage": "2d6", "type":
+        "fire", "phase": "start"}. save_ends: {"ability": "CON", "dc": 13}.
+        concentration=True ends the source's other concentration effects.
+        """
+        if condition is not None and condition not in CONDITIONS and condition != "dodging":
+            raise ValueError(f"Unknown condition {condition!r}")
+        if concentration and source is not None:
+            self.end_concentration(source)
+        self._seq += 1
+        effect = {
+            "id": f"e{self._seq}",
+            "target": target,
+            "name": name or condition or "effect",
+            "condition": condition,
+            "source": source,
+            "anchor": anchor or target,
+            "phase": phase,
+            "expires_round": None if rounds is None else self.tracker.round + int(rounds),
+            "ongoing": ongoing,
+            "save_ends": save_ends,
+            "concentration": bool(concentration),
+            # Round of the next ongoing-damage / save-ends tick on the target's turn.
+            "next": {},
+        }
+        for kind, present in (("ongoing", ongoing), ("save", save_ends)):
+            if present:
+                round_ = max(self.tracker.round, 1)
+                boundary = (round_, self.tracker.key_of(target), self._tick_phase(effect, kind))
+                if self._position is not None and boundary <= self._position + (START,):
+                    # That boundary has already passed this round.
+                    round_ += 1
+                effect["next"][kind] = round_
+        self._index(effect)
+        self._schedule(effect)
+        return effect
+
+    def _index(self, effect):
+        self.effects[effect["id"]] = effect
+        self._by_target.setdefault(effect["target"], {})[effect["id"]] = None
+        if effect["concentration"] and effect["source"] is not None:
+            self._by_source.setdefault(effect["source"], {})[effect["id"]] = None
+
+    def restore(self, effect):
+        """Put back an effect exactly as it was (undo); call rebuild() afterwards."""
+        self._index(effect)
+
+    def remove(self, effect_id):
+        effect = self.effects.pop(effect_id, None)
+        if effect is not None:
+            self._by_target.get(effect["target"], {}).pop(effect_id, None)
+            self._by_source.get(effect["source"], {}).pop(effect_id, None)
+        return effect
+
+    def remove_for(self, cid):
+        """Drop effects on a combatant leaving the fight, and its concentration."""
+        removed = [self.remove(eid) for eid in list(self._by_target.pop(cid, ()))]
+        return removed + self.end_concentration(cid)
+
+    def end_concentration(self, source):
+        return [self.remove(eid) for eid in list(self._by_source.pop(source, ()))]
+
+    def concentration_check(self, cid, damage, combatant, rng=random):
+        """Concentration save after cid takes damage; returns log lines."""
+        if damage <= 0 or not self.concentrating(cid):
+            return []
+        name = combatant.get("Name", "")
+        if int(combatant.get("HP", 0) or 0) <= 0:
+            self.end_concentration(cid)
+            return [f"{name} drops to 0 HP and loses concentration."]
+        dc = max(10, damage // 2)
+        d20 = rng.randint(1, 20)
+        total = d20 + ability_modifier(combatant.get("CON", 10))
+        if total >= dc:
+            return [f"{name} concentration save: d20({d20}) = {total} vs DC {dc}: holds."]
+        ended = self.end_concentration(cid)
+        return [f"{name} concentration save: d20({d20}) = {total} vs DC {dc}: lost "
+                f"({', '.join(e['name'] for e in ended)} ends)."]
+
+    # --- Turns ---------------------------------------------------------
+    def _due(self, until):
+        while self._heap and self._heap[0][:3] <= until:
+            round_, _key, _phase, _order, kind, eid = heapq.heappop(self._heap)
+            effect = self.effects.get(eid)
+            if effect is not None:
+                yield round_, kind, effect
+
+    def advance(self, combatants, rng=random):
+        """Process what is due now the turn has moved to tracker.current.
+
+        End-of-turn entries up to the previous turn fire first, then
+        start-of-turn entries up to the new one. Ongoing damage is applied
+        to combatants[cid] (with resistances). Returns (changed ids, lines).
+        """
+        from utils.combat_rules import apply_resist_vuln_immune
+
+        cid = self.tracker.current
+        if cid is None or cid not in self.tracker:
+            return set(), []
+        position = (self.tracker.round, self.tracker.key_of(cid))
+        due = []
+        if self._position is not None:
+            due += list(self._due(self._position + (END,)))
+        due += list(self._due(position + (START,)))
+        self._position = position
+
+        changed, lines = set(), []
+        for round_, kind, effect in due:
+            if effect["id"] not in self.effects:
+                continue
+            target = combatants.get(effect["target"])
+            name = target.get("Name", "") if target else "?"
+            if kind == "expire":
+                self.remove(effect["id"])
+                lines.append(f"{effect['name']} on {name} ends.")
+            elif kind == "ongoing" and target is not None:
+                damage, detail = roll_damage(effect["ongoing"]["damage"], rng=rng)
+                damage, note = apply_resist_vuln_immune(damage, effect["ongoing"].get("type", ""), target)
+                hp_before = int(target.get("HP", 0) or 0)
+                group = target.get("Group")
+                if group is not None:
+                    # Ongoing damage on a monster group hits every living member.
+                    group.damage(group.living(), damage)
+                    group.sync(target)
+                else:
+                    target["HP"] = max(0, hp_before - damage)
+                lines.append(
+                    f"{name} takes {damage} {effect['ongoing'].get('type', '')} damage from {effect['name']}"
+                    f"{' (' + note + ')' if note else ''}: {detail}. HP: {hp_before} → {target['HP']}."
+                )
+                if hp_before > 0 and target["HP"] == 0:
+                    lines.append(f"{name} has fallen!")
+                lines += self.concentration_check(effect["target"], damage, target, rng)
+            elif kind == "save" and target is not None:
+                ability, dc = effect["save_ends"]["ability"], int(effect["save_ends"]["dc"])
+                d20 = rng.randint(1, 20)
+                total = d20 + ability_modifier(target.get(ability, 10))
+                if total >= dc:
+                    self.remove(effect["id"])
+                    lines.append(f"{name} {ability} save vs {effect['name']}: d20({d20}) = {total} vs DC {dc}: ends.")
+                else:
+                    lines.append(f"{name} {ability} save vs {effect['name']}: d20({d20}) = {total} vs DC {dc}: still affected.")
+            changed.add(effect["target"])
+            if kind != "expire" and effect["id"] in self.effects:
+                effect["next"][kind] = round_ + 1
+                self._push(round_ + 1, effect["target"], self._tick_phase(effect, kind), kind, effect["id"])
+        return changed, lines
+
+    # --- Persistence ---------------------------------------------------
+    def to_state(self):
+        return {"effects": list(self.effects.values()), "seq": self._seq}
+
+    def load_state(self, state, known=None):
+        """Restore from to_state(); effects on ids not in known (default: the tracker) are dropped."""
+        known = self.tracker if known is None else known
+        self.effects = {}
+        self._by_target = {}
+        self._by_source = {}
+        for effect in (state or {}).get("effects", []):
+            if effect.get("target") in known:
+                effect.setdefault("next", {})
+                self._index(effect)
+        self._seq = int((state or {}).get("seq", 0))
+        self.rebuild()
@@ -0,0 +1,301 @@
+"""Monte Carlo difficulty tuning for the fight in the combat tracker.
+
+build_spec() turns the tracker's combatants into a picklable description:
+characters and friendly NPCs on one side, hostile NPCs on the other, each
+with HP, AC, initiative bonus and its best attack. simulate() plays many
+copies of the fight at once as NumPy arrays, one row per trial: everyone
+acts in initiative order, attacks a random living enemy with that attack,
+and the party wins when the last hostile drops.
+
+tune() moves the hostiles along one strength scale, step k from -16 to
+16, scaling HP and monster counts by 1 + k/16 and adding k/4 (rounded
+toward zero) to AC and attack bonuses, each knob optional, until the
+party's win rate is in the target band. Each candidate is sampled in batches until the Wilson interval of
+its win rate lies inside, above or below the band. Candidates are
+evaluated across cores, and each wave narrows the range of k the way a
+bisection does. One step can move several knobs at once and jump over
+the band; tune() then keeps the easier step of the pair and searches its
+HP alone in 1/16 increments, then the harder step's downwards if that
+is not enough.
+"""
+import math
+import os
+import re
+
+MAX_ROUNDS = 30
+BATCH = 200
+MAX_TRIALS = 4000
+STEPS = 16
+KNOBS = ("hp", "ac", "attack", "count")
+_DAMAGE_RE = re.compile(r"\s*(\d+)d(\d+)\s*([+-]\s*\d+)?\s*$")
+
+
+def _int(value, default=0):
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return default
+
+
+def wilson(wins, trials, z=1.96):
+    """95% Wilson score interval for a win rate."""
+    if not trials:
+        return 0.0, 1.0
+    p = wins / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    spread = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, centre - spread), min(1.0, centre + spread)
+
+
+# ---------- Fight description ----------
+def _best_attack(combatant):
+    """(attack bonus, dice count, die, modifier) of the action with the most expected damage."""
+    best, best_mean = (0, 0, 0, 0), -1
+    for action in combatant.get("Actions", []):
+        match = _DAMAGE_RE.match(str(action.get("damage", "")))
+        if not match:
+            continue
+        num, die = int(match.group(1)), int(match.group(2))
+        mod = int(match.group(3).replace(" ", "")) if match.group(3) else 0
+        mean = num * (die + 1) / 2 + mod
+        if mean > best_mean:
+            best, best_mean = (_int(action.get("attack_bonus", 0)), num, die, mod), mean
+    return best
+
+
+def side_of(combatant):
+    """The side a combatant fights on: "hostiles", "party", or None for a neutral NPC.
+
+    NPCs are hostile unless their NPC type says Friendly or Neutral, so
+    NPCs without one (and combatants from older saves) still count.
+    """
+    if combatant.get("Type") != "NPC":
+        return "party"
+    return {"Friendly": "party", "Neutral": None}.get(combatant.get("NPCType"), "hostiles")
+
+
+def build_spec(combatants):
+    """{"party": [...], "hostiles": [...]} from combat tracker combatants.
+
+    Downed combatants and neutral NPCs are left out; friendly NPCs fight
+    with the party.
+    """
+    spec = {"party": [], "hostiles": []}
+    for c in combatants:
+        group = c.get("Group")
+        if group is not None:
+            count, hp = group.alive_count(), group.max_hp
+        else:
+            count, hp = 1, _int(c.get("HP", 0))
+        if not count or hp <= 0:
+            continue
+        side = side_of(c)
+        if side is None:
+            continue
+        bonus, num, die, mod = _best_attack(c)
+        unit = {
+            "id": c.get("Id"),
+            "name": c.get("Name", ""),
+            "hp": hp,
+            "ac": _int(c.get("AC", 10), 10),
+            "init": _int(c.get("InitiativeBonus", 0)),
+            "attack": bonus,
+            "dice": (num, die, mod),
+            "count": count,
+        }
+        spec[side].append(unit)
+    return spec
+
+
+def scale_unit(unit, k, knobs=KNOBS, hp_scale=1.0):
+    """The unit at strength step k (k = 0 leaves it unchanged), its HP times hp_scale."""
+    factor = max(0.25, 1 + k / STEPS)
+    delta = int(k / 4)
+    return dict(
+        unit,
+        hp=max(1, round(unit["hp"] * factor * hp_scale)) if "hp" in knobs else unit["hp"],
+        ac=unit["ac"] + delta if "ac" in knobs else unit["ac"],
+        attack=unit["attack"] + delta if "attack" in knobs else unit["attack"],
+        count=max(1, round(unit["count"] * factor)) if "count" in knobs else unit["count"],
+    )
+
+
+def scale_spec(spec, k, knobs=KNOBS, hp_scale=1.0):
+    return {"party": spec["party"], "hostiles": [scale_unit(u, k, knobs, hp_scale) for u in spec["hostiles"]]}
+
+
+def tuned_combatant(combatant, k, knobs=KNOBS, hp_scale=1.0):
+    """(fields, group) that put a hostile combatant at step k, its HP times hp_scale.
+
+    group is (size, HP per member) when the combatant should become or stay
+    a monster group, else None.
+    """
+    group = combatant.get("Group")
+    unit = {
+        "hp": group.max_hp if group is not None else _int(combatant.get("HP", 0)),
+        "ac": _int(combatant.get("AC", 10), 10),
+        "attack": 0,
+        "count": group.alive_count() if group is not None else 1,
+    }
+    scaled = scale_unit(unit, k, knobs, hp_scale)
+    fields = {"AC": scaled["ac"]}
+    if scaled["attack"]:
+        fields["Actions"] = [
+            dict(a, attack_bonus=str(_int(a.get("attack_bonus", 0)) + scaled["attack"]))
+            for a in combatant.get("Actions", [])
+        ]
+    if group is None and scaled["count"] == 1:
+        fields["HP"] = scaled["hp"]
+        return fields, None
+    return fields, (scaled["count"], scaled["hp"])
+
+
+# ---------- Simulation ----------
+def simulate(spec, trials, rng):
+    """Play the fight trials times at once; returns how many the party won."""
+    import numpy as np
+
+    if not spec["party"] or not spec["hostiles"]:
+        return trials if spec["party"] else 0
+    units = [(0, u) for u in spec["party"] for _ in range(u["count"])]
+    units += [(1, u) for u in spec["hostiles"] for _ in range(u["count"])]
+    side = np.array([s for s, _ in units])
+    ac = np.array([u["ac"] for _, u in units])
+    hp = np.tile(np.array([u["hp"] for _, u in units], dtype=np.int32), (trials, 1))
+    members = [np.flatnonzero(side == s) for s in (0, 1)]
+    rows = np.arange(trials)
+    # Ties in initiative bonus go to the party.
+    order = sorted(range(len(units)), key=lambda i: (-units[i][1]["init"], units[i][0]))
+    for _round in range(MAX_ROUNDS):
+        for i in order:
+            s, unit = units[i]
+            num, die, mod = unit["dice"]
+            enemies = members[1 - s]
+            enemy_alive = hp[:, enemies] > 0
+            acting = (hp[:, i] > 0) & enemy_alive.any(axis=1)
+            if not num or not acting.any():
+                continue
+            target = enemies[np.where(enemy_alive, rng.random(enemy_alive.shape), -1.0).argmax(axis=1)]
+            d20 = rng.integers(1, 21, trials)
+            hit = acting & (d20 != 1) & ((d20 == 20) | (d20 + unit["attack"] >= ac[target]))
+            dice = rng.integers(1, die + 1, (trials, num * 2))
+            dice[d20 != 20, num:] = 0
+            damage = np.maximum(dice.sum(axis=1) + mod, 0) * hit
+            hp[rows, target] -= damage.astype(np.int32)
+        party_up = (hp[:, members[0]] > 0).any(axis=1)
+        hostiles_up = (hp[:, members[1]] > 0).any(axis=1)
+        if not (party_up & hostiles_up).any():
+            break
+    return int((party_up & ~hostiles_up).sum())
+
+
+def evaluate(spec, k, band, seed, knobs=KNOBS, batch=BATCH, max_trials=MAX_TRIALS, hp_scale=1.0):
+    """Sample step k (HP times hp_scale) until its win-rate interval clears the band, or max_trials.
+
+    verdict is "in", "easy" (the party wins too often) or "hard"; it comes
+    from the point estimate when the interval never cleared the band
+    ("confident" is then False).
+    """
+    import numpy as np
+
+    spawn_key = (k + 10 * STEPS, round(hp_scale * 4 * STEPS))
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=spawn_key))
+    scaled = scale_spec(spec, k, knobs, hp_scale)
+    wins = trials = 0
+    confident = False
+    while trials < max_trials:
+        wins += simulate(scaled, batch, rng)
+        trials += batch
+        low, high = wilson(wins, trials)
+        if low >= band[0] and high <= band[1] or high < band[0] or low > band[1]:
+            confident = True
+            break
+    p = wins / trials
+    verdict = "easy" if p > band[1] else "hard" if p < band[0] else "in"
+    return {"k": k, "hp": hp_scale, "wins": wins, "trials": trials, "p": p, "ci": wilson(wins, trials),
+            "verdict": verdict, "confident": confident}
+
+
+# ---------- Search ----------
+def _wave(low, high, size, done):
+    """Up to size untried indices spread evenly over [low, high]."""
+    pending = [i for i in range(low, high + 1) if i not in done]
+    if len(pending) <= size:
+        return pending
+    # Interior points, so a single worker bisects.
+    return sorted({pending[(i + 1) * len(pending) // (size + 1)] for i in range(size)})
+
+
+def _bisect(candidates, evaluate_all, workers, results, progress, first=()):
+    """Evaluate (k, hp_scale) candidates, ordered weakest first, until one is in the band.
+
+    Returns the (low, high) index range still open: low > high when the
+    band falls between candidates low - 1 and low.
+    """
+    low, high = 0, len(candidates) - 1
+    done = set()
+    wave = sorted(set(_wave(low, high, workers - len(first), done)) | set(first))
+    while wave:
+        for i, result in zip(wave, evaluate_all([candidates[i] for i in wave])):
+            done.add(i)
+            results[candidates[i]] = result
+            # The party wins less as the hostiles get stronger.
+            if result["verdict"] == "easy":
+                low = max(low, i + 1)
+            elif result["verdict"] == "hard":
+                high = min(high, i - 1)
+        if progress:
+            progress(sorted(results.values(), key=lambda r: (r["k"], r["hp"])))
+        if any(r["verdict"] == "in" for r in results.values()) or low > high:
+            break
+        wave = _wave(low, high, workers, done)
+    return low, high
+
+
+def tune(spec, band=(0.70, 0.85), knobs=KNOBS, seed=0, workers=None, progress=None):
+    """Find the strength step whose party win rate lands in band.
+
+    Returns (best result, all results) with results as from evaluate().
+    When two neighbouring steps jump over the band, the fine HP search
+    adds results with hp other than 1.0. The best is the "in" result
+    with the smallest change (|k|, then HP), or the closest miss if
+    nothing fits. progress(results so far) is called after each wave.
+    """
+    workers = workers or os.cpu_count() or 1
+    results = {}
+    pool = None
+    if workers > 1:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Spawned, not forked: the GUI calls this from a worker thread.
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def evaluate_all(candidates):
+        if pool is None:
+            return [evaluate(spec, k, band, seed, knobs, hp_scale=hp) for k, hp in candidates]
+        futures = [pool.submit(evaluate, spec, k, band, seed, knobs, hp_scale=hp) for k, hp in candidates]
+        return [f.result() for f in futures]
+
+    try:
+        steps = [(k, 1.0) for k in range(-STEPS, STEPS + 1)]
+        # The unchanged fight is always in the first wave.
+        low, high = _bisect(steps, evaluate_all, workers, results, progress, first=(STEPS,))
+        if low > high and 0 < low < len(steps) and "hp" in knobs:
+            easier, harder = steps[low - 1][0], steps[low][0]
+            stronger = [(easier, 1 + j / STEPS) for j in range(1, STEPS + 1)]
+            low, high = _bisect(stronger, evaluate_all, workers, results, progress)
+            if low > high and low == len(stronger):
+                weaker = [(harder, 1 - j / (2 * STEPS)) for j in range(STEPS, 0, -1)]
+                _bisect(weaker, evaluate_all, workers, results, progress)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    fits = [r for r in results.values() if r["verdict"] == "in"]
+    mid = sum(band) / 2
+    best = (
+        min(fits, key=lambda r: (not r["confident"], abs(r["k"]), abs(r["hp"] - 1)))
+        if fits else min(results.values(), key=lambda r: abs(r["p"] - mid))
+    )
+    return best, sorted(results.values(), key=lambda r: (r["k"], r["hp"]))
@@ -0,0 +1,265 @@
+"""Encounter building by the 5e XP budget rules.
+
+MonsterIndex parses each NPC's CR into XP once and indexes the library
+by CR, type and habitat. build_encounters() then searches for monster
+combinations whose adjusted XP lands in a difficulty band for the party.
+
+The search does not look at individual monsters: a library of any size
+has at most 34 distinct XP values, so it is a bounded knapsack over those
+values with a "how many monsters" dimension. reach[n] is a Python int used
+as a bitset of the XP totals n monsters can make; one shift-and-or per
+(value, copies, n) fills it, and combinations are read back from the
+per-value tables. Concrete NPCs are then drawn for each XP value from the
+index.
+"""
+import math
+import random
+import re
+from functools import reduce
+
+XP_BY_CR = {
+    0: 10, 0.125: 25, 0.25: 50, 0.5: 100, 1: 200, 2: 450, 3: 700, 4: 1100, 5: 1800, 6: 2300,
+    7: 2900, 8: 3900, 9: 5000, 10: 5900, 11: 7200, 12: 8400, 13: 10000, 14: 11500, 15: 13000,
+    16: 15000, 17: 18000, 18: 20000, 19: 22000, 20: 25000, 21: 33000, 22: 41000, 23: 50000,
+    24: 62000, 25: 75000, 26: 90000, 27: 105000, 28: 120000, 29: 135000, 30: 155000,
+}
+DIFFICULTIES = ("easy", "medium", "hard", "deadly")
+# Per-character XP thresholds (easy, medium, hard, deadly) by level, from the DMG.
+THRESHOLDS = {
+    1: (25, 50, 75, 100), 2: (50, 100, 150, 200), 3: (75, 150, 225, 400), 4: (125, 250, 375, 500),
+    5: (250, 500, 750, 1100), 6: (300, 600, 900, 1400), 7: (350, 750, 1100, 1700),
+    8: (450, 900, 1400, 2100), 9: (550, 1100, 1600, 2400), 10: (600, 1200, 1900, 2800),
+    11: (800, 1600, 2400, 3600), 12: (1000, 2000, 3000, 4500), 13: (1100, 2200, 3400, 5100),
+    14: (1250, 2500, 3800, 5700), 15: (1400, 2800, 4300, 6400), 16: (1600, 3200, 4800, 7200),
+    17: (2000, 3900, 5900, 8800), 18: (2100, 4200, 6300, 9500), 19: (2400, 4900, 7300, 10900),
+    20: (2800, 5700, 8500, 12700),
+}
+# Encounter multipliers; the step for a monster count moves for small or large parties.
+_MULTIPLIERS = (0.5, 1, 1.5, 2, 2.5, 3, 4, 5)
+_CR_RE = re.compile(r"(\d+)\s*/\s*(\d+)|(\d+(?:\.\d+)?)")
+_INT_RE = re.compile(r"\d+")
+
+
+def parse_cr(value):
+    """CR as a number ("1/4" -> 0.25, "CR 2 (450 XP)" -> 2), or None if unreadable."""
+    match = _CR_RE.search(str(value or ""))
+    if not match:
+        return None
+    if match.group(1):
+        denominator = int(match.group(2))
+        return int(match.group(1)) / denominator if denominator else None
+    return float(match.group(3))
+
+
+def cr_to_xp(value):
+    cr = parse_cr(value)
+    if cr is None:
+        return None
+    if cr in XP_BY_CR:
+        return XP_BY_CR[cr]
+    # Odd values ("0.3") take the nearest listed CR.
+    return XP_BY_CR[min(XP_BY_CR, key=lambda listed: abs(listed - cr))]
+
+
+def format_cr(cr):
+    return {0.125: "1/8", 0.25: "1/4", 0.5: "1/2"}.get(cr, f"{cr:g}")
+
+
+def character_level(character):
+    match = _INT_RE.search(str(character.get("Level", "") or ""))
+    return max(1, min(20, int(match.group(0)))) if match else 1
+
+
+def party_thresholds(levels):
+    """Summed (easy, medium, hard, deadly) thresholds for a party of the given levels."""
+    totals = [0, 0, 0, 0]
+    for level in levels:
+        for i, xp in enumerate(THRESHOLDS[max(1, min(20, int(level)))]):
+            totals[i] += xp
+    return tuple(totals)
+
+
+def multiplier(count, party_size):
+    if count <= 0:
+        return 1
+    step = 1 if count == 1 else 2 if count == 2 else 3 if count <= 6 else 4 if count <= 10 else 5 if count <= 14 else 6
+    if party_size < 3:
+        step += 1
+    elif party_size >= 6:
+        step -= 1
+    return _MULTIPLIERS[step]
+
+
+def rate(xp_values, thresholds, party_size):
+    """(adjusted XP, difficulty) for monsters with the given XP; "trivial" is below easy."""
+    adjusted = int(sum(xp_values) * multiplier(len(xp_values), party_size))
+    label = "trivial"
+    for name, threshold in zip(DIFFICULTIES, thresholds):
+        if adjusted >= threshold:
+            label = name
+    return adjusted, label
+
+
+def difficulty_band(difficulty, thresholds):
+    """[low, high) adjusted XP for a difficulty; deadly extends as far above as hard is below it."""
+    i = DIFFICULTIES.index(difficulty)
+    low = thresholds[i]
+    high = thresholds[i + 1] if i + 1 < len(thresholds) else low + max(1, low - thresholds[i - 1])
+    return low, high
+
+
+class MonsterIndex:
+    """NPCs by XP, CR, type and habitat; the CR of each NPC is parsed once."""
+
+    def __init__(self, npcs=()):
+        self.npcs = []
+        self.xp = []
+        self.cr = []
+        self.by_xp = {}
+        self.by_type = {}
+        self.by_habitat = {}
+        for npc in npcs:
+            self.add(npc)
+
+    def add(self, npc):
+        xp = cr_to_xp(npc.get("CR"))
+        if xp is None:
+            return
+        i = len(self.npcs)
+        self.npcs.append(npc)
+        self.xp.append(xp)
+        self.cr.append(parse_cr(npc.get("CR")))
+        self.by_xp.setdefault(xp, []).append(i)
+        self.by_type.setdefault(str(npc.get("Type", "")).strip().lower(), []).append(i)
+        self.by_habitat.setdefault(str(npc.get("Habitat", "")).strip().lower(), []).append(i)
+
+    def __len__(self):
+        return len(self.npcs)
+
+    def types(self):
+        return sorted(t for t in self.by_type if t)
+
+    def habitats(self):
+        return sorted(h for h in self.by_habitat if h)
+
+    def select(self, types=None, habitats=None, min_cr=None, max_cr=None):
+        """Indices of the NPCs matching every given filter (types/habitats: any of)."""
+        chosen = None
+        for wanted, index in ((types, self.by_type), (habitats, self.by_habitat)):
+            if wanted:
+                ids = set()
+                for key in wanted:
+                    ids.update(index.get(key.strip().lower(), ()))
+                chosen = ids if chosen is None else chosen & ids
+        ids = range(len(self.npcs)) if chosen is None else sorted(chosen)
+        if min_cr is not None or max_cr is not None:
+            low = -1 if min_cr is None else min_cr
+            high = math.inf if max_cr is None else max_cr
+            ids = [i for i in ids if low <= self.cr[i] <= high]
+        return list(ids)
+
+
+def _reachable(values, max_count, max_units):
+    """tables[k][n]: bitset of totals n monsters can make from the first k values."""
+    mask = (1 << (max_units + 1)) - 1
+    reach = [1] + [0] * max_count
+    tables = [reach]
+    for value in values:
+        nxt = list(reach)
+        for n in range(1, max_count + 1):
+            bits = nxt[n]
+            for copies in range(1, n + 1):
+                if copies * value > max_units:
+                    break
+                bits |= reach[n - copies] << (copies * value)
+            nxt[n] = bits & mask
+        reach = nxt
+        tables.append(reach)
+    return tables
+
+
+def _set_bits(bits, low, high):
+    """Positions of the set bits of bits within [low, high)."""
+    window = (bits >> low) & ((1 << max(0, high - low)) - 1)
+    text = bin(window)[:1:-1]
+    positions = []
+    i = text.find("1")
+    while i >= 0:
+        positions.append(low + i)
+        i = text.find("1", i + 1)
+    return positions
+
+
+def _combination(tables, values, count, total, rng):
+    """A random {value: copies} with count monsters totalling total, read back from the tables."""
+    chosen = {}
+    for k in range(len(values), 0, -1):
+        value = values[k - 1]
+        options = [
+            c for c in range(0, count + 1)
+            if c * value <= total and (tables[k - 1][count - c] >> (total - c * value)) & 1
+        ]
+        copies = rng.choice(options)
+        if copies:
+            chosen[value] = copies
+        count -= copies
+        total -= copies * value
+    return chosen
+
+
+def build_encounters(index, levels, difficulty="medium", max_monsters=8, candidates=None, limit=10, rng=None):
+    """Up to limit encounters for a party of the given levels at the target difficulty.
+
+    candidates restricts the search to those index positions (see
+    MonsterIndex.select). Each encounter is a dict with "monsters" (a list
+    of (npc, count)), "xp", "adjusted_xp" and "difficulty".
+    """
+    rng = rng or random.Random()
+    levels = list(levels)
+    if not levels or not len(index):
+        return []
+    candidates = range(len(index)) if candidates is None else candidates
+    pools = {}
+    for i in candidates:
+        pools.setdefault(index.xp[i], []).append(i)
+    if not pools:
+        return []
+    thresholds = party_thresholds(levels)
+    low, high = difficulty_band(difficulty, thresholds)
+    unit = reduce(math.gcd, pools)
+    values = sorted(xp // unit for xp in pools)
+    # One monster has the smallest multiplier, so it needs the largest raw total.
+    max_units = math.ceil(high / multiplier(1, len(levels)) / unit)
+    tables = _reachable(values, max_monsters, max_units)
+
+    # (count, total) pairs whose adjusted XP falls in the band.
+    targets = []
+    for count in range(1, max_monsters + 1):
+        factor = multiplier(count, len(levels))
+        first = math.ceil(low / factor / unit)
+        last = math.ceil(high / factor / unit)
+        targets += [(count, total) for total in _set_bits(tables[-1][count], first, last)]
+    encounters, seen = [], set()
+    for count, total in rng.sample(targets, min(len(targets), limit * 3)):
+        combination = _combination(tables, values, count, total, rng)
+        monsters = {}
+        for value, copies in combination.items():
+            # One kind of monster per XP value, so copies fight as a group.
+            npc = rng.choice(pools[value * unit])
+            monsters[npc] = copies
+        key = tuple(sorted(monsters.items()))
+        if key in seen:
+            continue
+        seen.add(key)
+        xp_values = [index.xp[i] for i, n in monsters.items() for _ in range(n)]
+        adjusted, label = rate(xp_values, thresholds, len(levels))
+        encounters.append({
+            "monsters": [(index.npcs[i], n) for i, n in sorted(monsters.items(), key=lambda item: -index.xp[item[0]])],
+            "xp": sum(xp_values),
+            "adjusted_xp": adjusted,
+            "difficulty": label,
+        })
+        if len(encounters) >= limit:
+            break
+    encounters.sort(key=lambda e: e["adjusted_xp"])
+    return encounters
@@ -0,0 +1,238 @@
+import html
+import re
+from urllib.parse import quote, unquote
+
+LINK_RE = re.compile(r"\[\[([^\[\]|]+)(?:\|([^\[\]]+))?\]\]")
+ENTITY_SCHEME = "entity:"
+_TERMINAL = None
+
+
+def entity_url(name):
+    return ENTITY_SCHEME + quote(name)
+
+
+def name_from_url(url):
+    """Return the entity name for an ``entity:`` link, or None for other links."""
+    if not url.startswith(ENTITY_SCHEME):
+        return None
+    return unquote(url[len(ENTITY_SCHEME):])
+
+
+def name_key(name):
+    """The key entities are matched by: case and runs of whitespace don't count."""
+    return " ".join(str(name or "").lower().split())
+
+
+class EntityIndex:
+    """Name index over characters and NPCs used for ``[[Name]]`` note links.
+
+    Names live in a dict for exact link resolution and in a character trie
+    for spotting bare mentions while typing. Both are updated per entity, so
+    saving or deleting one NPC never rebuilds the index.
+    """
+
+    def __init__(self):
+        self._entities = {}
+        self._trie = {}
+        self._summaries = {}
+        self._listeners = []
+        self._change_listeners = []
+
+    def add_listener(self, callback):
+        """Register callback(names_changed) fired after every update."""
+        self._listeners.append(callback)
+
+    def add_change_listener(self, callback):
+        """Register callback(op, kind, value) fired with what changed.
+
+        op is "set" (value: all entities of kind), "add" (the entity) or
+        "remove" (the name).
+        """
+        self._change_listeners.append(callback)
+
+    def _notify(self, names_changed, op=None, kind=None, value=None):
+        for callback in self._change_listeners:
+            callback(op, kind, value)
+        for callback in self._listeners:
+            callback(names_changed)
+
+    def __len__(self):
+        return len(self._entities)
+
+    # --- Updates -------------------------------------------------------
+    def set_entities(self, kind, entities):
+        """Replace every entity of kind, e.g. after a campaign load."""
+        before = set(self._entities)
+        for key in list(self._entities):
+            self._drop(key, kind)
+        for entity in entities:
+            self._put(kind, entity)
+        self._notify(before != set(self._entities), "set", kind, entities)
+
+    def add(self, kind, entity):
+        """Insert or update a single entity."""
+        key = name_key(entity.get("Name", ""))
+        if not key:
+            return
+        is_new = key not in self._entities
+        self._put(kind, entity)
+        self._notify(is_new, "add", kind, entity)
+
+    def remove(self, kind, name):
+        key = name_key(name)
+        if key not in self._entities:
+            return
+        self._drop(key, kind)
+        self._notify(key not in self._entities, "remove", kind, name)
+
+    def _put(self, kind, entity):
+        key = name_key(entity.get("Name", ""))
+        if not key:
+            return
+        if key not in self._entities:
+            self._entities[key] = {}
+            self._trie_insert(key)
+        self._entities[key][kind] = entity
+        self._summaries.pop(key, None)
+
+    def _drop(self, key, kind):
+        kinds = self._entities.get(key)
+        if not kinds or kind not in kinds:
+            return
+        del kinds[kind]
+        self._summaries.pop(key, None)
+        if not kinds:
+            del self._entities[key]
+            self._trie_remove(key)
+
+    # --- Trie ----------------------------------------------------------
+    def _trie_insert(self, key):
+        node = self._trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[_TERMINAL] = key
+
+    def _trie_remove(self, key):
+        path = []
+        node = self._trie
+        for ch in key:
+            path.append((node, ch))
+            node = node.get(ch)
+            if node is None:
+                return
+        node.pop(_TERMINAL, None)
+        # Prune branches that no longer lead to any name.
+        for parent, ch in reversed(path):
+            if parent[ch]:
+                break
+            del parent[ch]
+
+    # --- Lookups -------------------------------------------------------
+    def entities(self, kind):
+        """Every entity of kind, in no particular order."""
+        return [kinds[kind] for kinds in self._entities.values() if kind in kinds]
+
+    def has(self, kind, name):
+        return kind in self._entities.get(name_key(name), ())
+
+    def resolve(self, name):
+        """Return (kind, entity) for name, preferring characters over NPCs."""
+        kinds = self._entities.get(name_key(name))
+        if not kinds:
+            return None
+        kind = "Character" if "Character" in kinds else next(iter(kinds))
+        return kind, kinds[kind]
+
+    def find_mentions(self, text):
+        """Return (start, end, name_key) for whole-word entity names in text.
+
+        Matching walks the trie from each word start and keeps the longest
+        name that ends on a word boundary.
+        """
+        mentions = []
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            return mentions
+        n = len(text)
+        i = 0
+        while i < n:
+            if not lowered[i].isalnum() or (i and lowered[i - 1].isalnum()):
+                i += 1
+                continue
+            node = self._trie
+            best = None
+            j = i
+            while j < n:
+                ch = lowered[j]
+                if ch.isspace():
+                    # Stored names use single spaces between words.
+                    while j + 1 < n and lowered[j + 1].isspace():
+                        j += 1
+                    ch = " "
+                node = node.get(ch)
+                if node is None:
+                    break
+                j += 1
+                if _TERMINAL in node and (j == n or not lowered[j].isalnum()):
+                    best = (i, j, node[_TERMINAL])
+            if best:
+                mentions.append(best)
+                i = best[1]
+            else:
+                i += 1
+        return mentions
+
+    def summary_html(self, name):
+        """Rendered stat summary for hover cards, cached until the entity changes."""
+        key = name_key(name)
+        if key in self._summaries:
+            return self._summaries[key]
+        found = self.resolve(name)
+        if not found:
+            return None
+        kind, entity = found
+
+        def esc(value):
+            return html.escape(str(value))
+
+        subtitle = kind
+        if kind == "Character":
+            details = " ".join(str(entity.get(k, "")) for k in ("Race", "Class") if entity.get(k))
+            if entity.get("Level"):
+                details += f" (level {entity['Level']})"
+        else:
+            details = " ".join(str(entity.get(k, "")) for k in ("Type", "Role/Title") if entity.get(k))
+            if entity.get("CR"):
+                details += f", CR {entity['CR']}"
+        if details:
+            subtitle += " · " + details.strip()
+        abilities = " ".join(
+            f"{stat} {esc(entity.get(stat, '–'))}" for stat in ("STR", "DEX", "CON", "INT", "WIS", "CHA")
+        )
+        actions = ", ".join(esc(a.get("name", "")) for a in entity.get("Actions", []) if a.get("name"))
+        parts = [
+            f"<b>{esc(entity.get('Name', ''))}</b><br><i>{esc(subtitle)}</i>",
+            f"HP {esc(entity.get('HP', '–'))} · AC {esc(entity.get('AC', '–'))}",
+            abilities,
+        ]
+        if actions:
+            parts.append(f"Actions: {actions}")
+        summary = "<br>".join(parts)
+        self._summaries[key] = summary
+        return summary
+
+    def link_markdown(self, text):
+        """Turn ``[[Name]]`` / ``[[Name|label]]`` into Markdown links.
+
+        Unresolved names are rendered struck through so broken links stand
+        out in the preview.
+        """
+
+        def replace(match):
+            name = match.group(1).strip()
+            label = (match.group(2) or name).strip()
+            if self.resolve(name):
+                return f"[{label}]({entity_url(name)})"
+            return f"<s>{html.escape(label)}</s>"
+
+        return LINK_RE.sub(replace, text)
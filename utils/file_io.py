@@ -1,6 +1,97 @@
 import os
 import json
+import hashlib
+import marshal
+import struct
+import sys
+import tempfile
 
+from utils.entity_index import name_key
+from utils.tracing import traced
+
+# Marks the cache files written by write_cache().
+CACHE_MAGIC = b"DNDCACHE"
+_HEADER_LIMIT = 1 << 16
+
+@traced("file_io.atomic_write_bytes")
+def atomic_write_bytes(file_path, data):
+    """Write data to file_path via a temp file and rename, so readers never see a partial file."""
+    folder = os.path.dirname(file_path) or "."
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=folder)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def atomic_write_text(file_path, text):
+    """Atomically replace file_path with UTF-8 text."""
+    atomic_write_bytes(file_path, text.encode("utf-8"))
+
+# --- Binary caches ---------------------------------------------------------
+# Snapshots and indexes are marshalled for speed. marshal is not safe
+# against malformed or crafted data (it can crash the interpreter), and
+# these files sit in campaign folders that get copied and shared. So a
+# cache starts with a JSON header, and nothing is unmarshalled unless the
+# header matches what the reader expects and the payload has the recorded
+# size and BLAKE2 digest. That rejects truncated, corrupt, stale and
+# foreign files; someone able to write the folder could still forge one.
+
+def write_cache(file_path, header, value):
+    """Atomically write value (marshallable) behind a JSON header dict."""
+    payload = marshal.dumps(value)
+    head = dict(header)
+    head["python"] = list(sys.version_info[:2])
+    head["size"] = len(payload)
+    head["digest"] = hashlib.blake2b(payload).hexdigest()
+    head = json.dumps(head).encode("utf-8")
+    atomic_write_bytes(file_path, CACHE_MAGIC + struct.pack(">I", len(head)) + head + payload)
+
+def read_cache(file_path, expect, max_size):
+    """The value of a write_cache() file, or None.
+
+    None unless the file is at most max_size bytes, every item of expect
+    equals the header's, it was written by this Python version and the
+    payload checks out; only then is it unmarshalled.
+    """
+    try:
+        if os.path.getsize(file_path) > max_size:
+            return None
+        with open(file_path, "rb") as f:
+            raw = f.read(max_size + 1)
+    except OSError:
+        return None
+    start = len(CACHE_MAGIC) + 4
+    if len(raw) < start or not raw.startswith(CACHE_MAGIC):
+        return None
+    (head_size,) = struct.unpack(">I", raw[len(CACHE_MAGIC):start])
+    if head_size > _HEADER_LIMIT:
+        return None
+    try:
+        header = json.loads(raw[start:start + head_size])
+    except ValueError:
+        return None
+    if not isinstance(header, dict) or header.get("python") != list(sys.version_info[:2]):
+        return None
+    if any(header.get(key) != value for key, value in expect.items()):
+        return None
+    payload = raw[start + head_size:]
+    if header.get("size") != len(payload) or header.get("digest") != hashlib.blake2b(payload).hexdigest():
+        return None
+    try:
+        return marshal.loads(payload)
+    except (EOFError, ValueError, TypeError):
+        return None
+
+@traced("file_io.save_entity")
 def save_entity(entity_type, data, campaign_folder):
     """Save a single entity (character, spell, item, npc, notes) as JSON in the campaign folder."""
     os.makedirs(campaign_folder, exist_ok=True)
@@ -14,6 +105,17 @@ def save_entity(entity_type, data, campaign_folder):
     with open(file_path, "w", encoding="utf-8") as f:
         json.dump(all_data, f, indent=2)
 
+@traced("file_io.upsert_entity")
+def upsert_entity(entity_type, data, campaign_folder):
+    """Save an entity, replacing any of the same name (see name_key); returns the new list."""
+    file_path = os.path.join(campaign_folder, f"{entity_type}.json")
+    key = name_key(data.get("Name", ""))
+    all_data = [e for e in load_entities(entity_type, campaign_folder) if name_key(e.get("Name", "")) != key]
+    all_data.append(data)
+    atomic_write_text(file_path, json.dumps(all_data, indent=2))
+    return all_data
+
+@traced("file_io.load_entities")
 def load_entities(entity_type, campaign_folder):
     """Load all entities of a type from the campaign folder."""
     file_path = os.path.join(campaign_folder, f"{entity_type}.json")
@@ -22,17 +124,34 @@ def load_entities(entity_type, campaign_folder):
     with open(file_path, "r", encoding="utf-8") as f:
         return json.load(f)
 
+@traced("file_io.save_notes")
 def save_notes(notes_text, campaign_folder):
     """Save campaign notes as markdown text."""
     os.makedirs(campaign_folder, exist_ok=True)
     file_path = os.path.join(campaign_folder, "notes.md")
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(notes_text)
+    atomic_write_text(file_path, notes_text)
 
+@traced("file_io.load_notes")
 def load_notes(campaign_folder):
     """Load campaign notes as markdown text."""
     file_path = os.path.join(campaign_folder, "notes.md")
     if not os.path.exists(file_path):
         return ""
     with open(file_path, "r", encoding="utf-8") as f:
-        return f.read()
\ No newline at end of file
+        return f.read()
+@traced("file_io.load_combat_state")
+def load_combat_state(campaign_folder):
+    """Load the saved combat tracker state, or an empty dict if there is none."""
+    file_path = os.path.join(campaign_folder, "combat_state.json")
+    if not os.path.exists(file_path):
+        return {}
+    with open(file_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+# Readers for each independently loadable part of a campaign.
+CAMPAIGN_PARTS = {
+    "characters": lambda folder: load_entities("characters", folder),
+    "npcs": lambda folder: load_entities("npcs", folder),
+    "notes": load_notes,
+    "combat": load_combat_state,
+}
@@ -0,0 +1,257 @@
+"""Fuzzy matching of short labels for the command palette.
+
+Candidates are labels such as "Goblin: Scimitar" or "Roll Initiative".
+Their words form a vocabulary, kept sorted for prefix lookups, and each
+alphabetic vocabulary word is indexed by its trigrams. A query word is
+matched against the vocabulary: exact words score highest, then
+prefixes ("scim" for "scimitar"), then words sharing at least half of
+the query's trigrams (typos such as "scmitar"). A candidate matches when
+every query word matches one of its words, so "gob scim" finds
+"Goblin: Scimitar".
+
+Candidates belong to groups (an entity with its actions, the commands,
+the combatants), and set_group() only touches the candidates of a group
+that changed, so saving one NPC never rebuilds the index.
+
+Ranking runs as a Ranking object that does a bounded amount of work per
+step(), so a caller can spread a query over several frames when a word
+like "npc" matches tens of thousands of candidates. The best matches are
+visited first, so the first step already has the top results in almost
+every case.
+"""
+import heapq
+import time
+from bisect import bisect_left, insort
+
+from utils.search_index import tokenize
+
+# Share of a query word's trigrams a vocabulary word must contain to match as a typo.
+MIN_TRIGRAM_SHARE = 0.5
+# Candidates scored between checks of the step deadline.
+CHECK_EVERY = 256
+
+
+def trigrams(word):
+    """Trigrams used for typo matching; numbers and short words have none."""
+    if len(word) < 3 or not word.isalpha():
+        return set()
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+class FuzzyIndex:
+    """Trigram index over candidate labels, updated per group."""
+
+    def __init__(self):
+        self._items = {}        # key -> (label, words, payload, boost)
+        self._groups = {}       # group -> {key: label}
+        self._word_keys = {}    # word -> set of keys
+        self._gram_words = {}   # trigram -> set of words
+        self._sorted = None     # sorted vocabulary, built on the first query
+        self.version = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def groups(self):
+        return list(self._groups)
+
+    # --- Updates -------------------------------------------------------
+    def _add(self, key, label, payload, boost):
+        words = tuple(dict.fromkeys(tokenize(label)))
+        self._items[key] = (label, words, payload, boost)
+        for word in words:
+            keys = self._word_keys.get(word)
+            if keys is None:
+                keys = self._word_keys[word] = set()
+                if self._sorted is not None:
+                    insort(self._sorted, word)
+                for gram in trigrams(word):
+                    self._gram_words.setdefault(gram, set()).add(word)
+            keys.add(key)
+
+    def _remove(self, key):
+        _label, words, _payload, _boost = self._items.pop(key)
+        for word in words:
+            keys = self._word_keys[word]
+            keys.discard(key)
+            if not keys:
+                del self._word_keys[word]
+                if self._sorted is not None:
+                    del self._sorted[bisect_left(self._sorted, word)]
+                for gram in trigrams(word):
+                    grams = self._gram_words[gram]
+                    grams.discard(word)
+                    if not grams:
+                        del self._gram_words[gram]
+
+    def set_group(self, group, candidates):
+        """Make group hold exactly candidates, (key, label, payload, boost) tuples.
+
+        Candidates whose key and label are unchanged keep their entries
+        (their payload is refreshed); returns whether any label changed.
+        """
+        old = self._groups.get(group, {})
+        new = {}
+        changed = False
+        for key, label, payload, boost in candidates:
+            if old.get(key) == label and key in self._items:
+                self._items[key] = self._items[key][:2] + (payload, boost)
+            else:
+                if key in self._items:
+                    self._remove(key)
+                self._add(key, label, payload, boost)
+                changed = True
+            new[key] = label
+        for key in old:
+            if key not in new:
+                self._remove(key)
+                changed = True
+        if new:
+            self._groups[group] = new
+        else:
+            self._groups.pop(group, None)
+        if changed:
+            self.version += 1
+        return changed
+
+    def remove_group(self, group):
+        return self.set_group(group, ())
+
+    # --- Queries -------------------------------------------------------
+    def match_word(self, query_word):
+        """{vocabulary word: similarity in (0, 1]} for one query word."""
+        if self._sorted is None:
+            self._sorted = sorted(self._word_keys)
+        vocabulary = self._sorted
+        matches = {}
+        i = bisect_left(vocabulary, query_word)
+        while i < len(vocabulary) and vocabulary[i].startswith(query_word):
+            word = vocabulary[i]
+            matches[word] = 1.0 if word == query_word else 0.8 + 0.15 * len(query_word) / len(word)
+            i += 1
+        grams = trigrams(query_word)
+        counts = {}
+        for gram in grams:
+            for word in self._gram_words.get(gram, ()):
+                counts[word] = counts.get(word, 0) + 1
+        needed = MIN_TRIGRAM_SHARE * len(grams)
+        for word, shared in counts.items():
+            if shared >= needed and word not in matches:
+                matches[word] = 0.6 * shared / (max(len(query_word), len(word)) - 2)
+        return matches
+
+    def ranking(self, query, limit=20):
+        return Ranking(self, query, limit)
+
+    def search(self, query, limit=20):
+        """Best candidates for query, ranked to completion."""
+        ranking = Ranking(self, query, limit)
+        while not ranking.step(None):
+            pass
+        return ranking.results()
+
+
+class Ranking:
+    """An incremental query over a FuzzyIndex.
+
+    step(budget) works for at most budget seconds (None: no limit) and
+    returns True once every candidate was scored; results() can be read
+    between steps. If the index changes between steps, even after the
+    query finished, the next step starts it over.
+    """
+
+    def __init__(self, index, query, limit):
+        self.index = index
+        self.query = query
+        self.limit = limit
+        self.words = list(dict.fromkeys(tokenize(query)))
+        self._restart()
+
+    @property
+    def stale(self):
+        return self.index.version != self._version
+
+    def _restart(self):
+        self._version = self.index.version
+        self._heap = []
+        self.scored = 0
+        self.done = not self.words
+        self._work = self._run() if self.words else None
+
+    def step(self, budget=None):
+        if self.stale:
+            self._restart()
+        if self.done:
+            return True
+        deadline = None if budget is None else time.perf_counter() + budget
+        for _ in self._work:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return False
+        self.done = True
+        return True
+
+    def results(self):
+        """[{"label", "payload", "score"}] best first."""
+        return [
+            {"label": label, "payload": payload, "score": score}
+            for score, _order, label, payload in sorted(self._heap, key=lambda e: (-e[0], e[1]))
+        ]
+
+    def _run(self):
+        index = self.index
+        matches = []
+        for word in self.words:
+            found = index.match_word(word)
+            if not found:
+                return
+            matches.append(found)
+            yield
+        # Candidates come from the query word with the fewest of them, its
+        # closest vocabulary words first.
+        def size(found):
+            return sum(len(index._word_keys[w]) for w in found)
+
+        driver = min(matches, key=size)
+        heap = self._heap
+        seen = set()
+        for word in sorted(driver, key=driver.get, reverse=True):
+            for key in index._word_keys[word]:
+                if key in seen:
+                    continue
+                seen.add(key)
+                label, words, payload, boost = index._items[key]
+                score = _score(words, matches)
+                if score is not None:
+                    entry = (score + boost, -self.scored, label, payload)
+                    if len(heap) < self.limit:
+                        heapq.heappush(heap, entry)
+                    elif entry[:2] > heap[0][:2]:
+                        heapq.heapreplace(heap, entry)
+                self.scored += 1
+                if self.scored % CHECK_EVERY == 0:
+                    yield
+
+
+def _score(words, matches):
+    """Mean similarity of the query words to a candidate's words, or None if one has no match.
+
+    Query words matched in label order and short labels score a little higher.
+    """
+    total = 0.0
+    last = -1
+    in_order = True
+    for found in matches:
+        best, position = 0.0, -1
+        for i, word in enumerate(words):
+            sim = found.get(word)
+            if sim is not None and sim > best:
+                best, position = sim, i
+        if not best:
+            return None
+        total += best
+        in_order = in_order and position > last
+        last = position
+    return total / len(matches) + (0.05 if in_order else 0.0) - 0.01 * len(words)
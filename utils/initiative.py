@@ -0,0 +1,308 @@
+import math
+import re
+import uuid
+from bisect import bisect_left
+
+_SIGNED_INT_RE = re.compile(r"[+-]\s*\d+")
+_INT_RE = re.compile(r"-?\d+")
+
+
+def ability_modifier(score):
+    try:
+        return (int(score) - 10) // 2
+    except (TypeError, ValueError):
+        return 0
+
+
+def initiative_bonus(entity, typ=None):
+    """Initiative modifier for a character or NPC.
+
+    NPCs use their stat-block Initiative field when it holds a modifier
+    ("+3", "-1", "+2 (12)"); everyone else falls back to the DEX modifier.
+    """
+    if (typ or entity.get("Type")) != "Character":
+        raw = str(entity.get("Initiative", "") or "").strip()
+        match = _SIGNED_INT_RE.search(raw) or _INT_RE.fullmatch(raw)
+        if match:
+            return int(match.group(0).replace(" ", ""))
+    return ability_modifier(entity.get("DEX", 10))
+
+
+def new_combatant_id():
+    return uuid.uuid4().hex[:12]
+
+
+class InitiativeTracker:
+    """Turn order kept sorted by initiative, then DEX, then arrival.
+
+    Entries are stored as parallel sorted lists of keys and combatant ids,
+    so finding a position is a bisect and inserting a late joiner, removing
+    or re-rolling one combatant never re-sorts the list. Combatants without
+    an initiative yet sort after everyone else in the order they were added.
+
+    The tracker knows whose turn it is and the round number, and supports
+    delaying a turn (the combatant drops out of the rotation until it
+    resumes right after the current turn) and readying an action (a flag
+    that clears when the combatant's next turn starts).
+
+    Listeners are called as callback(event, *args) with:
+      "inserted" (index, cid)   "removed" (index, cid)
+      "moved" (old, new, cid)   "changed" (index, cid)
+      "turn" (previous, current)  "round" (round)   "reset" ()
+    """
+
+    def __init__(self):
+        self._keys = []
+        self._ids = []
+        self._entries = {}
+        self._seq = 0
+        self.current = None
+        self.round = 0
+        self.delayed = set()
+        self.ready = set()
+        self.listeners = []
+
+    # --- Queries -------------------------------------------------------
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, cid):
+        return cid in self._entries
+
+    def order(self):
+        return list(self._ids)
+
+    def index_of(self, cid):
+        key = self._entries.get(cid)
+        if key is None:
+            return -1
+        return bisect_left(self._keys, key)
+
+    def key_of(self, cid):
+        """The sort key of cid's slot; keys compare in turn order."""
+        return self._entries.get(cid)
+
+    def initiative_of(self, cid):
+        key = self._entries.get(cid)
+        if key is None or key[0]:
+            return None
+        return -key[1]
+
+    def started(self):
+        return self.round > 0
+
+    # --- Listeners -----------------------------------------------------
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def _emit(self, event, *args):
+        for callback in list(self.listeners):
+            callback(event, *args)
+
+    # --- Membership ----------------------------------------------------
+    def _make_key(self, initiative, dex, order=None):
+        if order is None:
+            self._seq += 1
+            order = float(self._seq)
+        if initiative is None:
+            return (1, 0, 0, order)
+        return (0, -int(initiative), -int(dex or 0), order)
+
+    def _insert(self, cid, key):
+        index = bisect_left(self._keys, key)
+        self._keys.insert(index, key)
+        self._ids.insert(index, cid)
+        self._entries[cid] = key
+        return index
+
+    def _pop(self, cid):
+        index = self.index_of(cid)
+        del self._keys[index]
+        del self._ids[index]
+        del self._entries[cid]
+        return index
+
+    def add(self, cid, initiative=None, dex=0):
+        """Insert a combatant (a late joiner lands in place); returns its index."""
+        if cid in self._entries:
+            raise ValueError(f"Combatant {cid!r} is already in the turn order")
+        index = self._insert(cid, self._make_key(initiative, dex))
+        self._emit("inserted", index, cid)
+        return index
+
+    def remove(self, cid):
+        if cid not in self._entries:
+            return -1
+        was_current = cid == self.current
+        following = self._next_active(cid) if was_current else None
+        index = self._pop(cid)
+        self.delayed.discard(cid)
+        self.ready.discard(cid)
+        self._emit("removed", index, cid)
+        if was_current:
+            self.current = None
+            if following is not None and following != cid:
+                self._set_current(following, wrapped=self.index_of(following) < index)
+        return index
+
+    def set_initiative(self, cid, initiative, dex=0):
+        """Change one combatant's initiative, moving only that entry."""
+        old = self._pop(cid)
+        new = self._insert(cid, self._make_key(initiative, dex))
+        if old == new:
+            self._emit("changed", new, cid)
+        else:
+            self._emit("moved", old, new, cid)
+        return new
+
+    def reset(self, entries):
+        """Replace the whole order from (cid, initiative, dex) tuples in arrival order."""
+        self._keys = []
+        self._ids = []
+        self._entries = {}
+        self._seq = 0
+        keyed = []
+        for cid, initiative, dex in entries:
+            key = self._make_key(initiative, dex)
+            keyed.append((key, cid))
+            self._entries[cid] = key
+        keyed.sort()
+        self._keys = [key for key, _cid in keyed]
+        self._ids = [cid for _key, cid in keyed]
+        self.current = None
+        self.round = 0
+        self.delayed = set()
+        self.ready = set()
+        self._emit("reset")
+
+    # --- Turns ---------------------------------------------------------
+    def _next_active(self, cid):
+        """The next non-delayed combatant after cid, wrapping around."""
+        count = len(self._ids)
+        if not count:
+            return None
+        start = self.index_of(cid) if cid in self._entries else -1
+        for step in range(1, count + 1):
+            candidate = self._ids[(start + step) % count]
+            if candidate not in self.delayed:
+                return candidate
+        return None
+
+    def _set_current(self, cid, wrapped=False):
+        previous = self.current
+        self.current = cid
+        if wrapped:
+            self.round += 1
+            self._emit("round", self.round)
+        if cid is not None and cid in self.ready:
+            # A readied action lapses when the combatant's own turn comes round.
+            self.ready.discard(cid)
+            self._emit("changed", self.index_of(cid), cid)
+        self._emit("turn", previous, cid)
+
+    def start(self):
+        """Begin round 1 at the top of the order."""
+        self.round = 0
+        first = next((cid for cid in self._ids if cid not in self.delayed), None)
+        previous = self.current
+        self.current = None
+        if previous is not None and previous in self._entries:
+            self._emit("changed", self.index_of(previous), previous)
+        self._set_current(first, wrapped=True)
+
+    def next_turn(self):
+        if not self.started():
+            self.start()
+            return self.current
+        if self.current not in self._entries:
+            # Everyone left or delayed at the end of the order: the next round begins.
+            self._set_current(self._next_active(None), wrapped=True)
+            return self.current
+        following = self._next_active(self.current)
+        if following is None:
+            return None
+        wrapped = self.index_of(following) <= self.index_of(self.current)
+        self._set_current(following, wrapped=wrapped)
+        return self.current
+
+    def delay(self, cid=None):
+        """Take cid (default: the current combatant) out of the rotation until resume()."""
+        cid = cid or self.current
+        if cid is None or cid not in self._entries or cid in self.delayed:
+            return
+        advance = cid == self.current
+        self.delayed.add(cid)
+        self._emit("changed", self.index_of(cid), cid)
+        if advance:
+            following = self._next_active(cid)
+            if following is None:
+                self._set_current(None)
+            else:
+                self._set_current(following, wrapped=self.index_of(following) <= self.index_of(cid))
+
+    def resume(self, cid):
+        """A delayed combatant acts now: it moves to just after the current turn and takes it."""
+        if cid not in self.delayed:
+            return
+        self.delayed.discard(cid)
+        anchor = self.current
+        if anchor is None or anchor not in self._entries:
+            self._emit("changed", self.index_of(cid), cid)
+            self._set_current(cid)
+            return
+        old = self._pop(cid)
+        anchor_index = self.index_of(anchor)
+        anchor_key = self._keys[anchor_index]
+        next_key = self._keys[anchor_index + 1] if anchor_index + 1 < len(self._keys) else None
+        if next_key is not None and next_key[:3] == anchor_key[:3]:
+            order = (anchor_key[3] + next_key[3]) / 2.0
+        else:
+            order = anchor_key[3] + 1.0
+        # Later arrivals must sort after this one, never share its key.
+        self._seq = max(self._seq, math.ceil(order))
+        new = self._insert(cid, anchor_key[:3] + (order,))
+        if old == new:
+            self._emit("changed", new, cid)
+        else:
+            self._emit("moved", old, new, cid)
+        self._set_current(cid)
+
+    def set_ready(self, cid, flag=True):
+        if cid not in self._entries:
+            return
+        if flag:
+            self.ready.add(cid)
+        else:
+            self.ready.discard(cid)
+        self._emit("changed", self.index_of(cid), cid)
+
+    # --- Persistence ---------------------------------------------------
+    def to_state(self):
+        return {
+            "entries": [
+                [cid, None if key[0] else -key[1], -key[2], key[3]] for key, cid in zip(self._keys, self._ids)
+            ],
+            "current": self.current,
+            "round": self.round,
+            "delayed": sorted(self.delayed),
+            "ready": sorted(self.ready),
+        }
+
+    def load_state(self, state):
+        """Restore from to_state() output; emits a single "reset"."""
+        keyed = []
+        self._entries = {}
+        for cid, initiative, dex, order in state.get("entries", []):
+            key = self._make_key(initiative, dex, float(order))
+            keyed.append((key, cid))
+            self._entries[cid] = key
+        keyed.sort()
+        self._keys = [key for key, _cid in keyed]
+        self._ids = [cid for _key, cid in keyed]
+        self._seq = math.ceil(max((key[3] for key in self._keys), default=0))
+        current = state.get("current")
+        self.current = current if current in self._entries else None
+        self.round = int(state.get("round", 0) or 0)
+        self.delayed = {cid for cid in state.get("delayed", []) if cid in self._entries}
+        self.ready = {cid for cid in state.get("ready", []) if cid in self._entries}
+        self._emit("reset")
@@ -0,0 +1,221 @@
+"""Index of the characters and NPCs of every campaign under the library root.
+
+Each campaign keeps its entities in characters.json and npcs.json. The
+index records, per file, a summary of every entity (name, kind, type or
+class, CR or level) and the byte range its JSON object occupies in the
+file, so a search never parses a campaign and importing an entity reads
+just its own bytes.
+
+The index is saved next to the campaigns (a marshal cache, like the
+warm-start snapshot) and updated incrementally: files whose (mtime, size) is
+unchanged keep their entries, so refreshing hundreds of campaigns costs
+one stat() per file.
+"""
+import json
+import os
+import re
+
+from utils.file_io import read_cache, write_cache
+from utils.tracing import span
+
+LIBRARY_ROOT = os.path.expanduser("~/DnD_Campaigns/")
+INDEX_NAME = ".library_index.bin"
+INDEX_VERSION = 2
+# Far above the index of any real library; anything bigger is not one of ours.
+MAX_INDEX_SIZE = 1 << 30
+# Campaign folders are looked for this many levels below the root.
+MAX_DEPTH = 3
+ENTITY_FILES = {"characters.json": "Character", "npcs.json": "NPC"}
+_SPACE_RE = re.compile(r"\s*")
+
+
+def _signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def campaign_files(root, max_depth=MAX_DEPTH):
+    """Paths of the entity files of every campaign folder under root (hidden folders skipped)."""
+    found = []
+    pending = [(root, 0)]
+    while pending:
+        folder, depth = pending.pop()
+        try:
+            entries = sorted(os.scandir(folder), key=lambda e: e.name)
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            if entry.name in ENTITY_FILES and entry.is_file():
+                found.append(entry.path)
+            elif depth < max_depth and entry.is_dir(follow_symlinks=False):
+                pending.append((entry.path, depth + 1))
+    return sorted(found)
+
+
+def scan_entities(raw):
+    """(entity, byte offset, byte length) for each object of a JSON array file."""
+    text = raw.decode("utf-8")
+    decoder = json.JSONDecoder()
+    pos = _SPACE_RE.match(text, 0).end()
+    if pos >= len(text) or text[pos] != "[":
+        raise ValueError("not a JSON array")
+    pos = _SPACE_RE.match(text, pos + 1).end()
+    # Char and byte positions only differ after non-ASCII text.
+    ascii_only = len(text) == len(raw)
+    char_pos = byte_pos = 0
+    entities = []
+    while pos < len(text) and text[pos] != "]":
+        entity, end = decoder.raw_decode(text, pos)
+        if ascii_only:
+            start, length = pos, end - pos
+        else:
+            byte_pos += len(text[char_pos:pos].encode("utf-8"))
+            length = len(text[pos:end].encode("utf-8"))
+            start, char_pos, byte_pos = byte_pos, end, byte_pos + length
+        entities.append((entity, start, length))
+        pos = _SPACE_RE.match(text, end).end()
+        if pos < len(text) and text[pos] == ",":
+            pos = _SPACE_RE.match(text, pos + 1).end()
+    return entities
+
+
+def _summary(kind, entity, start, length):
+    if kind == "NPC":
+        detail, rank = entity.get("Type", ""), entity.get("CR", "")
+    else:
+        detail = " ".join(str(entity.get(key, "")).strip() for key in ("Race", "Class")).strip()
+        rank = entity.get("Level", "")
+    return (str(entity.get("Name", "")), str(detail or ""), str(rank or ""), start, length)
+
+
+class LibraryIndex:
+    """Entity summaries of every campaign under root, with their byte ranges.
+
+    update() may run in a worker thread: it builds new tables and swaps
+    them in, so searches from the GUI thread see either the old or the new
+    index, never a half-updated one.
+    """
+
+    def __init__(self, root=LIBRARY_ROOT):
+        self.root = root
+        self.files = {}
+        self.entries = []
+
+    @property
+    def path(self):
+        return os.path.join(self.root, INDEX_NAME)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def campaigns(self):
+        return sorted({e["campaign_folder"] for e in self.entries})
+
+    # --- Persistence ---------------------------------------------------
+    def load(self):
+        """Read the saved index; a missing, damaged or foreign one leaves the index empty."""
+        saved = read_cache(self.path, {"version": INDEX_VERSION}, MAX_INDEX_SIZE)
+        if not isinstance(saved, dict):
+            return False
+        self._swap(saved)
+        return True
+
+    def save(self):
+        write_cache(self.path, {"version": INDEX_VERSION}, self.files)
+
+    # --- Updates -------------------------------------------------------
+    def _index_file(self, path):
+        """{"signature", "kind", "entries"} for one entity file, or None if unreadable."""
+        signature = _signature(path)
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+            entities = scan_entities(raw)
+        except (OSError, ValueError):
+            return None
+        kind = ENTITY_FILES[os.path.basename(path)]
+        return {
+            "signature": signature,
+            "kind": kind,
+            "entries": [_summary(kind, e, start, length) for e, start, length in entities if isinstance(e, dict)],
+        }
+
+    def update(self, save=True):
+        """Re-index changed files and drop deleted ones; returns how many files were read."""
+        files = {}
+        read = 0
+        with span("library.update", root=self.root):
+            for path in campaign_files(self.root):
+                old = self.files.get(path)
+                if old is not None and tuple(old["signature"] or ()) == (_signature(path) or ()):
+                    files[path] = old
+                    continue
+                indexed = self._index_file(path)
+                read += 1
+                if indexed is not None:
+                    files[path] = indexed
+        changed = read or set(files) != set(self.files)
+        self._swap(files)
+        if changed and save and os.path.isdir(self.root):
+            self.save()
+        return read
+
+    def refresh_file(self, path):
+        """Re-index one file right away, e.g. after importing into it."""
+        files = dict(self.files)
+        indexed = self._index_file(path) if os.path.exists(path) else None
+        if indexed is None:
+            files.pop(path, None)
+        else:
+            files[path] = indexed
+        self._swap(files)
+
+    def _swap(self, files):
+        entries = []
+        for path, record in sorted(files.items()):
+            folder = os.path.dirname(path)
+            for name, detail, rank, start, length in record["entries"]:
+                entries.append({
+                    "name": name,
+                    "kind": record["kind"],
+                    "detail": detail,
+                    "rank": rank,
+                    "campaign": os.path.basename(folder),
+                    "campaign_folder": folder,
+                    "path": path,
+                    "offset": start,
+                    "length": length,
+                })
+        self.files, self.entries = files, entries
+
+    # --- Queries -------------------------------------------------------
+    def search(self, query="", kind=None, limit=200):
+        """Entries whose name, type or campaign contains every word of query."""
+        words = query.lower().split()
+        found = []
+        for entry in self.entries:
+            if kind and entry["kind"] != kind:
+                continue
+            text = f"{entry['name']} {entry['detail']} {entry['campaign']}".lower()
+            if all(word in text for word in words):
+                found.append(entry)
+        found.sort(key=lambda e: (e["name"].lower(), e["campaign"].lower()))
+        return found[:limit]
+
+    def load_entity(self, entry):
+        """Read one entity from its campaign file, re-indexing the file if it changed."""
+        record = self.files.get(entry["path"])
+        if record is None or tuple(record["signature"] or ()) != (_signature(entry["path"]) or ()):
+            self.refresh_file(entry["path"])
+            matches = [e for e in self.entries if e["path"] == entry["path"] and e["name"] == entry["name"]]
+            if not matches:
+                return None
+            entry = matches[0]
+        with open(entry["path"], "rb") as f:
+            f.seek(entry["offset"])
+            return json.loads(f.read(entry["length"]).decode("utf-8"))
@@ -0,0 +1,86 @@
+import logging
+import os
+import time
+from collections import deque, namedtuple
+
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+_LEVEL_NUMBERS = {name: getattr(logging, name) for name in LEVELS}
+
+LogEntry = namedtuple("LogEntry", "timestamp level source message")
+
+
+class LogSink:
+    """Thread-safe structured log buffer.
+
+    Producers on any thread append to a bounded deque, which is atomic in
+    CPython, so logging never takes a lock or blocks; if nobody drains for a
+    while the oldest queued entries are dropped. The GUI drains in batches
+    into a capped ring buffer and the optional rotating file sink.
+    """
+
+    def __init__(self, capacity=5000):
+        self.capacity = capacity
+        self._queue = deque(maxlen=capacity)
+        self.entries = deque(maxlen=capacity)
+        self._file_handler = None
+
+    def emit(self, message, level="INFO", source=""):
+        if level not in _LEVEL_NUMBERS:
+            level = "INFO"
+        self._queue.append(LogEntry(time.time(), level, source, str(message)))
+
+    def drain(self):
+        """Move queued entries into the ring buffer and return them."""
+        batch = []
+        pop = self._queue.popleft
+        try:
+            while True:
+                batch.append(pop())
+        except IndexError:
+            pass
+        if batch:
+            self.entries.extend(batch)
+            if self._file_handler is not None:
+                self._write_file(batch)
+        return batch
+
+    # --- Rotating file sink --------------------------------------------
+    def enable_file_sink(self, path, max_bytes=1024 * 1024, backup_count=3):
+        import logging.handlers
+
+        self.disable_file_sink()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s [%(source)s] %(message)s"))
+        self._file_handler = handler
+
+    def disable_file_sink(self):
+        if self._file_handler is not None:
+            self._file_handler.close()
+            self._file_handler = None
+
+    @property
+    def file_path(self):
+        return self._file_handler.baseFilename if self._file_handler else None
+
+    def _write_file(self, batch):
+        handler = self._file_handler
+        for entry in batch:
+            record = logging.LogRecord(
+                "dnd_campaign_creator", _LEVEL_NUMBERS[entry.level], "", 0, entry.message, None, None
+            )
+            record.created = entry.timestamp
+            record.msecs = (entry.timestamp % 1) * 1000
+            record.source = entry.source or "-"
+            handler.handle(record)
+        handler.flush()
+
+
+SINK = LogSink()
+
+
+def log(message, level="INFO", source=""):
+    """Queue a log entry on the shared sink; safe to call from any thread."""
+    SINK.emit(message, level, source)
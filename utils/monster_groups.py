@@ -0,0 +1,278 @@
+import re
+
+import numpy as np
+
+from utils.combat_rules import CONDITIONS, attack_modifiers, damage_modifiers, save_modifier
+from utils.initiative import ability_modifier
+
+_DAMAGE_RE = re.compile(r"\s*(\d+)d(\d+)\s*([+-]\s*\d+)?\s*$")
+
+
+def _rle_encode(values):
+    """[[value, run length], ...] for a 1-D array, so uniform groups save in a few bytes."""
+    if not len(values):
+        return []
+    starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+    lengths = np.diff(np.r_[starts, len(values)])
+    return [[int(v), int(n)] for v, n in zip(values[starts], lengths)]
+
+
+def _rle_decode(runs, dtype):
+    if not runs:
+        return np.zeros(0, dtype=dtype)
+    values, lengths = zip(*runs)
+    return np.repeat(np.array(values, dtype=dtype), lengths)
+
+
+class MonsterGroup:
+    """Per-member state of a stack of identical monsters.
+
+    The combatant dict holding the group is the shared stat block (name,
+    AC, abilities, one Actions list); the group itself is two arrays, the
+    HP and a condition bitmask (one bit per CONDITIONS entry) of every member. It is saved run-length
+    encoded, so a group of 50 untouched goblins costs the same as one.
+    """
+
+    def __init__(self, size, max_hp, hp=None, conditions=None):
+        self.max_hp = int(max_hp)
+        self.hp = np.full(int(size), self.max_hp, dtype=np.int32) if hp is None else np.asarray(hp, dtype=np.int32)
+        self.conditions = (
+            np.zeros(len(self.hp), dtype=np.uint16) if conditions is None else np.asarray(conditions, dtype=np.uint16)
+        )
+
+    # --- Queries -------------------------------------------------------
+    @property
+    def size(self):
+        return len(self.hp)
+
+    def living(self):
+        """Indices of the members still standing."""
+        return np.flatnonzero(self.hp > 0)
+
+    def alive_count(self):
+        return int(np.count_nonzero(self.hp))
+
+    def total_hp(self):
+        return int(self.hp.sum())
+
+    def conditions_of(self, member):
+        bits = int(self.conditions[member])
+        return [name for i, name in enumerate(CONDITIONS) if bits & (1 << i)]
+
+    def summary(self):
+        alive = self.hp[self.hp > 0]
+        if not len(alive):
+            return f"0/{self.size} standing"
+        return f"{len(alive)}/{self.size} standing, HP {int(alive.min())}-{int(alive.max())} (max {self.max_hp})"
+
+    # --- Changes -------------------------------------------------------
+    def damage(self, members, amounts):
+        """Subtract amounts from members (repeats add up); HP stops at 0."""
+        np.subtract.at(self.hp, members, amounts)
+        np.maximum(self.hp, 0, out=self.hp)
+
+    def set_hp(self, members, value):
+        self.hp[members] = max(0, min(int(value), self.max_hp))
+
+    def set_condition(self, members, condition, flag=True):
+        bit = np.uint16(1 << CONDITIONS.index(condition))
+        if flag:
+            self.conditions[members] |= bit
+        else:
+            self.conditions[members] &= ~bit
+
+    def resized(self, alive, max_hp):
+        """A copy with alive standing members of max_hp each, keeping the survivors.
+
+        Standing members keep their conditions and the same share of their
+        max HP; new members join unhurt, and if the group shrinks the last
+        standing members leave. The fallen stay as they are.
+        """
+        max_hp = int(max_hp)
+        hp, conditions = self.hp.copy(), self.conditions.copy()
+        living = self.living()
+        if self.max_hp > 0 and max_hp != self.max_hp:
+            hp[living] = np.clip(np.rint(hp[living] * (max_hp / self.max_hp)), 1, max_hp)
+        extra = int(alive) - len(living)
+        if extra > 0:
+            hp = np.concatenate([hp, np.full(extra, max_hp, dtype=np.int32)])
+            conditions = np.concatenate([conditions, np.zeros(extra, dtype=np.uint16)])
+        elif extra < 0:
+            keep = np.ones(len(hp), dtype=bool)
+            keep[living[extra:]] = False
+            hp, conditions = hp[keep], conditions[keep]
+        return MonsterGroup(len(hp), max_hp, hp, conditions)
+
+    def sync(self, combatant):
+        """Mirror the group's total HP into the combatant's HP field."""
+        combatant["HP"] = self.total_hp()
+
+    # --- Persistence ---------------------------------------------------
+    def to_state(self):
+        return {
+            "size": self.size,
+            "max_hp": self.max_hp,
+            "hp": _rle_encode(self.hp),
+            "conditions": _rle_encode(self.conditions),
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        hp = _rle_decode(state.get("hp", []), np.int32)
+        conditions = _rle_decode(state.get("conditions", []), np.uint16)
+        size = int(state.get("size", len(hp)))
+        if len(hp) != size:
+            hp = None
+        if len(conditions) != size:
+            conditions = None
+        return cls(size, state.get("max_hp", 0), hp, conditions)
+
+
+def is_group(combatant):
+    return isinstance(combatant.get("Group"), MonsterGroup)
+
+
+# ---------- Vectorized resolution ----------
+def roll_damage_array(formula, crit, rng):
+    """Damage for many rolls at once; crit is a bool array (crits double the dice)."""
+    m = _DAMAGE_RE.match(str(formula))
+    if not m:
+        return np.zeros(len(crit), dtype=np.int64)
+    num, die = int(m.group(1)), int(m.group(2))
+    mod = int(m.group(3).replace(" ", "")) if m.group(3) else 0
+    dice = rng.integers(1, die + 1, size=(len(crit), num * 2))
+    dice[~crit, num:] = 0
+    return np.maximum(dice.sum(axis=1) + mod, 0)
+
+
+def _adjust(damage, damage_type, target):
+    """Apply resistances etc. to an array of separate damage instances."""
+    immune, resistant, vulnerable = damage_modifiers(damage_type, target)
+    if immune:
+        return damage * 0, "immune"
+    notes = []
+    if resistant:
+        damage = damage // 2
+        notes.append("resistance")
+    if vulnerable:
+        damage = damage * 2
+        notes.append("vulnerability")
+    return damage, "+".join(notes) if notes else None
+
+
+def _d20_array(rng, count, advantage=False, disadvantage=False):
+    if advantage == disadvantage:
+        return rng.integers(1, 21, size=count)
+    rolls = rng.integers(1, 21, size=(2, count))
+    return rolls.max(axis=0) if advantage else rolls.min(axis=0)
+
+
+def _int(value, default=0):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _label(combatant):
+    if is_group(combatant):
+        return f"{combatant.get('Name', '')} ×{combatant['Group'].alive_count()}"
+    return combatant.get("Name", "")
+
+
+def resolve_group_action(attacker, action, targets, save=None, rng=None, conditions_of=None):
+    """resolve_action() for fights involving monster groups.
+
+    A group attacker attacks with every living member, spread evenly over
+    the targets. Against a group target, each hit lands on the next living
+    member in turn, and an area (saving-throw) action catches every living
+    member, each rolling its own save. All rolls for a target are made as
+    one array. conditions_of applies to the group as a whole, as in
+    resolve_action; per-member conditions are for the DM's reference.
+    Returns (outcomes, lines) shaped like resolve_action's.
+    """
+    rng = rng or np.random.default_rng()
+    conditions_of = conditions_of or (lambda _combatant: set())
+    name = action.get("name", "Unknown Action")
+    dmg_formula = action.get("damage", "")
+    dmg_type = action.get("damage_type", "")
+    attackers = attacker["Group"].alive_count() if is_group(attacker) else 1
+    lines = [f"{_label(attacker)} uses {name}" + (f" (DC {save[1]} {save[0]} save)." if save else ".")]
+    outcomes = []
+    if not attackers:
+        return outcomes, lines
+
+    if save is not None:
+        ability, dc, half = save
+        shared = int(roll_damage_array(dmg_formula, np.zeros(1, dtype=bool), rng)[0]) if dmg_formula else 0
+        lines.append(f"Damage roll: {dmg_formula} = {shared}")
+    else:
+        attack_bonus = _int(action.get("attack_bonus", 0))
+    # Members attacking each target: an even split, earlier targets take the remainder.
+    share = [attackers // len(targets) + (i < attackers % len(targets)) for i in range(len(targets))]
+
+    for target, swings in zip(targets, share):
+        group = target["Group"] if is_group(target) else None
+        hp_before = _int(target.get("HP", 0))
+        fallen_before = group.size - group.alive_count() if group is not None else None
+        outcome = {"target": target, "crit": False, "saved": False, "hit": False, "damage": 0, "note": None}
+        if save is not None:
+            if group is not None:
+                members = group.living()
+            else:
+                members = np.zeros(1, dtype=np.int64)
+            modifier = save_modifier(conditions_of(target), ability)
+            d20 = _d20_array(rng, len(members), disadvantage=modifier == "disadvantage")
+            saved = d20 + ability_modifier(target.get(ability, 10)) >= dc
+            if modifier == "fail":
+                saved[:] = False
+            damage = np.full(len(members), shared, dtype=np.int64)
+            damage[saved] = shared // 2 if half else 0
+            damage, note = _adjust(damage, dmg_type, target)
+            outcome.update(saved=bool(saved.all()), hit=bool((~saved).any()))
+            roll_text = f"{_label(target)}: {int(saved.sum())} of {len(members)} succeed on the {ability} save"
+        else:
+            if not swings:
+                continue
+            advantage, disadvantage, auto_crit = attack_modifiers(
+                conditions_of(attacker), conditions_of(target), action
+            )
+            d20 = _d20_array(rng, swings, advantage, disadvantage)
+            hit = (d20 != 1) & ((d20 == 20) | (d20 + attack_bonus >= _int(target.get("AC", 10), 10)))
+            crit = hit if auto_crit else d20 == 20
+            damage, note = _adjust(roll_damage_array(dmg_formula, crit[hit], rng), dmg_type, target)
+            if group is not None:
+                living = group.living()
+                members = living[np.arange(len(damage)) % len(living)] if len(living) else living[:0]
+                damage = damage[: len(members)]
+            outcome.update(hit=bool(hit.any()), crit=bool(crit[hit].any()))
+            roll_text = (
+                f"{swings} attack(s) vs {_label(target)} (AC {target.get('AC', '')}): "
+                f"{int(hit.sum())} hit, {int(crit[hit].sum())} critical"
+            )
+        lines.append(roll_text)
+
+        total = int(damage.sum())
+        if group is not None:
+            group.damage(members, damage)
+            group.sync(target)
+        else:
+            target["HP"] = max(0, hp_before - total)
+        hp_after = _int(target.get("HP", 0))
+        if group is not None:
+            # Overkill on one member does not carry over, so report the HP actually lost.
+            total = hp_before - hp_after
+        outcome.update(damage=total, note=note, hp_before=hp_before, hp_after=hp_after)
+        outcomes.append(outcome)
+        if total or note:
+            msg = f"{target.get('Name', '')} takes {total} {dmg_type} damage"
+            if note:
+                msg += f" ({note})"
+            lines.append(msg + f". HP: {hp_before} → {hp_after}.")
+        if group is not None:
+            fallen = group.size - group.alive_count() - fallen_before
+            if fallen:
+                lines.append(f"{fallen} {target.get('Name', '')} {'has' if fallen == 1 else 'have'} fallen!")
+        elif hp_before > 0 and hp_after == 0:
+            lines.append(f"{target.get('Name', '')} has fallen!")
+    return outcomes, lines
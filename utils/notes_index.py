@@ -0,0 +1,23 @@
+import re
+
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+
+
+def note_sections(text):
+    """Return [level, title, line_number] for each Markdown heading in text.
+
+    Headings inside fenced code blocks are skipped.
+    """
+    sections = []
+    in_fence = False
+    for line_no, line in enumerate(text.split("\n")):
+        stripped = line.lstrip()
+        if stripped.startswith("```") or stripped.startswith("~~~"):
+            in_fence = not in_fence
+            continue
+        if in_fence or not stripped.startswith("#"):
+            continue
+        match = HEADING_RE.match(stripped)
+        if match:
+            sections.append([len(match.group(1)), match.group(2), line_no])
+    return sections
@@ -0,0 +1,109 @@
+import json
+import os
+import zlib
+
+from utils.file_io import atomic_write_text
+
+JOURNAL_NAME = "notes.md.journal"
+JOURNAL_VERSION = 1
+
+
+def _fingerprint(text):
+    """Size and CRC of the notes text a journal was started against."""
+    data = text.encode("utf-8")
+    return len(data), zlib.crc32(data)
+
+
+def apply_ops(text, ops):
+    """Replay journal ops on text.
+
+    Each op is ``[position, chars_removed, inserted_text]`` with positions
+    counted in UTF-16 code units, the way Qt's text document reports them.
+    """
+    buf = bytearray(text.encode("utf-16-le"))
+    for pos, removed, inserted in ops:
+        start = pos * 2
+        buf[start:start + removed * 2] = inserted.encode("utf-16-le")
+    return buf.decode("utf-16-le")
+
+
+class NotesJournal:
+    """Append-only recovery journal of edits made on top of ``notes.md``.
+
+    The first line is a header fingerprinting the notes file the edits
+    apply to; every following line is one autosave batch of ops.
+    """
+
+    def __init__(self, campaign_folder):
+        self.campaign_folder = campaign_folder
+        self.path = os.path.join(campaign_folder, JOURNAL_NAME)
+        self.notes_path = os.path.join(campaign_folder, "notes.md")
+
+    def size(self):
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def reset(self, base_text):
+        """Start an empty journal against base_text (the current notes.md)."""
+        base_size, base_crc = _fingerprint(base_text)
+        header = {"version": JOURNAL_VERSION, "base_size": base_size, "base_crc": base_crc}
+        atomic_write_text(self.path, json.dumps(header) + "\n")
+
+    def append(self, ops):
+        """Durably append one batch of ops; cost is proportional to the batch."""
+        if not ops:
+            return
+        line = json.dumps({"ops": ops}, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def read(self):
+        """Return (header, ops) or (None, []) when there is no usable journal.
+
+        A torn final line from a crash mid-append is ignored.
+        """
+        if not os.path.exists(self.path):
+            return None, []
+        header = None
+        ops = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                if header is None:
+                    header = entry
+                    continue
+                ops.extend(entry.get("ops", []))
+        if not header or header.get("version") != JOURNAL_VERSION:
+            return None, []
+        return header, ops
+
+    def recover(self, base_text):
+        """Return the recovered notes text, or None if there is nothing to restore.
+
+        Recovery is refused when notes.md no longer matches the text the
+        journal was started against, since the ops would land in the wrong place.
+        """
+        header, ops = self.read()
+        if header is None or not ops:
+            return None
+        if (header.get("base_size"), header.get("base_crc")) != _fingerprint(base_text):
+            return None
+        return apply_ops(base_text, ops)
+
+    def compact(self, text):
+        """Fold the journal into notes.md via atomic rename and start afresh."""
+        atomic_write_text(self.notes_path, text)
+        self.reset(text)
+
+    def discard(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
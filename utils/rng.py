@@ -0,0 +1,82 @@
+"""Seeded random number streams.
+
+Every source of randomness draws from a named stream of an RNGService
+("initiative", "attacks", "effects", ...). Each stream is a NumPy
+Generator whose SeedSequence is spawned from the session seed with the
+stream name as its spawn key. Streams are independent of each other and
+of the order they are first used in, so a session seed (plus the stream
+states, for a session in progress) reproduces every roll.
+
+Set DND_SEED to fix the seed of new sessions when reproducing a bug.
+"""
+import os
+import secrets
+import zlib
+
+
+def new_seed():
+    env = os.environ.get("DND_SEED")
+    return int(env) if env else secrets.randbits(63)
+
+
+class Stream:
+    """One random stream: randint() for the dice helpers, integers() for array code."""
+
+    def __init__(self, generator):
+        self.generator = generator
+
+    def randint(self, a, b):
+        return int(self.generator.integers(a, b + 1))
+
+    def integers(self, *args, **kwargs):
+        return self.generator.integers(*args, **kwargs)
+
+    def random(self):
+        return float(self.generator.random())
+
+
+class RNGService:
+    """Named, independently seeded random streams for one session.
+
+    NumPy is imported when the first stream is used, not when the service
+    is created, so opening the app does not pay for it.
+    """
+
+    def __init__(self, seed=None):
+        self.seed = new_seed() if seed is None else int(seed)
+        self._streams = {}
+
+    def stream(self, name):
+        stream = self._streams.get(name)
+        if stream is None:
+            import numpy as np
+
+            sequence = np.random.SeedSequence(self.seed, spawn_key=(zlib.crc32(name.encode("utf-8")),))
+            stream = self._streams[name] = Stream(np.random.Generator(np.random.PCG64(sequence)))
+        return stream
+
+    # --- Persistence ---------------------------------------------------
+    def to_state(self):
+        return {
+            "seed": self.seed,
+            "streams": {name: s.generator.bit_generator.state for name, s in self._streams.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Continue a session where to_state() left it (a new seed if state is empty)."""
+        service = cls((state or {}).get("seed"))
+        for name, bit_state in (state or {}).get("streams", {}).items():
+            service.stream(name).generator.bit_generator.state = bit_state
+        return service
+
+
+_default = None
+
+
+def default_service():
+    """Process-wide service for rolls outside a combat session (e.g. character stats)."""
+    global _default
+    if _default is None:
+        _default = RNGService()
+    return _default
@@ -0,0 +1,358 @@
+"""Full-text search over a campaign's characters, NPCs and note sections.
+
+An inverted index: postings[term] maps a document id to the term's BM25
+weight in that document, tf * (k1 + 1) / (tf + k1 * (1 - b + b * len / avg)),
+worked out when the document is indexed. A query multiplies by each
+term's idf and sums, vectorized with NumPy over the posting arrays (kept
+per term until the term's postings change), so even words that occur in
+every one of 50,000 NPCs score in a few milliseconds. The last query word
+also matches as a prefix, for as-you-type search.
+
+Each document keeps a digest of its source, so sync_entities() and
+set_notes() only re-index what changed, and the index is saved in the
+campaign folder: opening a campaign re-indexes only what changed since
+the last session. Saved postings stay as packed arrays until a document
+using them changes.
+
+The average document length is set when the index is first filled and
+kept through incremental updates, until it drifts by a quarter and
+reweight() recomputes every weight.
+"""
+import hashlib
+import marshal
+import math
+import os
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+from utils.file_io import read_cache, write_cache
+from utils.notes_index import note_sections
+
+INDEX_NAME = ".search_index.bin"
+INDEX_VERSION = 2
+# Far above a 50,000-NPC campaign's index; anything bigger is not one of ours.
+MAX_INDEX_SIZE = 1 << 30
+K1 = 1.2
+B = 0.75
+# Repeats of the name or title and of action names, as a field boost.
+NAME_WEIGHT = 3
+ACTION_NAME_WEIGHT = 2
+# A one-letter last word only matches whole words; longer ones expand to this many words.
+MAX_EXPANSIONS = 30
+SKIP_FIELDS = {"Name", "TokenImage", "Actions"}
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Lowercase words of text with accents dropped ("Zoë's" -> ["zoe", "s"])."""
+    text = str(text).lower()
+    if not text.isascii():
+        text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return _WORD_RE.findall(text)
+
+
+def _digest(value):
+    # Version 2 has no back-references, so equal values give equal bytes.
+    return hashlib.blake2b(marshal.dumps(value, 2), digest_size=8).digest()
+
+
+def entity_key(kind, name):
+    return (kind, " ".join(str(name).lower().split()))
+
+
+def entity_tokens(entity):
+    parts = [value for field, value in entity.items() if field not in SKIP_FIELDS and isinstance(value, str)]
+    names = []
+    for action in entity.get("Actions", []) or []:
+        if isinstance(action, dict):
+            names.append(str(action.get("name", "")))
+            parts += [str(action.get("description", "")), str(action.get("damage_type", ""))]
+    return (
+        tokenize(entity.get("Name", "")) * NAME_WEIGHT
+        + tokenize(" ".join(names)) * ACTION_NAME_WEIGHT
+        + tokenize(" ".join(parts))
+    )
+
+
+def note_documents(text):
+    """(key, title, line_number, body) for each section of the notes (text before the first heading is "Notes")."""
+    lines = text.split("\n")
+    sections = note_sections(text)
+    starts = [(0, "Notes")] + [(line_no, title) for _level, title, line_no in sections]
+    documents = []
+    seen = {}
+    for i, (start, title) in enumerate(starts):
+        end = starts[i + 1][0] if i + 1 < len(starts) else len(lines)
+        body = "\n".join(lines[start + (1 if i else 0):end])
+        if i == 0 and not body.strip():
+            continue
+        # Repeated headings are told apart by how many came before.
+        n = seen[title] = seen.get(title, -1) + 1
+        documents.append((("Note", f"{title}\x00{n}"), title, start, body))
+    return documents
+
+
+class SearchIndex:
+    """BM25 index of documents keyed by (kind, name) for entities and ("Note", title) for note sections."""
+
+    def __init__(self):
+        self.ids = {}
+        # id -> [kind, title, line, digest, length, terms ("word" or "word*tf")]
+        self.docs = {}
+        # term -> {id: weight}, or (ids, weights) packed arrays as saved
+        self.postings = {}
+        self.avgdl = 0.0
+        self._next_id = 0
+        self._total_length = 0
+        self._terms = None
+        self._arrays = {}
+
+    def __len__(self):
+        return len(self.docs)
+
+    # --- Documents -----------------------------------------------------
+    def _norm(self, length):
+        return K1 * (1 - B + B * length / (self.avgdl or 1))
+
+    def _plist(self, term):
+        """The postings of term as a dict, unpacking saved arrays first."""
+        plist = self.postings.get(term)
+        if isinstance(plist, tuple):
+            ids, weights = array("i"), array("f")
+            ids.frombytes(plist[0])
+            weights.frombytes(plist[1])
+            plist = self.postings[term] = dict(zip(ids, weights))
+        return plist
+
+    def _add(self, key, title, line, digest, tokens):
+        self._remove(key)
+        doc_id = self._next_id
+        self._next_id += 1
+        counts = Counter(tokens)
+        if not self.avgdl:
+            self.avgdl = float(len(tokens) or 1)
+        norm = self._norm(len(tokens))
+        postings = self.postings
+        for term, tf in counts.items():
+            plist = postings.get(term)
+            if type(plist) is not dict:
+                if plist is None:
+                    plist = postings[term] = {}
+                    self._terms = None
+                else:
+                    plist = self._plist(term)
+            plist[doc_id] = tf * (K1 + 1) / (tf + norm)
+        if self._arrays:
+            for term in counts:
+                self._arrays.pop(term, None)
+        self.ids[key] = doc_id
+        terms = " ".join(term if tf == 1 else f"{term}*{tf}" for term, tf in counts.items())
+        self.docs[doc_id] = [key[0], title, line, digest, len(tokens), terms]
+        self._total_length += len(tokens)
+
+    def _remove(self, key):
+        doc_id = self.ids.pop(key, None)
+        if doc_id is None:
+            return
+        doc = self.docs.pop(doc_id)
+        self._total_length -= doc[4]
+        for item in doc[5].split():
+            term = item.partition("*")[0]
+            plist = self._plist(term)
+            if plist is not None:
+                plist.pop(doc_id, None)
+                self._arrays.pop(term, None)
+                if not plist:
+                    del self.postings[term]
+                    self._terms = None
+
+    def _add_batch(self, batch):
+        """Index [(key, title, line, digest, tokens)], setting the average length first if the index is empty."""
+        if not self.docs and batch:
+            self.avgdl = sum(len(b[4]) for b in batch) / len(batch) or 1.0
+        for key, title, line, digest, tokens in batch:
+            self._add(key, title, line, digest, tokens)
+        if self.docs and abs(self._total_length / len(self.docs) - self.avgdl) > 0.25 * self.avgdl:
+            self.reweight()
+
+    def reweight(self):
+        """Recompute every weight for the current average document length."""
+        self.avgdl = self._total_length / len(self.docs) if self.docs else 0.0
+        self._arrays = {}
+        for doc_id, doc in self.docs.items():
+            norm = self._norm(doc[4])
+            for item in doc[5].split():
+                term, _star, tf = item.partition("*")
+                tf = int(tf or 1)
+                self._plist(term)[doc_id] = tf * (K1 + 1) / (tf + norm)
+
+    def add_entity(self, kind, entity):
+        """Index or re-index one character or NPC; an unchanged entity costs one digest."""
+        key = entity_key(kind, entity.get("Name", ""))
+        digest = _digest(entity)
+        doc_id = self.ids.get(key)
+        if doc_id is not None and self.docs[doc_id][3] == digest:
+            return False
+        self._add(key, str(entity.get("Name", "")), -1, digest, entity_tokens(entity))
+        return True
+
+    def remove_entity(self, kind, name):
+        self._remove(entity_key(kind, name))
+
+    def sync_entities(self, kind, entities):
+        """Make the documents of kind match entities; returns how many were (re)indexed or dropped."""
+        wanted = set()
+        batch = []
+        for entity in entities:
+            key = entity_key(kind, entity.get("Name", ""))
+            wanted.add(key)
+            digest = _digest(entity)
+            doc_id = self.ids.get(key)
+            if doc_id is None or self.docs[doc_id][3] != digest:
+                batch.append((key, str(entity.get("Name", "")), -1, digest, entity_tokens(entity)))
+        stale = [key for key in self.ids if key[0] == kind and key not in wanted]
+        for key in stale:
+            self._remove(key)
+        self._add_batch(batch)
+        return len(batch) + len(stale)
+
+    def set_notes(self, text):
+        """Re-index the note sections that changed; moved sections only get their new line."""
+        wanted = set()
+        batch = []
+        for key, title, line, body in note_documents(text):
+            wanted.add(key)
+            digest = _digest(body)
+            doc_id = self.ids.get(key)
+            if doc_id is not None and self.docs[doc_id][3] == digest:
+                self.docs[doc_id][2] = line
+                continue
+            batch.append((key, title, line, digest, tokenize(title) * NAME_WEIGHT + tokenize(body)))
+        stale = [key for key in self.ids if key[0] == "Note" and key not in wanted]
+        for key in stale:
+            self._remove(key)
+        self._add_batch(batch)
+        return len(batch) + len(stale)
+
+    # --- Queries -------------------------------------------------------
+    def _expand(self, prefix):
+        """Indexed words starting with prefix, shortest first."""
+        if self._terms is None:
+            self._terms = sorted(self.postings)
+        i = bisect_left(self._terms, prefix)
+        found = []
+        while i < len(self._terms) and self._terms[i].startswith(prefix):
+            found.append(self._terms[i])
+            i += 1
+        found.sort(key=len)
+        return found[:MAX_EXPANSIONS]
+
+    def _term_arrays(self, term):
+        """(ids, weights) of term as NumPy arrays, cached until its postings change."""
+        import numpy as np
+
+        cached = self._arrays.get(term)
+        if cached is None:
+            plist = self.postings[term]
+            if isinstance(plist, tuple):
+                cached = (np.frombuffer(plist[0], dtype=np.int32), np.frombuffer(plist[1], dtype=np.float32))
+            else:
+                cached = (
+                    np.fromiter(plist.keys(), dtype=np.int32, count=len(plist)),
+                    np.fromiter(plist.values(), dtype=np.float32, count=len(plist)),
+                )
+            self._arrays[term] = cached
+        return cached
+
+    def _word_scores(self, word, prefix):
+        """(ids, scores) for one query word; a prefix word scores each document by its best expansion."""
+        import numpy as np
+
+        terms = [t for t in (self._expand(word) if prefix and len(word) > 1 else [word]) if t in self.postings]
+        if not terms:
+            return None
+        n = len(self.docs)
+        parts = []
+        for term in terms:
+            ids, weights = self._term_arrays(term)
+            idf = math.log(1 + (n - len(ids) + 0.5) / (len(ids) + 0.5))
+            parts.append((ids, weights * idf))
+        if len(parts) == 1:
+            return parts[0]
+        ids = np.concatenate([p[0] for p in parts])
+        scores = np.concatenate([p[1] for p in parts])
+        order = np.lexsort((-scores, ids))
+        ids, scores = ids[order], scores[order]
+        first = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+        return ids[first], scores[first]
+
+    def search(self, query, limit=50, kinds=None):
+        """Best matches for query as dicts (kind, title, line, score); every word must match.
+
+        The last word matches as a prefix unless query ends in a space.
+        """
+        words = tokenize(query)
+        if not words or not self.docs:
+            return []
+        import numpy as np
+
+        prefix = not query[-1:].isspace()
+        if prefix and len(words) > 1 and len(words[-1]) == 1:
+            # One letter into the next word narrows nothing yet.
+            words.pop()
+        per_word = []
+        for i, word in enumerate(words):
+            found = self._word_scores(word, prefix and i == len(words) - 1)
+            if found is None:
+                return []
+            per_word.append(found)
+        per_word.sort(key=lambda p: len(p[0]))
+        ids, scores = per_word[0]
+        for other_ids, other_scores in per_word[1:]:
+            ids, mine, theirs = np.intersect1d(ids, other_ids, assume_unique=True, return_indices=True)
+            scores = scores[mine] + other_scores[theirs]
+        if kinds:
+            keep = np.fromiter((self.docs[i][0] in kinds for i in ids.tolist()), dtype=bool, count=len(ids))
+            ids, scores = ids[keep], scores[keep]
+        if len(ids) > limit:
+            top = np.argpartition(-scores, limit)[:limit]
+            ids, scores = ids[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        results = []
+        for doc_id, score in zip(ids[order].tolist(), scores[order].tolist()):
+            kind, title, line = self.docs[doc_id][:3]
+            results.append({"kind": kind, "title": title, "line": line, "score": score})
+        return results
+
+    # --- Persistence ---------------------------------------------------
+    def save(self, campaign_folder):
+        postings = {
+            term: plist if isinstance(plist, tuple)
+            else (array("i", plist.keys()).tobytes(), array("f", plist.values()).tobytes())
+            for term, plist in self.postings.items()
+        }
+        write_cache(os.path.join(campaign_folder, INDEX_NAME), {"version": INDEX_VERSION}, {
+            "ids": self.ids,
+            "docs": self.docs,
+            "postings": postings,
+            "avgdl": self.avgdl,
+            "next_id": self._next_id,
+        })
+
+    @classmethod
+    def load(cls, campaign_folder):
+        """The index saved in campaign_folder, or an empty one (also if the file is unreadable or stale)."""
+        saved = read_cache(os.path.join(campaign_folder, INDEX_NAME), {"version": INDEX_VERSION}, MAX_INDEX_SIZE)
+        if not isinstance(saved, dict) or set(saved) != {"ids", "docs", "postings", "avgdl", "next_id"}:
+            return cls()
+        index = cls()
+        index.ids = saved["ids"]
+        index.docs = saved["docs"]
+        index.postings = saved["postings"]
+        index.avgdl = saved["avgdl"]
+        index._next_id = saved["next_id"]
+        index._total_length = sum(doc[4] for doc in index.docs.values())
+        return index
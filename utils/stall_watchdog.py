@@ -0,0 +1,161 @@
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+
+STALL_THRESHOLD_MS = 100
+POLL_INTERVAL_S = 0.01
+MAX_STACK_DEPTH = 40
+MAX_LOG_BYTES = 1024 * 1024
+STALL_LOG_PATH = os.path.expanduser("~/.dnd_campaign_creator/stalls.jsonl")
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_SKIP_FILES = {os.path.abspath(__file__)}
+
+
+class StallWatchdog:
+    """Detects event-loop stalls from a heartbeat kept by the GUI thread.
+
+    The GUI thread calls beat() from a short timer. A daemon thread polls the
+    time since the last beat; once it exceeds the expected interval plus the
+    threshold, it snapshots the GUI thread's stack with sys._current_frames().
+    When beats resume, the stall is appended to a JSON-lines log with its
+    duration and that stack.
+    """
+
+    def __init__(self, interval_ms, threshold_ms=STALL_THRESHOLD_MS, log_path=STALL_LOG_PATH, on_stall=None):
+        self.interval = interval_ms / 1000.0
+        self.threshold = threshold_ms / 1000.0
+        self.log_path = log_path
+        self.on_stall = on_stall
+        self._main_ident = threading.main_thread().ident
+        self._last_beat = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def beat(self):
+        self._last_beat = time.monotonic()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stall-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+    def _run(self):
+        stall_start = None
+        stack = None
+        while not self._stop.wait(POLL_INTERVAL_S):
+            last = self._last_beat
+            if last is None:
+                # Not armed until the event loop delivers its first beat.
+                continue
+            if stall_start is not None:
+                if last > stall_start:
+                    self._record(last - stall_start - self.interval, stack)
+                    stall_start = stack = None
+                continue
+            if time.monotonic() - last - self.interval > self.threshold:
+                stall_start = last
+                stack = self._capture_main_stack()
+
+    def _capture_main_stack(self):
+        frame = sys._current_frames().get(self._main_ident)
+        if frame is None:
+            return []
+        try:
+            summary = traceback.extract_stack(frame, limit=MAX_STACK_DEPTH)
+        finally:
+            del frame
+        return [[entry.filename, entry.lineno, entry.name, entry.line or ""] for entry in summary]
+
+    def _record(self, duration_s, stack):
+        record = {
+            "timestamp": time.time(),
+            "duration_ms": round(duration_s * 1000.0, 1),
+            "call_site": call_site(stack),
+            "blocked_in": _format_frame(stack[-1]) if stack else "",
+            "stack": stack,
+        }
+        try:
+            _append_record(self.log_path, record)
+        except OSError:
+            pass
+        if self.on_stall is not None:
+            self.on_stall(record)
+
+
+def _format_frame(frame):
+    filename, lineno, name, _line = frame
+    if filename.startswith(_PROJECT_ROOT + os.sep):
+        filename = os.path.relpath(filename, _PROJECT_ROOT)
+    else:
+        filename = os.path.basename(filename)
+    return f"{filename}:{lineno} in {name}"
+
+
+def call_site(stack):
+    """The innermost frame of our own code in a stack, outermost-first as stored."""
+    for frame in reversed(stack or []):
+        filename = os.path.abspath(frame[0])
+        if filename in _SKIP_FILES or not filename.startswith(_PROJECT_ROOT + os.sep):
+            continue
+        if os.sep + "site-packages" + os.sep in filename:
+            continue
+        return _format_frame(frame)
+    return "(outside project code)"
+
+
+def _append_record(path, record):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if os.path.exists(path) and os.path.getsize(path) > MAX_LOG_BYTES:
+        os.replace(path, path + ".1")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def read_stalls(path=STALL_LOG_PATH):
+    """Stall records from the log (and its rotated predecessor), oldest first."""
+    records = []
+    for candidate in (path + ".1", path):
+        if not os.path.exists(candidate):
+            continue
+        with open(candidate, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # A line cut short by a crash mid-write.
+                    continue
+    return records
+
+
+def aggregate_stalls(records):
+    """Group stalls by call site, worst total time first.
+
+    Returns dicts with call_site, blocked_in (of the longest stall), count,
+    total_ms, max_ms and the stack of the longest stall.
+    """
+    groups = {}
+    for record in records:
+        site = record.get("call_site") or "(unknown)"
+        duration = record.get("duration_ms", 0.0)
+        group = groups.get(site)
+        if group is None:
+            group = groups[site] = {
+                "call_site": site, "blocked_in": "", "count": 0, "total_ms": 0.0, "max_ms": -1.0, "stack": [],
+            }
+        group["count"] += 1
+        group["total_ms"] += duration
+        if duration > group["max_ms"]:
+            group["max_ms"] = duration
+            group["blocked_in"] = record.get("blocked_in", "")
+            group["stack"] = record.get("stack", [])
+    return sorted(groups.values(), key=lambda g: g["total_ms"], reverse=True)
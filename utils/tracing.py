@@ -0,0 +1,171 @@
+"""Lightweight tracing spans.
+
+Usage::
+
+    with span("combat.refresh_table", rows=n):
+        ...
+
+    @traced("file_io.load_entities")
+    def load_entities(...): ...
+
+When tracing is disabled (the default unless DND_TRACE is set) span()
+returns a shared no-op context manager and traced() adds one flag check
+per call. Finished spans are kept in a bounded buffer and can be written
+as a Chrome trace (chrome://tracing, Perfetto).
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+MAX_EVENTS = 100000
+SAMPLES_PER_NAME = 512
+
+_enabled = bool(os.environ.get("DND_TRACE"))
+_events = deque(maxlen=MAX_EVENTS)
+_durations = {}
+_pid = os.getpid()
+
+
+def enable(flag=True):
+    global _enabled
+    _enabled = bool(flag)
+
+
+def is_enabled():
+    return _enabled
+
+
+def clear():
+    _events.clear()
+    _durations.clear()
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        _record(self.name, self.start, end - self.start, self.args, exc_type)
+        return False
+
+
+def _record(name, start_ns, dur_ns, args, exc_type=None):
+    if exc_type is not None:
+        args = dict(args or {}, error=exc_type.__name__)
+    # deque.append is atomic, so worker threads can record without a lock.
+    _events.append((name, start_ns, dur_ns, threading.get_ident(), args))
+    samples = _durations.get(name)
+    if samples is None:
+        samples = _durations.setdefault(name, deque(maxlen=SAMPLES_PER_NAME))
+    samples.append(dur_ns)
+
+
+def span(name, **args):
+    """Time a block of code; a no-op when tracing is disabled."""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, args)
+
+
+def traced(name=None):
+    """Decorator form of span(); defaults to the function's qualified name.
+
+    The wrapper takes *args, so PyQt no longer drops extra signal arguments
+    (e.g. clicked's checked flag); connect decorated slots through a lambda.
+    """
+
+    def decorate(func):
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(span_name, None):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+# --- Reporting ---------------------------------------------------------
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def stats():
+    """Per-span-name summary over recent samples, slowest p95 first.
+
+    Returns dicts with name, count, p50_ms, p95_ms and max_ms.
+    """
+    rows = []
+    for name, samples in list(_durations.items()):
+        values = sorted(samples)
+        if not values:
+            continue
+        rows.append({
+            "name": name,
+            "count": len(values),
+            "p50_ms": _percentile(values, 0.50) / 1e6,
+            "p95_ms": _percentile(values, 0.95) / 1e6,
+            "max_ms": values[-1] / 1e6,
+        })
+    rows.sort(key=lambda r: r["p95_ms"], reverse=True)
+    return rows
+
+
+def slowest(limit=20, window=5000):
+    """The slowest of the last `window` spans as (name, duration_ms, args)."""
+    recent = list(_events)[-window:]
+    recent.sort(key=lambda e: e[2], reverse=True)
+    return [(name, dur / 1e6, args) for name, _start, dur, _tid, args in recent[:limit]]
+
+
+def write_chrome_trace(path):
+    """Write recorded spans in Chrome trace-event JSON format; returns the event count."""
+    events = []
+    for name, start_ns, dur_ns, tid, args in list(_events):
+        event = {
+            "name": name,
+            "cat": name.split(".", 1)[0],
+            "ph": "X",
+            "ts": start_ns / 1000.0,
+            "dur": dur_ns / 1000.0,
+            "pid": _pid,
+            "tid": tid,
+        }
+        if args:
+            event["args"] = {k: v if isinstance(v, (int, float, bool)) else str(v) for k, v in args.items()}
+        events.append(event)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    return len(events)